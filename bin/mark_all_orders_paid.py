@@ -4,19 +4,22 @@ Script para marcar todas las órdenes activas como pagadas.
 
 Este script actualiza directamente en la base de datos todas las órdenes
 con estados no terminales (new, queued, preparing, ready, delivered, awaiting_payment)
-al estado terminal 'paid'.
+al estado terminal 'paid'. Trabaja por lotes de ids: cada lote es un UPDATE y
+el INSERT de historial correspondiente, en su propia transacción.
 
 Uso:
-    python3 bin/mark-all-orders-paid.py [--dry-run] [--confirm]
+    python3 bin/mark-all-orders-paid.py [--dry-run] [--confirm] [--batch-size N]
 
 Opciones:
-    --dry-run: Solo mostrar qué se actualizaría, sin ejecutar
+    --dry-run: Solo mostrar qué se actualizaría (una consulta agregada), sin ejecutar
     --confirm: Confirmar automáticamente sin preguntar
+    --batch-size: Órdenes por lote/transacción (default: 1000)
 """
 
 import argparse
 import os
 import sys
+import time
 from datetime import datetime, timezone
 
 try:
@@ -43,48 +46,92 @@ NON_TERMINAL_STATUSES = [
 ]
 
 
-def get_orders_to_update(cursor):
-    """Obtener órdenes con estados no terminales."""
+DEFAULT_BATCH_SIZE = 1000
+
+# UPDATE + historial en una sola sentencia por lote. El filtro por estado se
+# repite para no pisar órdenes que cambiaron entre la lectura de ids y el lote.
+BATCH_UPDATE_SQL = """
+    WITH updated AS (
+        UPDATE pronto_orders
+        SET workflow_status = 'paid', updated_at = %(now)s
+        WHERE id = ANY(%(ids)s::uuid[])
+          AND workflow_status = ANY(%(statuses)s)
+        RETURNING id
+    )
+    INSERT INTO pronto_order_status_history (order_id, status, changed_at, changed_by)
+    SELECT id, 'paid', %(now)s, NULL FROM updated
+"""
+
+
+def get_status_summary(cursor):
+    """Conteo y monto por estado no terminal en una sola consulta agregada."""
     query = """
-        SELECT id, workflow_status, total_amount, created_at
-        FROM pronto_orders 
+        SELECT workflow_status, COUNT(*), COALESCE(SUM(total_amount), 0)
+        FROM pronto_orders
         WHERE workflow_status = ANY(%s)
-        ORDER BY created_at DESC
+        GROUP BY workflow_status
+        ORDER BY workflow_status
     """
     cursor.execute(query, (NON_TERMINAL_STATUSES,))
     return cursor.fetchall()
 
 
-def update_orders_to_paid(cursor, orders, dry_run=False):
-    """Actualizar órdenes a estado 'paid'."""
-    if not orders:
-        print("✅ No hay órdenes para actualizar")
-        return 0
+def get_order_ids_to_update(cursor):
+    """Obtener ids de órdenes con estados no terminales."""
+    query = """
+        SELECT id::text
+        FROM pronto_orders
+        WHERE workflow_status = ANY(%s)
+        ORDER BY created_at DESC
+    """
+    cursor.execute(query, (NON_TERMINAL_STATUSES,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _print_progress(done, total, started):
+    elapsed = time.monotonic() - started
+    rate = done / elapsed if elapsed > 0 else 0.0
+    width = 30
+    filled = int(width * done / total) if total else width
+    bar = "#" * filled + "-" * (width - filled)
+    pct = 100.0 * done / total if total else 100.0
+    sys.stdout.write(
+        f"\r   [{bar}] {done}/{total} ({pct:5.1f}%) {rate:,.0f} órdenes/s"
+    )
+    sys.stdout.flush()
 
-    updated_count = 0
-    current_time = datetime.now(timezone.utc)
-
-    for order_id, status, total_amount, created_at in orders:
-        if not dry_run:
-            # Actualizar el estado de la orden
-            cursor.execute(
-                "UPDATE pronto_orders SET workflow_status = 'paid', updated_at = %s WHERE id = %s",
-                (current_time, order_id),
-            )
 
-            # Agregar entrada al historial de estados
-            cursor.execute(
-                """
-                INSERT INTO pronto_order_status_history (order_id, status, changed_at, changed_by)
-                VALUES (%s, 'paid', %s, NULL)
-                """,
-                (order_id, current_time),
-            )
+def update_orders_to_paid(conn, cursor, order_ids, batch_size=DEFAULT_BATCH_SIZE):
+    """Actualizar órdenes a 'paid' por lotes, con historial en bloque.
 
-        print(f"  ✅ Orden {order_id} ({status}) -> paid - ${total_amount}")
-        updated_count += 1
+    Cada lote es una transacción: un UPDATE sobre el arreglo de ids y el INSERT
+    del historial correspondiente en la misma sentencia. Retorna
+    ``(actualizadas, segundos)``.
+    """
+    if not order_ids:
+        print("✅ No hay órdenes para actualizar")
+        return 0, 0.0
+
+    total = len(order_ids)
+    updated_count = 0
+    started = time.monotonic()
+
+    for start in range(0, total, batch_size):
+        batch = order_ids[start : start + batch_size]
+        cursor.execute(
+            BATCH_UPDATE_SQL,
+            {
+                "ids": batch,
+                "statuses": NON_TERMINAL_STATUSES,
+                "now": datetime.now(timezone.utc),
+            },
+        )
+        updated_count += max(cursor.rowcount, 0)
+        conn.commit()
+        _print_progress(start + len(batch), total, started)
 
-    return updated_count
+    print()
+    return updated_count, time.monotonic() - started
 
 
 def main():
@@ -97,8 +144,16 @@ def main():
     parser.add_argument(
         "--confirm", action="store_true", help="Confirmar automáticamente"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Órdenes por lote/transacción (default: {DEFAULT_BATCH_SIZE})",
+    )
 
     args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size debe ser mayor a 0")
 
     print("╔═══════════════════════════════════════════════════════════╗")
     print("║                                                       ║")
@@ -125,46 +180,49 @@ def main():
         sys.exit(1)
 
     try:
-        # Obtener órdenes a actualizar
-        orders_to_update = get_orders_to_update(cursor)
+        summary = get_status_summary(cursor)
+        pending_total = sum(count for _, count, _ in summary)
 
-        if not orders_to_update:
+        if not pending_total:
             print("✅ No hay órdenes activas para marcar como pagadas")
             return
 
-        print(f"📊 Órdenes activas encontradas: {len(orders_to_update)}")
-        status_counts = {}
-        total_amount = 0
-
-        for order_id, status, amount, created_at in orders_to_update:
-            status_counts[status] = status_counts.get(status, 0) + 1
-            total_amount += amount or 0
-
+        print(f"📊 Órdenes activas encontradas: {pending_total}")
         print("📋 Desglose por estado:")
-        for status, count in sorted(status_counts.items()):
+        for status, count, _ in summary:
             print(f"   {status}: {count}")
+        total_amount = sum(amount or 0 for _, _, amount in summary)
         print(f"💰 Monto total: ${total_amount:.2f}")
         print()
 
-        if not args.dry_run:
-            if not args.confirm:
-                confirm = input(
-                    "¿Estás seguro de marcar estas órdenes como pagadas? (s/N): "
-                )
-                if confirm.lower() != "s":
-                    print("❌ Operación cancelada")
-                    return
-
-            print("🔄 Actualizando órdenes...")
-            updated_count = update_orders_to_paid(
-                cursor, orders_to_update, dry_run=False
+        if args.dry_run:
+            print("🔍 Modo dry-run: no se modificó ninguna orden")
+            return
+
+        if not args.confirm:
+            confirm = input(
+                "¿Estás seguro de marcar estas órdenes como pagadas? (s/N): "
+            )
+            if confirm.lower() != "s":
+                print("❌ Operación cancelada")
+                return
+
+        print(f"🔄 Actualizando órdenes (lotes de {args.batch_size})...")
+        order_ids = get_order_ids_to_update(cursor)
+        conn.commit()
+        updated_count, elapsed = update_orders_to_paid(
+            conn, cursor, order_ids, batch_size=args.batch_size
+        )
+        rate = updated_count / elapsed if elapsed > 0 else 0.0
+        print(
+            f"✅ {updated_count} órdenes actualizadas a 'paid' "
+            f"en {elapsed:.2f}s ({rate:,.0f} órdenes/s)"
+        )
+        if updated_count < len(order_ids):
+            print(
+                f"⚠️  {len(order_ids) - updated_count} órdenes cambiaron de estado "
+                "durante la ejecución y no se modificaron"
             )
-            conn.commit()
-            print(f"✅ {updated_count} órdenes actualizadas a 'paid'")
-        else:
-            print("🔍 Modo dry-run: Mostrando órdenes que se actualizarían...")
-            update_orders_to_paid(cursor, orders_to_update, dry_run=True)
-            print("✅ Operación simulada completada")
 
         print()
         print("🎉 ¡Todas las órdenes han sido marcadas como pagadas!")
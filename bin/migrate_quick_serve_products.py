@@ -3,7 +3,8 @@
 Migrate existing menu items to set is_quick_serve flag based on category.
 
 This script analyzes existing menu items and sets is_quick_serve=True
-for items in beverage categories.
+for items in beverage categories. The update runs through
+bin/python/backfill_runner.py (PK batches, checkpoint, throttling).
 """
 
 import argparse
@@ -11,6 +12,8 @@ import os
 import sys
 from typing import List
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "python"))
+
 try:
     import psycopg2
 except ImportError:
@@ -18,6 +21,8 @@ except ImportError:
     print("   Para instalar: pip install psycopg2-binary")
     sys.exit(1)
 
+from backfill_runner import Backfill, add_runner_arguments, runner_from_args
+
 # Load database configuration from environment
 postgres_host = os.getenv("POSTGRES_HOST", "localhost")
 postgres_port = os.getenv("POSTGRES_PORT", "5432")
@@ -51,13 +56,13 @@ def get_quick_serve_categories(cursor) -> List[str]:
     return [row[0] for row in cursor.fetchall()]
 
 
-def migrate_quick_serve_items(cursor, dry_run: bool = False) -> int:
-    """Migrate menu items to set is_quick_serve flag."""
+def count_quick_serve_items(cursor) -> tuple[int, List[str]]:
+    """Count menu items that need the is_quick_serve flag."""
     # Get quick serve categories
     quick_serve_categories = get_quick_serve_categories(cursor)
     if not quick_serve_categories:
         print("ℹ️  No se encontraron categorías de bebidas para migrar")
-        return 0
+        return 0, []
 
     print(f"📊 Categorías identificadas como quick-serve: {quick_serve_categories}")
 
@@ -73,26 +78,27 @@ def migrate_quick_serve_items(cursor, dry_run: bool = False) -> int:
 
     if count_to_update == 0:
         print("✅ No hay items que necesiten actualización")
-        return 0
-
-    print(f"🔄 Items que serán actualizados: {count_to_update}")
-
-    if dry_run:
-        print("🔍 Modo dry-run: No se realizarán cambios")
-        return count_to_update
-
-    # Update items
-    update_query = """
-        UPDATE pronto_menu_items 
-        SET is_quick_serve = true
-        FROM pronto_menu_categories mc
-        WHERE pronto_menu_items.category_id = mc.id
-        AND mc.slug = ANY(%s)
-        AND pronto_menu_items.is_quick_serve = false
-    """
-    cursor.execute(update_query, (quick_serve_categories,))
-
-    return cursor.rowcount
+    else:
+        print(f"🔄 Items que serán actualizados: {count_to_update}")
+    return count_to_update, quick_serve_categories
+
+
+def quick_serve_backfill(quick_serve_categories: List[str]) -> Backfill:
+    """Backfill por lotes de PK sobre pronto_menu_items."""
+    return Backfill(
+        name="menu_items_quick_serve",
+        table="pronto_menu_items",
+        sql="""
+            UPDATE pronto_menu_items
+            SET is_quick_serve = true
+            FROM pronto_menu_categories mc
+            WHERE {batch}
+            AND pronto_menu_items.category_id = mc.id
+            AND mc.slug = ANY(%(slugs)s)
+            AND pronto_menu_items.is_quick_serve = false
+        """,
+        params={"slugs": quick_serve_categories},
+    )
 
 
 def main():
@@ -101,6 +107,7 @@ def main():
         "--dry-run", action="store_true", help="Solo mostrar qué se actualizaría"
     )
     parser.add_argument("--yes", action="store_true", help="Confirmar automáticamente")
+    add_runner_arguments(parser)
 
     args = parser.parse_args()
 
@@ -130,22 +137,24 @@ def main():
 
     try:
         # Perform migration
-        updated_count = migrate_quick_serve_items(cursor, dry_run=args.dry_run)
+        count_to_update, quick_serve_categories = count_quick_serve_items(cursor)
+        conn.rollback()
 
-        if not args.dry_run and updated_count > 0:
+        if args.dry_run:
+            print("🔍 Modo dry-run: No se realizarán cambios")
+            print("✅ Operación simulada completada")
+        elif count_to_update > 0:
             if not args.yes:
                 confirm = input(
-                    f"¿Estás seguro de actualizar {updated_count} items? (s/N): "
+                    f"¿Estás seguro de actualizar {count_to_update} items? (s/N): "
                 )
                 if confirm.lower() != "s":
                     print("❌ Operación cancelada")
-                    conn.rollback()
                     return
 
-            conn.commit()
-            print(f"✅ {updated_count} items actualizados exitosamente")
-        elif args.dry_run:
-            print("✅ Operación simulada completada")
+            job = quick_serve_backfill(quick_serve_categories)
+            progress = runner_from_args(conn, job, args).run(restart=args.restart)
+            print(f"✅ {progress.rows} items actualizados exitosamente")
         else:
             print("✅ No se requirieron actualizaciones")
 
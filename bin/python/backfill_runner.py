@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Runner de backfills por lotes para migraciones de datos.
+
+Recorre una tabla por rangos de la PK (keyset: ``key > último`` ``ORDER BY
+key LIMIT n``) y aplica a cada lote una transformación SQL o Python en su
+propia transacción corta (``lock_timeout``/``statement_timeout`` locales).
+El checkpoint (``pronto_backfill_progress``) se actualiza en la misma
+transacción que el lote, así que una corrida interrumpida retoma exactamente
+donde quedó. Antes de cada lote espera si la réplica va atrasada
+(``pg_stat_replication.replay_lag``) o hay demasiadas consultas activas, y
+ajusta el tamaño del lote para que cada transacción dure ~``target`` segundos.
+
+Transformación SQL: ``{batch}`` se reemplaza por el rango de claves del lote
+(los ``%`` literales van como ``%%``)::
+
+    Backfill(
+        name="menu_items_quick_serve",
+        table="pronto_menu_items",
+        sql="UPDATE pronto_menu_items SET is_quick_serve = true "
+            "WHERE {batch} AND category_id = ANY(%(ids)s)",
+        params={"ids": [1, 2]},
+    )
+
+Transformación Python: se leen ``columns`` de las filas del lote (con
+``FOR NO KEY UPDATE``), ``transform(rows)`` devuelve ``(key, *updates)``
+solo de las filas que cambian y se escriben con un único
+``UPDATE ... FROM (VALUES ...)``. ``BackfillRunner.preview()`` recorre los
+mismos lotes sin bloquear ni escribir y cuenta las filas que cambiarían (el
+``--dry-run`` de los scripts).
+
+Uso:
+    python3 bin/python/backfill_runner.py --name X --table T --sql "UPDATE T SET ... WHERE {batch}"
+    python3 bin/python/backfill_runner.py --status
+
+Requiere la migración 20261019_02__create_backfill_progress.sql.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+try:
+    import psycopg2
+    from psycopg2 import sql as pgsql
+    from psycopg2.extras import execute_values
+except ImportError:
+    print("❌ Error: El paquete 'psycopg2-binary' no está instalado")
+    print("   Para instalar: pip install psycopg2-binary")
+    sys.exit(1)
+
+Transform = Callable[[list[tuple]], list[tuple]]
+
+LOCK_KEY = "pronto-backfill:"
+REPORT_EVERY_SECONDS = 5.0
+
+
+def connect():
+    """Conexión desde DATABASE_URL o POSTGRES_* (mismos defaults que bin/python)."""
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        return psycopg2.connect(database_url)
+    return psycopg2.connect(
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=os.getenv("POSTGRES_PORT", "5432"),
+        user=os.getenv("POSTGRES_USER", "pronto"),
+        password=os.getenv("POSTGRES_PASSWORD", "pronto123"),
+        database=os.getenv("POSTGRES_DB", "pronto"),
+    )
+
+
+@dataclass
+class Backfill:
+    name: str
+    table: str
+    key: str = "id"
+    sql: str | None = None
+    params: dict[str, Any] = field(default_factory=dict)
+    alias: str | None = None  # calificador de {batch} si el SQL usa alias
+    columns: list[str] = field(default_factory=list)
+    updates: list[str] = field(default_factory=list)
+    transform: Transform | None = None
+    where: str | None = None  # filtro de filas candidatas para transform
+    batch_size: int = 1000
+
+    def __post_init__(self):
+        if (self.sql is None) == (self.transform is None):
+            raise ValueError(f"{self.name}: definir sql o transform (uno solo)")
+        if self.sql is not None and "{batch}" not in self.sql:
+            raise ValueError(f"{self.name}: el SQL debe incluir {{batch}}")
+        if self.transform is not None and not self.updates:
+            raise ValueError(f"{self.name}: transform requiere updates")
+
+
+@dataclass
+class Throttle:
+    max_lag_seconds: float = 10.0
+    max_active: int = 32
+    sleep: float = 0.0
+    target_batch_seconds: float = 0.5
+    pause_seconds: float = 2.0
+
+
+def wait_for_capacity(conn, throttle: Throttle, label: str, log: Callable[[str], None] = print) -> None:
+    """Esperar mientras la réplica vaya atrasada o haya demasiadas consultas activas."""
+    paused = False
+    while True:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT COALESCE((SELECT EXTRACT(EPOCH FROM max(replay_lag)) FROM pg_stat_replication), 0), "
+                "(SELECT count(*) FROM pg_stat_activity WHERE state = 'active' AND pid <> pg_backend_pid())"
+            )
+            lag, active = cur.fetchone()
+        conn.commit()
+        lag_ok = float(lag) <= throttle.max_lag_seconds
+        load_ok = not throttle.max_active or active <= throttle.max_active
+        if lag_ok and load_ok:
+            return
+        if not paused:
+            log(f"⏸️  {label}: pausa (replay_lag={float(lag):.1f}s, activas={active})")
+            paused = True
+        time.sleep(throttle.pause_seconds)
+
+
+@dataclass
+class Progress:
+    rows: int = 0
+    batches: int = 0
+    last_key: Any = None
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def rate(self) -> float:
+        return self.rows / max(time.perf_counter() - self.started, 1e-9)
+
+
+class BackfillRunner:
+    """Ejecuta un ``Backfill`` con checkpoint, throttling y reporte de filas/s."""
+
+    def __init__(
+        self,
+        conn,
+        job: Backfill,
+        throttle: Throttle | None = None,
+        lock_timeout: str = "2s",
+        statement_timeout: str = "30s",
+        log: Callable[[str], None] = print,
+    ):
+        self.conn = conn
+        self.job = job
+        self.throttle = throttle or Throttle()
+        self.lock_timeout = lock_timeout
+        self.statement_timeout = statement_timeout
+        self.log = log
+        self.batch_size = job.batch_size
+        self.table = pgsql.SQL(job.table)
+        self.key = pgsql.Identifier(job.key)
+        self._types: dict[str, str] = {}
+
+    # -- SQL auxiliar --------------------------------------------------------
+
+    def _query(self, query, params=None) -> list[tuple]:
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall() if cur.description else []
+        self.conn.commit()
+        return rows
+
+    def _batch_predicate(self, qualifier: str) -> str:
+        column = pgsql.SQL("{}.{}").format(pgsql.SQL(qualifier), self.key).as_string(self.conn)
+        # psycopg2 interpola en el cliente: "NULL IS NULL" y "5 IS NULL" se pliegan.
+        return f"({column} > %(_lo)s OR %(_lo)s IS NULL) AND {column} <= %(_hi)s"
+
+    def _column_types(self) -> dict[str, str]:
+        if not self._types:
+            rows = self._query(
+                "SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute "
+                "WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped",
+                (self.job.table,),
+            )
+            self._types = dict(rows)
+            missing = [c for c in [self.job.key, *self.job.updates] if c not in self._types]
+            if missing:
+                raise RuntimeError(f"{self.job.table}: columnas inexistentes {missing}")
+        return self._types
+
+    # -- checkpoint ----------------------------------------------------------
+
+    def _start(self, restart: bool) -> Progress:
+        if not self._query("SELECT to_regclass('pronto_backfill_progress') IS NOT NULL")[0][0]:
+            raise RuntimeError("pronto_backfill_progress no existe (pronto-migrate --apply)")
+        if not self._query("SELECT pg_try_advisory_lock(hashtext(%s))", (LOCK_KEY + self.job.name,))[0][0]:
+            raise RuntimeError(f"{self.job.name}: otro proceso está corriendo este backfill")
+        rows = self._query(
+            "SELECT last_key, rows_done, batches, status FROM pronto_backfill_progress WHERE name = %s",
+            (self.job.name,),
+        )
+        if rows and not restart and rows[0][3] != "done":
+            last_key, done, batches, status = rows[0]
+            self.log(f"🔁 {self.job.name}: retomando ({status}) desde {self.job.key}={last_key}, {done} filas previas")
+            self._query(
+                "UPDATE pronto_backfill_progress SET status = 'running', error = NULL, updated_at = now() WHERE name = %s",
+                (self.job.name,),
+            )
+            return Progress(last_key=last_key)
+        self._query(
+            "INSERT INTO pronto_backfill_progress (name, table_name) VALUES (%s, %s) "
+            "ON CONFLICT (name) DO UPDATE SET table_name = EXCLUDED.table_name, last_key = NULL, "
+            "rows_done = 0, batches = 0, status = 'running', error = NULL, started_at = now(), "
+            "updated_at = now(), finished_at = NULL",
+            (self.job.name, self.job.table),
+        )
+        return Progress()
+
+    def _finish(self, status: str, error: str | None = None) -> None:
+        self.conn.rollback()
+        self._query(
+            "UPDATE pronto_backfill_progress SET status = %s, error = %s, updated_at = now(), "
+            "finished_at = CASE WHEN %s = 'done' THEN now() END WHERE name = %s",
+            (status, error, status, self.job.name),
+        )
+        self._query("SELECT pg_advisory_unlock(hashtext(%s))", (LOCK_KEY + self.job.name,))
+
+    # -- throttling ----------------------------------------------------------
+
+    def _wait_for_capacity(self) -> None:
+        wait_for_capacity(self.conn, self.throttle, self.job.name, self.log)
+
+    def _adapt(self, elapsed: float) -> None:
+        target = self.throttle.target_batch_seconds
+        if not target:
+            return
+        low, high = max(1, self.job.batch_size // 8), self.job.batch_size * 8
+        if elapsed > target * 2:
+            self.batch_size = max(low, self.batch_size // 2)
+        elif elapsed < target / 2:
+            self.batch_size = min(high, self.batch_size * 2)
+
+    # -- lotes ---------------------------------------------------------------
+
+    def _next_upper(self, lower: Any) -> Any:
+        query = pgsql.SQL(
+            "SELECT {key} FROM (SELECT {key} FROM {table} WHERE {key} > %(_lo)s OR %(_lo)s IS NULL "
+            "ORDER BY {key} LIMIT %(_n)s) AS batch ORDER BY {key} DESC LIMIT 1"
+        ).format(key=self.key, table=self.table)
+        rows = self._query(query, {"_lo": lower, "_n": self.batch_size})
+        return rows[0][0] if rows else None
+
+    def _apply_sql(self, cur, bounds: dict) -> int:
+        query = self.job.sql.replace("{batch}", self._batch_predicate(self.job.alias or self.job.table))
+        cur.execute(query, {**self.job.params, **bounds})
+        return cur.rowcount
+
+    def _changed_rows(self, cur, bounds: dict, lock: bool = True) -> list[tuple]:
+        columns = pgsql.SQL(", ").join(pgsql.Identifier(c) for c in [self.job.key, *self.job.columns])
+        select = pgsql.SQL("SELECT {columns} FROM {table} WHERE {batch}{where} ORDER BY {key}{lock}").format(
+            columns=columns,
+            table=self.table,
+            batch=pgsql.SQL(self._batch_predicate(self.job.table)),
+            where=pgsql.SQL(f" AND ({self.job.where})" if self.job.where else ""),
+            key=self.key,
+            lock=pgsql.SQL(" FOR NO KEY UPDATE" if lock else ""),
+        )
+        cur.execute(select, bounds)
+        return self.job.transform(cur.fetchall())
+
+    def _apply_transform(self, cur, bounds: dict) -> int:
+        changed = self._changed_rows(cur, bounds)
+        if not changed:
+            return 0
+        types = self._column_types()
+        targets = [self.job.key, *self.job.updates]
+        update = pgsql.SQL("UPDATE {table} AS t SET {sets} FROM (VALUES %s) AS v({names}) WHERE t.{key} = v.{key}").format(
+            table=self.table,
+            sets=pgsql.SQL(", ").join(
+                pgsql.SQL("{c} = v.{c}").format(c=pgsql.Identifier(c)) for c in self.job.updates
+            ),
+            names=pgsql.SQL(", ").join(pgsql.Identifier(c) for c in targets),
+            key=self.key,
+        )
+        template = "(" + ", ".join(f"%s::{types[c]}" for c in targets) + ")"
+        execute_values(cur, update.as_string(self.conn), changed, template=template, page_size=len(changed))
+        return len(changed)
+
+    def _run_batch(self, lower: Any, upper: Any) -> int:
+        bounds = {"_lo": lower, "_hi": upper}
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT set_config('lock_timeout', %s, true), set_config('statement_timeout', %s, true)",
+                (self.lock_timeout, self.statement_timeout),
+            )
+            apply = self._apply_sql if self.job.sql is not None else self._apply_transform
+            rows = apply(cur, bounds)
+            cur.execute(
+                "UPDATE pronto_backfill_progress SET last_key = %s, rows_done = rows_done + %s, "
+                "batches = batches + 1, updated_at = now() WHERE name = %s",
+                (str(upper), rows, self.job.name),
+            )
+        self.conn.commit()
+        return rows
+
+    def preview(self) -> Progress:
+        """Recorrer la tabla sin escribir ni tocar el checkpoint; ``rows`` = filas que cambiarían."""
+        if self.job.transform is None:
+            raise ValueError(f"{self.job.name}: preview requiere transform")
+        progress = Progress()
+        while True:
+            self._wait_for_capacity()
+            upper = self._next_upper(progress.last_key)
+            if upper is None:
+                break
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    "SELECT set_config('statement_timeout', %s, true)", (self.statement_timeout,)
+                )
+                progress.rows += len(self._changed_rows(cur, {"_lo": progress.last_key, "_hi": upper}, lock=False))
+            self.conn.rollback()
+            progress.batches += 1
+            progress.last_key = upper
+        return progress
+
+    def run(self, restart: bool = False) -> Progress:
+        """Correr hasta agotar la tabla; retoma el checkpoint salvo ``restart``."""
+        progress = self._start(restart)
+        last_report = time.perf_counter()
+        try:
+            while True:
+                self._wait_for_capacity()
+                upper = self._next_upper(progress.last_key)
+                if upper is None:
+                    break
+                started = time.perf_counter()
+                progress.rows += self._run_batch(progress.last_key, upper)
+                progress.batches += 1
+                progress.last_key = upper
+                self._adapt(time.perf_counter() - started)
+                if time.perf_counter() - last_report >= REPORT_EVERY_SECONDS:
+                    last_report = time.perf_counter()
+                    self.log(
+                        f"📊 {self.job.name}: {progress.rows} filas, {progress.batches} lotes, "
+                        f"{progress.rate:.0f} filas/s ({self.job.key}={upper}, lote={self.batch_size})"
+                    )
+                if self.throttle.sleep:
+                    time.sleep(self.throttle.sleep)
+        except KeyboardInterrupt:
+            self._finish("paused")
+            self.log(f"⏸️  {self.job.name}: interrumpido en {self.job.key}={progress.last_key}; se retoma al re-ejecutar")
+            raise
+        except Exception as e:
+            self._finish("failed", str(e)[:2000])
+            raise
+        self._finish("done")
+        elapsed = time.perf_counter() - progress.started
+        self.log(
+            f"✅ {self.job.name}: {progress.rows} filas en {progress.batches} lotes, "
+            f"{elapsed:.1f}s ({progress.rate:.0f} filas/s)"
+        )
+        return progress
+
+
+def add_runner_arguments(parser: argparse.ArgumentParser) -> None:
+    """Opciones comunes de throttling/checkpoint para scripts que usan el runner."""
+    parser.add_argument("--batch-size", type=int, default=1000, help="Filas por lote inicial")
+    parser.add_argument("--max-lag", type=float, default=10.0, help="Pausar si replay_lag supera N s")
+    parser.add_argument("--max-active", type=int, default=32, help="Pausar con más de N consultas activas (0 = off)")
+    parser.add_argument("--sleep", type=float, default=0.0, help="Pausa fija entre lotes (s)")
+    parser.add_argument("--target-batch-seconds", type=float, default=0.5, help="Duración objetivo por lote (0 = fijo)")
+    parser.add_argument("--lock-timeout", default="2s")
+    parser.add_argument("--statement-timeout", default="30s")
+    parser.add_argument("--restart", action="store_true", help="Ignorar el checkpoint y empezar de cero")
+
+
+def runner_from_args(conn, job: Backfill, args: argparse.Namespace) -> BackfillRunner:
+    job.batch_size = args.batch_size
+    throttle = Throttle(
+        max_lag_seconds=args.max_lag,
+        max_active=args.max_active,
+        sleep=args.sleep,
+        target_batch_seconds=args.target_batch_seconds,
+    )
+    return BackfillRunner(
+        conn,
+        job,
+        throttle,
+        lock_timeout=args.lock_timeout,
+        statement_timeout=args.statement_timeout,
+    )
+
+
+def print_status(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT name, table_name, status, rows_done, batches, last_key, updated_at, error "
+            "FROM pronto_backfill_progress ORDER BY updated_at DESC"
+        )
+        rows = cur.fetchall()
+    if not rows:
+        print("ℹ️  Sin backfills registrados")
+    for name, table, status, done, batches, last_key, updated, error in rows:
+        print(f"{name:<36} {table:<28} {status:<8} filas={done} lotes={batches} last_key={last_key} ({updated:%Y-%m-%d %H:%M})")
+        if error:
+            print(f"    error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill SQL por lotes con checkpoint y throttling")
+    parser.add_argument("--name", help="Identificador del backfill (clave del checkpoint)")
+    parser.add_argument("--table", help="Tabla a recorrer")
+    parser.add_argument("--key", default="id", help="Columna PK para paginar (default: id)")
+    parser.add_argument("--sql", help="Sentencia por lote con {batch} como rango de claves")
+    parser.add_argument("--alias", help="Alias de la tabla usado en --sql")
+    parser.add_argument("--status", action="store_true", help="Listar checkpoints y salir")
+    add_runner_arguments(parser)
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        if args.status:
+            print_status(conn)
+            return
+        if not (args.name and args.table and args.sql):
+            parser.error("--name, --table y --sql son obligatorios")
+        try:
+            job = Backfill(name=args.name, table=args.table, key=args.key, sql=args.sql, alias=args.alias)
+            runner_from_args(conn, job, args).run(restart=args.restart)
+        except (ValueError, RuntimeError, psycopg2.Error) as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        except KeyboardInterrupt:
+            sys.exit(130)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
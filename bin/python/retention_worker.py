@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Worker de retención para tablas que la UI no vuelve a leer.
+
+Las políticas se declaran en ``config/retention.yml`` (tabla, columna de
+tiempo, antigüedad, filtro, archivo). Cada ciclo borra las filas vencidas en
+chunks pequeños, cada uno en su propia transacción corta::
+
+    DELETE FROM t WHERE t.id IN (
+        SELECT id FROM t WHERE created_at < now() - '7 days' [AND filtro]
+        ORDER BY created_at LIMIT n FOR UPDATE SKIP LOCKED)
+
+El rango sale del índice de la columna de tiempo; ``SKIP LOCKED`` salta las
+filas que la app tiene tomadas y ``lock_timeout``/``statement_timeout`` locales
+acotan cada chunk. Antes de cada chunk espera si la réplica va atrasada o hay
+demasiadas consultas activas (``backfill_runner.wait_for_capacity``), y el
+tamaño del chunk baja a la mitad si tarda más del doble del objetivo.
+
+Con ``archive: rows`` las filas borradas se agregan a
+``<archive-dir>/<tabla>/<fecha>.jsonl.gz``; con ``archive: rollup`` solo un
+conteo por hora y ``rollup_by``. El archivo se escribe (fsync) antes del
+COMMIT: si el COMMIT falla el chunk se vuelve a archivar en el siguiente ciclo.
+
+Métricas (formato Prometheus) en ``--metrics-file`` y/o ``--metrics-port``:
+filas borradas/archivadas, chunks, latencia por chunk y backlog pendiente.
+
+Uso:
+    python3 bin/python/retention_worker.py --dry-run          # solo backlog
+    python3 bin/python/retention_worker.py                    # un ciclo
+    python3 bin/python/retention_worker.py --loop --interval 60 --metrics-port 9187
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import psycopg2
+    from psycopg2 import errors as pgerrors
+    from psycopg2 import sql as pgsql
+except ImportError:
+    print("❌ Error: El paquete 'psycopg2-binary' no está instalado")
+    print("   Para instalar: pip install psycopg2-binary")
+    sys.exit(1)
+
+from backfill_runner import Throttle, connect, wait_for_capacity
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "lib"))
+
+from ai_audit_runner import load_simple_yaml_registry  # noqa: E402
+
+DEFAULT_CONFIG = PROJECT_ROOT / "config" / "retention.yml"
+DEFAULT_ARCHIVE_DIR = os.getenv("PRONTO_RETENTION_ARCHIVE_DIR", str(PROJECT_ROOT / "backups" / "retention"))
+LOCK_KEY = "pronto-retention"
+BACKLOG_CAP = 100_000
+RETAIN_RE = re.compile(r"^(\d+)\s*([mhd])$")
+RETAIN_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+ARCHIVE_MODES = ("none", "rows", "rollup")
+
+
+@dataclass
+class Policy:
+    name: str
+    table: str
+    column: str
+    retain: str
+    key: str = "id"
+    where: str | None = None
+    batch_size: int = 500
+    archive: str = "none"
+    rollup_by: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not RETAIN_RE.match(str(self.retain)):
+            raise ValueError(f"{self.name}: retain invalido {self.retain!r} (usar 30m, 12h, 7d)")
+        if self.archive not in ARCHIVE_MODES:
+            raise ValueError(f"{self.name}: archive debe ser uno de {ARCHIVE_MODES}")
+        if self.batch_size < 1:
+            raise ValueError(f"{self.name}: batch_size debe ser >= 1")
+
+    @property
+    def interval(self) -> str:
+        amount, unit = RETAIN_RE.match(str(self.retain)).groups()
+        return f"{amount} {RETAIN_UNITS[unit]}"
+
+
+@dataclass
+class PolicyMetrics:
+    deleted: int = 0
+    archived: int = 0
+    chunks: int = 0
+    chunk_seconds_sum: float = 0.0
+    chunk_seconds_max: float = 0.0
+    backlog: int = 0
+    last_cycle: float = 0.0
+
+
+def load_policies(path: Path) -> list[Policy]:
+    data = load_simple_yaml_registry(path)
+    policies = []
+    for item in data.get("policies", []):
+        try:
+            policies.append(Policy(**item))
+        except TypeError as e:
+            raise ValueError(f"{path}: política invalida {item.get('name', '?')}: {e}") from e
+    names = [p.name for p in policies]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path}: nombres de política duplicados")
+    return policies
+
+
+class RetentionWorker:
+    """Aplica las políticas en chunks y acumula métricas por política."""
+
+    def __init__(
+        self,
+        conn,
+        policies: list[Policy],
+        throttle: Throttle | None = None,
+        archive_dir: str = DEFAULT_ARCHIVE_DIR,
+        lock_timeout: str = "1s",
+        statement_timeout: str = "5s",
+        max_chunks: int = 200,
+        log=print,
+    ):
+        self.conn = conn
+        self.policies = policies
+        self.throttle = throttle or Throttle()
+        self.archive_dir = Path(archive_dir)
+        self.lock_timeout = lock_timeout
+        self.statement_timeout = statement_timeout
+        self.max_chunks = max_chunks
+        self.log = log
+        self.metrics = {p.name: PolicyMetrics() for p in policies}
+        self.batch_sizes = {p.name: p.batch_size for p in policies}
+        self.stopping = False
+        self._types: dict[tuple[str, str], str] = {}
+
+    def _query(self, query, params=None) -> list[tuple]:
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall() if cur.description else []
+        self.conn.commit()
+        return rows
+
+    # -- SQL -------------------------------------------------------------------
+
+    def _cutoff(self, policy: Policy) -> pgsql.Composed:
+        """``<ahora> - retain`` con el reloj del mismo tipo que la columna (usa el índice)."""
+        key = (policy.table, policy.column)
+        if key not in self._types:
+            rows = self._query(
+                "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+                "WHERE attrelid = to_regclass(%s) AND attname = %s AND NOT attisdropped",
+                (policy.table, policy.column),
+            )
+            if not rows:
+                raise RuntimeError(f"{policy.name}: {policy.table}.{policy.column} no existe")
+            self._types[key] = rows[0][0]
+        clock = "now()" if self._types[key] == "timestamp with time zone" else "LOCALTIMESTAMP"
+        return pgsql.SQL("{} - {}::interval").format(pgsql.SQL(clock), pgsql.Literal(policy.interval))
+
+    def _expired(self, policy: Policy) -> pgsql.Composed:
+        condition = pgsql.SQL("{} < {}").format(pgsql.Identifier(policy.column), self._cutoff(policy))
+        if policy.where:
+            condition = pgsql.SQL("{} AND ({})").format(condition, pgsql.SQL(policy.where))
+        return condition
+
+    def backlog(self, policy: Policy) -> int:
+        """Filas vencidas pendientes (se cuenta hasta ``BACKLOG_CAP``)."""
+        query = pgsql.SQL("SELECT count(*) FROM (SELECT 1 FROM {table} WHERE {expired} LIMIT %s) AS b").format(
+            table=pgsql.Identifier(policy.table), expired=self._expired(policy)
+        )
+        return self._query(query, (BACKLOG_CAP,))[0][0]
+
+    def _delete_chunk(self, policy: Policy, limit: int) -> int:
+        if policy.archive == "rows":
+            returning = pgsql.SQL("t.*")
+        elif policy.archive == "rollup":
+            returning = pgsql.SQL(", ").join(
+                pgsql.SQL("t.{}").format(pgsql.Identifier(c)) for c in [policy.column, *policy.rollup_by]
+            )
+        else:
+            returning = pgsql.SQL("t.{}").format(pgsql.Identifier(policy.key))
+        query = pgsql.SQL(
+            "DELETE FROM {table} AS t WHERE t.{key} IN ("
+            "SELECT {key} FROM {table} WHERE {expired} ORDER BY {column} LIMIT %s FOR UPDATE SKIP LOCKED"
+            ") AND t.{column} < {cutoff} RETURNING {returning}"
+        ).format(
+            table=pgsql.Identifier(policy.table),
+            key=pgsql.Identifier(policy.key),
+            column=pgsql.Identifier(policy.column),
+            expired=self._expired(policy),
+            cutoff=self._cutoff(policy),
+            returning=returning,
+        )
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    "SELECT set_config('lock_timeout', %s, true), set_config('statement_timeout', %s, true)",
+                    (self.lock_timeout, self.statement_timeout),
+                )
+                cur.execute(query, (limit,))
+                rows = cur.fetchall()
+                names = [d[0] for d in cur.description]
+            if rows and policy.archive != "none":
+                self._archive(policy, names, rows)
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        if policy.archive != "none":
+            self.metrics[policy.name].archived += len(rows)
+        return len(rows)
+
+    # -- archivo ---------------------------------------------------------------
+
+    def _archive(self, policy: Policy, names: list[str], rows: list[tuple]) -> None:
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        suffix = "jsonl.gz" if policy.archive == "rows" else "rollup.jsonl.gz"
+        path = self.archive_dir / policy.table / f"{day}.{suffix}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if policy.archive == "rows":
+            lines = [json.dumps(dict(zip(names, row)), default=str, ensure_ascii=False) for row in rows]
+        else:
+            counts = Counter((row[0].strftime("%Y-%m-%dT%H:00"), *row[1:]) for row in rows)
+            lines = [
+                json.dumps(
+                    {"policy": policy.name, "hour": hour, **dict(zip(policy.rollup_by, values)), "count": n},
+                    default=str,
+                    ensure_ascii=False,
+                )
+                for (hour, *values), n in sorted(counts.items(), key=lambda kv: [str(v) for v in kv[0]])
+            ]
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+                gz.write(("\n".join(lines) + "\n").encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    # -- ciclo -----------------------------------------------------------------
+
+    def run_policy(self, policy: Policy) -> int:
+        m = self.metrics[policy.name]
+        deleted = 0
+        for _ in range(self.max_chunks):
+            if self.stopping:
+                break
+            wait_for_capacity(self.conn, self.throttle, f"retention {policy.name}", self.log)
+            limit = self.batch_sizes[policy.name]
+            started = time.perf_counter()
+            try:
+                n = self._delete_chunk(policy, limit)
+            except pgerrors.LockNotAvailable:
+                self.log(f"⏸️  {policy.name}: lock no disponible; se reintenta en el siguiente ciclo")
+                break
+            except pgerrors.QueryCanceled:
+                self.batch_sizes[policy.name] = max(1, limit // 2)
+                self.log(f"⏸️  {policy.name}: chunk cancelado por statement_timeout; lote={self.batch_sizes[policy.name]}")
+                break
+            elapsed = time.perf_counter() - started
+            m.chunks += 1
+            m.chunk_seconds_sum += elapsed
+            m.chunk_seconds_max = max(m.chunk_seconds_max, elapsed)
+            m.deleted += n
+            deleted += n
+            self._adapt(policy, elapsed)
+            if n < limit:
+                break
+            if self.throttle.sleep:
+                time.sleep(self.throttle.sleep)
+        m.backlog = self.backlog(policy)
+        m.last_cycle = time.time()
+        return deleted
+
+    def _adapt(self, policy: Policy, elapsed: float) -> None:
+        """Nunca por encima del batch_size configurado; baja si el chunk tarda."""
+        target = self.throttle.target_batch_seconds
+        if not target:
+            return
+        current = self.batch_sizes[policy.name]
+        if elapsed > target * 2:
+            self.batch_sizes[policy.name] = max(1, policy.batch_size // 8, current // 2)
+        elif elapsed < target / 2:
+            self.batch_sizes[policy.name] = min(policy.batch_size, current * 2)
+
+    def run_once(self) -> int:
+        total = 0
+        for policy in self.policies:
+            if self.stopping:
+                break
+            deleted = self.run_policy(policy)
+            m = self.metrics[policy.name]
+            backlog = f"{m.backlog}+" if m.backlog >= BACKLOG_CAP else str(m.backlog)
+            self.log(f"🧹 {policy.name}: {deleted} filas borradas, backlog={backlog}, lote={self.batch_sizes[policy.name]}")
+            total += deleted
+        return total
+
+    def metrics_text(self) -> str:
+        series = [
+            ("pronto_retention_deleted_rows_total", "counter", "Filas borradas", lambda m: m.deleted),
+            ("pronto_retention_archived_rows_total", "counter", "Filas archivadas", lambda m: m.archived),
+            ("pronto_retention_chunks_total", "counter", "Chunks ejecutados", lambda m: m.chunks),
+            ("pronto_retention_chunk_seconds_sum", "counter", "Segundos acumulados en chunks", lambda m: m.chunk_seconds_sum),
+            ("pronto_retention_chunk_seconds_max", "gauge", "Chunk más lento", lambda m: m.chunk_seconds_max),
+            ("pronto_retention_backlog_rows", "gauge", f"Filas vencidas pendientes (tope {BACKLOG_CAP})", lambda m: m.backlog),
+            ("pronto_retention_last_cycle_timestamp_seconds", "gauge", "Fin del último ciclo", lambda m: m.last_cycle),
+        ]
+        lines = []
+        for metric, kind, help_text, value in series:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for policy in self.policies:
+                labels = f'policy="{policy.name}",table="{policy.table}"'
+                lines.append(f"{metric}{{{labels}}} {value(self.metrics[policy.name])}")
+        return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: str, text: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def serve_metrics(worker: RetentionWorker, port: int) -> None:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = worker.metrics_text().encode("utf-8")
+            self.send_response(200 if self.path == "/metrics" else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retención por chunks de tablas de eventos/notificaciones")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="Archivo de políticas")
+    parser.add_argument("--policy", action="append", help="Solo esta política (repetible)")
+    parser.add_argument("--dry-run", action="store_true", help="Solo mostrar el backlog de cada política")
+    parser.add_argument("--loop", action="store_true", help="Correr ciclos continuamente")
+    parser.add_argument("--interval", type=float, default=60.0, help="Segundos entre ciclos con --loop")
+    parser.add_argument("--max-chunks", type=int, default=200, help="Chunks por política y ciclo")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument("--metrics-file", help="Escribir métricas Prometheus aquí tras cada ciclo")
+    parser.add_argument("--metrics-port", type=int, help="Servir /metrics en este puerto")
+    parser.add_argument("--max-lag", type=float, default=10.0, help="Pausar si replay_lag supera N s")
+    parser.add_argument("--max-active", type=int, default=32, help="Pausar con más de N consultas activas (0 = off)")
+    parser.add_argument("--sleep", type=float, default=0.05, help="Pausa entre chunks (s)")
+    parser.add_argument("--target-chunk-seconds", type=float, default=0.2, help="Duración objetivo por chunk (0 = fijo)")
+    parser.add_argument("--lock-timeout", default="1s")
+    parser.add_argument("--statement-timeout", default="5s")
+    args = parser.parse_args()
+
+    try:
+        policies = load_policies(Path(args.config))
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    if args.policy:
+        unknown = set(args.policy) - {p.name for p in policies}
+        if unknown:
+            print(f"❌ Error: políticas desconocidas: {', '.join(sorted(unknown))}")
+            sys.exit(1)
+        policies = [p for p in policies if p.name in args.policy]
+
+    conn = connect()
+    throttle = Throttle(
+        max_lag_seconds=args.max_lag,
+        max_active=args.max_active,
+        sleep=args.sleep,
+        target_batch_seconds=args.target_chunk_seconds,
+    )
+    worker = RetentionWorker(
+        conn,
+        policies,
+        throttle,
+        archive_dir=args.archive_dir,
+        lock_timeout=args.lock_timeout,
+        statement_timeout=args.statement_timeout,
+        max_chunks=args.max_chunks,
+    )
+
+    def stop(signum, frame):
+        worker.stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    try:
+        if args.dry_run:
+            for policy in policies:
+                n = worker.backlog(policy)
+                shown = f"{n}+" if n >= BACKLOG_CAP else str(n)
+                print(f"🔍 {policy.name}: {shown} filas vencidas en {policy.table} ({policy.column} más viejo que {policy.retain})")
+            return
+        if not worker._query("SELECT pg_try_advisory_lock(hashtext(%s))", (LOCK_KEY,))[0][0]:
+            print("ℹ️  Otro retention_worker tiene el lock; nada que hacer")
+            return
+        if args.metrics_port:
+            serve_metrics(worker, args.metrics_port)
+        while True:
+            worker.run_once()
+            if args.metrics_file:
+                write_metrics(args.metrics_file, worker.metrics_text())
+            if not args.loop or worker.stopping:
+                break
+            deadline = time.monotonic() + args.interval
+            while not worker.stopping and time.monotonic() < deadline:
+                time.sleep(min(1.0, args.interval))
+    except (RuntimeError, psycopg2.Error) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -375,7 +375,7 @@ class DatabaseValidator:
                 self.passed.append("All tables have indexes")
             else:
                 self.warnings.append(
-                    f"{tables_without_indexes} tables may need indexes"
+                    f"{tables_without_indexes} tables may need indexes (see pronto-index-advisor)"
                 )
 
             cursor.close()
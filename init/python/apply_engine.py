@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Motor de aplicación de fases de pronto-init sobre una sola conexión.
+
+Equivalente a ``apply_phase`` de ``bin/pronto-init`` pero sin lanzar un
+``psql`` por archivo ni ``python3`` para los hashes:
+
+- Una conexión psycopg2 para todas las fases.
+- Cada archivo corre en su propia transacción con el mismo advisory lock
+  (``pg_advisory_xact_lock(hashtext('pronto-init'))``) y ``SET LOCAL`` de
+  ``lock_timeout``/``statement_timeout``/``client_encoding``.
+- Prólogo + SQL del archivo + fila de ``pronto_init_runs`` van en un solo
+  round-trip; luego COMMIT. En 00_bootstrap las filas se difieren hasta que
+  exista ``pronto_init_runs`` (igual que el script bash).
+- Los archivos con meta-comandos de psql (``\\gset``, ``\\if``...) no se pueden
+  ejecutar por el driver y se delegan a ``psql`` con el mismo envoltorio.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Any
+
+from sql_safety import FactCache, init_errors
+
+PHASES = ["00_bootstrap", "10_schema", "20_constraints", "30_indexes", "40_seeds"]
+LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('pronto-init'));"
+
+PSQL_META_RE = re.compile(r"^\s*\\[A-Za-z]|\\gset\b|\\gexec\b", re.MULTILINE)
+
+INSERT_RUN_SQL = (
+    "INSERT INTO pronto_init_runs(phase, file_name, sha256, sql_norm_sha, status, error, "
+    "executed_by, app_version, git_sha, sql_head_sha) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s);"
+)
+
+
+def die(msg: str, code: int = 1) -> None:
+    print(msg, file=sys.stderr)
+    raise SystemExit(code)
+
+
+@dataclass
+class SqlFile:
+    phase: str
+    path: str
+    text: str
+    sha256: str
+    norm_sha: str
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def needs_psql(self) -> bool:
+        return bool(PSQL_META_RE.search(self.text))
+
+
+def sql_norm_sha(text: str) -> str:
+    """Mismo hash normalizado que ``sql_norm_sha`` de pronto-init/pronto-migrate."""
+    s = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    s = re.sub(r"--[^\n]*", "", s)
+    lines = [ln.strip() for ln in s.splitlines()]
+    s = " ".join([ln for ln in lines if ln])
+    s = re.sub(r"\s+", " ", s).strip()
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+def load_file(phase: str, path: str) -> SqlFile:
+    raw = open(path, "rb").read()
+    text = raw.decode("utf-8")
+    return SqlFile(phase, path, text, hashlib.sha256(raw).hexdigest(), sql_norm_sha(text))
+
+
+def list_phase_files(sql_root: str, phase: str) -> list[SqlFile]:
+    directory = os.path.join(sql_root, phase)
+    if not os.path.isdir(directory):
+        die(f"pronto-init: missing dir {directory}")
+    names = sorted(
+        n for n in os.listdir(directory) if n.endswith(".sql") and os.path.isfile(os.path.join(directory, n))
+    )
+    return [load_file(phase, os.path.join(directory, n)) for n in names]
+
+
+def deny_check(f: SqlFile, cache: FactCache | None = None) -> list[str]:
+    """Reglas ``init`` de ``sql_safety.py`` (las de pronto-init); devuelve los errores."""
+    facts = (cache or FactCache(None)).facts(f.text, f.sha256)
+    return init_errors(f.phase, f.path, facts)
+
+
+class ApplyEngine:
+    def __init__(self, database_url: str, lock_timeout: str, statement_timeout: str):
+        try:
+            import psycopg2
+        except ImportError:
+            die("pronto-init: el motor Python requiere psycopg2 (usa PRONTO_INIT_ENGINE=psql)")
+        self.psycopg2 = psycopg2
+        self.database_url = database_url
+        self.lock_timeout = lock_timeout
+        self.statement_timeout = statement_timeout
+        self.conn = psycopg2.connect(database_url)
+        self.conn.set_client_encoding("UTF8")
+        self.pending_bootstrap: list[tuple[Any, ...]] = []
+        self.run_meta = (
+            os.environ.get("USER", ""),
+            os.environ.get("APP_VERSION", ""),
+            os.environ.get("GIT_SHA", ""),
+            os.environ.get("SQL_HEAD_SHA", ""),
+        )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- SQL ---------------------------------------------------------------
+
+    def _prologue(self, cur) -> str:
+        return (
+            LOCK_SQL
+            + cur.mogrify(
+                "\nSELECT set_config('lock_timeout', %s, true), set_config('statement_timeout', %s, true);"
+                "\nSET LOCAL client_encoding = 'UTF8';\n",
+                (self.lock_timeout, self.statement_timeout),
+            ).decode()
+        )
+
+    def _run_row(self, f: SqlFile, status: str, error: str | None) -> tuple[Any, ...]:
+        return (f.phase, f.name, f.sha256, f.norm_sha, status, error, *self.run_meta)
+
+    def _log_sql(self, cur, rows: list[tuple[Any, ...]]) -> str:
+        return "".join(cur.mogrify(INSERT_RUN_SQL, row).decode() + "\n" for row in rows)
+
+    def init_runs_exists(self) -> bool:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('pronto_init_runs') IS NOT NULL;")
+            exists = bool(cur.fetchone()[0])
+        self.conn.rollback()
+        return exists
+
+    def log_failure(self, f: SqlFile, error: str) -> None:
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(LOCK_SQL + "\n" + self._log_sql(cur, [self._run_row(f, "failed", error)]))
+            self.conn.commit()
+        except self.psycopg2.Error:
+            self.conn.rollback()
+
+    # -- aplicación --------------------------------------------------------
+
+    def _apply_driver(self, f: SqlFile) -> None:
+        bootstrap = f.phase == "00_bootstrap"
+        with self.conn.cursor() as cur:
+            body = self._prologue(cur) + f.text + "\n;\n"
+            row = self._run_row(f, "applied", None)
+            if not bootstrap:
+                cur.execute(body + self._log_sql(cur, [row]))
+                self.conn.commit()
+                return
+            cur.execute(body + "SELECT to_regclass('pronto_init_runs') IS NOT NULL;")
+            pending = self.pending_bootstrap + [row]
+            logged = bool(cur.fetchone()[0])
+            if logged:
+                cur.execute(self._log_sql(cur, pending))
+        self.conn.commit()
+        self.pending_bootstrap = [] if logged else pending
+
+    def _apply_psql(self, f: SqlFile) -> None:
+        """Archivo con meta-comandos de psql: mismo envoltorio que el script bash."""
+        with self.conn.cursor() as cur:
+            script = (
+                "BEGIN;\n"
+                + self._prologue(cur)
+                + f"\\i '{f.path}'\n"
+                + ("" if f.phase == "00_bootstrap" else self._log_sql(cur, [self._run_row(f, "applied", None)]))
+                + "COMMIT;\n"
+            )
+        self.conn.rollback()
+        with tempfile.NamedTemporaryFile("w", suffix=".sql", encoding="utf-8", delete=False) as tmp:
+            tmp.write(script)
+        try:
+            p = subprocess.run(
+                ["psql", self.database_url, "-X", "-q", "-v", "ON_ERROR_STOP=1", "-f", tmp.name],
+                text=True,
+                capture_output=True,
+            )
+        finally:
+            os.unlink(tmp.name)
+        if p.returncode != 0:
+            raise RuntimeError(p.stderr.strip() or "psql execution failed")
+        if f.phase == "00_bootstrap":
+            self.pending_bootstrap.append(self._run_row(f, "applied", None))
+            if self.init_runs_exists():
+                with self.conn.cursor() as cur:
+                    cur.execute(LOCK_SQL + "\n" + self._log_sql(cur, self.pending_bootstrap))
+                self.conn.commit()
+                self.pending_bootstrap = []
+
+    def apply_phase(self, phase: str, files: list[SqlFile]) -> None:
+        if phase != "00_bootstrap" and not self.init_runs_exists():
+            die("pronto-init: pronto_init_runs no existe. Ejecuta fase 00_bootstrap.")
+        for f in files:
+            try:
+                if f.needs_psql:
+                    self._apply_psql(f)
+                else:
+                    self._apply_driver(f)
+            except (self.psycopg2.Error, RuntimeError) as e:
+                self.conn.rollback()
+                message = str(e).strip() or "execution failed"
+                self.log_failure(f, message[:2000])
+                print(message, file=sys.stderr)
+                die(f"pronto-init: FAILED phase={phase} file={f.name}")
+            print(f"applied: {phase}/{f.name}", flush=True)
+
+
+def main() -> None:
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+    sql_root_default = os.path.join(repo_root, "pronto-scripts", "init", "sql")
+
+    ap = argparse.ArgumentParser(description="Aplica las fases de init/sql sobre una sola conexión")
+    ap.add_argument("--sql-root", default=sql_root_default)
+    ap.add_argument("--phase", action="append", choices=PHASES, help="Fase a aplicar (repetible; default: todas)")
+    ap.add_argument("--dry-run", action="store_true", help="Solo deny checks, sin conectar")
+    args = ap.parse_args()
+
+    phases = args.phase or PHASES
+    plan = {phase: list_phase_files(args.sql_root, phase) for phase in phases}
+
+    cache = FactCache()
+    errors = [err for files in plan.values() for f in files for err in deny_check(f, cache)]
+    cache.save()
+    if errors:
+        die("\n".join(errors))
+    if args.dry_run:
+        print("OK dry-run (deny checks passed).")
+        return
+
+    database_url = os.environ.get("DATABASE_URL", "")
+    if not database_url:
+        die("pronto-init: DATABASE_URL requerido")
+
+    engine = ApplyEngine(
+        database_url,
+        lock_timeout=os.environ.get("PRONTO_LOCK_TIMEOUT", "5s"),
+        statement_timeout=os.environ.get("PRONTO_STATEMENT_TIMEOUT", "5min"),
+    )
+    try:
+        for phase in phases:
+            engine.apply_phase(phase, plan[phase])
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Snapshot de la base inicializada como template de Postgres.
+
+Construye una vez una base completa (``pronto-init --apply`` con seeds de
+40_seeds + ``pronto-migrate --apply-online``), la marca con la huella combinada de
+``sql_norm_sha`` de todos los ``init/sql/**/*.sql`` y la deja como template
+(``IS_TEMPLATE true``, ``ALLOW_CONNECTIONS false``). Las bases de prueba se
+crean con ``CREATE DATABASE ... TEMPLATE`` (copia de archivos, sin replay de
+SQL) y el template solo se reconstruye cuando cambia la huella.
+
+Usage:
+    db_snapshot.py status
+    db_snapshot.py build [--force]
+    db_snapshot.py create [--name NAME]      # imprime el DATABASE_URL
+    db_snapshot.py run -- python3 bin/python/verify_menu_refactor.py
+    db_snapshot.py drop NAME
+    db_snapshot.py gc [--max-age-hours 24]
+
+Desde Python::
+
+    from db_snapshot import throwaway_database
+    with throwaway_database() as url:
+        ...
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import os
+import re
+import secrets
+import subprocess
+import sys
+import time
+from typing import Iterator
+from urllib.parse import unquote, urlparse, urlunparse
+
+from apply_engine import die, sql_norm_sha
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+SQL_ROOT = os.path.join(REPO_ROOT, "pronto-scripts", "init", "sql")
+BIN_DIR = os.path.join(REPO_ROOT, "pronto-scripts", "bin")
+
+TEMPLATE_DB = os.environ.get("PRONTO_TEMPLATE_DB", "pronto_template")
+TEST_DB_PREFIX = "pronto_test_"
+STAMP_PREFIX = "pronto-snapshot:"
+LOCK_KEY = "pronto-snapshot"
+NAME_RE = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
+
+def sql_fingerprint(sql_root: str = SQL_ROOT) -> str:
+    """sha256 de ``ruta_relativa:sql_norm_sha`` de cada .sql, en orden."""
+    entries = []
+    for dirpath, _, filenames in os.walk(sql_root):
+        for name in filenames:
+            if name.endswith(".sql"):
+                path = os.path.join(dirpath, name)
+                rel = os.path.relpath(path, sql_root).replace(os.sep, "/")
+                with open(path, "r", encoding="utf-8") as f:
+                    entries.append(f"{rel}:{sql_norm_sha(f.read())}")
+    h = hashlib.sha256()
+    for entry in sorted(entries):
+        h.update(entry.encode("utf-8") + b"\n")
+    return h.hexdigest()
+
+
+def database_url_for(base_url: str, dbname: str) -> str:
+    return urlunparse(urlparse(base_url)._replace(path=f"/{dbname}"))
+
+
+def database_name(url: str) -> str:
+    return unquote(urlparse(url).path.lstrip("/"))
+
+
+def _check_name(name: str) -> str:
+    if not NAME_RE.match(name):
+        die(f"db_snapshot: nombre de base invalido: {name!r}")
+    return name
+
+
+class SnapshotManager:
+    def __init__(self, database_url: str, template: str = TEMPLATE_DB):
+        try:
+            import psycopg2
+            from psycopg2 import sql
+        except ImportError:
+            die("db_snapshot: requiere psycopg2")
+        self.psycopg2 = psycopg2
+        self.sql = sql
+        self.base_url = database_url
+        self.template = _check_name(template)
+        self.conn = psycopg2.connect(database_url_for(database_url, "postgres"))
+        self.conn.autocommit = True
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _execute(self, query, params=None) -> list[tuple]:
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            return cur.fetchall() if cur.description else []
+
+    def _ident(self, name: str):
+        return self.sql.Identifier(name)
+
+    # -- estado ------------------------------------------------------------
+
+    def stamp(self) -> str | None:
+        """Huella del template actual (None si no existe)."""
+        rows = self._execute(
+            "SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s",
+            (self.template,),
+        )
+        if not rows:
+            return None
+        comment = rows[0][0] or ""
+        return comment[len(STAMP_PREFIX):] if comment.startswith(STAMP_PREFIX) else ""
+
+    def is_fresh(self, fingerprint: str) -> bool:
+        return self.stamp() == fingerprint
+
+    def test_databases(self) -> list[str]:
+        rows = self._execute(
+            "SELECT datname FROM pg_database WHERE datname LIKE %s ORDER BY datname",
+            (TEST_DB_PREFIX + "%",),
+        )
+        return [row[0] for row in rows]
+
+    # -- build -------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _lock(self) -> Iterator[None]:
+        self._execute("SELECT pg_advisory_lock(hashtext(%s))", (LOCK_KEY,))
+        try:
+            yield
+        finally:
+            self._execute("SELECT pg_advisory_unlock(hashtext(%s))", (LOCK_KEY,))
+
+    def _drop(self, name: str) -> None:
+        if not self._exists(name):
+            return
+        ident = self._ident(name)
+        self._execute(self.sql.SQL("ALTER DATABASE {} WITH IS_TEMPLATE false ALLOW_CONNECTIONS true").format(ident))
+        self._execute(self.sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(ident))
+
+    def _exists(self, name: str) -> bool:
+        return bool(self._execute("SELECT 1 FROM pg_database WHERE datname = %s", (name,)))
+
+    def _init_database(self, url: str) -> None:
+        env = dict(os.environ, DATABASE_URL=url)
+        # --apply-online: los archivos con CONCURRENTLY (20260322_01, 20261019_01)
+        # no pueden correr en el BEGIN/COMMIT por archivo de --apply.
+        for cmd in (["pronto-init", "--apply"], ["pronto-migrate", "--apply-online"]):
+            print(f"db_snapshot: {' '.join(cmd)} -> {database_name(url)}", flush=True)
+            p = subprocess.run([os.path.join(BIN_DIR, cmd[0]), *cmd[1:]], env=env)
+            if p.returncode != 0:
+                raise RuntimeError(f"{cmd[0]} fallo (rc={p.returncode})")
+
+    def build(self, fingerprint: str, force: bool = False) -> bool:
+        """Reconstruir el template si la huella cambió; True si se reconstruyó."""
+        with self._lock():
+            if not force and self.is_fresh(fingerprint):
+                return False
+            build_name = f"{self.template}_build"
+            self._drop(build_name)
+            self._execute(self.sql.SQL("CREATE DATABASE {} TEMPLATE template0").format(self._ident(build_name)))
+            try:
+                self._init_database(database_url_for(self.base_url, build_name))
+            except RuntimeError:
+                self._drop(build_name)
+                raise
+            self._drop(self.template)
+            ident = self._ident(self.template)
+            self._execute(
+                self.sql.SQL("ALTER DATABASE {} RENAME TO {}").format(self._ident(build_name), ident)
+            )
+            self._execute(
+                self.sql.SQL("COMMENT ON DATABASE {} IS {}").format(ident, self.sql.Literal(STAMP_PREFIX + fingerprint))
+            )
+            self._execute(
+                self.sql.SQL("ALTER DATABASE {} WITH IS_TEMPLATE true ALLOW_CONNECTIONS false").format(ident)
+            )
+            return True
+
+    # -- bases desechables -------------------------------------------------
+
+    def create(self, fingerprint: str, name: str | None = None) -> str:
+        """Base nueva desde el template (reconstruyéndolo si hace falta); devuelve su URL."""
+        name = _check_name(name or f"{TEST_DB_PREFIX}{int(time.time())}_{secrets.token_hex(3)}")
+        with self._lock():  # reentrante: build() no puede cambiar el template en medio
+            self.build(fingerprint)
+            self._execute(
+                self.sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(self._ident(name), self._ident(self.template))
+            )
+        return database_url_for(self.base_url, name)
+
+    def drop(self, name: str) -> None:
+        if _check_name(name) == self.template:
+            die("db_snapshot: usa 'build --force' para reemplazar el template")
+        self._drop(name)
+
+    def gc(self, max_age_hours: float) -> list[str]:
+        """Borrar ``pronto_test_<epoch>_*`` más viejas que ``max_age_hours``."""
+        cutoff = time.time() - max_age_hours * 3600
+        dropped = []
+        for name in self.test_databases():
+            m = re.match(rf"^{TEST_DB_PREFIX}(\d+)_", name)
+            if m and int(m.group(1)) < cutoff:
+                self._drop(name)
+                dropped.append(name)
+        return dropped
+
+
+def _database_url() -> str:
+    url = os.environ.get("DATABASE_URL", "")
+    if not url:
+        die("db_snapshot: DATABASE_URL requerido (se usa para llegar al servidor)")
+    return url
+
+
+@contextlib.contextmanager
+def throwaway_database(database_url: str | None = None) -> Iterator[str]:
+    """Base desechable desde el template; se borra al salir del bloque."""
+    manager = SnapshotManager(database_url or _database_url())
+    try:
+        url = manager.create(sql_fingerprint())
+        try:
+            yield url
+        finally:
+            manager.drop(database_name(url))
+    finally:
+        manager.close()
+
+
+def _env_for(url: str) -> dict[str, str]:
+    """DATABASE_URL y POSTGRES_* apuntando a la base desechable."""
+    parsed = urlparse(url)
+    env = dict(os.environ, DATABASE_URL=url, POSTGRES_DB=database_name(url))
+    if parsed.hostname:
+        env["POSTGRES_HOST"] = parsed.hostname
+    if parsed.port:
+        env["POSTGRES_PORT"] = str(parsed.port)
+    if parsed.username:
+        env["POSTGRES_USER"] = unquote(parsed.username)
+    if parsed.password:
+        env["POSTGRES_PASSWORD"] = unquote(parsed.password)
+    return env
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Template de Postgres para bases de prueba instantáneas")
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Huella actual vs template y bases de prueba")
+    p_build = sub.add_parser("build", help="Reconstruir el template si cambió init/sql")
+    p_build.add_argument("--force", action="store_true")
+    p_create = sub.add_parser("create", help="Crear una base desde el template e imprimir su URL")
+    p_create.add_argument("--name")
+    p_run = sub.add_parser("run", help="Correr un comando contra una base desechable")
+    p_run.add_argument("cmd", nargs=argparse.REMAINDER)
+    p_drop = sub.add_parser("drop", help="Borrar una base de prueba")
+    p_drop.add_argument("name")
+    p_gc = sub.add_parser("gc", help="Borrar bases de prueba viejas")
+    p_gc.add_argument("--max-age-hours", type=float, default=24.0)
+    args = ap.parse_args()
+
+    fingerprint = sql_fingerprint()
+    manager = SnapshotManager(_database_url())
+    try:
+        if args.command == "status":
+            stamp = manager.stamp()
+            state = "missing" if stamp is None else ("fresh" if stamp == fingerprint else "stale")
+            print(f"template={manager.template} state={state}")
+            print(f"fingerprint={fingerprint}")
+            print(f"stamp={stamp or '-'}")
+            for name in manager.test_databases():
+                print(f"test_db={name}")
+        elif args.command == "build":
+            started = time.perf_counter()
+            rebuilt = manager.build(fingerprint, force=args.force)
+            action = "rebuilt" if rebuilt else "up-to-date"
+            print(f"OK: template {manager.template} {action} ({time.perf_counter() - started:.1f}s)")
+        elif args.command == "create":
+            print(manager.create(fingerprint, args.name))
+        elif args.command == "run":
+            cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+            if not cmd:
+                die("db_snapshot: run requiere un comando (run -- CMD ...)")
+            started = time.perf_counter()
+            url = manager.create(fingerprint)
+            print(f"db_snapshot: {database_name(url)} lista en {time.perf_counter() - started:.2f}s", file=sys.stderr)
+            try:
+                rc = subprocess.run(cmd, env=_env_for(url)).returncode
+            finally:
+                manager.drop(database_name(url))
+            raise SystemExit(rc)
+        elif args.command == "drop":
+            manager.drop(args.name)
+            print(f"OK: dropped {args.name}")
+        elif args.command == "gc":
+            for name in manager.gc(args.max_age_hours):
+                print(f"dropped: {name}")
+    except RuntimeError as e:
+        die(f"db_snapshot: {e}")
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
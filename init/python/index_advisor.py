@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+"""
+Asesor de índices: propone índices compuestos/parciales faltantes y marca los
+que sobran, a partir de los predicados reales de la aplicación.
+
+Fuentes de predicados:
+
+- el catálogo de ``plan_regression.py`` (lookups de ``restaurant/`` y
+  ``pronto-api``, más el SQL de ``lib/validation/invariants*.py``);
+- con base (``DATABASE_URL``/``--database-url``): las ``--top`` consultas de
+  ``pg_stat_statements`` por tiempo total, si la extensión está instalada.
+
+Por consulta y tabla se arma el índice que la resolvería: columnas con
+igualdad contra un parámetro o un join primero, después la de rango u
+``ORDER BY``/``GROUP BY``; los filtros contra constantes (``status IN
+('open', ...)``, ``IS NOT NULL``) van al ``WHERE`` de un índice parcial. Se
+descarta si un índice existente ya empieza por esas columnas.
+
+Con base, ``pg_stat_user_tables`` (seq_scan vs idx_scan, filas leídas)
+prioriza y filtra por tamaño (``--min-rows``), y ``pg_stat_user_indexes``
+marca índices con ``idx_scan = 0`` o redundantes (prefijo de otro). Sin base,
+los índices existentes salen de ``init/sql`` y no hay candidatos a borrar.
+
+``--write-migration`` deja ``init/sql/migrations/<YYYYMMDD>_<NN>__index_advisor.sql``
+para revisar: ``CREATE INDEX CONCURRENTLY IF NOT EXISTS`` (pasa ``pronto-migrate
+--lint``; se aplica con ``--apply-online``) y los ``DROP INDEX CONCURRENTLY IF
+EXISTS`` comentados.
+
+Usage:
+    index_advisor.py [--json]                     # estático (init/sql) o DATABASE_URL
+    index_advisor.py --database-url URL --top 100 --min-rows 50000
+    index_advisor.py --write-migration
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+from apply_engine import die
+from migration_lint import ALTER_TABLE_RE, CREATE_INDEX_RE, CREATE_TABLE_RE, split_statements, table_name
+from plan_regression import CATALOG, invariant_queries
+from sql_safety import PHASES, SQL_ROOT, mask_sql
+
+MIGRATIONS_DIR = os.path.join(SQL_ROOT, "migrations")
+MIGRATION_SLUG = "index_advisor"
+MAX_COLUMNS = 3
+
+_WORD = r"[A-Za-z_]\w*"
+TABLE_REF_RE = re.compile(
+    rf"\b(?:FROM|JOIN|UPDATE)\s+(?:ONLY\s+)?(?P<table>{_WORD})"
+    r"(?:\s+(?:AS\s+)?(?P<alias>(?!(?:WHERE|JOIN|LEFT|RIGHT|INNER|FULL|CROSS|ON|USING|GROUP|ORDER|LIMIT|OFFSET"
+    rf"|HAVING|SET|WINDOW|UNION|FOR|RETURNING)\b){_WORD}))?",
+    re.I,
+)
+CLAUSE_RE = re.compile(r"\b(?:WHERE|ON|HAVING)\b", re.I)
+CLAUSE_END_RE = re.compile(
+    r"\b(?:GROUP\s+BY|ORDER\s+BY|LIMIT|OFFSET|RETURNING|UNION|WINDOW|JOIN|LEFT|RIGHT|INNER|FULL|CROSS"
+    r"|WHERE|HAVING|FOR\s+UPDATE|SELECT)\b",
+    re.I,
+)
+_VALUE = (
+    r"(?:'(?:[^']|'')*'|\$\d+|%\(\w+\)s|%s|-?\d+(?:\.\d+)?|\((?:[^()]|\([^()]*\))*\)"
+    rf"|(?:{_WORD}\.)?{_WORD}(?:\s*\(\s*\))?)(?:\s*::\s*{_WORD}(?:\[\])?)?"
+)
+COND_RE = re.compile(
+    rf"(?<![\w.$])(?:(?P<qual>{_WORD})\.)?(?P<col>{_WORD})\s*"
+    r"(?P<op>=\s*ANY\b|NOT\s+IN\b|IN\b|<>|!=|<=|>=|=|<|>|BETWEEN\b|NOT\s+I?LIKE\b|I?LIKE\b"
+    r"|IS\s+NOT\s+NULL\b|IS\s+NULL\b)"
+    rf"\s*(?P<rhs>{_VALUE})?",
+    re.I,
+)
+ORDER_RE = re.compile(rf"\b(?P<kw>ORDER|GROUP)\s+BY\s+(?:(?P<qual>{_WORD})\.)?(?P<col>{_WORD})\b(?!\s*\()", re.I)
+LITERAL_RE = re.compile(r"^(?:'(?:[^']|'')*'|-?\d+(?:\.\d+)?|TRUE|FALSE)(?:\s*::\s*\w+)?$", re.I)
+LITERAL_LIST_RE = re.compile(r"^\(\s*(?:'(?:[^']|'')*'|-?\d+)(?:\s*,\s*(?:'(?:[^']|'')*'|-?\d+))*\s*\)$")
+INDEX_BODY_RE = re.compile(r"\s*(?:USING\s+(?P<method>\w+)\s*)?\((?P<cols>.*?)\)\s*(?:INCLUDE\s*\(.*?\)\s*)?(?:WHERE\s+(?P<where>.+))?$", re.I | re.S)
+DROP_INDEX_RE = re.compile(rf"^DROP\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?(?P<name>{_WORD}(?:\.{_WORD})?)", re.I)
+ADD_COLUMN_RE = re.compile(rf"\bADD\s+COLUMN\s+(?:IF\s+NOT\s+EXISTS\s+)?(?P<col>{_WORD})", re.I)
+COLUMN_DEF_RE = re.compile(rf"^\s*(?P<col>{_WORD})\s+(?P<rest>.*)$", re.S)
+TABLE_CONSTRAINT_RE = re.compile(r"^\s*(?:CONSTRAINT\s+\w+\s+)?(?P<kind>PRIMARY\s+KEY|UNIQUE)\s*\((?P<cols>[^)]*)\)", re.I)
+MIGRATION_NAME_RE = re.compile(r"^(?P<date>\d{8})_(?P<seq>\d{2})__")
+
+
+@dataclass
+class ExistingIndex:
+    table: str
+    name: str
+    columns: list[str]
+    predicate: str | None = None
+    unique: bool = False
+    method: str = "btree"
+    idx_scan: int | None = None
+    size_bytes: int = 0
+    backs_constraint: bool = False
+
+
+@dataclass
+class Predicate:
+    table: str
+    column: str
+    kind: str  # eq | range | join | filter | order
+    text: str = ""  # filtros contra constantes: texto para el WHERE del índice parcial
+
+
+@dataclass
+class Candidate:
+    table: str
+    columns: list[str]
+    where: list[str] = field(default_factory=list)
+    sources: list[str] = field(default_factory=list)
+    weight: float = 0.0
+    name: str = ""
+
+    @property
+    def key(self) -> tuple:
+        return self.table, tuple(self.columns), tuple(self.where)
+
+    def ddl(self) -> str:
+        sql = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.name}\n  ON {self.table} ({', '.join(self.columns)})"
+        if self.where:
+            sql += f"\n  WHERE {' AND '.join(self.where)}"
+        return sql + ";"
+
+
+@dataclass
+class DropCandidate:
+    table: str
+    name: str
+    reason: str
+    size_bytes: int
+
+
+@dataclass
+class Schema:
+    columns: dict[str, set[str]] = field(default_factory=dict)
+    indexes: list[ExistingIndex] = field(default_factory=list)
+    tables: dict[str, dict] = field(default_factory=dict)  # pg_stat_user_tables por tabla
+    stats_since: str | None = None
+    live: bool = False
+
+    def table_rows(self, table: str) -> int:
+        return int(self.tables.get(table, {}).get("n_live_tup", 0))
+
+
+# -- esquema estático (init/sql) -------------------------------------------------
+
+
+def _split_top_level(body: str) -> list[str]:
+    parts, depth, start = [], 0, 0
+    for k, c in enumerate(body):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "," and depth == 0:
+            parts.append(body[start:k])
+            start = k + 1
+    parts.append(body[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _index_columns(cols: str) -> list[str]:
+    """Columnas de la lista de un índice; una expresión corta la lista (no sirve de prefijo)."""
+    out = []
+    for part in _split_top_level(cols):
+        m = re.match(rf"^\"?({_WORD})\"?(?:\s+\w+)*$", part)
+        if not m:
+            break
+        out.append(m.group(1).lower())
+    return out
+
+
+def sql_files(sql_root: str = SQL_ROOT) -> list[str]:
+    files = []
+    for phase in PHASES + ["migrations"]:
+        d = os.path.join(sql_root, phase)
+        if os.path.isdir(d):
+            files.extend(sorted(os.path.join(d, n) for n in os.listdir(d) if n.endswith(".sql")))
+    return files
+
+
+def static_schema(sql_root: str = SQL_ROOT) -> Schema:
+    """Tablas, columnas e índices tal como los dejan init/sql + migrations (sin DO/EXECUTE)."""
+    schema = Schema()
+    indexes: dict[str, ExistingIndex] = {}
+    for path in sql_files(sql_root):
+        with open(path, "r", encoding="utf-8") as f:
+            statements = split_statements(f.read(), path)
+        for st in statements:
+            code, sk = st.code, st.skeleton
+            if m := CREATE_TABLE_RE.match(sk):
+                table = table_name(m.group("table"))
+                cols = schema.columns.setdefault(table, set())
+                open_at = code.find("(")
+                if open_at < 0:
+                    continue
+                for part in _split_top_level(code[open_at + 1 : code.rfind(")")]):
+                    if c := TABLE_CONSTRAINT_RE.match(part):
+                        kind = "pkey" if c.group("kind").upper().startswith("PRIMARY") else "key"
+                        columns = _index_columns(c.group("cols"))
+                        name = f"{table}_{'_'.join(columns)}_{kind}" if kind == "key" else f"{table}_pkey"
+                        indexes[name] = ExistingIndex(table, name, columns, unique=True, backs_constraint=True)
+                    elif (d := COLUMN_DEF_RE.match(part)) and d.group("col").upper() not in ("CONSTRAINT", "CHECK", "FOREIGN", "EXCLUDE"):
+                        col = d.group("col").lower()
+                        cols.add(col)
+                        if re.search(r"\bPRIMARY\s+KEY\b", d.group("rest"), re.I):
+                            indexes[f"{table}_pkey"] = ExistingIndex(table, f"{table}_pkey", [col], unique=True, backs_constraint=True)
+                        elif re.search(r"\bUNIQUE\b", d.group("rest"), re.I):
+                            name = f"{table}_{col}_key"
+                            indexes[name] = ExistingIndex(table, name, [col], unique=True, backs_constraint=True)
+            elif m := ALTER_TABLE_RE.match(sk):
+                table = table_name(m.group("table"))
+                schema.columns.setdefault(table, set()).update(c.lower() for c in ADD_COLUMN_RE.findall(code))
+            elif m := CREATE_INDEX_RE.match(sk):
+                if not m.group("name"):
+                    continue
+                body = INDEX_BODY_RE.match(code[m.end() :])
+                if not body:
+                    continue
+                name = table_name(st.span(m, "name"))
+                indexes.setdefault(
+                    name,
+                    ExistingIndex(
+                        table_name(st.span(m, "table")),
+                        name,
+                        _index_columns(body.group("cols")),
+                        predicate=(body.group("where") or "").strip() or None,
+                        unique=bool(re.match(r"^CREATE\s+UNIQUE\b", code, re.I)),
+                        method=(body.group("method") or "btree").lower(),
+                    ),
+                )
+            elif m := DROP_INDEX_RE.match(code):
+                indexes.pop(table_name(m.group("name")), None)
+    schema.indexes = list(indexes.values())
+    return schema
+
+
+# -- esquema y estadísticas en vivo ------------------------------------------------
+
+LIVE_COLUMNS_SQL = """
+    SELECT table_name, column_name FROM information_schema.columns
+    WHERE table_schema = current_schema()
+"""
+LIVE_TABLES_SQL = """
+    SELECT relname, seq_scan, seq_tup_read, coalesce(idx_scan, 0), coalesce(idx_tup_fetch, 0), n_live_tup
+    FROM pg_stat_user_tables
+    WHERE schemaname = current_schema()
+"""
+LIVE_INDEXES_SQL = """
+    SELECT c.relname, i.relname,
+           ARRAY(SELECT a.attname::text
+                 FROM unnest(x.indkey) WITH ORDINALITY AS k(attnum, n)
+                 LEFT JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = k.attnum
+                 WHERE k.n <= x.indnkeyatts
+                 ORDER BY k.n),
+           pg_get_expr(x.indpred, x.indrelid),
+           x.indisunique, am.amname, coalesce(s.idx_scan, 0), pg_relation_size(i.oid),
+           EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = x.indexrelid)
+    FROM pg_index x
+    JOIN pg_class i ON i.oid = x.indexrelid
+    JOIN pg_class c ON c.oid = x.indrelid
+    JOIN pg_am am ON am.oid = i.relam
+    LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = x.indexrelid
+    WHERE c.relnamespace = current_schema()::regnamespace
+"""
+STATEMENTS_SQL = """
+    SELECT queryid, calls, total_exec_time, rows, query
+    FROM pg_stat_statements
+    WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+      AND query ~* '^\\s*(SELECT|UPDATE|DELETE|WITH)\\b'
+      AND query !~* '\\m(pg_catalog|information_schema|pg_stat_\\w+)\\M'
+    ORDER BY total_exec_time DESC
+    LIMIT %s
+"""
+
+
+class LiveStats:
+    def __init__(self, database_url: str):
+        try:
+            import psycopg2
+        except ImportError:
+            die("index_advisor: requiere psycopg2")
+        self.psycopg2 = psycopg2
+        self.conn = psycopg2.connect(database_url)
+        self.conn.autocommit = True
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _query(self, query: str, params=None) -> list[tuple]:
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            return cur.fetchall() if cur.description else []
+
+    def schema(self) -> Schema:
+        schema = Schema(live=True)
+        for table, column in self._query(LIVE_COLUMNS_SQL):
+            schema.columns.setdefault(table, set()).add(column)
+        for relname, seq_scan, seq_read, idx_scan, idx_fetch, live in self._query(LIVE_TABLES_SQL):
+            schema.tables[relname] = {
+                "seq_scan": seq_scan,
+                "seq_tup_read": seq_read,
+                "idx_scan": idx_scan,
+                "idx_tup_fetch": idx_fetch,
+                "n_live_tup": live,
+            }
+        for table, name, columns, pred, unique, method, scans, size, constraint in self._query(LIVE_INDEXES_SQL):
+            # Una expresión (attnum 0 -> NULL) corta el prefijo útil.
+            prefix = columns[: columns.index(None)] if None in columns else columns
+            schema.indexes.append(ExistingIndex(table, name, prefix, pred, unique, method, scans, size, constraint))
+        rows = self._query("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+        schema.stats_since = str(rows[0][0]) if rows and rows[0][0] else None
+        return schema
+
+    def statements(self, top: int) -> list[tuple[str, str, float]]:
+        """(etiqueta, query normalizada, peso en ms) de pg_stat_statements; [] si no está."""
+        if not self._query("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'"):
+            print("index_advisor: pg_stat_statements no instalada; solo el catálogo estático", file=sys.stderr)
+            return []
+        out = []
+        for queryid, calls, total_ms, rows, query in self._query(STATEMENTS_SQL, (top,)):
+            label = f"pgss:{queryid} calls={calls} mean={total_ms / max(calls, 1):.2f}ms rows={rows}"
+            out.append((label, query, float(total_ms)))
+        return out
+
+
+# -- predicados -----------------------------------------------------------------
+
+
+def _table_refs(safe: str, schema: Schema) -> dict[str, str]:
+    """alias/nombre -> tabla, solo para tablas conocidas del esquema."""
+    refs = {}
+    for m in TABLE_REF_RE.finditer(safe):
+        table = m.group("table").lower()
+        if table not in schema.columns:
+            continue
+        refs[table] = table
+        if m.group("alias"):
+            refs[m.group("alias").lower()] = table
+    return refs
+
+
+def _resolve(qual: str | None, col: str, refs: dict[str, str], schema: Schema) -> str | None:
+    col = col.lower()
+    if qual:
+        table = refs.get(qual.lower())
+        return table if table and col in schema.columns.get(table, ()) else None
+    owners = {t for t in refs.values() if col in schema.columns.get(t, ())}
+    return owners.pop() if len(owners) == 1 else None
+
+
+def _clause_regions(safe: str) -> list[tuple[int, int]]:
+    regions = []
+    for m in CLAUSE_RE.finditer(safe):
+        end = CLAUSE_END_RE.search(safe, m.end())
+        regions.append((m.end(), end.start() if end else len(safe)))
+    return regions
+
+
+def extract_predicates(sql: str, schema: Schema) -> list[Predicate]:
+    views = mask_sql(sql)
+    code, safe = views.code, views.safe
+    refs = _table_refs(safe, schema)
+    if not refs:
+        return []
+    preds: list[Predicate] = []
+    for start, end in _clause_regions(safe):
+        # Igualdades unidas por OR no forman un índice compuesto: cada una va por su lado (BitmapOr).
+        eq_kind = "alt" if re.search(r"\bOR\b", safe[start:end], re.I) else "eq"
+        for m in COND_RE.finditer(safe, start, end):
+            table = _resolve(m.group("qual"), m.group("col"), refs, schema)
+            if not table:
+                continue
+            col = m.group("col").lower()
+            op = re.sub(r"\s+", " ", m.group("op").upper())
+            rhs_safe = (m.group("rhs") or "").strip()
+            rhs = code[m.start("rhs") : m.end("rhs")].strip() if m.group("rhs") else ""
+            rhs = re.sub(r"\s*\)", ")", re.sub(r"\(\s*", "(", re.sub(r"\s+", " ", rhs)))
+            other = re.match(rf"^(?:(?P<qual>{_WORD})\.)?(?P<col>{_WORD})$", rhs_safe)
+            other_table = _resolve(other.group("qual"), other.group("col"), refs, schema) if other else None
+            if op in ("IS NULL", "IS NOT NULL"):
+                preds.append(Predicate(table, col, "filter", f"{col} {op}"))
+            elif "LIKE" in op:
+                continue  # btree no sirve para '%x%' (ver ix_customer_name_search_trgm)
+            elif LITERAL_RE.match(rhs_safe) or (op in ("IN", "NOT IN") and LITERAL_LIST_RE.match(rhs)):
+                if op in ("=", "IN", "<>", "!=", "NOT IN"):
+                    preds.append(Predicate(table, col, "filter", f"{col} {op} {rhs}"))
+                else:
+                    preds.append(Predicate(table, col, "range"))
+            elif op in ("<", ">", "<=", ">=", "BETWEEN"):
+                if not other_table:  # contra otra columna es un filtro del join, no un rango indexable
+                    preds.append(Predicate(table, col, "range"))
+            elif op in ("=", "IN", "= ANY"):
+                if other_table:
+                    preds.append(Predicate(table, col, "join"))
+                    preds.append(Predicate(other_table, other.group("col").lower(), "join"))
+                else:
+                    preds.append(Predicate(table, col, eq_kind))
+    for m in ORDER_RE.finditer(safe):
+        table = _resolve(m.group("qual"), m.group("col"), refs, schema)
+        if table:
+            preds.append(Predicate(table, m.group("col").lower(), "order"))
+    return preds
+
+
+def _dedup(items: list[str]) -> list[str]:
+    return list(dict.fromkeys(items))
+
+
+def _rare_filter(text: str) -> bool:
+    """Filtros que en datos sanos casi no matchean (el SQL de invariantes busca violaciones)."""
+    return bool(re.search(r"\b(?:NOT IN|IS NULL)\b|<>|!=", text))
+
+
+def candidates_for(preds: list[Predicate]) -> list[Candidate]:
+    """Un índice por tabla: igualdades/joins, después rango u orden; constantes al WHERE."""
+    out = []
+    for table in _dedup([p.table for p in preds]):
+        mine = [p for p in preds if p.table == table]
+        # Con igualdades propias la tabla maneja el join; si no, se la recorre por la clave del join.
+        eq = _dedup([p.column for p in mine if p.kind == "eq"]) or _dedup([p.column for p in mine if p.kind == "join"])
+        # ORDER BY id después de una igualdad es desempate, no vale una columna más.
+        tail = _dedup([p.column for p in mine if p.kind in ("range", "order") and p.column != "id"])
+        where = _dedup([p.text for p in mine if p.kind == "filter"])
+        # Una columna filtrada contra constantes sale de la clave (va al WHERE), salvo IS NOT NULL.
+        filtered = {p.column for p in mine if p.kind == "filter" and not p.text.endswith("IS NOT NULL")}
+        eq = [c for c in eq if c not in filtered]
+        tail = [c for c in tail if c not in filtered and c not in eq]
+        columns = (eq + tail[:1])[:MAX_COLUMNS]
+        if not columns and where and all(_rare_filter(w) for w in where):
+            columns = ["id"]  # índice parcial chico sobre la PK: solo las filas que violan el invariante
+        if columns:
+            out.append(Candidate(table, columns, sorted(where)))
+        for col in _dedup([p.column for p in mine if p.kind == "alt"]):
+            out.append(Candidate(table, [col]))
+    return out
+
+
+def is_covered(candidate: Candidate, indexes: list[ExistingIndex]) -> bool:
+    """Un índice btree existente empieza por las columnas del candidato y cubre su filtro."""
+    filtered = {re.match(rf"^({_WORD})", w).group(1) for w in candidate.where}
+    for idx in indexes:
+        if idx.table != candidate.table or idx.method != "btree":
+            continue
+        if idx.columns[: len(candidate.columns)] != candidate.columns:
+            continue
+        if not candidate.where or idx.predicate or filtered <= set(idx.columns):
+            return True
+    return False
+
+
+def index_name(candidate: Candidate, taken: set[str]) -> str:
+    base = "ix_" + re.sub(r"^pronto_", "", candidate.table) + "_" + "_".join(candidate.columns)
+    if candidate.where:
+        base += "_" + "_".join(_dedup(re.match(rf"^({_WORD})", w).group(1) for w in candidate.where))
+    if len(base) > 63 or base in taken:
+        digest = hashlib.sha1(repr(candidate.key).encode("utf-8")).hexdigest()[:6]
+        base = f"{base[:56]}_{digest}"
+    return base
+
+
+# -- propuesta -------------------------------------------------------------------
+
+
+def query_sources(stats: LiveStats | None, top: int) -> list[tuple[str, str, float]]:
+    sources = [(f"{q.name} ({q.source})", q.sql, 1.0) for q in CATALOG]
+    try:
+        sources += [(f"{q.name} ({q.source})", q.sql, 1.0) for q in invariant_queries()]
+    except ImportError as e:
+        print(f"index_advisor: sin invariantes de lib/validation ({e})", file=sys.stderr)
+    if stats:
+        sources += stats.statements(top)
+    return sources
+
+
+def propose(schema: Schema, sources: list[tuple[str, str, float]], min_rows: int) -> list[Candidate]:
+    merged: dict[tuple, Candidate] = {}
+    for label, sql, weight in sources:
+        for cand in candidates_for(extract_predicates(sql, schema)):
+            if schema.live and schema.table_rows(cand.table) < min_rows:
+                continue
+            if is_covered(cand, schema.indexes):
+                continue
+            entry = merged.setdefault(cand.key, cand)
+            entry.sources.append(label)
+            entry.weight += weight
+
+    # (a) cubre (a, b) con el mismo filtro: queda el más largo con las fuentes de ambos.
+    for cand in sorted(merged.values(), key=lambda c: len(c.columns)):
+        for other in merged.values():
+            if (
+                other is not cand
+                and other.table == cand.table
+                and other.where == cand.where
+                and len(other.columns) > len(cand.columns)
+                and other.columns[: len(cand.columns)] == cand.columns
+                and cand.key in merged
+            ):
+                other.sources += cand.sources
+                other.weight += cand.weight
+                del merged[cand.key]
+                break
+
+    def priority(c: Candidate) -> tuple:
+        t = schema.tables.get(c.table, {})
+        return -c.weight, -int(t.get("seq_tup_read", 0)), c.table
+
+    taken = {idx.name for idx in schema.indexes}
+    ordered = sorted(merged.values(), key=priority)
+    for cand in ordered:
+        cand.name = index_name(cand, taken)
+        taken.add(cand.name)
+    return ordered
+
+
+def drop_candidates(schema: Schema, min_index_bytes: int) -> list[DropCandidate]:
+    """Sin uso desde el último reset de estadísticas, o prefijo exacto de otro índice."""
+    if not schema.live:
+        return []
+    drops = []
+    for idx in schema.indexes:
+        if idx.unique or idx.backs_constraint:
+            continue
+        wider = next(
+            (
+                o
+                for o in schema.indexes
+                if o is not idx
+                and o.table == idx.table
+                and o.method == idx.method
+                and (o.predicate or None) == (idx.predicate or None)
+                and idx.columns
+                and len(o.columns) > len(idx.columns)
+                and o.columns[: len(idx.columns)] == idx.columns
+            ),
+            None,
+        )
+        if wider:
+            drops.append(DropCandidate(idx.table, idx.name, f"prefijo de {wider.name}", idx.size_bytes))
+        elif idx.idx_scan == 0 and idx.size_bytes >= min_index_bytes:
+            drops.append(DropCandidate(idx.table, idx.name, "idx_scan = 0", idx.size_bytes))
+    return sorted(drops, key=lambda d: (-d.size_bytes, d.name))
+
+
+def seq_heavy_tables(schema: Schema, min_rows: int) -> list[tuple[str, dict]]:
+    rows = [
+        (table, t)
+        for table, t in schema.tables.items()
+        if t["n_live_tup"] >= min_rows and t["seq_scan"] > t["idx_scan"]
+    ]
+    return sorted(rows, key=lambda r: -r[1]["seq_tup_read"])
+
+
+# -- migración -------------------------------------------------------------------
+
+
+def next_migration_path(today: str, migrations_dir: str = MIGRATIONS_DIR) -> str:
+    seqs = [
+        int(m.group("seq"))
+        for name in os.listdir(migrations_dir)
+        if (m := MIGRATION_NAME_RE.match(name)) and m.group("date") == today
+    ]
+    return os.path.join(migrations_dir, f"{today}_{max(seqs, default=0) + 1:02d}__{MIGRATION_SLUG}.sql")
+
+
+def _size(n: int) -> str:
+    for unit in ("B", "kB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return str(n)
+
+
+def render_migration(path: str, schema: Schema, adds: list[Candidate], drops: list[DropCandidate]) -> str:
+    origin = "pg_stat_* en vivo" if schema.live else "init/sql (estático)"
+    lines = [
+        f"-- Migration: {os.path.basename(path)}",
+        "-- Purpose: Index changes proposed by pronto-index-advisor. Review before applying:",
+        "-- keep only the indexes the plans need (pronto-plan-check) and apply with",
+        "-- `pronto-migrate --apply-online` (CONCURRENTLY cannot run inside --apply's transaction).",
+        f"-- Source: {origin}" + (f", stats since {schema.stats_since}" if schema.stats_since else ""),
+        "",
+    ]
+    for cand in adds:
+        lines.append(f"-- {cand.table}: " + "; ".join(cand.sources[:3]) + (" ..." if len(cand.sources) > 3 else ""))
+        lines.append(cand.ddl())
+        lines.append("")
+    if drops:
+        lines.append("-- Unused/redundant on this database; confirm against production stats, then uncomment.")
+        for drop in drops:
+            lines.append(f"-- {drop.table}: {drop.reason}, {_size(drop.size_bytes)}")
+            lines.append(f"-- DROP INDEX CONCURRENTLY IF EXISTS {drop.name};")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def print_report(schema: Schema, adds: list[Candidate], drops: list[DropCandidate], min_rows: int) -> None:
+    if schema.live:
+        print(f"Tablas con más seq scans que idx scans (>= {min_rows} filas):")
+        for table, t in seq_heavy_tables(schema, min_rows):
+            print(
+                f"  {table:<36} rows={t['n_live_tup']} seq_scan={t['seq_scan']} "
+                f"seq_tup_read={t['seq_tup_read']} idx_scan={t['idx_scan']}"
+            )
+    print("Índices propuestos:")
+    for cand in adds:
+        where = f" WHERE {' AND '.join(cand.where)}" if cand.where else ""
+        print(f"  + {cand.name} ON {cand.table} ({', '.join(cand.columns)}){where}")
+        for source in cand.sources:
+            print(f"      {source}")
+    if schema.live:
+        print("Índices sin uso / redundantes" + (f" (desde {schema.stats_since})" if schema.stats_since else "") + ":")
+        for drop in drops:
+            print(f"  - {drop.name} ({drop.table}) {drop.reason}, {_size(drop.size_bytes)}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Propone índices faltantes y marca los que sobran")
+    ap.add_argument("--database-url", default=os.environ.get("DATABASE_URL", ""), help="Base local/staging (default: DATABASE_URL)")
+    ap.add_argument("--static", action="store_true", help="Ignorar la base: índices de init/sql, sin estadísticas")
+    ap.add_argument("--top", type=int, default=50, help="Consultas de pg_stat_statements por tiempo total")
+    ap.add_argument("--min-rows", type=int, default=10_000, help="Tablas más chicas no reciben índices nuevos")
+    ap.add_argument("--min-index-bytes", type=int, default=1 << 20, help="Índices sin uso más chicos no se reportan")
+    ap.add_argument("--write-migration", action="store_true", help="Escribir init/sql/migrations/<fecha>_<NN>__index_advisor.sql")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    stats = None if args.static or not args.database_url else LiveStats(args.database_url)
+    try:
+        schema = stats.schema() if stats else static_schema()
+        sources = query_sources(stats, args.top)
+    except RuntimeError as e:
+        die(f"index_advisor: {e}")
+    finally:
+        if stats:
+            stats.close()
+
+    adds = propose(schema, sources, args.min_rows)
+    drops = drop_candidates(schema, args.min_index_bytes)
+    if args.json:
+        print(json.dumps({"add": [asdict(c) for c in adds], "drop": [asdict(d) for d in drops]}, indent=2, ensure_ascii=False))
+    else:
+        print_report(schema, adds, drops, args.min_rows)
+
+    if args.write_migration:
+        if not adds and not drops:
+            print("OK: nada que proponer; no se escribe migración")
+            return
+        path = next_migration_path(datetime.now(timezone.utc).strftime("%Y%m%d"))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_migration(path, schema, adds, drops))
+        print(f"OK: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Linter de migraciones según el lock que toma cada sentencia.
+
+Parte cada archivo en sentencias (respetando comentarios, literales y bloques
+``$$``), clasifica cada una por el lock de tabla que adquiere en Postgres y
+marca lo que bloquea tráfico en horario de servicio:
+
+- ``index-not-concurrent``: ``CREATE INDEX`` / ``ADD PRIMARY KEY|UNIQUE`` /
+  ``REINDEX`` sin ``CONCURRENTLY`` (bloquea escrituras durante el build).
+- ``table-rewrite``: ``ADD COLUMN`` con default volátil o serial,
+  ``ALTER COLUMN ... TYPE``, ``SET LOGGED|TABLESPACE``, ``VACUUM FULL``,
+  ``CLUSTER`` (ACCESS EXCLUSIVE mientras se reescribe la tabla).
+- ``full-scan-under-lock``: ``SET NOT NULL`` y ``ADD CONSTRAINT`` FK/CHECK sin
+  ``NOT VALID`` (escanean la tabla con el lock tomado).
+- ``unbatched-update`` / ``unbatched-delete``: DML sobre toda o gran parte de
+  la tabla en una sola sentencia.
+- ``unanalyzable``: bloques ``DO``, ``CALL`` y sentencias que llaman funciones
+  definidas en ``init/sql`` (p.ej. ``pronto_partition_convert``); los locks que
+  toman no se pueden deducir del texto y requieren revisión manual. Siempre
+  ``warning``; no cambian cómo se aplica el archivo en modo online.
+
+Los hallazgos sobre tablas calientes (``HOT_TABLES`` + ``PRONTO_HOT_TABLES``)
+son ``error``; el resto ``warning``. Las tablas creadas en el mismo archivo no
+se marcan (están vacías). ``online_migrate.py`` usa este análisis para aplicar
+las migraciones marcadas en modo online.
+
+Usage:
+    migration_lint.py                          # todo init/sql/migrations
+    migration_lint.py path/a.sql path/b.sql --all
+    migration_lint.py --hot-table pronto_customers --strict
+    migration_lint.py --json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+
+from apply_engine import die
+from sql_safety import DOLLAR_RE, SQL_ROOT, mask_sql, statement_spans
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+MIG_DIR = os.path.join(REPO_ROOT, "pronto-scripts", "init", "sql", "migrations")
+
+HOT_TABLES = {"pronto_orders", "pronto_order_items", "pronto_dining_sessions"}
+
+# Locks de tabla de Postgres, de menor a mayor.
+LOCK_LEVELS = [
+    "ACCESS SHARE",
+    "ROW SHARE",
+    "ROW EXCLUSIVE",
+    "SHARE UPDATE EXCLUSIVE",
+    "SHARE",
+    "SHARE ROW EXCLUSIVE",
+    "EXCLUSIVE",
+    "ACCESS EXCLUSIVE",
+]
+
+_IDENT = r'(?:"[^"]*"|[A-Za-z_][\w$]*)'
+NAME = rf"{_IDENT}(?:\s*\.\s*{_IDENT})?"
+
+CREATE_INDEX_RE = re.compile(
+    rf"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?P<conc>CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?"
+    rf"(?:(?P<name>{NAME})\s+)?ON\s+(?:ONLY\s+)?(?P<table>{NAME})",
+    re.I | re.S,
+)
+CREATE_TABLE_RE = re.compile(
+    rf"^CREATE\s+(?:(?:GLOBAL\s+|LOCAL\s+)?(?:TEMP|TEMPORARY|UNLOGGED)\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?P<table>{NAME})",
+    re.I | re.S,
+)
+ALTER_TABLE_RE = re.compile(
+    rf"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?(?P<table>{NAME})\s+(?P<rest>.+)$", re.I | re.S
+)
+UPDATE_RE = re.compile(
+    rf"^(?:WITH\b.*?\s)?UPDATE\s+(?:ONLY\s+)?(?P<table>{NAME})(?:\s+(?:AS\s+)?(?P<alias>{_IDENT}))?"
+    r"\s+SET\s+(?P<set>.+?)(?:\s+FROM\s+(?P<from>.+?))?(?:\s+WHERE\s+(?P<where>.+?))?"
+    r"(?:\s+RETURNING\s+(?P<returning>.+))?\s*$",
+    re.I | re.S,
+)
+DELETE_RE = re.compile(
+    rf"^(?:WITH\b.*?\s)?DELETE\s+FROM\s+(?:ONLY\s+)?(?P<table>{NAME})(?:\s+(?:AS\s+)?(?P<alias>{_IDENT}))?"
+    r"(?:\s+USING\s+(?P<using>.+?))?(?:\s+WHERE\s+(?P<where>.+?))?"
+    r"(?:\s+RETURNING\s+(?P<returning>.+))?\s*$",
+    re.I | re.S,
+)
+DROP_INDEX_RE = re.compile(r"^DROP\s+INDEX\s+(?P<conc>CONCURRENTLY\s+)?", re.I)
+REINDEX_RE = re.compile(r"^REINDEX\s+(?:\(.*?\)\s*)?(?:INDEX|TABLE|SCHEMA|DATABASE|SYSTEM)\s+(?P<conc>CONCURRENTLY\s+)?", re.I | re.S)
+CREATE_FUNCTION_RE = re.compile(
+    rf"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:FUNCTION|PROCEDURE)\s+(?P<name>{NAME})", re.I | re.S
+)
+CALL_NAME_RE = re.compile(rf"(?P<name>{NAME})\s*\(")
+TXN_RE = re.compile(r"^(BEGIN|COMMIT|ROLLBACK|START\s+TRANSACTION|END)\b", re.I)
+# Sentencias embebidas en un DO $$ ... $$ (plpgsql).
+EMBEDDED_RE = re.compile(
+    r"(?:^|\b(?:THEN|ELSE|LOOP|BEGIN)\s+)(?P<stmt>ALTER\s+TABLE|CREATE\s+(?:UNIQUE\s+)?INDEX|UPDATE|DELETE\s+FROM|EXECUTE)\b",
+    re.I,
+)
+
+VOLATILE_DEFAULT_RE = re.compile(
+    r"\bDEFAULT\b.*\b(random|gen_random_uuid|uuid_generate_v[14]|clock_timestamp|timeofday|nextval|txid_current)\s*\(",
+    re.I | re.S,
+)
+SERIAL_RE = re.compile(r"\b(SMALLSERIAL|BIGSERIAL|SERIAL|SERIAL[248])\b|\bGENERATED\s+ALWAYS\s+AS\s*\(.*\)\s*STORED", re.I | re.S)
+KEY_EQUALITY_RE = re.compile(
+    r"(?:^|[\s(.])(?:\"?(?:id|key|name|slug|code|[A-Za-z_]\w*_(?:id|key))\"?)\s*(?:=\s*(?:'(?:[^']|'')*'|-?\d+)|IN\s*\(\s*(?:'|-?\d))",
+    re.I,
+)
+
+
+@dataclass
+class Statement:
+    path: str
+    line: int
+    text: str  # SQL original
+    code: str  # comentarios en blanco (misma longitud que text)
+    skeleton: str  # además literales, identificadores con comillas y contenido de paréntesis en blanco
+
+    def span(self, m: re.Match, group: str) -> str:
+        """Texto (sin comentarios) de un grupo encontrado sobre ``skeleton``."""
+        return self.code[m.start(group) : m.end(group)].strip()
+
+    def tail(self, offset: int) -> "Statement":
+        return Statement(
+            self.path,
+            self.line + self.text.count("\n", 0, offset),
+            self.text[offset:],
+            self.code[offset:],
+            self.skeleton[offset:],
+        )
+
+
+@dataclass
+class Finding:
+    rule: str
+    severity: str  # "error" | "warning"
+    message: str
+
+
+# Reglas que piden revisión manual pero no se corrigen al aplicar en online.
+REVIEW_RULES = frozenset({"unanalyzable"})
+
+
+@dataclass
+class Analysis:
+    statement: Statement
+    kind: str
+    lock: str | None = None
+    table: str | None = None
+    relation: str | None = None  # nombre tal como aparece en el SQL
+    parts: list[str] = field(default_factory=list)  # subcomandos de ALTER TABLE
+    concurrent: bool = False  # CONCURRENTLY: no puede ir dentro de una transacción
+    findings: list[Finding] = field(default_factory=list)
+    embedded: list["Analysis"] = field(default_factory=list)
+
+    @property
+    def flagged(self) -> bool:
+        return bool(self.findings)
+
+    @property
+    def lock_findings(self) -> list[Finding]:
+        """Hallazgos que el modo online corrige (sin los de revisión manual)."""
+        return [f for f in self.findings if f.rule not in REVIEW_RULES]
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.statement.path,
+            "line": self.statement.line,
+            "kind": self.kind,
+            "lock": self.lock,
+            "table": self.table,
+            "findings": [f.__dict__ for f in self.findings],
+        }
+
+
+def _skeleton(masked: str) -> str:
+    """Contenido de paréntesis en blanco: solo queda el nivel superior."""
+    out = list(masked)
+    depth = 0
+    for k, c in enumerate(masked):
+        if c == "(":
+            depth += 1
+            if depth > 1:
+                out[k] = " "
+        elif c == ")":
+            depth = max(depth - 1, 0)
+            if depth > 0:
+                out[k] = " "
+        elif depth > 0 and c != "\n":
+            out[k] = " "
+    return "".join(out)
+
+
+def split_statements(text: str, path: str = "<sql>", first_line: int = 1) -> list[Statement]:
+    """Sentencias separadas por ``;`` de nivel superior (fuera de literales/$$)."""
+    views = mask_sql(text)
+    return [
+        Statement(
+            path,
+            first_line + text.count("\n", 0, s),
+            text[s:e],
+            views.code[s:e],
+            _skeleton(views.masked[s:e]),
+        )
+        for s, e in statement_spans(views.code, views.masked)
+    ]
+
+
+def table_name(raw: str) -> str:
+    """``public."Foo"`` -> ``Foo``; ``Public.Bar`` -> ``bar``."""
+    parts = [p.strip() for p in re.split(r'\.(?=(?:[^"]*"[^"]*")*[^"]*$)', raw)]
+    parts = [p[1:-1] if p.startswith('"') else p.lower() for p in parts]
+    if len(parts) == 2 and parts[0] == "public":
+        parts = parts[1:]
+    return ".".join(parts)
+
+
+def repo_functions(root: str = SQL_ROOT) -> set[str]:
+    """Funciones y procedimientos creados por los .sql de ``root``."""
+    names: set[str] = set()
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.endswith(".sql"):
+                continue
+            with open(os.path.join(dirpath, filename), "r", encoding="utf-8") as f:
+                for stmt in split_statements(f.read()):
+                    if m := CREATE_FUNCTION_RE.match(stmt.skeleton.lstrip()):
+                        names.add(table_name(m.group("name")))
+    return names
+
+
+def hot_tables() -> set[str]:
+    extra = os.environ.get("PRONTO_HOT_TABLES", "")
+    return HOT_TABLES | {t.strip().lower() for t in extra.split(",") if t.strip()}
+
+
+def max_lock(*locks: str | None) -> str | None:
+    known = [lock for lock in locks if lock]
+    return max(known, key=LOCK_LEVELS.index) if known else None
+
+
+class Linter:
+    def __init__(self, hot: set[str] | None = None, functions: set[str] | None = None):
+        self.hot = hot_tables() if hot is None else hot
+        self.functions = repo_functions() if functions is None else set(functions)
+        self.created: set[str] = set()
+
+    def _severity(self, table: str | None) -> str:
+        return "error" if table in self.hot else "warning"
+
+    def _finding(self, a: Analysis, rule: str, message: str) -> None:
+        if a.table in self.created:
+            return
+        a.findings.append(Finding(rule, self._severity(a.table), message))
+
+    def _called_functions(self, text: str) -> list[str]:
+        masked = mask_sql(text).masked
+        called = {table_name(m.group("name")) for m in CALL_NAME_RE.finditer(masked)}
+        return sorted(called & self.functions)
+
+    def _unanalyzable(self, a: Analysis, what: str) -> None:
+        a.findings.append(
+            Finding("unanalyzable", "warning", f"{what}: los locks que toma no se analizan; revisar a mano")
+        )
+
+    # -- por tipo de sentencia ----------------------------------------------
+
+    def _create_index(self, a: Analysis, m: re.Match) -> None:
+        a.kind = "create_index"
+        a.relation = a.statement.span(m, "table")
+        a.table = table_name(a.relation)
+        if m.group("conc"):
+            a.lock = "SHARE UPDATE EXCLUSIVE"
+            a.concurrent = True
+            return
+        a.lock = "SHARE"
+        self._finding(a, "index-not-concurrent", f"CREATE INDEX sin CONCURRENTLY bloquea escrituras en {a.table} durante el build")
+
+    def _alter_table(self, a: Analysis, m: re.Match) -> None:
+        a.kind = "alter_table"
+        a.relation = a.statement.span(m, "table")
+        a.table = table_name(a.relation)
+        offset = m.start("rest")
+        skeleton = a.statement.skeleton[offset:]
+        locks = []
+        pos = 0
+        for piece in skeleton.split(","):
+            sub_sk = piece.strip()
+            start = offset + pos + (len(piece) - len(piece.lstrip()))
+            sub_code = a.statement.code[start : start + len(sub_sk)]
+            pos += len(piece) + 1
+            a.parts.append(sub_code)
+            locks.append(self._alter_action(a, sub_sk.upper(), sub_code))
+        a.lock = max_lock(*locks)
+
+    def _alter_action(self, a: Analysis, sk: str, code: str) -> str:
+        sk = re.sub(r"\s+", " ", sk)
+        if re.match(r"ADD (CONSTRAINT \S+ )?FOREIGN KEY\b", sk) or (sk.startswith("ADD CONSTRAINT") and " REFERENCES " in sk):
+            if " NOT VALID" not in sk:
+                self._finding(a, "full-scan-under-lock", f"FOREIGN KEY sin NOT VALID valida toda {a.table} con el lock tomado")
+            return "SHARE ROW EXCLUSIVE"
+        if re.match(r"ADD (CONSTRAINT \S+ )?CHECK\b", sk):
+            if " NOT VALID" not in sk:
+                self._finding(a, "full-scan-under-lock", f"CHECK sin NOT VALID escanea {a.table} bajo ACCESS EXCLUSIVE")
+            return "ACCESS EXCLUSIVE"
+        if re.match(r"ADD (CONSTRAINT \S+ )?(PRIMARY KEY|UNIQUE|EXCLUDE)\b", sk):
+            if " USING INDEX " not in sk + " ":
+                self._finding(
+                    a,
+                    "index-not-concurrent",
+                    f"ADD PRIMARY KEY/UNIQUE construye el índice bajo ACCESS EXCLUSIVE en {a.table}"
+                    " (usar CREATE UNIQUE INDEX CONCURRENTLY + USING INDEX)",
+                )
+            return "ACCESS EXCLUSIVE"
+        if sk.startswith("ADD"):
+            if VOLATILE_DEFAULT_RE.search(code) or SERIAL_RE.search(code):
+                self._finding(a, "table-rewrite", f"ADD COLUMN con default volátil/serial reescribe {a.table}")
+            return "ACCESS EXCLUSIVE"
+        if re.match(r"ALTER (COLUMN )?\S+ (SET DATA )?TYPE\b", sk):
+            self._finding(a, "table-rewrite", f"ALTER COLUMN ... TYPE puede reescribir {a.table} (salvo ampliar varchar)")
+            return "ACCESS EXCLUSIVE"
+        if re.match(r"ALTER (COLUMN )?\S+ SET NOT NULL\b", sk):
+            self._finding(
+                a,
+                "full-scan-under-lock",
+                f"SET NOT NULL escanea {a.table} bajo ACCESS EXCLUSIVE (usar CHECK ... NOT VALID + VALIDATE primero)",
+            )
+            return "ACCESS EXCLUSIVE"
+        if re.match(r"ALTER (COLUMN )?\S+ SET STATISTICS\b", sk) or sk.startswith(("VALIDATE CONSTRAINT", "SET (", "RESET (")):
+            return "SHARE UPDATE EXCLUSIVE"
+        if re.match(r"SET (LOGGED|UNLOGGED|TABLESPACE|WITHOUT OIDS)\b", sk):
+            self._finding(a, "table-rewrite", f"{sk.split(' (')[0]} reescribe {a.table}")
+            return "ACCESS EXCLUSIVE"
+        if re.match(r"(ENABLE|DISABLE) (ALWAYS |REPLICA )?TRIGGER\b", sk):
+            return "SHARE ROW EXCLUSIVE"
+        if sk.startswith("ATTACH PARTITION"):
+            return "SHARE UPDATE EXCLUSIVE"
+        return "ACCESS EXCLUSIVE"
+
+    def _dml(self, a: Analysis, m: re.Match, kind: str) -> None:
+        a.kind = kind
+        a.lock = "ROW EXCLUSIVE"
+        a.relation = a.statement.span(m, "table")
+        a.table = table_name(a.relation)
+        where = a.statement.span(m, "where") if m.group("where") else ""
+        if where and KEY_EQUALITY_RE.search(where):
+            return
+        verb = "UPDATE" if kind == "update" else "DELETE"
+        scope = "sin WHERE" if not where else "sin acotar por clave"
+        self._finding(a, f"unbatched-{kind}", f"{verb} {scope} sobre {a.table} en una sola transacción (usar lotes)")
+
+    def _do_block(self, a: Analysis) -> None:
+        a.kind = "do_block"
+        m = DOLLAR_RE.search(a.statement.code)
+        if not m:
+            return
+        end = a.statement.code.find(m.group(0), m.end())
+        body = a.statement.text[m.end() : end if end >= 0 else None]
+        body_line = a.statement.line + a.statement.text.count("\n", 0, m.end())
+        for stmt in split_statements(body, a.statement.path, body_line):
+            em = EMBEDDED_RE.search(stmt.skeleton)
+            if not em:
+                continue
+            inner = self.analyze(stmt.tail(em.start("stmt")), embedded=True)
+            if em.group("stmt").upper() == "EXECUTE":
+                inner.kind = "dynamic_sql"
+            a.embedded.append(inner)
+            for f in inner.findings:
+                a.findings.append(Finding(f.rule, f.severity, f"{f.message} (dentro de DO: no se reescribe en modo online)"))
+        a.lock = max_lock(*(inner.lock for inner in a.embedded))
+        tables = {inner.table for inner in a.embedded if inner.table}
+        a.table = ",".join(sorted(tables)) or None
+        called = self._called_functions(body)
+        what = "bloque DO (plpgsql)"
+        if called:
+            what += " que llama " + ", ".join(f"{name}()" for name in called)
+        self._unanalyzable(a, what)
+
+    # -- entrada ------------------------------------------------------------
+
+    def analyze(self, stmt: Statement, embedded: bool = False) -> Analysis:
+        a = Analysis(stmt, "other")
+        sk = stmt.skeleton.lstrip()
+        if TXN_RE.match(sk):
+            a.kind = "transaction"
+        elif m := CREATE_INDEX_RE.match(sk):
+            self._create_index(a, m)
+        elif m := CREATE_TABLE_RE.match(sk):
+            a.kind = "create_table"
+            a.table = table_name(stmt.span(m, "table"))
+            a.lock = "ACCESS EXCLUSIVE"
+            if not embedded:
+                self.created.add(a.table)
+        elif m := ALTER_TABLE_RE.match(sk):
+            self._alter_table(a, m)
+        elif m := UPDATE_RE.match(sk):
+            self._dml(a, m, "update")
+        elif m := DELETE_RE.match(sk):
+            self._dml(a, m, "delete")
+        elif m := DROP_INDEX_RE.match(sk):
+            a.kind = "drop_index"
+            a.concurrent = bool(m.group("conc"))
+            a.lock = "SHARE UPDATE EXCLUSIVE" if m.group("conc") else "ACCESS EXCLUSIVE"
+        elif m := REINDEX_RE.match(sk):
+            a.kind = "reindex"
+            a.concurrent = bool(m.group("conc"))
+            a.lock = "SHARE UPDATE EXCLUSIVE" if m.group("conc") else "SHARE"
+            if not m.group("conc"):
+                a.findings.append(Finding("index-not-concurrent", "warning", "REINDEX sin CONCURRENTLY bloquea escrituras"))
+        elif re.match(r"^(VACUUM\s+(\(.*?FULL.*?\)|FULL)|CLUSTER)\b", sk, re.I | re.S):
+            a.kind = "rewrite"
+            a.lock = "ACCESS EXCLUSIVE"
+            a.findings.append(Finding("table-rewrite", "warning", "VACUUM FULL/CLUSTER reescribe la tabla bajo ACCESS EXCLUSIVE"))
+        elif re.match(r"^DO\b", sk, re.I):
+            self._do_block(a)
+            return a
+        elif m := CREATE_FUNCTION_RE.match(sk):
+            # El cuerpo no se ejecuta al crearla; las llamadas se marcan donde ocurren.
+            a.kind = "create_function"
+            self.functions.add(table_name(m.group("name")))
+            return a
+        elif re.match(r"^CALL\b", sk, re.I):
+            a.kind = "call"
+            self._unanalyzable(a, "CALL")
+            return a
+        elif re.match(r"^(INSERT|COPY)\b", sk, re.I):
+            a.kind = "insert"
+            a.lock = "ROW EXCLUSIVE"
+        elif re.match(r"^(DROP\s+TABLE|TRUNCATE|LOCK)\b", sk, re.I):
+            a.kind = sk.split()[0].lower()
+            a.lock = "ACCESS EXCLUSIVE"
+        elif re.match(r"^(SELECT|WITH)\b", sk, re.I):
+            a.kind = "select"
+            a.lock = "ACCESS SHARE"
+        if not embedded:
+            called = self._called_functions(stmt.text)
+            if called:
+                self._unanalyzable(a, "llama " + ", ".join(f"{name}()" for name in called))
+        return a
+
+    def lint_text(self, text: str, path: str = "<sql>") -> list[Analysis]:
+        self.created = set()
+        return [self.analyze(stmt) for stmt in split_statements(text, path)]
+
+    def lint_file(self, path: str) -> list[Analysis]:
+        with open(path, "r", encoding="utf-8") as f:
+            return self.lint_text(f.read(), path)
+
+
+def migration_files(paths: list[str]) -> list[str]:
+    if not paths:
+        paths = [MIG_DIR]
+    files = []
+    for p in paths:
+        if not os.path.exists(p):
+            die(f"migration-lint: no existe {p}")
+        if os.path.isdir(p):
+            files.extend(sorted(os.path.join(p, n) for n in os.listdir(p) if n.endswith(".sql")))
+        else:
+            files.append(p)
+    return files
+
+
+def _first_line(a: Analysis) -> str:
+    line = " ".join(a.statement.code.split())
+    return line if len(line) <= 100 else line[:97] + "..."
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Clasifica sentencias de migraciones por lock y marca las que bloquean tráfico")
+    ap.add_argument("paths", nargs="*", help="Archivos o directorios (default: init/sql/migrations)")
+    ap.add_argument("--hot-table", action="append", default=[], help="Tabla caliente extra (repetible)")
+    ap.add_argument("--all", action="store_true", help="Listar todas las sentencias, no solo las marcadas")
+    ap.add_argument("--strict", action="store_true", help="Fallar también con warnings")
+    ap.add_argument("--json", action="store_true", help="Salida JSON")
+    args = ap.parse_args()
+
+    linter = Linter(hot_tables() | {t.lower() for t in args.hot_table})
+    results = []
+    for path in migration_files(args.paths):
+        results.extend(linter.lint_file(path))
+
+    findings = [f for a in results for f in a.findings]
+    errors = sum(1 for f in findings if f.severity == "error")
+    warnings = len(findings) - errors
+
+    if args.json:
+        print(json.dumps([a.to_dict() for a in results if args.all or a.flagged], indent=2, ensure_ascii=False))
+    else:
+        for a in results:
+            if not (args.all or a.flagged):
+                continue
+            rel = os.path.relpath(a.statement.path)
+            print(f"{rel}:{a.statement.line}  [{a.lock or '?'}] {a.table or '-'}  {_first_line(a)}")
+            for f in a.findings:
+                print(f"    {f.severity.upper()} {f.rule}: {f.message}")
+        print(f"migration-lint: statements={len(results)} errors={errors} warnings={warnings}", file=sys.stderr)
+
+    if errors or (args.strict and warnings):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
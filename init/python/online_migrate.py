@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Modo online de pronto-migrate: migraciones en horario de servicio.
+
+Para cada migración pendiente (sin fila ``applied`` con el mismo sha en
+``pronto_schema_migrations``) corre ``migration_lint``:
+
+- Sin hallazgos (los ``unanalyzable`` de revisión manual no cuentan): se aplica como en ``pronto-migrate --apply`` (una
+  transacción + fila de control) pero con ``lock_timeout`` corto y reintentos
+  con backoff cuando el lock no está disponible.
+- Con hallazgos: se aplica sentencia por sentencia, cada una en su propia
+  transacción corta, reescribiendo lo marcado:
+
+  ``CREATE INDEX``            -> ``CREATE INDEX CONCURRENTLY`` (limpia índices
+                                 inválidos de un intento anterior)
+  ``UPDATE``/``DELETE``       -> lotes por rangos de la PK (keyset)
+  ``ADD CONSTRAINT`` FK/CHECK -> ``NOT VALID`` + ``VALIDATE CONSTRAINT``
+  ``SET NOT NULL``            -> ``CHECK (col IS NOT NULL) NOT VALID`` +
+                                 ``VALIDATE`` + ``SET NOT NULL`` (PG12+ no escanea)
+
+  Sentencias ya escritas con ``CONCURRENTLY`` (``CREATE INDEX``, ``DROP
+  INDEX``, ``REINDEX``) también fuerzan este modo y corren fuera de
+  transacción; ``pronto-migrate --apply`` no puede aplicarlas.
+
+  El resto (``DO $$``, ALTER con varios subcomandos...) se ejecuta tal cual
+  con ``lock_timeout`` corto y reintentos. ``BEGIN``/``COMMIT`` del archivo se
+  ignoran: la migración deja de ser atómica, así que debe ser idempotente
+  (``IF NOT EXISTS``), como ya lo son las de ``init/sql/migrations``.
+
+Toda la corrida mantiene ``pg_advisory_lock(hashtext('pronto-migrate'))``, el
+mismo que usa ``pronto-migrate --apply``.
+
+Usage:
+    online_migrate.py [archivos...] [--lock-timeout 2s] [--retries 30]
+                      [--batch-size 1000] [--batch-sleep 0.05] [--plan]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass
+
+from apply_engine import SqlFile, die, load_file
+from migration_lint import (
+    CREATE_INDEX_RE,
+    DELETE_RE,
+    UPDATE_RE,
+    Analysis,
+    Linter,
+    migration_files,
+)
+
+RETRYABLE = {"55P03", "40P01"}  # lock_not_available, deadlock_detected
+LOCK_SQL = "SELECT pg_advisory_lock(hashtext('pronto-migrate'));"
+UNLOCK_SQL = "SELECT pg_advisory_unlock(hashtext('pronto-migrate'));"
+
+RECORD_SQL = """
+INSERT INTO pronto_schema_migrations(file_name, sha256, sql_norm_sha, status, error, executed_by, app_version, git_sha, sql_head_sha)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON CONFLICT (file_name) DO UPDATE
+SET sha256=EXCLUDED.sha256,
+    sql_norm_sha=EXCLUDED.sql_norm_sha,
+    executed_at=now(),
+    status=EXCLUDED.status,
+    error=EXCLUDED.error,
+    executed_by=EXCLUDED.executed_by,
+    app_version=EXCLUDED.app_version,
+    git_sha=EXCLUDED.git_sha,
+    sql_head_sha=EXCLUDED.sql_head_sha;
+"""
+
+_IDENT_RE = r'(?:"[^"]*"|[A-Za-z_][\w$]*)'
+ADD_CONSTRAINT_RE = re.compile(rf"^ADD\s+CONSTRAINT\s+(?P<name>{_IDENT_RE})\s+(FOREIGN\s+KEY|CHECK)\b", re.I | re.S)
+SET_NOT_NULL_RE = re.compile(rf"^ALTER\s+(?:COLUMN\s+)?(?P<col>{_IDENT_RE})\s+SET\s+NOT\s+NULL$", re.I | re.S)
+
+
+@dataclass
+class Options:
+    lock_timeout: str = "2s"
+    statement_timeout: str = "5min"
+    retries: int = 30
+    backoff_max: float = 10.0
+    batch_size: int = 1000
+    batch_sleep: float = 0.05
+
+
+def statement_mode(analyses: list[Analysis]) -> bool:
+    """El archivo se aplica sentencia por sentencia (hallazgos o CONCURRENTLY)."""
+    return any(a.lock_findings or a.concurrent for a in analyses)
+
+
+def plan_action(a: Analysis) -> str:
+    """Cómo se aplica una sentencia de un archivo marcado."""
+    if a.kind == "transaction":
+        return "skip"
+    if a.concurrent:
+        return "concurrent-index" if a.kind == "create_index" else "autocommit"
+    if not a.lock_findings:
+        return "retry"
+    rules = {f.rule for f in a.lock_findings}
+    sk = a.statement.skeleton
+    if a.kind == "create_index" and "index-not-concurrent" in rules:
+        return "concurrent-index"
+    if a.kind in ("update", "delete") and rules & {"unbatched-update", "unbatched-delete"}:
+        m = (UPDATE_RE if a.kind == "update" else DELETE_RE).match(sk)
+        simple = m and not sk.upper().startswith("WITH") and not m.group("returning")
+        if simple and not (m.groupdict().get("from") or m.groupdict().get("using")):
+            return "batched"
+    if a.kind == "alter_table" and len(a.parts) == 1:
+        part = " ".join(a.parts[0].split())
+        if ADD_CONSTRAINT_RE.match(part) and not re.search(r"\bNOT\s+VALID\b", part, re.I):
+            return "not-valid-validate"
+        if SET_NOT_NULL_RE.match(part):
+            return "not-null-check"
+    return "retry"
+
+
+class OnlineMigrator:
+    def __init__(self, database_url: str, options: Options):
+        try:
+            import psycopg2
+            from psycopg2 import sql
+        except ImportError:
+            die("pronto-migrate: el modo online requiere psycopg2")
+        self.psycopg2 = psycopg2
+        self.sql = sql
+        self.options = options
+        self.conn = psycopg2.connect(database_url)
+        self.conn.set_client_encoding("UTF8")
+        self.run_meta = (
+            os.environ.get("USER", ""),
+            os.environ.get("APP_VERSION", ""),
+            os.environ.get("GIT_SHA", ""),
+            os.environ.get("SQL_HEAD_SHA", ""),
+        )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- primitivas ----------------------------------------------------------
+
+    def _query(self, query, params=None) -> list[tuple]:
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall() if cur.description else []
+        self.conn.commit()
+        return rows
+
+    def _txn(self, body: str, lock_timeout: str | None = None) -> int:
+        """Una transacción con ``SET LOCAL`` de timeouts; devuelve rowcount."""
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT set_config('lock_timeout', %s, true), set_config('statement_timeout', %s, true);",
+                (lock_timeout or self.options.lock_timeout, self.options.statement_timeout),
+            )
+            cur.execute(body)
+            rowcount = cur.rowcount
+        self.conn.commit()
+        return rowcount
+
+    def _autocommit(self, *statements: str) -> None:
+        """Sentencias que no pueden ir en una transacción (CONCURRENTLY)."""
+        self.conn.autocommit = True
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SET lock_timeout = 0; SET statement_timeout = 0;")
+                for statement in statements:
+                    cur.execute(statement)
+                cur.execute("RESET lock_timeout; RESET statement_timeout;")
+        finally:
+            self.conn.autocommit = False
+
+    def _retry(self, label: str, fn):
+        delay = 0.2
+        for attempt in range(1, self.options.retries + 1):
+            try:
+                return fn()
+            except self.psycopg2.Error as e:
+                self.conn.rollback()
+                if e.pgcode not in RETRYABLE or attempt == self.options.retries:
+                    raise
+                wait = min(delay, self.options.backoff_max) * random.uniform(0.5, 1.0)
+                print(f"  lock no disponible en {label} (intento {attempt}); reintento en {wait:.1f}s", flush=True)
+                time.sleep(wait)
+                delay *= 2
+
+    # -- estado --------------------------------------------------------------
+
+    def is_applied(self, f: SqlFile) -> bool:
+        rows = self._query(
+            "SELECT sha256, sql_norm_sha, status FROM pronto_schema_migrations WHERE file_name = %s",
+            (f.name,),
+        )
+        return bool(rows) and rows[0] == (f.sha256, f.norm_sha, "applied")
+
+    def record(self, f: SqlFile, status: str, error: str | None = None) -> None:
+        self._query(RECORD_SQL, (f.name, f.sha256, f.norm_sha, status, error, *self.run_meta))
+
+    def primary_key(self, relation: str) -> str | None:
+        rows = self._query(
+            "SELECT a.attname FROM pg_index i "
+            "JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) "
+            "WHERE i.indrelid = to_regclass(%s) AND i.indisprimary",
+            (relation,),
+        )
+        return rows[0][0] if len(rows) == 1 else None
+
+    # -- reescrituras --------------------------------------------------------
+
+    def _concurrent_index(self, a: Analysis) -> None:
+        st = a.statement
+        m = CREATE_INDEX_RE.match(st.skeleton)
+        if m.group("conc"):
+            statement = st.code
+        else:
+            head = re.match(r"^CREATE\s+(?:UNIQUE\s+)?INDEX", st.skeleton, re.I)
+            statement = st.code[: head.end()] + " CONCURRENTLY" + st.code[head.end() :]
+        name = st.span(m, "name") if m.group("name") else None
+        drop_invalid = f"DROP INDEX CONCURRENTLY IF EXISTS {name}" if name else None
+        if name:
+            invalid = self._query(
+                "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+                (name,),
+            )
+            if invalid and invalid[0][0]:
+                print(f"  índice inválido {name} de un intento anterior: se recrea", flush=True)
+                self._autocommit(drop_invalid)
+        try:
+            self._autocommit(statement)
+        except self.psycopg2.Error:
+            if drop_invalid:
+                self._autocommit(drop_invalid)
+            raise
+
+    def _batched(self, a: Analysis) -> None:
+        st = a.statement
+        pk = self.primary_key(a.relation)
+        if pk is None:
+            print(f"  {a.table}: sin PK de una columna, se ejecuta en una sola sentencia", flush=True)
+            self._retry(a.table, lambda: self._txn(st.code))
+            return
+        m = (UPDATE_RE if a.kind == "update" else DELETE_RE).match(st.skeleton)
+        head = st.code[: m.end("alias") if m.group("alias") else m.end("table")]
+        if a.kind == "update":
+            head += " SET " + st.span(m, "set")
+        where = st.span(m, "where") if m.group("where") else None
+        qualifier = st.span(m, "alias") if m.group("alias") else a.relation
+        column = self.sql.Identifier(pk).as_string(self.conn)
+        # Sin max(): no existe para uuid. El parámetro se interpola en el cliente,
+        # así que "%s IS NULL OR ..." se pliega y el planner usa el índice de la PK.
+        next_bound = (
+            f"SELECT {column} FROM (SELECT {column} FROM {a.relation} "
+            f"WHERE %s IS NULL OR {column} > %s ORDER BY {column} LIMIT %s) AS batch "
+            f"ORDER BY {column} DESC LIMIT 1"
+        )
+
+        started = time.perf_counter()
+        rows = batches = 0
+        lower = None
+        while True:
+            found = self._query(next_bound, (lower, lower, self.options.batch_size))
+            if not found:
+                break
+            upper = found[0][0]
+            with self.conn.cursor() as cur:
+                bounds = cur.mogrify(
+                    f"{qualifier}.{column} <= %s" + ("" if lower is None else f" AND {qualifier}.{column} > %s"),
+                    (upper,) if lower is None else (upper, lower),
+                ).decode()
+            self.conn.rollback()
+            statement = f"{head} WHERE {bounds}" + (f" AND ({where})" if where else "")
+            rows += self._retry(f"{a.table} lote {batches + 1}", lambda: self._txn(statement))
+            batches += 1
+            lower = upper
+            if batches % 50 == 0:
+                elapsed = time.perf_counter() - started
+                print(f"  {a.table}: {batches} lotes, {rows} filas ({rows / elapsed:.0f} filas/s)", flush=True)
+            if self.options.batch_sleep:
+                time.sleep(self.options.batch_sleep)
+        elapsed = time.perf_counter() - started
+        print(
+            f"  {a.table}: {a.kind} en {batches} lotes de {self.options.batch_size}, "
+            f"{rows} filas en {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} filas/s)",
+            flush=True,
+        )
+
+    def _not_valid_validate(self, a: Analysis) -> None:
+        part = a.parts[0].strip()
+        name = ADD_CONSTRAINT_RE.match(part).group("name")
+        self._retry(a.table, lambda: self._txn(f"ALTER TABLE {a.relation} {part} NOT VALID"))
+        self._retry(a.table, lambda: self._txn(f"ALTER TABLE {a.relation} VALIDATE CONSTRAINT {name}"))
+
+    def _not_null_check(self, a: Analysis) -> None:
+        col = SET_NOT_NULL_RE.match(" ".join(a.parts[0].split())).group("col")
+        bare = col.strip('"')
+        check = self.sql.Identifier(f"{a.table.split('.')[-1]}_{bare}_not_null_tmp"[:63]).as_string(self.conn)
+        self._retry(
+            a.table,
+            lambda: self._txn(
+                f"ALTER TABLE {a.relation} DROP CONSTRAINT IF EXISTS {check};"
+                f"ALTER TABLE {a.relation} ADD CONSTRAINT {check} CHECK ({col} IS NOT NULL) NOT VALID"
+            ),
+        )
+        self._retry(a.table, lambda: self._txn(f"ALTER TABLE {a.relation} VALIDATE CONSTRAINT {check}"))
+        self._retry(
+            a.table,
+            lambda: self._txn(
+                f"ALTER TABLE {a.relation} ALTER COLUMN {col} SET NOT NULL;"
+                f"ALTER TABLE {a.relation} DROP CONSTRAINT {check}"
+            ),
+        )
+
+    # -- archivos ------------------------------------------------------------
+
+    def apply_statement(self, a: Analysis) -> None:
+        action = plan_action(a)
+        label = f"{os.path.basename(a.statement.path)}:{a.statement.line}"
+        if action == "skip":
+            return
+        print(f"  {label} {action} [{a.lock or '?'}] {a.table or '-'}", flush=True)
+        if action == "concurrent-index":
+            self._concurrent_index(a)
+        elif action == "batched":
+            self._batched(a)
+        elif action == "not-valid-validate":
+            self._not_valid_validate(a)
+        elif action == "not-null-check":
+            self._not_null_check(a)
+        elif action == "autocommit":
+            self._autocommit(a.statement.code)
+        else:
+            self._retry(label, lambda: self._txn(a.statement.code))
+
+    def apply_file(self, f: SqlFile, analyses: list[Analysis]) -> None:
+        try:
+            if statement_mode(analyses):
+                print(f"online: {f.name} ({sum(len(a.lock_findings) for a in analyses)} hallazgos)", flush=True)
+                for a in analyses:
+                    self.apply_statement(a)
+                self.record(f, "applied")
+            else:
+                self._retry(
+                    f.name,
+                    lambda: self._txn(f.text + "\n;\n" + self._record_sql(f)),
+                )
+        except (self.psycopg2.Error, RuntimeError) as e:
+            self.conn.rollback()
+            message = str(e).strip() or "execution failed"
+            self.record(f, "failed", message[:2000])
+            print(message, file=sys.stderr)
+            die(f"pronto-migrate: FAILED {f.name}")
+        print(f"applied: {f.name}", flush=True)
+
+    def _record_sql(self, f: SqlFile) -> str:
+        with self.conn.cursor() as cur:
+            return cur.mogrify(RECORD_SQL, (f.name, f.sha256, f.norm_sha, "applied", None, *self.run_meta)).decode()
+
+    def run(self, files: list[SqlFile], linter: Linter) -> None:
+        if not self._query("SELECT to_regclass('pronto_schema_migrations') IS NOT NULL")[0][0]:
+            die("pronto-migrate: pronto_schema_migrations no existe. Ejecuta pronto-init --apply (00_bootstrap).")
+        self._query(LOCK_SQL)
+        try:
+            for f in files:
+                if self.is_applied(f):
+                    continue
+                self.apply_file(f, linter.lint_text(f.text, f.path))
+        finally:
+            self._query(UNLOCK_SQL)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Aplica migraciones pendientes sin bloquear tablas calientes")
+    ap.add_argument("paths", nargs="*", help="Archivos o directorios (default: init/sql/migrations)")
+    ap.add_argument("--lock-timeout", default=os.environ.get("PRONTO_ONLINE_LOCK_TIMEOUT", "2s"))
+    ap.add_argument("--statement-timeout", default=os.environ.get("PRONTO_STATEMENT_TIMEOUT", "5min"))
+    ap.add_argument("--retries", type=int, default=30, help="Reintentos por sentencia ante lock_timeout")
+    ap.add_argument("--batch-size", type=int, default=1000, help="Filas por lote en UPDATE/DELETE")
+    ap.add_argument("--batch-sleep", type=float, default=0.05, help="Pausa entre lotes (s)")
+    ap.add_argument("--plan", action="store_true", help="Solo mostrar cómo se aplicaría cada archivo marcado")
+    args = ap.parse_args()
+
+    linter = Linter()
+    files = [load_file("migrations", path) for path in migration_files(args.paths)]
+    if args.plan:
+        for f in files:
+            analyses = linter.lint_text(f.text, f.path)
+            if not statement_mode(analyses):
+                continue
+            print(f"{f.name}:")
+            for a in analyses:
+                if a.lock_findings or a.concurrent:
+                    print(f"  :{a.statement.line} {plan_action(a)} [{a.lock or '?'}] {a.table or '-'}")
+        return
+
+    if any(f.needs_psql for f in files):
+        die("pronto-migrate: el modo online no soporta meta-comandos de psql; usa --apply")
+    database_url = os.environ.get("DATABASE_URL", "")
+    if not database_url:
+        die("pronto-migrate: DATABASE_URL requerido")
+
+    options = Options(
+        lock_timeout=args.lock_timeout,
+        statement_timeout=args.statement_timeout,
+        retries=args.retries,
+        batch_size=args.batch_size,
+        batch_sleep=args.batch_sleep,
+    )
+    migrator = OnlineMigrator(database_url, options)
+    try:
+        migrator.run(files, linter)
+    finally:
+        migrator.close()
+
+
+if __name__ == "__main__":
+    main()
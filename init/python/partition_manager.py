@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Particiones mensuales de las tablas append-only (``pronto_partition_config``).
+
+La conversión la hace la migración ``20261019_04`` con
+``pronto_partition_convert`` (la tabla existente queda como partición
+``<tabla>_legacy``). Este script mantiene el ciclo de vida después:
+
+- ``maintain``: crea por adelantado las particiones ``<tabla>_pYYYYMM`` del mes
+  actual + ``premake_months`` (``pronto_partition_add``, que también saca de la
+  partición default las filas que hubieran caído ahí) y archiva las que ya
+  salieron de ``retain_months``: ``DETACH PARTITION`` + ``SET SCHEMA
+  pronto_archive`` en una transacción corta, en vez de ``DELETE`` fila por fila.
+  La partición archivada pierde sus FKs salientes (las clonadas del padre):
+  si no, un ``DELETE`` de ``pronto_orders``/``pronto_employees`` fallaría por
+  filas que ya solo viven en el archivo.
+  Con ``--export-dir`` cada partición archivada se vuelca con ``pg_dump -Fc``;
+  ``--drop-exported`` la borra después de un volcado correcto.
+- ``status``: particiones, rangos, filas estimadas y pendientes por tabla.
+- ``convert TABLA``: convierte una tabla registrada después de la migración.
+
+Los DDL sobre la tabla padre corren con ``lock_timeout`` corto y reintentos
+(mismo criterio que ``online_migrate.py``); la corrida completa mantiene
+``pg_advisory_lock(hashtext('pronto-partitions'))`` para que dos crons no se
+pisen. Los rangos son meses UTC.
+
+Los índices únicos que no incluyen la columna de partición no pueden existir en
+la tabla padre: ``pronto_partition_convert`` solo los conserva en la partición
+``<tabla>_legacy``, así que la unicidad vale dentro de esa partición y no entre
+meses (las particiones nuevas no la verifican).
+
+Usage:
+    partition_manager.py status [--json]
+    partition_manager.py maintain [--table T] [--dry-run] [--export-dir DIR [--drop-exported]]
+    partition_manager.py convert pronto_audit_logs
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+
+from apply_engine import die
+from online_migrate import RETRYABLE
+
+LOCK_KEY = "pronto-partitions"
+ARCHIVE_SCHEMA = "pronto_archive"
+BOUND_RE = re.compile(r"FROM \((?:'(?P<lo>\d{4}-\d{2}-\d{2})[^)]*|MINVALUE)\) TO \('(?P<hi>\d{4}-\d{2}-\d{2})")
+
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@dataclass
+class TableConfig:
+    table_name: str
+    column_name: str
+    enabled: bool
+    premake_months: int
+    retain_months: int | None
+
+
+@dataclass
+class Partition:
+    name: str
+    bound: str
+    est_rows: int
+    size_bytes: int
+
+    @property
+    def is_default(self) -> bool:
+        return self.bound == "DEFAULT"
+
+    @property
+    def range(self) -> tuple[date | None, date | None]:
+        """(desde, hasta) del rango; desde=None es MINVALUE (partición legacy)."""
+        m = BOUND_RE.search(self.bound)
+        if not m:
+            return None, None
+        lo = date.fromisoformat(m.group("lo")) if m.group("lo") else None
+        return lo, date.fromisoformat(m.group("hi"))
+
+    def covers(self, month: date) -> bool:
+        lo, hi = self.range
+        return hi is not None and (lo is None or lo <= month) and month < hi
+
+
+class PartitionManager:
+    def __init__(self, database_url: str, lock_timeout: str = "2s", retries: int = 20, dry_run: bool = False):
+        try:
+            import psycopg2
+        except ImportError:
+            die("partition_manager: requiere psycopg2")
+        self.psycopg2 = psycopg2
+        self.database_url = database_url
+        self.lock_timeout = lock_timeout
+        self.retries = retries
+        self.dry_run = dry_run
+        self.conn = psycopg2.connect(database_url)
+        # pg_get_expr() muestra los límites timestamptz en la zona de la sesión.
+        self._query("SET TIME ZONE 'UTC'")
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _query(self, query: str, params=None) -> list[tuple]:
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            return cur.fetchall() if cur.description else []
+
+    def _ddl(self, label: str, statements: list[tuple[str, tuple]]) -> None:
+        """Una transacción con lock_timeout corto; reintenta si el lock no está libre."""
+        if self.dry_run:
+            print(f"  [dry-run] {label}")
+            return
+        self.conn.rollback()
+        delay = 0.2
+        for attempt in range(1, self.retries + 1):
+            try:
+                self._query("SELECT set_config('lock_timeout', %s, true)", (self.lock_timeout,))
+                for query, params in statements:
+                    self._query(query, params)
+                self.conn.commit()
+                print(f"  {label}")
+                return
+            except self.psycopg2.Error as e:
+                self.conn.rollback()
+                if e.pgcode not in RETRYABLE or attempt == self.retries:
+                    raise
+                wait = min(delay, 10.0) * random.uniform(0.5, 1.0)
+                print(f"  lock no disponible en {label} (intento {attempt}); reintento en {wait:.1f}s", flush=True)
+                time.sleep(wait)
+                delay *= 2
+
+    # -- estado --------------------------------------------------------------
+
+    def configs(self, tables: list[str] | None = None) -> list[TableConfig]:
+        rows = self._query(
+            "SELECT table_name, column_name, enabled, premake_months, retain_months "
+            "FROM pronto_partition_config ORDER BY table_name"
+        )
+        configs = [TableConfig(*row) for row in rows]
+        if tables:
+            unknown = set(tables) - {c.table_name for c in configs}
+            if unknown:
+                die(f"partition_manager: tabla sin fila en pronto_partition_config: {', '.join(sorted(unknown))}")
+            configs = [c for c in configs if c.table_name in tables]
+        return configs
+
+    def is_partitioned(self, table: str) -> bool:
+        rows = self._query("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+        return bool(rows) and rows[0][0] == "p"
+
+    def partitions(self, table: str) -> list[Partition]:
+        rows = self._query(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), greatest(c.reltuples, 0)::bigint, "
+            "pg_total_relation_size(c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+            (table,),
+        )
+        return [Partition(*row) for row in rows]
+
+    def default_has_rows(self, table: str) -> bool:
+        default = next((p for p in self.partitions(table) if p.is_default), None)
+        if default is None:
+            return False
+        return bool(self._query(f'SELECT 1 FROM "{default.name}" LIMIT 1'))
+
+    def missing_months(self, cfg: TableConfig, today: date) -> list[date]:
+        parts = [p for p in self.partitions(cfg.table_name) if not p.is_default]
+        first = month_start(today)
+        months = [add_months(first, i) for i in range(cfg.premake_months + 1)]
+        return [m for m in months if not any(p.covers(m) for p in parts)]
+
+    def expired(self, cfg: TableConfig, today: date) -> list[Partition]:
+        """Particiones cuyo rango terminó antes de ``retain_months`` meses atrás."""
+        if cfg.retain_months is None:
+            return []
+        cutoff = add_months(month_start(today), -cfg.retain_months)
+        return [p for p in self.partitions(cfg.table_name) if not p.is_default and p.range[1] and p.range[1] <= cutoff]
+
+    # -- mantenimiento ---------------------------------------------------------
+
+    def premake(self, cfg: TableConfig, today: date) -> None:
+        for month in self.missing_months(cfg, today):
+            self._ddl(
+                f"create {cfg.table_name} {month:%Y-%m}",
+                [("SELECT pronto_partition_add(%s, %s)", (cfg.table_name, month))],
+            )
+
+    def foreign_keys(self, table: str) -> list[str]:
+        rows = self._query(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'f' ORDER BY conname",
+            (f'"{table}"',),
+        )
+        return [name for (name,) in rows]
+
+    def archive(self, cfg: TableConfig, part: Partition) -> None:
+        lo, hi = part.range
+        # Las FKs clonadas del padre quedan sueltas tras el DETACH: se borran en la
+        # misma transacción, antes de mover la partición al schema de archivo.
+        drop_fks = [(f'ALTER TABLE "{part.name}" DROP CONSTRAINT IF EXISTS "{name}"', ()) for name in self.foreign_keys(part.name)]
+        self._ddl(
+            f"archive {part.name} ({lo or 'MINVALUE'} .. {hi})",
+            [
+                (f'ALTER TABLE "{cfg.table_name}" DETACH PARTITION "{part.name}"', ()),
+                *drop_fks,
+                (f'ALTER TABLE "{part.name}" SET SCHEMA {ARCHIVE_SCHEMA}', ()),
+                (
+                    "INSERT INTO pronto_partition_archive (partition_name, table_name, range_from, range_to, est_rows) "
+                    "VALUES (%s, %s, %s, %s, %s) ON CONFLICT (partition_name) DO NOTHING",
+                    (part.name, cfg.table_name, lo and lo.isoformat(), hi.isoformat(), part.est_rows),
+                ),
+            ],
+        )
+
+    def export_archived(self, export_dir: str, drop: bool) -> None:
+        """``pg_dump -Fc`` de las particiones archivadas aún no exportadas."""
+        rows = self._query(
+            "SELECT partition_name FROM pronto_partition_archive "
+            "WHERE exported_to IS NULL AND dropped_at IS NULL ORDER BY archived_at"
+        )
+        self.conn.rollback()
+        os.makedirs(export_dir, exist_ok=True)
+        for (name,) in rows:
+            path = os.path.join(export_dir, f"{name}.dump")
+            if self.dry_run:
+                print(f"  [dry-run] export {ARCHIVE_SCHEMA}.{name} -> {path}")
+                continue
+            p = subprocess.run(
+                ["pg_dump", "--format=custom", f"--table={ARCHIVE_SCHEMA}.{name}", f"--file={path}", self.database_url]
+            )
+            if p.returncode != 0:
+                raise RuntimeError(f"pg_dump fallo para {ARCHIVE_SCHEMA}.{name} (rc={p.returncode})")
+            statements = [("UPDATE pronto_partition_archive SET exported_to = %s WHERE partition_name = %s", (path, name))]
+            if drop:
+                statements += [
+                    (f'DROP TABLE IF EXISTS {ARCHIVE_SCHEMA}."{name}"', ()),
+                    ("UPDATE pronto_partition_archive SET dropped_at = now() WHERE partition_name = %s", (name,)),
+                ]
+            self._ddl(f"export {name} -> {path}" + (" (dropped)" if drop else ""), statements)
+
+    def maintain(self, configs: list[TableConfig], export_dir: str | None = None, drop_exported: bool = False) -> None:
+        if not self._query("SELECT pg_try_advisory_lock(hashtext(%s))", (LOCK_KEY,))[0][0]:
+            self.conn.rollback()
+            print("partition_manager: otra corrida tiene el lock; nada que hacer")
+            return
+        self.conn.commit()
+        try:
+            today = datetime.now(timezone.utc).date()
+            for cfg in configs:
+                if not cfg.enabled:
+                    continue
+                if not self.is_partitioned(cfg.table_name):
+                    print(f"{cfg.table_name}: no particionada (pronto-partitions convert {cfg.table_name})")
+                    self.conn.rollback()
+                    continue
+                print(f"{cfg.table_name}:")
+                self.premake(cfg, today)
+                for part in self.expired(cfg, today):
+                    self.archive(cfg, part)
+                if self.default_has_rows(cfg.table_name):
+                    print(f"  WARN: filas en la partición default de {cfg.table_name} (fuera de todo rango mensual)")
+                self.conn.rollback()
+                if not self.dry_run:
+                    self._query(
+                        "UPDATE pronto_partition_config SET last_maintenance_at = now() WHERE table_name = %s",
+                        (cfg.table_name,),
+                    )
+                    self.conn.commit()
+            if export_dir:
+                self.export_archived(export_dir, drop_exported)
+        finally:
+            self.conn.rollback()
+            self._query("SELECT pg_advisory_unlock(hashtext(%s))", (LOCK_KEY,))
+            self.conn.commit()
+
+    def convert(self, cfg: TableConfig) -> None:
+        self._ddl(
+            f"convert {cfg.table_name} ({cfg.column_name})",
+            [
+                (
+                    "SELECT pronto_partition_convert(%s, %s, %s)",
+                    (cfg.table_name, cfg.column_name, cfg.premake_months),
+                )
+            ],
+        )
+
+    def status(self, configs: list[TableConfig]) -> list[dict]:
+        today = datetime.now(timezone.utc).date()
+        report = []
+        for cfg in configs:
+            entry = {**asdict(cfg), "partitioned": self.is_partitioned(cfg.table_name)}
+            if entry["partitioned"]:
+                entry["partitions"] = [
+                    {**asdict(p), "from": str(p.range[0] or "MINVALUE"), "to": str(p.range[1] or "")}
+                    for p in self.partitions(cfg.table_name)
+                ]
+                entry["missing_months"] = [f"{m:%Y-%m}" for m in self.missing_months(cfg, today)]
+                entry["expired"] = [p.name for p in self.expired(cfg, today)]
+                entry["default_has_rows"] = self.default_has_rows(cfg.table_name)
+            report.append(entry)
+        self.conn.rollback()
+        return report
+
+
+def _print_status(report: list[dict]) -> None:
+    for entry in report:
+        state = "partitioned" if entry["partitioned"] else ("enabled" if entry["enabled"] else "disabled")
+        retain = entry["retain_months"] or "-"
+        print(
+            f"{entry['table_name']}  [{state}] column={entry['column_name']} "
+            f"premake={entry['premake_months']} retain={retain}"
+        )
+        for p in entry.get("partitions", []):
+            bound = "DEFAULT" if p["bound"] == "DEFAULT" else f"{p['from']} .. {p['to']}"
+            print(f"  {p['name']:<48} {bound:<26} ~{p['est_rows']} rows  {p['size_bytes'] // 1024} kB")
+        if entry.get("missing_months"):
+            print(f"  missing: {', '.join(entry['missing_months'])}")
+        if entry.get("expired"):
+            print(f"  expired: {', '.join(entry['expired'])}")
+        if entry.get("default_has_rows"):
+            print("  WARN: la partición default tiene filas")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Particiones mensuales de las tablas append-only")
+    ap.add_argument("--lock-timeout", default=os.environ.get("PRONTO_ONLINE_LOCK_TIMEOUT", "2s"))
+    ap.add_argument("--retries", type=int, default=20, help="Reintentos por DDL ante lock_timeout")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p_status = sub.add_parser("status", help="Particiones y pendientes por tabla")
+    p_status.add_argument("--json", action="store_true")
+    p_maintain = sub.add_parser("maintain", help="Crear meses futuros y archivar los vencidos")
+    p_maintain.add_argument("--table", action="append", help="Solo esta tabla (repetible)")
+    p_maintain.add_argument("--dry-run", action="store_true", help="Solo mostrar qué haría")
+    p_maintain.add_argument("--export-dir", help="pg_dump -Fc de las particiones archivadas a este directorio")
+    p_maintain.add_argument("--drop-exported", action="store_true", help="Borrar las particiones ya exportadas")
+    p_convert = sub.add_parser("convert", help="Convertir una tabla registrada a particiones mensuales")
+    p_convert.add_argument("table")
+    args = ap.parse_args()
+
+    if getattr(args, "drop_exported", False) and not args.export_dir:
+        die("partition_manager: --drop-exported requiere --export-dir")
+    database_url = os.environ.get("DATABASE_URL", "")
+    if not database_url:
+        die("partition_manager: DATABASE_URL requerido")
+
+    manager = PartitionManager(
+        database_url,
+        lock_timeout=args.lock_timeout,
+        retries=args.retries,
+        dry_run=getattr(args, "dry_run", False),
+    )
+    try:
+        if args.command == "status":
+            report = manager.status(manager.configs())
+            if args.json:
+                print(json.dumps(report, indent=2, default=str))
+            else:
+                _print_status(report)
+        elif args.command == "maintain":
+            manager.maintain(manager.configs(args.table), args.export_dir, args.drop_exported)
+            print("OK: partitions maintained")
+        elif args.command == "convert":
+            (cfg,) = manager.configs([args.table])
+            manager.convert(cfg)
+            print(f"OK: {cfg.table_name} partitioned")
+    except (RuntimeError, manager.psycopg2.Error) as e:
+        die(f"partition_manager: {e}")
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+Regresiones de plan de las consultas calientes.
+
+Corre ``EXPLAIN (FORMAT JSON)`` sobre un catálogo de consultas (los lookups
+ORM de ``restaurant/`` y ``pronto-api``, más el SQL de
+``lib/validation/invariants*.py``) en una base sembrada a escala de
+producción, y compara la huella de cada plan con ``init/plan_baselines.json``:
+
+- forma del plan: tipos de nodo, relaciones, índices y joins (sin costos ni
+  alias), resumida en un sha256 corto + un outline legible;
+- costo total y filas estimadas del nodo raíz;
+- acceso por relación (``index:<índice>`` o ``seq``).
+
+``check`` falla (exit 1) si una relación que el baseline leía por índice pasa
+a ``Seq Scan`` y tiene al menos ``--large-rows`` filas, o si el costo crece
+más de ``--max-cost-ratio``. Otros cambios de forma solo avisan. Sin baseline
+(archivo ausente o consulta nueva) aplica una regla absoluta a los lookups del
+catálogo: falla todo ``Seq Scan`` sobre una relación de ``--large-rows`` filas
+o más. Las consultas ``full_scan`` (los invariantes, que recorren la tabla a
+propósito) quedan fuera de esa regla. Las filas de una tabla particionada son
+la suma de sus hojas (``pg_inherits``).
+
+Por defecto la base es desechable: ``db_snapshot.throwaway_database()`` (init
++ migrations del árbol actual) + datos sintéticos con ``generate_series``
+según ``--scale`` + ``ANALYZE``. Con ``--database-url`` se usa una base
+existente tal cual (p. ej. una copia restaurada); ``--seed`` la siembra.
+
+Usage:
+    plan_regression.py list
+    plan_regression.py check [--scale 1.0] [--json]
+    plan_regression.py update [--scale 1.0]          # reescribe el baseline
+    plan_regression.py check --database-url URL [--seed]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from typing import Iterator
+
+from apply_engine import die
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+LIB_DIR = os.path.join(REPO_ROOT, "pronto-scripts", "lib")
+BASELINE_PATH = os.path.join(REPO_ROOT, "pronto-scripts", "init", "plan_baselines.json")
+BASELINE_VERSION = 1
+
+# Filas por tabla a --scale 1.0 (orden de magnitud de un restaurante con un año de historia).
+BASE_ROWS = {
+    "customers": 200_000,
+    "sessions": 400_000,
+    "orders": 1_000_000,
+    "order_items": 2_500_000,
+}
+SHAPE_KEYS = (
+    "Node Type",
+    "Strategy",
+    "Join Type",
+    "Parent Relationship",
+    "Relation Name",
+    "Index Name",
+    "Scan Direction",
+)
+PARTITION_SUFFIX_RE = re.compile(r"_p\d{6}$")
+
+
+@dataclass(frozen=True)
+class PlanQuery:
+    name: str
+    source: str
+    sql: str
+    # SELECT de una fila cuyas columnas son los parámetros de ``sql`` (None: sin parámetros).
+    sample: str | None = None
+    # Recorre la tabla completa a propósito: sin la regla absoluta de Seq Scan.
+    full_scan: bool = False
+
+
+CATALOG = [
+    PlanQuery(
+        name="session_active_by_table",
+        source="restaurant/crear_orden.py",
+        sql="""
+            SELECT * FROM pronto_dining_sessions
+            WHERE table_id = %(table_id)s
+              AND status IN ('open', 'active', 'awaiting_tip', 'awaiting_payment')
+            ORDER BY opened_at DESC
+        """,
+        sample="SELECT table_id FROM pronto_dining_sessions WHERE table_id IS NOT NULL LIMIT 1",
+    ),
+    PlanQuery(
+        name="order_by_number",
+        source="restaurant/resolver_ordenes.py",
+        sql="SELECT * FROM pronto_orders WHERE order_number = %(order_number)s",
+        sample="SELECT max(order_number) AS order_number FROM pronto_orders",
+    ),
+    PlanQuery(
+        name="orders_by_ids_or_numbers",
+        source="restaurant/resolver_ordenes.py",
+        sql="""
+            SELECT id, order_number FROM pronto_orders
+            WHERE id = ANY(%(ids)s::uuid[]) OR order_number = ANY(%(numbers)s::bigint[])
+        """,
+        sample="""
+            SELECT array_agg(id::text) AS ids, array_agg(order_number) AS numbers
+            FROM (SELECT id, order_number FROM pronto_orders ORDER BY order_number DESC LIMIT 20) o
+        """,
+    ),
+    PlanQuery(
+        name="orders_by_session",
+        source="restaurant/transicion_masiva.py",
+        sql="""
+            SELECT id FROM pronto_orders
+            WHERE workflow_status IN ('new', 'queued') AND session_id = %(session_id)s
+            ORDER BY created_at
+        """,
+        sample="SELECT session_id FROM pronto_orders WHERE session_id IS NOT NULL LIMIT 1",
+    ),
+    PlanQuery(
+        name="orders_open",
+        source="restaurant/listar_ordenes.py",
+        sql="""
+            SELECT * FROM pronto_orders
+            WHERE workflow_status IN ('new', 'queued', 'preparing', 'ready', 'delivered')
+            ORDER BY created_at DESC LIMIT 100
+        """,
+    ),
+    PlanQuery(
+        name="orders_by_customer",
+        source="restaurant/listar_ordenes.py",
+        sql="""
+            SELECT * FROM pronto_orders
+            WHERE customer_id = %(customer_id)s
+            ORDER BY created_at DESC LIMIT 100
+        """,
+        sample="SELECT customer_id FROM pronto_orders WHERE customer_id IS NOT NULL LIMIT 1",
+    ),
+    PlanQuery(
+        name="orders_of_day",
+        source="restaurant/reportes_dia.py",
+        sql="SELECT * FROM pronto_orders WHERE created_at >= %(start)s AND created_at <= %(end)s",
+        sample="""
+            SELECT date_trunc('day', max(created_at)) AS start,
+                   date_trunc('day', max(created_at)) + interval '1 day' - interval '1 microsecond' AS end
+            FROM pronto_orders
+        """,
+    ),
+    PlanQuery(
+        name="order_items_by_order",
+        source="Order.items (relación ORM)",
+        sql="SELECT * FROM pronto_order_items WHERE order_id = %(order_id)s",
+        sample="SELECT order_id FROM pronto_order_items WHERE order_id IS NOT NULL LIMIT 1",
+    ),
+    PlanQuery(
+        name="customer_by_email_hash",
+        source="pronto-api/auth.py",
+        sql="SELECT * FROM pronto_customers WHERE email_hash = %(email_hash)s",
+        sample="SELECT email_hash FROM pronto_customers WHERE email_hash IS NOT NULL LIMIT 1",
+    ),
+    PlanQuery(
+        name="customer_by_email",
+        source="restaurant/buscar_cliente.py",
+        sql="SELECT * FROM pronto_customers WHERE email_normalized = %(email)s ORDER BY id",
+        sample="SELECT email_normalized AS email FROM pronto_customers WHERE email_normalized IS NOT NULL LIMIT 1",
+    ),
+    PlanQuery(
+        name="customer_by_phone",
+        source="restaurant/buscar_cliente.py",
+        sql="SELECT * FROM pronto_customers WHERE phone_e164 = %(phone)s ORDER BY id",
+        sample="SELECT phone_e164 AS phone FROM pronto_customers WHERE phone_e164 IS NOT NULL LIMIT 1",
+    ),
+    PlanQuery(
+        name="customer_by_name",
+        source="restaurant/buscar_cliente.py",
+        sql="""
+            SELECT * FROM pronto_customers
+            WHERE name_search LIKE %(pattern)s
+            ORDER BY CASE WHEN name_search = %(term)s THEN 0
+                          WHEN name_search LIKE %(prefix)s THEN 1
+                          ELSE 2 END,
+                     similarity(name_search, %(term)s) DESC, id
+        """,
+        sample="""
+            SELECT '%' || t.term || '%' AS pattern, t.term || '%' AS prefix, t.term
+            FROM (SELECT right(name_search, 6) AS term FROM pronto_customers
+                  WHERE length(name_search) >= 6 LIMIT 1) t
+        """,
+    ),
+]
+
+
+def invariant_queries() -> list[PlanQuery]:
+    """El SQL de ``pronto-invariant-check`` (corre completo sobre tablas grandes)."""
+    if LIB_DIR not in sys.path:
+        sys.path.insert(0, LIB_DIR)
+    from validation.invariants import PAYMENT_INVARIANTS
+    from validation.invariants_extended import ALL_EXTENDED_INVARIANTS
+
+    source = "lib/validation/invariants.py"
+    return [
+        PlanQuery(name=f"invariant:{check.name}", source=source, sql=check.sql, full_scan=True)
+        for check in PAYMENT_INVARIANTS + ALL_EXTENDED_INVARIANTS
+    ]
+
+
+def catalog() -> list[PlanQuery]:
+    try:
+        return CATALOG + invariant_queries()
+    except ImportError as e:
+        die(f"plan_regression: lib/validation no disponible ({e}); requiere psycopg2")
+
+
+# -- huellas ---------------------------------------------------------------
+
+
+def _relation(name: str) -> str:
+    # Las particiones mensuales cambian de nombre con el calendario.
+    return PARTITION_SUFFIX_RE.sub("_pYYYYMM", name)
+
+
+def plan_shape(node: dict) -> dict:
+    shape = {key: node[key] for key in SHAPE_KEYS if key in node}
+    if "Relation Name" in shape:
+        shape["Relation Name"] = _relation(shape["Relation Name"])
+    children = [plan_shape(child) for child in node.get("Plans", [])]
+    if children:
+        shape["Plans"] = children
+    return shape
+
+
+def plan_outline(shape: dict, depth: int = 0) -> list[str]:
+    line = "  " * depth + shape["Node Type"]
+    if "Join Type" in shape:
+        line += f" ({shape['Join Type']})"
+    if "Relation Name" in shape:
+        line += f" on {shape['Relation Name']}"
+    if "Index Name" in shape:
+        line += f" using {shape['Index Name']}"
+    lines = [line]
+    for child in shape.get("Plans", []):
+        lines.extend(plan_outline(child, depth + 1))
+    return lines
+
+
+def plan_scans(node: dict, scans: dict[str, set[str]] | None = None) -> dict[str, set[str]]:
+    """relación -> accesos (``seq`` o ``index:<índice>``); bitmap toma el índice del hijo."""
+    scans = {} if scans is None else scans
+    if "Relation Name" in node:
+        relation = _relation(node["Relation Name"])
+        if node["Node Type"] == "Seq Scan":
+            access = {"seq"}
+        elif "Index Name" in node:
+            access = {f"index:{node['Index Name']}"}
+        else:
+            access = {f"index:{child['Index Name']}" for child in _walk(node) if "Index Name" in child}
+            access = access or {node["Node Type"]}
+        scans.setdefault(relation, set()).update(access)
+    for child in node.get("Plans", []):
+        plan_scans(child, scans)
+    return scans
+
+
+def _walk(node: dict) -> Iterator[dict]:
+    for child in node.get("Plans", []):
+        yield child
+        yield from _walk(child)
+
+
+def fingerprint(plan: dict) -> dict:
+    root = plan["Plan"]
+    shape = plan_shape(root)
+    digest = hashlib.sha256(json.dumps(shape, sort_keys=True).encode("utf-8")).hexdigest()
+    return {
+        "status": "ok",
+        "shape": digest[:16],
+        "total_cost": round(float(root["Total Cost"]), 2),
+        "plan_rows": int(root["Plan Rows"]),
+        "scans": {rel: sorted(access) for rel, access in sorted(plan_scans(root).items())},
+        "outline": plan_outline(shape),
+    }
+
+
+def _uses_index(accesses: list[str]) -> bool:
+    return any(a.startswith("index:") for a in accesses) and "seq" not in accesses
+
+
+def compare(
+    baseline: dict | None,
+    current: dict,
+    rel_rows: dict[str, int],
+    large_rows: int,
+    max_cost_ratio: float,
+    full_scan: bool = False,
+) -> tuple[list[str], list[str]]:
+    """(errores, avisos) de una consulta contra su baseline."""
+    errors: list[str] = []
+    warnings: list[str] = []
+    if baseline is None:
+        warnings.append("sin baseline (plan_regression.py update)")
+        if full_scan:
+            return errors, warnings
+        for relation, accesses in current.get("scans", {}).items():
+            rows = rel_rows.get(relation, 0)
+            if "seq" in accesses and rows >= large_rows:
+                errors.append(f"{relation}: Seq Scan sin baseline ({rows} filas)")
+        return errors, warnings
+    if current["status"] != "ok":
+        if baseline["status"] == "ok":
+            errors.append(f"EXPLAIN falla: {current.get('error', current['status'])}")
+        return errors, warnings
+    if baseline["status"] != "ok":
+        warnings.append("ahora tiene plan (el baseline no lo tenía)")
+        return errors, warnings
+
+    for relation, accesses in baseline["scans"].items():
+        now = current["scans"].get(relation, [])
+        rows = rel_rows.get(relation, 0)
+        if _uses_index(accesses) and "seq" in now and rows >= large_rows:
+            errors.append(f"{relation}: {', '.join(accesses)} -> Seq Scan ({rows} filas)")
+    base_cost = max(baseline["total_cost"], 0.01)
+    ratio = current["total_cost"] / base_cost
+    if ratio > max_cost_ratio:
+        errors.append(f"costo {baseline['total_cost']} -> {current['total_cost']} (x{ratio:.1f})")
+    if current["shape"] != baseline["shape"] and not errors:
+        warnings.append(f"plan cambió ({baseline['shape']} -> {current['shape']})")
+    return errors, warnings
+
+
+# -- base sembrada -----------------------------------------------------------
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO pronto_customers
+        (first_name, last_name, email_hash, email_normalized, phone_e164, name_search, created_at)
+    SELECT 'Plan', 'Cliente ' || g, md5('plan-customer-' || g), 'cliente' || g || '@plan.test',
+           '+5255' || lpad(g::text, 8, '0'), 'plan cliente ' || g,
+           now() - make_interval(hours => g %% 8760)
+    FROM generate_series(1, %(customers)s) AS g
+    """,
+    "CREATE TEMP TABLE plan_customers AS SELECT row_number() OVER (ORDER BY id) AS rn, id FROM pronto_customers",
+    """
+    INSERT INTO pronto_dining_sessions (table_id, customer_id, status, opened_at, closed_at)
+    SELECT t.ids[1 + g %% cardinality(t.ids)], c.id,
+           CASE WHEN g %% 100 < 2 THEN 'active'
+                WHEN g %% 100 < 3 THEN 'awaiting_payment'
+                WHEN g %% 100 < 50 THEN 'paid'
+                ELSE 'closed' END,
+           now() - make_interval(mins => g %% 525600),
+           CASE WHEN g %% 100 >= 3 THEN now() - make_interval(mins => g %% 525600) + interval '90 minutes' END
+    FROM generate_series(1, %(sessions)s) AS g
+    CROSS JOIN (SELECT array_agg(id ORDER BY id) AS ids FROM pronto_tables) AS t
+    JOIN plan_customers c ON c.rn = 1 + g %% (SELECT count(*) FROM plan_customers)
+    """,
+    """
+    CREATE TEMP TABLE plan_sessions AS
+    SELECT row_number() OVER (ORDER BY id) AS rn, id, customer_id, opened_at FROM pronto_dining_sessions
+    """,
+    """
+    INSERT INTO pronto_orders (customer_id, session_id, workflow_status, subtotal, total_amount, created_at)
+    SELECT s.customer_id, s.id,
+           CASE WHEN g %% 200 = 0 THEN 'new'
+                WHEN g %% 200 = 1 THEN 'preparing'
+                WHEN g %% 200 = 2 THEN 'ready'
+                WHEN g %% 50 = 3 THEN 'cancelled'
+                ELSE 'paid' END,
+           50 + g %% 900, 58 + g %% 1044,
+           s.opened_at + make_interval(mins => g %% 60)
+    FROM generate_series(1, %(orders)s) AS g
+    JOIN plan_sessions s ON s.rn = 1 + g %% (SELECT count(*) FROM plan_sessions)
+    """,
+    "CREATE TEMP TABLE plan_orders AS SELECT row_number() OVER (ORDER BY id) AS rn, id, created_at FROM pronto_orders",
+    """
+    INSERT INTO pronto_order_items (order_id, menu_item_id, quantity, unit_price, created_at)
+    SELECT o.id, m.ids[1 + g %% cardinality(m.ids)], 1 + g %% 3, 95, o.created_at
+    FROM generate_series(1, %(order_items)s) AS g
+    CROSS JOIN (SELECT array_agg(id ORDER BY id) AS ids FROM pronto_menu_items) AS m
+    JOIN plan_orders o ON o.rn = 1 + g %% (SELECT count(*) FROM plan_orders)
+    """,
+    """
+    INSERT INTO pronto_payments (session_id, amount, method, reference, created_at)
+    SELECT id, 250, CASE WHEN extract(minute FROM opened_at)::int %% 3 = 0 THEN 'cash' ELSE 'card' END,
+           'plan-' || id, closed_at
+    FROM pronto_dining_sessions
+    WHERE status IN ('paid', 'closed')
+    """,
+    "DROP TABLE plan_customers, plan_sessions, plan_orders",
+]
+
+
+def seed_counts(scale: float) -> dict[str, int]:
+    return {name: max(1, int(rows * scale)) for name, rows in BASE_ROWS.items()}
+
+
+class PlanHarness:
+    def __init__(self, database_url: str):
+        try:
+            import psycopg2
+        except ImportError:
+            die("plan_regression: requiere psycopg2")
+        self.psycopg2 = psycopg2
+        self.conn = psycopg2.connect(database_url)
+        # Planes comparables entre máquinas: sin workers paralelos ni JIT.
+        self._query("SET max_parallel_workers_per_gather = 0")
+        self._query("SET jit = off")
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _query(self, query: str, params=None) -> list[tuple]:
+        with self.conn.cursor() as cur:
+            cur.execute(query, params)
+            return cur.fetchall() if cur.description else []
+
+    def server_version(self) -> str:
+        return self._query("SHOW server_version")[0][0]
+
+    def seed(self, scale: float) -> None:
+        counts = seed_counts(scale)
+        started = time.perf_counter()
+        for statement in SEED_STATEMENTS:
+            self._query(statement, counts)
+        self.conn.commit()
+        self.conn.autocommit = True
+        try:
+            self._query("VACUUM ANALYZE")
+        finally:
+            self.conn.autocommit = False
+        summary = " ".join(f"{name}={rows}" for name, rows in counts.items())
+        print(f"plan_regression: seed {summary} ({time.perf_counter() - started:.1f}s)", file=sys.stderr)
+
+    def _sample(self, query: PlanQuery) -> dict | None:
+        with self.conn.cursor() as cur:
+            cur.execute(query.sample)
+            row = cur.fetchone()
+            names = [d[0] for d in cur.description]
+        if row is None or any(value is None for value in row):
+            return None
+        return dict(zip(names, row))
+
+    def explain(self, query: PlanQuery) -> dict:
+        try:
+            params = self._sample(query) if query.sample else None
+            if query.sample and params is None:
+                return {"status": "skipped", "error": "sin datos para los parámetros"}
+            rows = self._query("EXPLAIN (FORMAT JSON) " + query.sql, params)
+            return fingerprint(rows[0][0][0])
+        except self.psycopg2.Error as e:
+            # p. ej. un invariante que referencia columnas que el esquema ya no tiene.
+            return {"status": "error", "error": (e.pgerror or str(e)).strip().splitlines()[0]}
+        finally:
+            self.conn.rollback()
+
+    def relation_rows(self, relations: set[str]) -> dict[str, int]:
+        rows = self._query(RELATION_ROWS_SQL)
+        self.conn.rollback()
+        by_name = aggregate_rows(rows)
+        return {name: by_name[name] for name in relations if name in by_name}
+
+
+RELATION_ROWS_SQL = """
+SELECT c.relname, c.relkind = 'p', GREATEST(c.reltuples, 0)::bigint, p.relname
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+LEFT JOIN pg_class p ON p.oid = i.inhparent
+WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p')
+"""
+
+
+def aggregate_rows(rows: list[tuple[str, bool, int, str | None]]) -> dict[str, int]:
+    """Filas por relación normalizada desde ``(relname, particionada, reltuples, padre)``.
+
+    Una tabla particionada no tiene ``reltuples`` propio: suma el de sus hojas.
+    Las particiones mensuales comparten nombre normalizado (``_pYYYYMM``) y
+    toman el de la mayor.
+    """
+    own = {name: int(tuples) for name, _, tuples, _ in rows}
+    partitioned = {name for name, is_partitioned, _, _ in rows if is_partitioned}
+    children: dict[str, list[str]] = {}
+    for name, _, _, parent in rows:
+        if parent:
+            children.setdefault(parent, []).append(name)
+
+    def total(name: str) -> int:
+        if name not in partitioned:
+            return own[name]
+        return sum(total(child) for child in children.get(name, []))
+
+    result: dict[str, int] = {}
+    for name in own:
+        key = _relation(name)
+        result[key] = max(result.get(key, 0), total(name))
+    return result
+
+
+@contextlib.contextmanager
+def plan_database(database_url: str | None, seed: bool, scale: float) -> Iterator[PlanHarness]:
+    """Harness sobre ``database_url`` o sobre una base desechable sembrada."""
+    if database_url:
+        harness = PlanHarness(database_url)
+        try:
+            if seed:
+                harness.seed(scale)
+            yield harness
+        finally:
+            harness.close()
+        return
+
+    from db_snapshot import throwaway_database
+
+    with throwaway_database() as url:
+        harness = PlanHarness(url)
+        try:
+            harness.seed(scale)
+            yield harness
+        finally:
+            harness.close()
+
+
+# -- baseline ----------------------------------------------------------------
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != BASELINE_VERSION:
+        die(f"plan_regression: {path}: version {data.get('version')!r} no soportada")
+    return data
+
+
+def write_baseline(results: dict[str, dict], scale: float, server_version: str, path: str = BASELINE_PATH) -> None:
+    data = {
+        "version": BASELINE_VERSION,
+        "scale": scale,
+        "postgres": server_version,
+        "queries": {name: results[name] for name in sorted(results)},
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def _major(version: str) -> str:
+    return version.split(".")[0]
+
+
+def run_check(harness: PlanHarness, queries: list[PlanQuery], baseline: dict | None, args) -> tuple[dict, int]:
+    baseline = baseline or {"queries": {}}
+    results = {query.name: harness.explain(query) for query in queries}
+    relations = {rel for r in list(results.values()) + list(baseline["queries"].values()) for rel in r.get("scans", {})}
+    rel_rows = harness.relation_rows(relations)
+
+    failures = 0
+    for query in queries:
+        current = results[query.name]
+        errors, warnings = compare(
+            baseline["queries"].get(query.name),
+            current,
+            rel_rows,
+            args.large_rows,
+            args.max_cost_ratio,
+            full_scan=query.full_scan,
+        )
+        if errors:
+            failures += 1
+            print(f"FAIL {query.name} ({query.source})")
+            for message in errors:
+                print(f"  {message}")
+        elif warnings:
+            print(f"WARN {query.name}: {'; '.join(warnings)}")
+        elif current["status"] == "ok":
+            print(f"OK   {query.name} cost={current['total_cost']}")
+        else:
+            print(f"SKIP {query.name}: {current.get('error', current['status'])}")
+        if (errors or warnings) and current["status"] == "ok":
+            base = baseline["queries"].get(query.name) or {}
+            if base.get("outline") and base["outline"] != current["outline"]:
+                print("  antes:")
+                print("\n".join("    " + line for line in base["outline"]))
+            print("  ahora:")
+            print("\n".join("    " + line for line in current["outline"]))
+    return results, failures
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Regresiones de plan de las consultas calientes")
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Catálogo de consultas")
+    for name, help_text in (
+        ("check", "Comparar los planes actuales con el baseline"),
+        ("update", "Reescribir init/plan_baselines.json con los planes actuales"),
+    ):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--scale", type=float, default=None, help="Escala de la siembra (default: la del baseline o 1.0)")
+        p.add_argument("--database-url", help="Usar esta base en vez de una desechable (sin sembrar)")
+        p.add_argument("--seed", action="store_true", help="Sembrar también la base de --database-url")
+        p.add_argument("--query", action="append", help="Solo esta consulta (repetible)")
+        p.add_argument("--json", action="store_true", help="Imprimir las huellas actuales en JSON")
+    p_check = sub.choices["check"]
+    p_check.add_argument("--large-rows", type=int, default=10_000, help="Filas desde las que un Seq Scan es regresión")
+    p_check.add_argument("--max-cost-ratio", type=float, default=4.0, help="Crecimiento de costo tolerado")
+    args = ap.parse_args()
+
+    queries = catalog()
+    if args.command == "list":
+        for query in queries:
+            print(f"{query.name:<40} {query.source}")
+        return
+
+    if args.query:
+        unknown = set(args.query) - {q.name for q in queries}
+        if unknown:
+            die(f"plan_regression: consultas desconocidas: {', '.join(sorted(unknown))}")
+        queries = [q for q in queries if q.name in args.query]
+
+    baseline = load_baseline()
+    if args.command == "check" and baseline is None:
+        print(f"WARN: falta {BASELINE_PATH}; solo la regla absoluta de los lookups (Seq Scan >= --large-rows filas)")
+    scale = args.scale if args.scale is not None else (baseline or {}).get("scale", 1.0)
+    seeded = not args.database_url or args.seed
+    if args.command == "check" and baseline and seeded and scale != baseline["scale"]:
+        die(f"plan_regression: el baseline es de --scale {baseline['scale']}; los costos no son comparables")
+
+    try:
+        with plan_database(args.database_url, args.seed, scale) as harness:
+            version = harness.server_version()
+            if args.command == "update":
+                results = {query.name: harness.explain(query) for query in queries}
+                if args.query and baseline:
+                    results = {**baseline["queries"], **results}
+                write_baseline(results, scale, version)
+                failures = 0
+                print(f"OK: baseline {len(results)} consultas -> {BASELINE_PATH}")
+            else:
+                if baseline and _major(version) != _major(baseline.get("postgres", version)):
+                    print(f"WARN: baseline de Postgres {baseline['postgres']}, servidor {version}")
+                results, failures = run_check(harness, queries, baseline, args)
+                if not failures:
+                    print(f"OK: plan regression ({len(queries)} consultas)")
+            if args.json:
+                print(json.dumps(results, indent=2, ensure_ascii=False))
+    except RuntimeError as e:
+        die(f"plan_regression: {e}")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Escáner de seguridad SQL compartido por pronto-sql-safety, pronto-migrate y
+pronto-init.
+
+Reemplaza las pasadas de ``rg`` línea a línea: cada archivo de ``init/sql`` se
+tokeniza una vez (comentarios, literales ``'...'``/``"..."`` y bloques
+``$tag$``) y todas las reglas se evalúan sobre esa vista, así que un
+``DROP TABLE`` en un comentario o en un string ya no es un hit. Los hechos de
+cada archivo dependen solo de su contenido y se cachean por sha256 en
+``PRONTO_SQL_SAFETY_CACHE`` (default ``~/.cache/pronto/sql_safety.json``).
+
+Checks (``--check``, repetible):
+
+- ``sql-safety``: fuera de ``migrations/``, ``DROP TABLE|SCHEMA|DATABASE``,
+  ``TRUNCATE``, ``DO $$``, ``VACUUM``, ``ANALYZE``, ``CLUSTER`` y
+  ``DROP INDEX IF EXISTS`` bloqueados.
+- ``migrate``: en ``migrations/``, ``DROP INDEX`` exige ``IF EXISTS``.
+- ``init``: en las fases 10..40, DDL/DML fuera de lugar bloqueado; ``INSERT``
+  solo en 40_seeds y cada uno con ``ON CONFLICT ... DO NOTHING``.
+
+Usage:
+    sql_safety.py                                  # --check sql-safety
+    sql_safety.py --check sql-safety --check migrate
+    sql_safety.py --root path/init/sql --check init
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import NamedTuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+SQL_ROOT = os.path.join(REPO_ROOT, "pronto-scripts", "init", "sql")
+CACHE_PATH = os.environ.get(
+    "PRONTO_SQL_SAFETY_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "pronto", "sql_safety.json")
+)
+
+# Subir al cambiar cualquier regla: invalida los hechos cacheados.
+RULES_VERSION = 1
+
+PHASES = ["00_bootstrap", "10_schema", "20_constraints", "30_indexes", "40_seeds"]
+CHECKS = ["sql-safety", "migrate", "init"]
+
+DOLLAR_RE = re.compile(r"\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$")
+_DO = r"\bDO\s+\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$"
+
+DESTRUCTIVE_RE = re.compile(
+    rf"\b(?:DROP\s+(?:TABLE|SCHEMA|DATABASE)|TRUNCATE|VACUUM|ANALYZE|CLUSTER)\b|{_DO}", re.I
+)
+DROP_INDEX_IF_EXISTS_RE = re.compile(r"\bDROP\s+INDEX\s+(?:CONCURRENTLY\s+)?IF\s+EXISTS\b", re.I)
+DROP_INDEX_NO_IF_EXISTS_RE = re.compile(r"\bDROP\s+INDEX\b(?!\s+(?:CONCURRENTLY\s+)?IF\s+EXISTS\b)", re.I)
+INIT_DENY_RE = re.compile(
+    r"\b(?:ALTER\s+TABLE|RENAME|(?<!\bON\s)UPDATE\s+[A-Za-z_\"][A-Za-z0-9_\"\.]*|DELETE\s+FROM|EXECUTE"
+    r"|CREATE\s+EXTENSION|DROP\s+INDEX|CREATE\s+(?:OR\s+REPLACE\s+)?VIEW|DROP\s+VIEW|CREATE\s+TYPE"
+    rf"|CREATE\s+(?:OR\s+REPLACE\s+)?FUNCTION)\b|{_DO}",
+    re.I,
+)
+INSERT_RE = re.compile(r"\bINSERT\s+INTO\b", re.I)
+ON_CONFLICT_RE = re.compile(r"\bON\s+CONFLICT\b[^;]*?\bDO\s+(NOTHING|UPDATE)\b", re.I)
+
+FACT_RULES = {
+    "destructive": DESTRUCTIVE_RE,
+    "drop_index_if_exists": DROP_INDEX_IF_EXISTS_RE,
+    "drop_index_no_if_exists": DROP_INDEX_NO_IF_EXISTS_RE,
+    "init_deny": INIT_DENY_RE,
+    "insert": INSERT_RE,
+}
+
+
+class Masked(NamedTuple):
+    """Tres vistas del mismo texto, con los mismos offsets y saltos de línea.
+
+    - ``code``: comentarios en blanco.
+    - ``safe``: además sin el contenido de ``'...'``/``"..."``; los cuerpos
+      ``$tag$`` quedan visibles pero enmascarados a su vez (un ``DO`` o una
+      función se revisan por dentro).
+    - ``masked``: además sin los cuerpos ``$tag$``.
+    """
+
+    code: str
+    safe: str
+    masked: str
+
+
+def _blank(chars: list[str], start: int, end: int) -> None:
+    for k in range(start, min(end, len(chars))):
+        if chars[k] != "\n":
+            chars[k] = " "
+
+
+def mask_sql(text: str) -> Masked:
+    code = list(text)
+    safe = list(text)
+    masked = list(text)
+    n = len(text)
+    i = 0
+    while i < n:
+        c = text[i]
+        if text.startswith("--", i):
+            j = text.find("\n", i)
+            j = n if j < 0 else j
+            for view in (code, safe, masked):
+                _blank(view, i, j)
+            i = j
+        elif text.startswith("/*", i):
+            depth, j = 1, i + 2
+            while j < n and depth:
+                if text.startswith("/*", j):
+                    depth, j = depth + 1, j + 2
+                elif text.startswith("*/", j):
+                    depth, j = depth - 1, j + 2
+                else:
+                    j += 1
+            for view in (code, safe, masked):
+                _blank(view, i, j)
+            i = j
+        elif c == "'":
+            backslash = i > 0 and text[i - 1] in "eE" and not (i > 1 and (text[i - 2].isalnum() or text[i - 2] == "_"))
+            j = i + 1
+            while j < n:
+                if backslash and text[j] == "\\":
+                    j += 2
+                elif text[j] == "'" and text.startswith("''", j):
+                    j += 2
+                elif text[j] == "'":
+                    break
+                else:
+                    j += 1
+            _blank(safe, i + 1, j)
+            _blank(masked, i + 1, j)
+            i = j + 1
+        elif c == '"':
+            j = i + 1
+            while j < n and not (text[j] == '"' and not text.startswith('""', j)):
+                j += 2 if text.startswith('""', j) else 1
+            _blank(safe, i + 1, j)
+            _blank(masked, i + 1, j)
+            i = j + 1
+        elif c == "$" and not (i > 0 and (text[i - 1].isalnum() or text[i - 1] == "_")):
+            m = DOLLAR_RE.match(text, i)
+            if not m:
+                i += 1
+                continue
+            j = text.find(m.group(0), m.end())
+            j = n if j < 0 else j
+            safe[m.end() : j] = mask_sql(text[m.end() : j]).safe
+            _blank(masked, m.end(), j)
+            i = j + len(m.group(0))
+        else:
+            i += 1
+    return Masked("".join(code), "".join(safe), "".join(masked))
+
+
+def statement_spans(code: str, masked: str) -> list[tuple[int, int]]:
+    """(inicio, fin) de cada sentencia separada por ``;`` de nivel superior, sin espacios."""
+    spans = []
+    depth = 0
+    start = 0
+    for k, c in enumerate(masked + ";"):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth = max(depth - 1, 0)
+        elif c == ";" and depth == 0:
+            segment = code[start:k]
+            if segment.strip():
+                lead = len(segment) - len(segment.lstrip())
+                spans.append((start + lead, start + len(segment.rstrip())))
+            start = k + 1
+    return spans
+
+
+def scan_text(text: str) -> dict[str, list[tuple[int, str]]]:
+    """Hechos del archivo (independientes de su ruta): regla -> [(línea, texto)]."""
+    views = mask_sql(text)
+    lines = text.splitlines()
+    starts = [0] + [m.end() for m in re.finditer("\n", text)]
+
+    def hit(offset: int) -> tuple[int, str]:
+        lineno = bisect.bisect_right(starts, offset)
+        return lineno, lines[lineno - 1].strip()[:220] if lineno <= len(lines) else ""
+
+    facts = {rule: [hit(m.start()) for m in rx.finditer(views.safe)] for rule, rx in FACT_RULES.items()}
+    facts["insert_not_idempotent"] = []
+    for start, end in statement_spans(views.code, views.masked):
+        stmt = views.safe[start:end]
+        m = INSERT_RE.search(stmt)
+        if not m:
+            continue
+        conflict = ON_CONFLICT_RE.search(stmt, m.end())
+        if not conflict or conflict.group(1).upper() != "NOTHING":
+            facts["insert_not_idempotent"].append(hit(start + m.start()))
+    return facts
+
+
+class FactCache:
+    """Hechos por sha256 de contenido; si no se puede escribir, se ignora."""
+
+    def __init__(self, path: str | None = CACHE_PATH):
+        self.path = path
+        self.dirty = False
+        self.entries: dict[str, dict] = {}
+        if not path:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == RULES_VERSION:
+            self.entries = data.get("files", {})
+
+    def facts(self, text: str, sha256: str | None = None) -> dict[str, list[tuple[int, str]]]:
+        sha256 = sha256 or hashlib.sha256(text.encode("utf-8")).hexdigest()
+        cached = self.entries.get(sha256)
+        if cached is None:
+            cached = scan_text(text)
+            self.entries[sha256] = cached
+            self.dirty = True
+        return cached
+
+    def save(self) -> None:
+        if not (self.path and self.dirty):
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".sql_safety.")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump({"version": RULES_VERSION, "files": self.entries}, fh)
+            os.replace(tmp, self.path)
+        except OSError:
+            return
+        self.dirty = False
+
+
+@dataclass
+class SqlSource:
+    path: str
+    rel: str
+    text: str
+
+    @property
+    def area(self) -> str:
+        """Primer directorio bajo init/sql: una fase o ``migrations``."""
+        return self.rel.split(os.sep, 1)[0] if os.sep in self.rel else ""
+
+
+def sql_safety_errors(src: SqlSource, facts: dict) -> list[str]:
+    """Reglas de ``pronto-sql-safety``: todo init/sql salvo migrations/."""
+    if src.area == "migrations":
+        return []
+    errors = [f"{src.path}:{line}:{text}" for line, text in facts["destructive"]]
+    errors += [
+        f"DROP INDEX IF EXISTS fuera de migrations: {src.path}:{line}:{text}"
+        for line, text in facts["drop_index_if_exists"]
+    ]
+    return errors
+
+
+def migrate_errors(src: SqlSource, facts: dict) -> list[str]:
+    """Reglas de ``pronto-migrate``: en migrations/ solo ``DROP INDEX IF EXISTS``."""
+    if src.area != "migrations":
+        return []
+    return [
+        f"pronto-migrate: DROP INDEX sin IF EXISTS bloqueado: {src.path}:{line}: {text}"
+        for line, text in facts["drop_index_no_if_exists"]
+    ]
+
+
+def init_errors(phase: str, path: str, facts: dict) -> list[str]:
+    """Reglas de las fases de ``pronto-init`` (00_bootstrap queda libre)."""
+    if phase not in PHASES or phase == "00_bootstrap":
+        return []
+    errors = [
+        f"pronto-init: deny hit en fase={phase} archivo={path}:{line}: {text}" for line, text in facts["init_deny"]
+    ]
+    if errors:
+        return errors
+    if phase == "40_seeds":
+        return [
+            f"pronto-init: 40_seeds INSERT requiere ON CONFLICT DO NOTHING: {path}:{line}: {text}"
+            for line, text in facts["insert_not_idempotent"]
+        ]
+    if facts["insert"]:
+        return [f"pronto-init: INSERT fuera de 40_seeds bloqueado: {path}"]
+    return []
+
+
+def iter_sources(root: str):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith(".sql"):
+                path = os.path.join(dirpath, name)
+                with open(path, "r", encoding="utf-8") as fh:
+                    yield SqlSource(path, os.path.relpath(path, root), fh.read())
+
+
+def scan_tree(root: str, checks: list[str], cache: FactCache) -> dict[str, list[str]]:
+    """Una pasada por init/sql; errores por check."""
+    errors: dict[str, list[str]] = {check: [] for check in checks}
+    for src in iter_sources(root):
+        facts = cache.facts(src.text)
+        if "sql-safety" in errors:
+            errors["sql-safety"] += sql_safety_errors(src, facts)
+        if "migrate" in errors:
+            errors["migrate"] += migrate_errors(src, facts)
+        if "init" in errors and src.rel.count(os.sep) == 1:
+            errors["init"] += init_errors(src.area, src.path, facts)
+    cache.save()
+    return errors
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Deny checks de init/sql en una sola pasada")
+    ap.add_argument("--root", default=SQL_ROOT, help="Directorio init/sql")
+    ap.add_argument("--check", action="append", choices=CHECKS, help="Check a correr (repetible; default: sql-safety)")
+    ap.add_argument("--no-cache", action="store_true", help="No leer ni escribir la cache de hechos")
+    args = ap.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"pronto-sql-safety: missing {args.root}", file=sys.stderr)
+        raise SystemExit(1)
+    checks = args.check or ["sql-safety"]
+    errors = scan_tree(args.root, checks, FactCache(None if args.no_cache else CACHE_PATH))
+
+    failed = False
+    for check in checks:
+        for err in errors[check]:
+            print(err, file=sys.stderr)
+        if check == "sql-safety":
+            if errors[check]:
+                print(f"pronto-sql-safety: FAIL (bad={len(errors[check])})", file=sys.stderr)
+            else:
+                print("OK: sql safety")
+        elif not errors[check]:
+            print(f"OK: {check} deny checks")
+        failed = failed or bool(errors[check])
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
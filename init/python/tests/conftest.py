@@ -0,0 +1,6 @@
+"""Los módulos de init/python se importan entre sí por nombre (``from apply_engine import die``)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
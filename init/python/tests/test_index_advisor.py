@@ -0,0 +1,141 @@
+import pytest
+
+from index_advisor import (
+    Candidate,
+    ExistingIndex,
+    Schema,
+    candidates_for,
+    drop_candidates,
+    extract_predicates,
+    index_name,
+    is_covered,
+    propose,
+    render_migration,
+)
+
+
+@pytest.fixture
+def schema() -> Schema:
+    return Schema(
+        columns={
+            "pronto_orders": {"id", "session_id", "customer_id", "workflow_status", "created_at", "deleted_at"},
+            "pronto_order_items": {"id", "order_id", "menu_item_id", "quantity"},
+            "pronto_dining_sessions": {"id", "table_id", "status", "opened_at"},
+        },
+        indexes=[ExistingIndex("pronto_orders", "pronto_orders_pkey", ["id"], unique=True, backs_constraint=True)],
+    )
+
+
+def _kinds(preds) -> set[tuple[str, str, str]]:
+    return {(p.table, p.column, p.kind) for p in preds}
+
+
+def test_predicates_by_kind(schema):
+    preds = extract_predicates(
+        "SELECT o.id FROM pronto_orders o JOIN pronto_order_items i ON i.order_id = o.id "
+        "WHERE o.session_id = %s AND o.created_at >= %s AND o.deleted_at IS NULL "
+        "AND o.workflow_status IN ('new', 'queued') ORDER BY o.created_at",
+        schema,
+    )
+    assert _kinds(preds) == {
+        ("pronto_order_items", "order_id", "join"),
+        ("pronto_orders", "id", "join"),
+        ("pronto_orders", "session_id", "eq"),
+        ("pronto_orders", "created_at", "range"),
+        ("pronto_orders", "created_at", "order"),
+        ("pronto_orders", "deleted_at", "filter"),
+        ("pronto_orders", "workflow_status", "filter"),
+    }
+
+
+def test_predicates_ignore_strings_and_unknown_tables(schema):
+    assert extract_predicates("SELECT * FROM other_table WHERE session_id = %s", schema) == []
+    preds = extract_predicates("SELECT * FROM pronto_orders WHERE customer_id = %s -- AND session_id = 1", schema)
+    assert _kinds(preds) == {("pronto_orders", "customer_id", "eq")}
+
+
+def test_candidate_puts_equalities_first_and_constants_in_where(schema):
+    preds = extract_predicates(
+        "SELECT * FROM pronto_orders WHERE customer_id = %s AND created_at > %s "
+        "AND workflow_status = 'paid' ORDER BY created_at DESC",
+        schema,
+    )
+    (cand,) = candidates_for(preds)
+    assert cand.columns == ["customer_id", "created_at"]
+    assert cand.where == ["workflow_status = 'paid'"]
+
+
+def test_or_equalities_give_separate_indexes(schema):
+    preds = extract_predicates("SELECT * FROM pronto_orders WHERE session_id = %s OR customer_id = %s", schema)
+    assert sorted(c.columns[0] for c in candidates_for(preds)) == ["customer_id", "session_id"]
+
+
+def test_is_covered_by_prefix():
+    indexes = [ExistingIndex("pronto_orders", "ix_a", ["customer_id", "created_at", "id"])]
+    assert is_covered(Candidate("pronto_orders", ["customer_id", "created_at"]), indexes)
+    assert not is_covered(Candidate("pronto_orders", ["created_at"]), indexes)
+    partial = Candidate("pronto_orders", ["customer_id"], ["workflow_status = 'paid'"])
+    assert not is_covered(partial, indexes)
+
+
+def test_index_name_is_unique_and_short():
+    cand = Candidate("pronto_orders", ["customer_id"], ["deleted_at IS NULL"])
+    assert index_name(cand, set()) == "ix_orders_customer_id_deleted_at"
+    renamed = index_name(cand, {"ix_orders_customer_id_deleted_at"})
+    assert renamed.startswith("ix_orders_customer_id_deleted_at_")
+    long = Candidate("pronto_" + "x" * 40, ["a_long_column_name", "another_long_column"])
+    assert len(index_name(long, set())) <= 63
+
+
+def test_propose_merges_sources_and_keeps_longest(schema):
+    sources = [
+        ("by customer", "SELECT * FROM pronto_orders WHERE customer_id = %s", 1.0),
+        ("by customer, recent", "SELECT * FROM pronto_orders WHERE customer_id = %s ORDER BY created_at", 2.0),
+        ("by customer again", "SELECT id FROM pronto_orders WHERE customer_id = %s", 1.0),
+        ("by pk", "SELECT * FROM pronto_orders WHERE id = %s", 5.0),
+    ]
+    (cand,) = propose(schema, sources, min_rows=0)
+    assert cand.columns == ["customer_id", "created_at"]
+    assert sorted(cand.sources) == ["by customer", "by customer again", "by customer, recent"]
+    assert cand.weight == 4.0
+    assert cand.name == "ix_orders_customer_id_created_at"
+    assert cand.ddl().startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_customer_id_created_at\n  ON pronto_orders")
+
+
+def test_propose_skips_small_tables_with_live_stats(schema):
+    schema.live = True
+    schema.tables = {"pronto_orders": {"n_live_tup": 10}}
+    sources = [("q", "SELECT * FROM pronto_orders WHERE customer_id = %s", 1.0)]
+    assert propose(schema, sources, min_rows=1000) == []
+
+
+def test_drop_candidates():
+    schema = Schema(
+        indexes=[
+            ExistingIndex("t", "ix_t_a", ["a"], idx_scan=10, size_bytes=10),
+            ExistingIndex("t", "ix_t_a_b", ["a", "b"], idx_scan=10, size_bytes=20),
+            ExistingIndex("t", "ix_t_c", ["c"], idx_scan=0, size_bytes=1 << 20),
+            ExistingIndex("t", "ix_t_d", ["d"], idx_scan=0, size_bytes=10),
+            ExistingIndex("t", "t_e_key", ["e"], idx_scan=0, size_bytes=1 << 20, unique=True),
+        ],
+        live=True,
+    )
+    drops = drop_candidates(schema, min_index_bytes=1024)
+    assert [(d.name, d.reason) for d in drops] == [
+        ("ix_t_c", "idx_scan = 0"),
+        ("ix_t_a", "prefijo de ix_t_a_b"),
+    ]
+    schema.live = False
+    assert drop_candidates(schema, min_index_bytes=1024) == []
+
+
+def test_rendered_migration_passes_lint(schema):
+    from migration_lint import Linter
+
+    sources = [("by customer", "SELECT * FROM pronto_orders WHERE customer_id = %s AND deleted_at IS NULL", 1.0)]
+    adds = propose(schema, sources, min_rows=0)
+    sql = render_migration("20261019_01__index_advisor.sql", schema, adds, [])
+    analyses = Linter(hot={"pronto_orders"}, functions=set()).lint_text(sql)
+    assert [a.kind for a in analyses] == ["create_index"]
+    assert analyses[0].concurrent
+    assert not analyses[0].flagged
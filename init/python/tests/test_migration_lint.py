@@ -0,0 +1,129 @@
+import pytest
+
+from migration_lint import Linter
+
+
+@pytest.fixture
+def linter() -> Linter:
+    return Linter(hot={"pronto_orders"}, functions={"pronto_partition_convert"})
+
+
+def _one(linter: Linter, sql: str):
+    (analysis,) = linter.lint_text(sql)
+    return analysis
+
+
+def _rules(analysis) -> list[str]:
+    return [finding.rule for finding in analysis.findings]
+
+
+def test_create_index_without_concurrently(linter):
+    a = _one(linter, "CREATE INDEX ix_orders_status ON pronto_orders (status);")
+    assert (a.kind, a.table, a.lock, a.concurrent) == ("create_index", "pronto_orders", "SHARE", False)
+    assert _rules(a) == ["index-not-concurrent"]
+    assert a.findings[0].severity == "error"
+
+
+def test_create_index_concurrently(linter):
+    a = _one(linter, "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_x ON public.pronto_notes (note_id);")
+    assert (a.table, a.lock, a.concurrent) == ("pronto_notes", "SHARE UPDATE EXCLUSIVE", True)
+    assert not a.flagged
+
+
+def test_cold_table_findings_are_warnings(linter):
+    a = _one(linter, "CREATE INDEX ix_notes ON pronto_notes (created_at);")
+    assert a.findings[0].severity == "warning"
+
+
+@pytest.mark.parametrize(
+    "sql, lock, rules",
+    [
+        ("ALTER TABLE pronto_orders ADD CONSTRAINT fk FOREIGN KEY (x) REFERENCES t (id);", "SHARE ROW EXCLUSIVE", ["full-scan-under-lock"]),
+        ("ALTER TABLE pronto_orders ADD CONSTRAINT fk FOREIGN KEY (x) REFERENCES t (id) NOT VALID;", "SHARE ROW EXCLUSIVE", []),
+        ("ALTER TABLE pronto_orders VALIDATE CONSTRAINT fk;", "SHARE UPDATE EXCLUSIVE", []),
+        ("ALTER TABLE pronto_orders ADD COLUMN note text;", "ACCESS EXCLUSIVE", []),
+        ("ALTER TABLE pronto_orders ADD COLUMN token uuid DEFAULT gen_random_uuid();", "ACCESS EXCLUSIVE", ["table-rewrite"]),
+        ("ALTER TABLE pronto_orders ALTER COLUMN total TYPE numeric(12,2);", "ACCESS EXCLUSIVE", ["table-rewrite"]),
+        ("ALTER TABLE pronto_orders ALTER COLUMN total SET NOT NULL;", "ACCESS EXCLUSIVE", ["full-scan-under-lock"]),
+        ("ALTER TABLE pronto_orders ADD UNIQUE (code);", "ACCESS EXCLUSIVE", ["index-not-concurrent"]),
+    ],
+)
+def test_alter_table_actions(linter, sql, lock, rules):
+    a = _one(linter, sql)
+    assert a.kind == "alter_table"
+    assert a.lock == lock
+    assert _rules(a) == rules
+
+
+def test_alter_table_takes_strongest_lock(linter):
+    a = _one(linter, "ALTER TABLE pronto_orders VALIDATE CONSTRAINT fk, ADD COLUMN x int;")
+    assert len(a.parts) == 2
+    assert a.lock == "ACCESS EXCLUSIVE"
+
+
+@pytest.mark.parametrize(
+    "sql, rules",
+    [
+        ("UPDATE pronto_orders SET status = 'x';", ["unbatched-update"]),
+        ("UPDATE pronto_orders SET status = 'x' WHERE status = 'y';", ["unbatched-update"]),
+        ("UPDATE pronto_orders SET status = 'x' WHERE id = 42;", []),
+        ("DELETE FROM pronto_orders WHERE id IN (1, 2);", []),
+        ("DELETE FROM pronto_orders;", ["unbatched-delete"]),
+    ],
+)
+def test_dml_needs_key_bound(linter, sql, rules):
+    assert _rules(_one(linter, sql)) == rules
+
+
+def test_table_created_in_same_file_is_not_flagged(linter):
+    analyses = linter.lint_text(
+        "CREATE TABLE pronto_new (id int, x int);\n"
+        "CREATE INDEX ix_new_x ON pronto_new (x);\n"
+        "UPDATE pronto_new SET x = 1;\n"
+    )
+    assert [a.kind for a in analyses] == ["create_table", "create_index", "update"]
+    assert not any(a.flagged for a in analyses)
+
+
+def test_do_block_is_unanalyzable_and_reports_embedded(linter):
+    a = _one(
+        linter,
+        "DO $$\nBEGIN\n  CREATE INDEX ix_o ON pronto_orders (status);\n"
+        "  PERFORM pronto_partition_convert('pronto_audit_logs');\nEND $$;",
+    )
+    assert a.kind == "do_block"
+    assert a.table == "pronto_orders"
+    assert _rules(a) == ["index-not-concurrent", "unanalyzable"]
+    assert "pronto_partition_convert()" in a.findings[-1].message
+    assert [f.rule for f in a.lock_findings] == ["index-not-concurrent"]
+
+
+def test_repo_function_call_is_unanalyzable(linter):
+    a = _one(linter, "SELECT pronto_partition_convert('pronto_audit_logs');")
+    assert a.kind == "select"
+    assert _rules(a) == ["unanalyzable"]
+    assert not a.lock_findings
+
+
+def test_functions_defined_in_file_are_tracked():
+    linter = Linter(hot=set(), functions=set())
+    analyses = linter.lint_text(
+        "CREATE OR REPLACE FUNCTION pronto_touch() RETURNS void AS $$ BEGIN END $$ LANGUAGE plpgsql;\n"
+        "SELECT pronto_touch();\n"
+    )
+    assert [a.kind for a in analyses] == ["create_function", "select"]
+    assert _rules(analyses[1]) == ["unanalyzable"]
+
+
+@pytest.mark.parametrize(
+    "sql, kind, concurrent",
+    [
+        ("DROP INDEX CONCURRENTLY IF EXISTS ix_a;", "drop_index", True),
+        ("DROP INDEX ix_a;", "drop_index", False),
+        ("REINDEX INDEX CONCURRENTLY ix_a;", "reindex", True),
+        ("BEGIN;", "transaction", False),
+    ],
+)
+def test_other_statement_kinds(linter, sql, kind, concurrent):
+    a = _one(linter, sql)
+    assert (a.kind, a.concurrent) == (kind, concurrent)
@@ -0,0 +1,47 @@
+from datetime import date
+
+import pytest
+
+from partition_manager import Partition, add_months, month_start
+
+
+def _partition(bound: str) -> Partition:
+    return Partition("pronto_audit_logs_p", bound, 0, 0)
+
+
+@pytest.mark.parametrize(
+    "bound, expected",
+    [
+        (
+            "FOR VALUES FROM ('2026-10-01 00:00:00+00') TO ('2026-11-01 00:00:00+00')",
+            (date(2026, 10, 1), date(2026, 11, 1)),
+        ),
+        ("FOR VALUES FROM ('2026-10-01') TO ('2026-11-01')", (date(2026, 10, 1), date(2026, 11, 1))),
+        ("FOR VALUES FROM (MINVALUE) TO ('2026-10-01 00:00:00+00')", (None, date(2026, 10, 1))),
+        ("DEFAULT", (None, None)),
+        ("FOR VALUES IN ('x')", (None, None)),
+    ],
+)
+def test_range_from_bound(bound, expected):
+    assert _partition(bound).range == expected
+
+
+def test_is_default():
+    assert _partition("DEFAULT").is_default
+    assert not _partition("FOR VALUES FROM ('2026-10-01') TO ('2026-11-01')").is_default
+
+
+def test_covers():
+    october = _partition("FOR VALUES FROM ('2026-10-01 00:00:00+00') TO ('2026-11-01 00:00:00+00')")
+    assert october.covers(date(2026, 10, 1))
+    assert not october.covers(date(2026, 11, 1))
+    assert not october.covers(date(2026, 9, 1))
+    legacy = _partition("FOR VALUES FROM (MINVALUE) TO ('2026-10-01 00:00:00+00')")
+    assert legacy.covers(date(2020, 1, 1))
+    assert not _partition("DEFAULT").covers(date(2026, 10, 1))
+
+
+def test_month_arithmetic():
+    assert month_start(date(2026, 10, 19)) == date(2026, 10, 1)
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
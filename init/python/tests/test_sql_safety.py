@@ -0,0 +1,61 @@
+from sql_safety import mask_sql, scan_text, statement_spans
+
+
+def test_views_keep_offsets_and_newlines():
+    text = "SELECT 'a;b' -- x\n/* y\n z */ FROM t;"
+    views = mask_sql(text)
+    for view in views:
+        assert len(view) == len(text)
+        assert view.count("\n") == text.count("\n")
+
+
+def test_comments_blanked_in_every_view():
+    views = mask_sql("SELECT 1; -- DROP TABLE x\n/* TRUNCATE /* nested */ y */ SELECT 2;")
+    for view in views:
+        assert "DROP" not in view
+        assert "TRUNCATE" not in view
+        assert "nested" not in view
+    assert "SELECT 2" in views.code
+
+
+def test_string_contents_blanked_in_safe_only():
+    views = mask_sql("""SELECT 'it''s DROP TABLE', "Weird""Name", E'\\' TRUNCATE';""")
+    assert "DROP TABLE" in views.code
+    assert "DROP" not in views.safe
+    assert "Weird" not in views.safe
+    assert "TRUNCATE" not in views.safe
+    assert views.safe.startswith("SELECT '")
+
+
+def test_dollar_bodies_masked_recursively():
+    text = "DO $body$ BEGIN -- DROP TABLE a\n PERFORM 'DROP TABLE b'; DROP TABLE c; END $body$;"
+    views = mask_sql(text)
+    assert views.safe.count("DROP TABLE") == 1  # solo c: a es comentario y b un literal
+    assert "DROP" not in views.masked
+    assert "$body$" in views.masked
+
+
+def test_dollar_after_identifier_is_not_a_quote():
+    views = mask_sql("SELECT a$b$ FROM t; DROP TABLE x;")
+    assert "DROP TABLE" in views.masked
+
+
+def test_statement_spans_skip_semicolons_in_strings_and_parens():
+    text = "INSERT INTO t VALUES ('a;b');\nCREATE FUNCTION f() RETURNS int AS $$ SELECT 1; $$ LANGUAGE sql;"
+    views = mask_sql(text)
+    spans = statement_spans(views.code, views.masked)
+    assert [text[start:end] for start, end in spans] == [
+        "INSERT INTO t VALUES ('a;b')",
+        "CREATE FUNCTION f() RETURNS int AS $$ SELECT 1; $$ LANGUAGE sql",
+    ]
+
+
+def test_scan_text_ignores_comments_and_literals():
+    facts = scan_text(
+        "-- DROP TABLE old;\n"
+        "INSERT INTO logs (msg) VALUES ('TRUNCATE') ON CONFLICT DO NOTHING;\n"
+        "INSERT INTO t VALUES (1);\n"
+        "DROP TABLE real_one;\n"
+    )
+    assert [line for line, _ in facts["destructive"]] == [4]
+    assert [line for line, _ in facts["insert_not_idempotent"]] == [3]
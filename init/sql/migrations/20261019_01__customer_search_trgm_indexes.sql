@@ -0,0 +1,11 @@
+-- Migration: 20261019_01__customer_search_trgm_indexes.sql
+-- Purpose: Index the normalized customer search columns used by restaurant/buscar_cliente.py.
+-- name_search is matched with LIKE '%term%' and ranked by similarity(), which needs pg_trgm.
+-- email_normalized / phone_e164 are exact lookups; their btree indexes come from 20260205_01.
+-- The GIN build scans all of pronto_customers, so it runs CONCURRENTLY: apply with
+-- `pronto-migrate --apply-online` (CONCURRENTLY cannot run inside the --apply transaction).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customer_name_search_trgm
+  ON pronto_customers USING gin (name_search gin_trgm_ops);
@@ -0,0 +1,17 @@
+-- Migration: 20261019_02__create_backfill_progress.sql
+-- Purpose: Checkpoints of bin/python/backfill_runner.py (one row per named backfill).
+-- last_key is the primary key of the last committed batch, updated in the same
+-- transaction as the batch so a crashed run resumes exactly where it stopped.
+
+CREATE TABLE IF NOT EXISTS pronto_backfill_progress (
+    name TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    last_key TEXT NULL,
+    rows_done BIGINT NOT NULL DEFAULT 0,
+    batches BIGINT NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'paused', 'failed', 'done')),
+    error TEXT NULL,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ NULL
+);
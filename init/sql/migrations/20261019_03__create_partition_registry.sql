@@ -0,0 +1,271 @@
+-- Migration: 20261019_03__create_partition_registry.sql
+-- Purpose: Monthly range partitioning for the append-only tables, managed by
+-- init/python/partition_manager.py (bin/pronto-partitions).
+--
+-- pronto_partition_config   one row per table: partition column, months created
+--                           ahead, months kept attached before archiving.
+-- pronto_partition_archive  partitions detached into the pronto_archive schema.
+-- pronto_partition_literal  range bound literal (UTC month start) for a column.
+-- pronto_partition_add      creates <table>_pYYYYMM, moving matching rows out of
+--                           the default partition if any landed there.
+-- pronto_partition_convert  turns a plain table into a partitioned parent: the
+--                           existing table is attached as <table>_legacy covering
+--                           everything before next month (no data copy), plus a
+--                           default partition and the next premake_months months.
+--
+-- pronto_orders is registered but disabled: pronto_order_items, pronto_payments,
+-- pronto_carts, pronto_invoices, ... reference pronto_orders(id), and a
+-- partitioned table can only be referenced through a key that includes the
+-- partition column. pronto_partition_convert refuses tables referenced by FKs.
+--
+-- pronto_realtime_events is not registered: it keeps 2 days, which monthly
+-- partitions cannot express. bin/python/retention_worker.py owns its cleanup
+-- (config/retention.yml, policy realtime_events, with hourly rollups).
+
+CREATE SCHEMA IF NOT EXISTS pronto_archive;
+
+CREATE TABLE IF NOT EXISTS pronto_partition_config (
+    table_name TEXT PRIMARY KEY,
+    column_name TEXT NOT NULL,
+    enabled BOOLEAN NOT NULL DEFAULT true,
+    premake_months INTEGER NOT NULL DEFAULT 3 CHECK (premake_months >= 1),
+    retain_months INTEGER NULL CHECK (retain_months >= 1),
+    notes TEXT NULL,
+    converted_at TIMESTAMPTZ NULL,
+    last_maintenance_at TIMESTAMPTZ NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS pronto_partition_archive (
+    partition_name TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    range_from TEXT NULL,
+    range_to TEXT NOT NULL,
+    est_rows BIGINT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    exported_to TEXT NULL,
+    dropped_at TIMESTAMPTZ NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_partition_archive_table ON pronto_partition_archive (table_name);
+
+INSERT INTO pronto_partition_config (table_name, column_name, enabled, premake_months, retain_months, notes)
+VALUES
+    ('pronto_order_status_history', 'changed_at', true, 3, 24, NULL),
+    ('pronto_payment_audit_logs', 'created_at', true, 3, 60, 'Financial audit trail: 5 years attached'),
+    ('pronto_audit_logs', 'changed_at', true, 3, 24, NULL),
+    ('pronto_orders', 'created_at', false, 3, NULL, 'Blocked: referenced by FKs on pronto_orders(id)')
+ON CONFLICT (table_name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION pronto_partition_literal(p_table regclass, p_column text, p_month date)
+RETURNS text
+LANGUAGE sql
+STABLE
+AS $fn$
+    SELECT quote_literal(
+        to_char(p_month, 'YYYY-MM-DD')
+        || CASE WHEN a.atttypid = 'timestamptz'::regtype THEN ' 00:00:00+00' ELSE ' 00:00:00' END
+    )
+    FROM pg_attribute a
+    WHERE a.attrelid = p_table AND a.attname = p_column AND NOT a.attisdropped;
+$fn$;
+
+CREATE OR REPLACE FUNCTION pronto_partition_add(p_table text, p_month date)
+RETURNS text
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+    v_oid oid := to_regclass(p_table);
+    v_name text := left(p_table, 55) || '_p' || to_char(p_month, 'YYYYMM');
+    v_column text;
+    v_default text;
+    v_from text;
+    v_to text;
+    v_cols text;
+    v_pending boolean := false;
+BEGIN
+    IF to_regclass(v_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT a.attname INTO v_column
+    FROM pg_partitioned_table pt
+    JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+    WHERE pt.partrelid = v_oid;
+    IF v_column IS NULL THEN
+        RAISE EXCEPTION 'pronto_partition_add: % no es una tabla particionada', p_table;
+    END IF;
+
+    v_from := pronto_partition_literal(v_oid, v_column, date_trunc('month', p_month)::date);
+    v_to := pronto_partition_literal(v_oid, v_column, (date_trunc('month', p_month) + interval '1 month')::date);
+
+    SELECT c.relname INTO v_default
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = v_oid AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT';
+
+    IF v_default IS NOT NULL THEN
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I WHERE %I >= %s AND %I < %s)',
+                       v_default, v_column, v_from, v_column, v_to)
+        INTO v_pending;
+    END IF;
+
+    IF NOT v_pending THEN
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%s) TO (%s)',
+                       v_name, p_table, v_from, v_to);
+        RETURN v_name;
+    END IF;
+
+    -- Rows for this month landed in the default partition (premake fell behind):
+    -- the new partition cannot be created while they are there, so move them.
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO v_cols
+    FROM pg_attribute
+    WHERE attrelid = v_oid AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+    EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', p_table, v_default);
+    EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%s) TO (%s)',
+                   v_name, p_table, v_from, v_to);
+    EXECUTE format('INSERT INTO %I (%s) SELECT %s FROM %I WHERE %I >= %s AND %I < %s',
+                   v_name, v_cols, v_cols, v_default, v_column, v_from, v_column, v_to);
+    EXECUTE format('DELETE FROM %I WHERE %I >= %s AND %I < %s',
+                   v_default, v_column, v_from, v_column, v_to);
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', p_table, v_default);
+    RETURN v_name;
+END;
+$fn$;
+
+CREATE OR REPLACE FUNCTION pronto_partition_convert(p_table text, p_column text, p_premake integer DEFAULT 3)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+    v_oid oid := to_regclass(p_table);
+    v_legacy text := left(p_table, 56) || '_legacy';
+    v_check text := left(p_table, 50) || '_legacy_bound';
+    v_first date := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '1 month')::date;
+    v_bound text;
+    v_refs text;
+    v_pk_name text;
+    v_pk_legacy text;
+    v_pk_cols name[];
+    v_index_names text[];
+    v_index_defs text[];
+    v_fk_names text[];
+    v_fk_defs text[];
+    r record;
+    i integer;
+BEGIN
+    IF v_oid IS NULL THEN
+        RAISE EXCEPTION 'pronto_partition_convert: % no existe', p_table;
+    END IF;
+    IF (SELECT relkind FROM pg_class WHERE oid = v_oid) = 'p' THEN
+        RETURN false;
+    END IF;
+
+    SELECT string_agg(conrelid::regclass::text || '.' || conname, ', ') INTO v_refs
+    FROM pg_constraint
+    WHERE confrelid = v_oid AND contype = 'f';
+    IF v_refs IS NOT NULL THEN
+        RAISE EXCEPTION 'pronto_partition_convert: % es referenciada por FKs (%)', p_table, v_refs
+            USING HINT = 'Una tabla particionada solo puede ser referenciada por una clave que incluya la columna de partición.';
+    END IF;
+
+    v_bound := pronto_partition_literal(v_oid, p_column, v_first);
+    IF v_bound IS NULL THEN
+        RAISE EXCEPTION 'pronto_partition_convert: %.% no existe', p_table, p_column;
+    END IF;
+
+    EXECUTE format('LOCK TABLE %I IN ACCESS EXCLUSIVE MODE', p_table);
+
+    -- The partition key must be NOT NULL (it becomes part of the primary key).
+    -- Rows without timestamp go to the oldest end so they are archived first.
+    EXECUTE format('UPDATE %I SET %I = %L WHERE %I IS NULL', p_table, p_column, 'epoch', p_column);
+    -- One validating scan; SET NOT NULL and ATTACH PARTITION reuse this CHECK.
+    EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I CHECK (%I IS NOT NULL AND %I < %s)',
+                   p_table, v_check, p_column, p_column, v_bound);
+    EXECUTE format('ALTER TABLE %I ALTER COLUMN %I SET NOT NULL', p_table, p_column);
+
+    SELECT c.conname, array_agg(a.attname ORDER BY k.ord) INTO v_pk_name, v_pk_cols
+    FROM pg_constraint c
+    CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum
+    WHERE c.conrelid = v_oid AND c.contype = 'p'
+    GROUP BY c.conname;
+
+    -- Unique indexes without the partition column cannot exist on the parent;
+    -- they stay enforced on the legacy partition only.
+    SELECT array_agg(ic.relname::text ORDER BY ic.relname), array_agg(pg_get_indexdef(ix.indexrelid) ORDER BY ic.relname)
+    INTO v_index_names, v_index_defs
+    FROM pg_index ix
+    JOIN pg_class ic ON ic.oid = ix.indexrelid
+    WHERE ix.indrelid = v_oid
+      AND NOT ix.indisprimary
+      AND (NOT ix.indisunique
+           OR (SELECT attnum FROM pg_attribute WHERE attrelid = v_oid AND attname = p_column) = ANY (ix.indkey::int2[]));
+
+    SELECT array_agg(conname::text ORDER BY conname), array_agg(pg_get_constraintdef(oid) ORDER BY conname)
+    INTO v_fk_names, v_fk_defs
+    FROM pg_constraint
+    WHERE conrelid = v_oid AND contype = 'f';
+
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', p_table, v_legacy);
+    IF v_pk_name IS NOT NULL THEN
+        v_pk_legacy := left(v_pk_name, 56) || '_legacy';
+        EXECUTE format('ALTER TABLE %I RENAME CONSTRAINT %I TO %I', v_legacy, v_pk_name, v_pk_legacy);
+    END IF;
+    FOR i IN 1..coalesce(array_length(v_index_names, 1), 0) LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', v_index_names[i], left(v_index_names[i], 56) || '_legacy');
+    END LOOP;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED '
+        'INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE (%I)',
+        p_table, v_legacy, p_column);
+    EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', p_table, v_check);
+
+    IF v_pk_name IS NOT NULL THEN
+        IF NOT p_column = ANY (v_pk_cols) THEN
+            v_pk_cols := v_pk_cols || p_column::name;
+            -- ATTACH PARTITION adopts a matching primary key but cannot replace a
+            -- different one: the legacy key gains the partition column as well.
+            EXECUTE format('CREATE UNIQUE INDEX %I ON %I (%s)', left(v_pk_name, 52) || '_partkey', v_legacy,
+                           (SELECT string_agg(quote_ident(col), ', ') FROM unnest(v_pk_cols) AS col));
+            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I, ADD CONSTRAINT %I PRIMARY KEY USING INDEX %I',
+                           v_legacy, v_pk_legacy, v_pk_legacy, left(v_pk_name, 52) || '_partkey');
+        END IF;
+        EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I PRIMARY KEY (%s)', p_table, v_pk_name,
+                       (SELECT string_agg(quote_ident(col), ', ') FROM unnest(v_pk_cols) AS col));
+    END IF;
+    -- Same definitions and names as before; ATTACH PARTITION adopts the
+    -- matching legacy indexes and FKs instead of building/validating them again.
+    FOR i IN 1..coalesce(array_length(v_index_defs, 1), 0) LOOP
+        EXECUTE v_index_defs[i];
+    END LOOP;
+    FOR i IN 1..coalesce(array_length(v_fk_names, 1), 0) LOOP
+        EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I %s', p_table, v_fk_names[i], v_fk_defs[i]);
+    END LOOP;
+
+    -- SERIAL ids keep their sequence; it must outlive the legacy partition.
+    FOR r IN
+        SELECT a.attname, pg_get_serial_sequence(quote_ident(v_legacy), a.attname) AS seq
+        FROM pg_attribute a
+        WHERE a.attrelid = v_oid AND a.attnum > 0 AND NOT a.attisdropped
+    LOOP
+        IF r.seq IS NOT NULL THEN
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.%I', r.seq, p_table, r.attname);
+        END IF;
+    END LOOP;
+
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (MINVALUE) TO (%s)', p_table, v_legacy, v_bound);
+    EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', left(p_table, 55) || '_default', p_table);
+    FOR i IN 0..p_premake LOOP
+        PERFORM pronto_partition_add(p_table, (v_first + make_interval(months => i))::date);
+    END LOOP;
+
+    UPDATE pronto_partition_config
+    SET converted_at = now(), updated_at = now()
+    WHERE table_name = p_table;
+    RETURN true;
+END;
+$fn$;
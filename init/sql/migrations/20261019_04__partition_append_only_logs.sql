@@ -0,0 +1,25 @@
+-- Migration: 20261019_04__partition_append_only_logs.sql
+-- Purpose: Convert the enabled tables of pronto_partition_config to monthly range
+-- partitions (pronto_order_status_history, pronto_payment_audit_logs,
+-- pronto_audit_logs).
+-- Existing rows stay where they are: each table becomes the <table>_legacy
+-- partition (everything before next month); one validating scan per table, no
+-- copy. Queries, INSERTs and DELETEs keep using the original table name.
+-- Primary keys become (id, <partition column>). Later months are created by
+-- `pronto-partitions maintain` (cron), which also archives expired partitions.
+
+DO $$
+DECLARE
+    r record;
+BEGIN
+    FOR r IN
+        SELECT table_name, column_name, premake_months
+        FROM pronto_partition_config
+        WHERE enabled AND to_regclass(table_name) IS NOT NULL
+        ORDER BY table_name
+    LOOP
+        IF pronto_partition_convert(r.table_name, r.column_name, r.premake_months) THEN
+            RAISE NOTICE 'partitioned: %', r.table_name;
+        END IF;
+    END LOOP;
+END $$;
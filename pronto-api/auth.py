@@ -2,12 +2,19 @@
 Authentication endpoints for clients API.
 """
 
+import hashlib
+import json
 import logging
+import os
 import secrets
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from http import HTTPStatus
+from pathlib import Path
+from typing import NamedTuple
 
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from sqlalchemy.exc import IntegrityError
 
 from pronto_shared.utils.input_sanitizer import (
@@ -389,35 +396,93 @@ def update_customer(customer_id: int):
         ), HTTPStatus.OK
 
 
-@auth_bp.get("/avatars")
-def get_available_avatars():
-    """Get list of available predefined avatars."""
-    from pathlib import Path
+# Avatars only change on deploy: the catalog is built once per worker and only
+# rebuilt when the directory mtime changes (checked at most every N seconds).
+AVATAR_CATALOG_RECHECK_SECONDS = 30.0
+
 
-    avatars_dir = Path(current_app.static_folder) / "avatars"
+class AvatarSnapshot(NamedTuple):
+    """Immutable view of the avatar directory; swapped in as a whole."""
 
-    if not avatars_dir.exists():
-        return jsonify({"avatars": []}), HTTPStatus.OK
+    filenames: frozenset[str]
+    body: bytes
+    etag: str
 
-    avatar_files = sorted([f.name for f in avatars_dir.glob("*.svg")])
 
-    avatars = [
-        {
-            "filename": filename,
-            "url": f"/static/avatars/{filename}",
-            "name": filename.replace("avatar-", "").replace(".svg", "").upper(),
-        }
-        for filename in avatar_files
-    ]
+EMPTY_AVATAR_SNAPSHOT = AvatarSnapshot(frozenset(), b"", "")
 
-    return jsonify({"avatars": avatars}), HTTPStatus.OK
+
+class AvatarCatalog:
+    """Per-worker cache of the predefined avatars under ``static/avatars``.
+
+    ``snapshot`` and ``_source`` are replaced with single assignments, so a
+    request that reads the snapshot once never mixes filenames/body/etag from
+    two different builds.
+    """
+
+    def __init__(self, recheck_seconds: float = AVATAR_CATALOG_RECHECK_SECONDS):
+        self.recheck_seconds = recheck_seconds
+        self._lock = threading.Lock()
+        self._source: tuple[Path | None, int | None] = (None, None)
+        self._checked_at = 0.0
+        self.snapshot = EMPTY_AVATAR_SNAPSHOT
+
+    @staticmethod
+    def _build(directory: Path, mtime_ns: int | None) -> AvatarSnapshot:
+        filenames = sorted(f.name for f in directory.glob("*.svg")) if mtime_ns else []
+        avatars = [
+            {
+                "filename": filename,
+                "url": f"/static/avatars/{filename}",
+                "name": filename.replace("avatar-", "").replace(".svg", "").upper(),
+            }
+            for filename in filenames
+        ]
+        body = json.dumps({"avatars": avatars}, separators=(",", ":")).encode("utf-8")
+        return AvatarSnapshot(frozenset(filenames), body, hashlib.sha256(body).hexdigest()[:32])
+
+    def refresh(self, directory: Path) -> AvatarSnapshot:
+        now = time.monotonic()
+        if directory == self._source[0] and now - self._checked_at < self.recheck_seconds:
+            return self.snapshot
+
+        with self._lock:
+            try:
+                mtime_ns: int | None = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                mtime_ns = None
+            source = (directory, mtime_ns)
+            if source != self._source or self.snapshot is EMPTY_AVATAR_SNAPSHOT:
+                self.snapshot = self._build(directory, mtime_ns)
+                self._source = source
+            self._checked_at = now
+            return self.snapshot
+
+
+_avatar_catalog = AvatarCatalog()
+
+
+def get_avatar_catalog() -> AvatarSnapshot:
+    return _avatar_catalog.refresh(Path(current_app.static_folder) / "avatars")
+
+
+@auth_bp.get("/avatars")
+def get_available_avatars():
+    """Get list of available predefined avatars."""
+    catalog = get_avatar_catalog()  # one snapshot for the whole response
+
+    if request.if_none_match.contains(catalog.etag):
+        response = Response(status=HTTPStatus.NOT_MODIFIED)
+    else:
+        response = Response(catalog.body, status=HTTPStatus.OK, mimetype="application/json")
+    response.set_etag(catalog.etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 @auth_bp.patch("/auth/update/<int:customer_id>/avatar")
 def update_customer_avatar(customer_id: int):
     """Update customer avatar."""
-    from pathlib import Path
-
     from pronto_shared.db import get_session
     from pronto_shared.models import Customer
 
@@ -427,10 +492,7 @@ def update_customer_avatar(customer_id: int):
     if not avatar:
         return jsonify({"error": "Avatar filename is required"}), HTTPStatus.BAD_REQUEST
 
-    avatars_dir = Path(current_app.static_folder) / "avatars"
-    avatar_path = avatars_dir / avatar
-
-    if not avatar_path.exists():
+    if not isinstance(avatar, str) or avatar not in get_avatar_catalog().filenames:
         return jsonify({"error": "Avatar not found"}), HTTPStatus.NOT_FOUND
 
     with get_session() as db_session:
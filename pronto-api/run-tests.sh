@@ -85,12 +85,33 @@ if [ "$1" = "--help" ] || [ "$1" = "-h" ]; then
     echo "  --health                Solo health endpoints"
     echo "  --output FILE, -o FILE  Guardar resultados en JSON"
     echo "  --quiet, -q             Modo silencioso"
+    echo "  --parallel N            Lecturas independientes en paralelo (default: 8)"
+    echo "  --load                  Modo carga (percentiles por endpoint)"
+    echo "  --duration SECONDS      Duración del modo carga (default: 30)"
+    echo "  --rps N                 Carga a tasa fija (lazo abierto)"
+    echo "  --concurrency N         Carga con N clientes concurrentes"
+    echo "  --workers N             Repartir la carga en N procesos (evita el techo del GIL)"
+    echo "  --max-in-flight N       Con --rps: tope de peticiones en vuelo (default: 1000)"
+    echo "  --token-pool N          Carga/soak con N clientes, cada uno con su token"
+    echo "  --employee-accounts F   JSON [{email, password}] de empleados para el pool"
+    echo "  --token-cache FILE      Caché de JWT del pool (default: ~/.cache/pronto/load_tokens.json)"
+    echo "  --endpoints A,B         Filtrar endpoints del modo carga"
+    echo "  --save-baseline FILE    Guardar latencias por endpoint como baseline"
+    echo "  --compare BASELINE      Fallar si hay regresiones significativas"
+    echo "  --budget FILE           Fallar si algún endpoint excede su p95"
+    echo "  --samples N             Muestras por endpoint (default: 30)"
+    echo "  --soak DURATION         Carga sostenida (ej. 2h) midiendo RSS, fds y conexiones pg"
     echo ""
     echo "Ejemplos:"
     echo "  $0                      # Tests completos"
     echo "  $0 --simple             # Tests simples"
     echo "  $0 --auth-mode          # Login + tests autenticados"
     echo "  $0 -o results.json      # Guardar resultados"
+    echo "  $0 --load --concurrency 50 --endpoints 'Get Menu,Create Order'"
+    echo "  $0 --load --rps 4000 --workers 4"
+    echo "  $0 --load --concurrency 200 --token-pool 200"
+    echo "  $0 --compare baseline.json --budget budget.json"
+    echo "  $0 --soak 2h --rps 20 -o soak.json"
     echo ""
 echo "Variables de entorno:"
 echo "  API_BASE_URL         URL core API (default: http://localhost:6082)"
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Benchmark del harness de pruebas contra ``stub_api_server.py``.
+
+Levanta el stub en un puerto libre y ejecuta ``run_api_tests.py --load`` (el
+mismo CLI que se usa contra el stack real) fijado a un solo núcleo; el stub
+corre en los núcleos restantes para no competir por CPU. Dos pruebas:
+
+- overhead: lazo cerrado con concurrencia 1 y latencia fija del stub. Lo que
+  exceda a esa latencia es costo del harness + red local + framework del stub
+  (cota superior del overhead del harness). Falla si p50/p99 superan
+  ``--max-overhead-ms`` / ``--max-overhead-p99-ms``.
+- throughput: lazo abierto a ``--target-rps``. Falla si el harness no sostiene
+  al menos el 95% de la tasa, si hay errores, o si el p99 (medido desde el
+  instante programado) supera ``--max-p99-ms``.
+
+Usage:
+    python bench_harness.py
+    python bench_harness.py --target-rps 2000 --duration 20 -o bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.request import urlopen
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+MIN_THROUGHPUT_RATIO = 0.95
+
+
+class Colors:
+    HEADER = "\033[95m"
+    OKGREEN = "\033[92m"
+    WARNING = "\033[93m"
+    FAIL = "\033[91m"
+    BOLD = "\033[1m"
+    ENDC = "\033[0m"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _pin(cpus: set[int] | None):
+    """preexec_fn que fija el proceso hijo a ``cpus`` (solo Linux)."""
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return None
+    return lambda: os.sched_setaffinity(0, cpus)
+
+
+def _cpu_split(harness_cpu: int) -> tuple[set[int] | None, set[int] | None]:
+    if not hasattr(os, "sched_getaffinity"):
+        return None, None
+    available = os.sched_getaffinity(0)
+    if harness_cpu not in available:
+        harness_cpu = min(available)
+    rest = available - {harness_cpu}
+    return {harness_cpu}, (rest or None)
+
+
+def start_stub(port: int, latency: str, cpus: set[int] | None) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(SCRIPTS_DIR / "stub_api_server.py"),
+            "--port",
+            str(port),
+            "--latency",
+            latency,
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        preexec_fn=_pin(cpus),
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{Colors.FAIL}El stub terminó al arrancar{Colors.ENDC}")
+        try:
+            with urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit(f"{Colors.FAIL}El stub no respondió en 10s{Colors.ENDC}")
+
+
+def run_load(
+    port: int, extra_args: list[str], cpus: set[int] | None, verbose: bool
+) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as handle:
+        output = handle.name
+    try:
+        env = dict(os.environ, API_BASE_URL=f"http://127.0.0.1:{port}")
+        subprocess.run(
+            [
+                sys.executable,
+                str(SCRIPTS_DIR / "run_api_tests.py"),
+                "--load",
+                "--quiet",
+                "--output",
+                output,
+                *extra_args,
+            ],
+            env=env,
+            check=True,
+            stdout=None if verbose else subprocess.DEVNULL,
+            preexec_fn=_pin(cpus),
+        )
+        return json.loads(Path(output).read_text())["load"]
+    finally:
+        os.unlink(output)
+
+
+def _check(
+    name: str, value: float | None, limit: float, higher_is_better: bool = False
+):
+    """Sin muestras exitosas (``value`` None) el chequeo se reporta como fallido."""
+    if value is None:
+        passed = False
+    else:
+        passed = value >= limit if higher_is_better else value <= limit
+    return {"check": name, "value": value, "limit": limit, "passed": passed}
+
+
+def bench_overhead(args, port: int, cpus: set[int] | None) -> list[dict]:
+    load = run_load(
+        port,
+        ["--concurrency", "1", "--duration", str(args.duration)],
+        cpus,
+        args.verbose,
+    )
+    latency = load["total"]["latency_ms"]
+
+    def overhead(quantile: str) -> float | None:
+        value = latency[quantile]
+        return None if value is None else value - args.stub_latency_ms
+
+    return [
+        _check("overhead p50 (ms)", overhead("p50"), args.max_overhead_ms),
+        _check("overhead p99 (ms)", overhead("p99"), args.max_overhead_p99_ms),
+        _check("errores", load["total"]["errors"], 0),
+    ]
+
+
+def bench_throughput(args, port: int, cpus: set[int] | None) -> list[dict]:
+    load = run_load(
+        port,
+        ["--rps", str(args.target_rps), "--duration", str(args.duration)],
+        cpus,
+        args.verbose,
+    )
+    total = load["total"]
+    return [
+        _check(
+            "throughput (rps)",
+            total["throughput_rps"],
+            args.target_rps * MIN_THROUGHPUT_RATIO,
+            higher_is_better=True,
+        ),
+        _check(
+            "p99 desde lo programado (ms)", total["latency_ms"]["p99"], args.max_p99_ms
+        ),
+        _check("errores", total["errors"], 0),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark del harness de run_api_tests.py contra el stub",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Segundos por prueba (default: 10)"
+    )
+    parser.add_argument(
+        "--target-rps",
+        type=float,
+        default=500.0,
+        help="Tasa a sostener en un núcleo (default: 500)",
+    )
+    parser.add_argument(
+        "--stub-latency-ms",
+        type=float,
+        default=1.0,
+        help="Latencia fija del stub en la prueba de overhead (default: 1)",
+    )
+    parser.add_argument(
+        "--max-overhead-ms",
+        type=float,
+        default=2.0,
+        help="Overhead p50 máximo por petición (default: 2)",
+    )
+    parser.add_argument(
+        "--max-overhead-p99-ms",
+        type=float,
+        default=10.0,
+        help="Overhead p99 máximo por petición (default: 10)",
+    )
+    parser.add_argument(
+        "--max-p99-ms",
+        type=float,
+        default=50.0,
+        help="p99 máximo en la prueba de throughput (default: 50)",
+    )
+    parser.add_argument(
+        "--harness-cpu", type=int, default=0, help="Núcleo del harness (default: 0)"
+    )
+    parser.add_argument(
+        "--output", "-o", metavar="FILE", help="Guardar resultados en JSON"
+    )
+    parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Mostrar salida del harness"
+    )
+    args = parser.parse_args()
+
+    harness_cpus, stub_cpus = _cpu_split(args.harness_cpu)
+    print(f"{Colors.BOLD}=== Benchmark del harness ==={Colors.ENDC}")
+    print(
+        f"Harness en CPU {sorted(harness_cpus or [])}, stub en {sorted(stub_cpus or [])}"
+    )
+    if harness_cpus and not stub_cpus:
+        print(
+            f"{Colors.WARNING}⚠ Un solo núcleo disponible: stub y harness "
+            f"compiten por CPU{Colors.ENDC}"
+        )
+
+    results: dict[str, list[dict]] = {}
+    port = _free_port()
+    stub = start_stub(port, f"fixed:{args.stub_latency_ms:g}", stub_cpus)
+    try:
+        results["overhead"] = bench_overhead(args, port, harness_cpus)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    port = _free_port()
+    stub = start_stub(port, "fixed:0", stub_cpus)
+    try:
+        results["throughput"] = bench_throughput(args, port, harness_cpus)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    failed = False
+    for name, checks in results.items():
+        print(f"\n{Colors.HEADER}{name}{Colors.ENDC}")
+        for item in checks:
+            failed |= not item["passed"]
+            mark = (
+                f"{Colors.OKGREEN}✓{Colors.ENDC}"
+                if item["passed"]
+                else f"{Colors.FAIL}✗{Colors.ENDC}"
+            )
+            value = "sin datos" if item["value"] is None else f"{item['value']:.2f}"
+            print(
+                f"  {mark} {item['check']:<32} {value:>10}  "
+                f"(límite {item['limit']:g})"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "target_rps": args.target_rps,
+                    "duration": args.duration,
+                    "harness_cpus": sorted(harness_cpus or []),
+                    "results": results,
+                    "passed": not failed,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\n{Colors.OKGREEN}Results saved to {args.output}{Colors.ENDC}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
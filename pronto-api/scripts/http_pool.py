@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Pool de conexiones HTTP keep-alive para los runners síncronos.
+
+``urllib.request.urlopen`` abre una conexión TCP (y TLS) nueva en cada llamada,
+así que contra un balanceador remoto el handshake domina la latencia medida.
+``ConnectionPool`` reutiliza conexiones ``http.client`` por (esquema, host,
+puerto) y separa en cada respuesta:
+
+- ``connect``: tiempo de abrir la conexión (TCP + TLS); 0 si se reutilizó.
+- ``server``: desde enviar la petición hasta recibir la respuesta completa.
+
+Solo usa la biblioteca estándar.
+"""
+
+from __future__ import annotations
+
+import http.client
+import ssl
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_IDLE_PER_HOST = 4
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+# Errores típicos de una conexión keep-alive que el servidor cerró estando ociosa.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+HostKey = tuple[str, str, int]
+
+
+@dataclass
+class PooledResponse:
+    status: int
+    headers: http.client.HTTPMessage
+    body: bytes
+    connect: float = 0.0
+    server: float = 0.0
+    reused: bool = False
+
+    @property
+    def duration(self) -> float:
+        return self.connect + self.server
+
+    def header_values(self, name: str) -> list[str]:
+        return self.headers.get_all(name) or []
+
+
+@dataclass
+class PoolStats:
+    requests: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    stale_retries: int = 0
+    connect_seconds: float = 0.0
+    server_seconds: float = 0.0
+    by_host: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "stale_retries": self.stale_retries,
+            "connect_ms": round(self.connect_seconds * 1000, 3),
+            "server_ms": round(self.server_seconds * 1000, 3),
+            "by_host": dict(self.by_host),
+        }
+
+
+class ConnectionPool:
+    """Conexiones ``http.client`` persistentes agrupadas por host."""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_idle_per_host: int = DEFAULT_MAX_IDLE_PER_HOST,
+        ssl_context: ssl.SSLContext | None = None,
+    ):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.stats = PoolStats()
+        self._idle: dict[HostKey, list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    # -- conexiones --------------------------------------------------------
+
+    @staticmethod
+    def _host_key(url: str) -> tuple[HostKey, str]:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in {"http", "https"}:
+            raise ValueError(f"Esquema no soportado: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        return (scheme, parts.hostname or "", port), path
+
+    def _checkout(self, key: HostKey) -> http.client.HTTPConnection | None:
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn = idle.pop()
+                # sock=None: http.client reconectaría en silencio y el tiempo de
+                # conexión se mediría como tiempo de servidor.
+                if conn.sock is not None:
+                    return conn
+            return None
+
+    def _checkin(self, key: HostKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _open(self, key: HostKey) -> tuple[http.client.HTTPConnection, float]:
+        scheme, host, port = key
+        if scheme == "https":
+            conn: http.client.HTTPConnection = http.client.HTTPSConnection(
+                host, port, timeout=self.timeout, context=self.ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        started = time.perf_counter()
+        conn.connect()
+        elapsed = time.perf_counter() - started
+        self.stats.connections_opened += 1
+        return conn, elapsed
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # -- peticiones --------------------------------------------------------
+
+    def _send(
+        self,
+        key: HostKey,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: dict[str, str],
+    ) -> PooledResponse:
+        conn = self._checkout(key)
+        reused = conn is not None
+        connect = 0.0
+        if conn is None:
+            conn, connect = self._open(key)
+
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            payload = response.read()
+        except STALE_CONNECTION_ERRORS:
+            conn.close()
+            if not reused:
+                raise
+            # El servidor cerró la conexión ociosa antes de leer la petición:
+            # reintentar una vez con una conexión nueva.
+            self.stats.stale_retries += 1
+            conn, connect = self._open(key)
+            reused = False
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            conn.close()
+            raise
+        server = time.perf_counter() - started
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+
+        if reused:
+            self.stats.connections_reused += 1
+        return PooledResponse(
+            status=response.status,
+            headers=response.headers,
+            body=payload,
+            connect=connect,
+            server=server,
+            reused=reused,
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        follow_redirects: bool = True,
+    ) -> PooledResponse:
+        """Enviar una petición; lanza ``OSError``/``http.client.HTTPException``."""
+        headers = dict(headers or {})
+        connect = 0.0
+        server = 0.0
+        for _ in range(MAX_REDIRECTS + 1):
+            key, path = self._host_key(url)
+            response = self._send(key, method, path, body, headers)
+            connect += response.connect
+            server += response.server
+            self.stats.requests += 1
+            host = f"{key[0]}://{key[1]}:{key[2]}"
+            self.stats.by_host[host] = self.stats.by_host.get(host, 0) + 1
+
+            location = response.headers.get("Location")
+            if not (
+                follow_redirects and response.status in REDIRECT_STATUSES and location
+            ):
+                break
+            url = urljoin(url, location)
+            if response.status == 303 or (
+                response.status in {301, 302} and method == "POST"
+            ):
+                method, body = "GET", None
+                headers.pop("Content-Type", None)
+
+        self.stats.connect_seconds += connect
+        self.stats.server_seconds += server
+        response.connect = connect
+        response.server = server
+        return response
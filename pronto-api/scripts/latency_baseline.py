@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+Baselines de latencia y presupuestos (budget) por endpoint para run_api_tests.py.
+
+- ``collect_samples``: mide cada endpoint del catálogo ``samples`` veces, en
+  rondas secuenciales (round-robin) para que la deriva del entorno afecte a
+  todos por igual. La primera ronda es de calentamiento y se descarta.
+- ``SampleSet``: muestras crudas (ms) por ``"METHOD /ruta/{id}"``; se guarda en
+  disco como baseline y se recarga con ``from_dict``.
+- ``compare``: prueba U de Mann-Whitney de una cola por endpoint, con p-values
+  ajustados por Holm-Bonferroni. Un endpoint regresa si la diferencia es
+  significativa (``p < alpha``) *y* la mediana empeora al menos ``min_change``
+  (evita marcar ruido de microsegundos).
+- ``check_budget``: límites de p95 por endpoint declarados en un JSON::
+
+      {
+        "default_p95_ms": 500,
+        "endpoints": {
+          "GET /api/client/menu": 150,
+          "Create Order": {"p95_ms": 400}
+        }
+      }
+
+  Las claves aceptan ``"METHOD /ruta/{id}"`` o el nombre del check.
+
+Las respuestas no-2xx no aportan latencia pero se cuentan por endpoint: un
+endpoint con baseline o budget que no tiene ninguna muestra exitosa, o cuya
+tasa de error supera ``max_error_rate``, falla igual que una regresión; una
+clave del budget que nunca se midió también falla.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from latency_histogram import LatencyHistogram
+
+RequestFn = Callable[..., Awaitable[tuple[int, Any, float]]]
+
+BASELINE_VERSION = 1
+DEFAULT_SAMPLES = 30
+DEFAULT_ALPHA = 0.01
+DEFAULT_MIN_CHANGE = 0.10
+DEFAULT_MAX_ERROR_RATE = 0.01
+
+_UUID_RE = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I
+)
+
+
+def route_template(endpoint: str) -> str:
+    """``/api/orders/123/items?x=1`` -> ``/api/orders/{id}/items``."""
+    path = endpoint.split("?", 1)[0]
+    parts = [
+        "{id}" if part.isdigit() or _UUID_RE.match(part) else part
+        for part in path.split("/")
+    ]
+    return "/".join(parts)
+
+
+def route_key(method: str, endpoint: str) -> str:
+    return f"{method.upper()} {route_template(endpoint)}"
+
+
+# -- muestras --------------------------------------------------------------
+
+
+@dataclass
+class EndpointSamples:
+    name: str
+    method: str
+    route: str
+    samples_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def key(self) -> str:
+        return f"{self.method} {self.route}"
+
+    @property
+    def requests(self) -> int:
+        return len(self.samples_ms) + self.errors
+
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def histogram(self) -> LatencyHistogram:
+        histogram = LatencyHistogram()
+        for value in self.samples_ms:
+            histogram.record(value / 1000.0)
+        return histogram
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "method": self.method,
+            "route": self.route,
+            "errors": self.errors,
+            "summary": self.histogram().summary(),
+            "samples_ms": [round(value, 3) for value in self.samples_ms],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "EndpointSamples":
+        return cls(
+            name=data["name"],
+            method=data["method"],
+            route=data["route"],
+            samples_ms=[float(value) for value in data.get("samples_ms", [])],
+            errors=int(data.get("errors", 0)),
+        )
+
+
+@dataclass
+class SampleSet:
+    base_url: str
+    samples: int
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    endpoints: dict[str, EndpointSamples] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": BASELINE_VERSION,
+            "created_at": self.created_at,
+            "base_url": self.base_url,
+            "samples": self.samples,
+            "endpoints": {
+                key: stats.to_dict() for key, stats in sorted(self.endpoints.items())
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SampleSet":
+        if data.get("version") != BASELINE_VERSION:
+            raise ValueError(
+                f"Versión de baseline no soportada: {data.get('version')!r}"
+            )
+        result = cls(
+            base_url=data.get("base_url", ""),
+            samples=int(data.get("samples", 0)),
+            created_at=data.get("created_at", ""),
+        )
+        for key, stats in data.get("endpoints", {}).items():
+            result.endpoints[key] = EndpointSamples.from_dict(stats)
+        return result
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+    @classmethod
+    def load(cls, path: str | Path) -> "SampleSet":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+async def collect_samples(
+    request: RequestFn,
+    checks: list,
+    *,
+    base_url: str,
+    samples: int = DEFAULT_SAMPLES,
+    warmup: int = 1,
+    progress: bool = True,
+) -> SampleSet:
+    """Medir ``samples`` veces cada check, una petición a la vez."""
+    result = SampleSet(base_url=base_url, samples=samples)
+    rounds = warmup + samples
+    for round_number in range(rounds):
+        for check in checks:
+            kwargs = {"json": check.json} if check.json is not None else {}
+            status, _, duration = await request(check.method, check.endpoint, **kwargs)
+            if round_number < warmup:
+                continue
+            key = route_key(check.method, check.endpoint)
+            stats = result.endpoints.get(key)
+            if stats is None:
+                stats = EndpointSamples(
+                    check.name, check.method.upper(), route_template(check.endpoint)
+                )
+                result.endpoints[key] = stats
+            if 200 <= status < 300:
+                stats.samples_ms.append(duration * 1000.0)
+            else:
+                stats.errors += 1
+        if progress:
+            sys.stdout.write(f"\r  ronda {round_number + 1}/{rounds}")
+            sys.stdout.flush()
+    if progress:
+        print()
+    return result
+
+
+# -- comparación -----------------------------------------------------------
+
+
+def _normal_sf(z: float) -> float:
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+def mann_whitney_u(
+    baseline: list[float], current: list[float]
+) -> tuple[float, float, float]:
+    """Prueba U (aprox. normal con corrección de empates y continuidad).
+
+    Retorna ``(U, p_mayor, p_menor)``: probabilidad de una cola de que
+    ``current`` sea estocásticamente mayor / menor que ``baseline``.
+    """
+    n1, n2 = len(baseline), len(current)
+    if n1 == 0 or n2 == 0:
+        return 0.0, 1.0, 1.0
+
+    combined = sorted(
+        [(value, 0) for value in baseline] + [(value, 1) for value in current]
+    )
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        rank = (i + j) / 2.0 + 1.0
+        for k in range(i, j + 1):
+            ranks[k] = rank
+        ties = j - i + 1
+        tie_term += ties**3 - ties
+        i = j + 1
+
+    rank_sum_current = sum(rank for rank, (_, group) in zip(ranks, combined) if group)
+    u_current = rank_sum_current - n2 * (n2 + 1) / 2.0
+    mean = n1 * n2 / 2.0
+    n = n1 + n2
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u_current, 1.0, 1.0
+    sd = math.sqrt(variance)
+    p_greater = _normal_sf((u_current - mean - 0.5) / sd)
+    p_less = _normal_sf((mean - u_current - 0.5) / sd)
+    return u_current, p_greater, p_less
+
+
+def _median(values: list[float]) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+
+FAILING_VERDICTS = frozenset({"regression", "missing", "errors"})
+
+
+@dataclass
+class Comparison:
+    key: str
+    name: str
+    verdict: str
+    baseline_p50_ms: float | None = None
+    current_p50_ms: float | None = None
+    change: float | None = None
+    p_value: float | None = None
+    error_rate: float = 0.0
+
+    @property
+    def failed(self) -> bool:
+        return self.verdict in FAILING_VERDICTS
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "name": self.name,
+            "verdict": self.verdict,
+            "baseline_p50_ms": self.baseline_p50_ms,
+            "current_p50_ms": self.current_p50_ms,
+            "change": self.change,
+            "p_value": self.p_value,
+            "error_rate": self.error_rate,
+            "failed": self.failed,
+        }
+
+
+def holm_adjust(p_values: list[float]) -> list[float]:
+    """p-values ajustados por Holm-Bonferroni (control del error por familia)."""
+    m = len(p_values)
+    order = sorted(range(m), key=lambda index: p_values[index])
+    adjusted = [1.0] * m
+    running = 0.0
+    for position, index in enumerate(order):
+        running = max(running, min((m - position) * p_values[index], 1.0))
+        adjusted[index] = running
+    return adjusted
+
+
+def compare(
+    baseline: SampleSet,
+    current: SampleSet,
+    *,
+    alpha: float = DEFAULT_ALPHA,
+    min_change: float = DEFAULT_MIN_CHANGE,
+    max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+) -> list[Comparison]:
+    """Comparar por endpoint; ``verdict`` es regression/improvement/same/
+    missing/errors/new.
+
+    ``missing`` (en el baseline pero sin muestras exitosas ahora) y ``errors``
+    (tasa de error actual sobre ``max_error_rate``) fallan igual que
+    ``regression``; ``new`` no tiene contra qué compararse.
+
+    Con decenas de endpoints, ``alpha`` por endpoint daría falsos positivos:
+    los p-values se ajustan con Holm-Bonferroni sobre todos los comparados.
+    """
+    results: list[Comparison] = []
+    tested: list[tuple[Comparison, float, float]] = []
+    for key in sorted(set(baseline.endpoints) | set(current.endpoints)):
+        base = baseline.endpoints.get(key)
+        cur = current.endpoints.get(key)
+        if base is None or cur is None:
+            present = cur or base
+            results.append(
+                Comparison(key, present.name, "new" if base is None else "missing")
+            )
+            continue
+
+        base_p50 = _median(base.samples_ms)
+        cur_p50 = _median(cur.samples_ms)
+        error_rate = cur.error_rate()
+        if not base_p50 or cur_p50 is None:
+            results.append(
+                Comparison(
+                    key, cur.name, "missing", base_p50, cur_p50, error_rate=error_rate
+                )
+            )
+            continue
+
+        _, p_greater, p_less = mann_whitney_u(base.samples_ms, cur.samples_ms)
+        item = Comparison(
+            key,
+            cur.name,
+            "same",
+            base_p50,
+            cur_p50,
+            cur_p50 / base_p50 - 1.0,
+            error_rate=error_rate,
+        )
+        results.append(item)
+        if error_rate > max_error_rate:
+            item.verdict = "errors"
+            continue
+        tested.append((item, p_greater, p_less))
+
+    greater = holm_adjust([p_greater for _, p_greater, _ in tested])
+    less = holm_adjust([p_less for _, _, p_less in tested])
+    for (item, _, _), p_greater, p_less in zip(tested, greater, less):
+        if p_greater < alpha and item.change >= min_change:
+            item.verdict, item.p_value = "regression", p_greater
+        elif p_less < alpha and item.change <= -min_change:
+            item.verdict, item.p_value = "improvement", p_less
+        else:
+            item.p_value = min(p_greater, p_less)
+    return results
+
+
+def format_comparison(results: list[Comparison]) -> str:
+    header = (
+        f"{'Endpoint':<52} {'base p50':>9} {'p50':>9} {'cambio':>8} "
+        f"{'p':>8} {'error':>6}  resultado"
+    )
+    lines = [header, "-" * len(header)]
+    labels = {
+        "regression": "REGRESIÓN",
+        "improvement": "mejora",
+        "same": "=",
+        "missing": "SIN DATOS",
+        "errors": "ERRORES",
+        "new": "nuevo",
+    }
+
+    def _ms(value: float | None) -> str:
+        return f"{value:9.2f}" if value is not None else f"{'-':>9}"
+
+    for item in results:
+        change = f"{item.change * 100:+7.1f}%" if item.change is not None else "-"
+        p_value = f"{item.p_value:8.4f}" if item.p_value is not None else "-"
+        lines.append(
+            f"{item.key[:52]:<52} {_ms(item.baseline_p50_ms)} "
+            f"{_ms(item.current_p50_ms)} {change:>8} {p_value:>8} "
+            f"{item.error_rate * 100:5.1f}%  {labels[item.verdict]}"
+        )
+    lines.append("(latencias en ms; p = Mann-Whitney U de una cola, ajuste de Holm)")
+    return "\n".join(lines)
+
+
+# -- presupuestos ----------------------------------------------------------
+
+
+@dataclass
+class Budget:
+    default_p95_ms: float | None = None
+    endpoints: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Budget":
+        endpoints: dict[str, float] = {}
+        for key, value in data.get("endpoints", {}).items():
+            limit = value.get("p95_ms") if isinstance(value, dict) else value
+            if limit is None:
+                raise ValueError(f"Budget sin p95_ms para {key!r}")
+            method, _, path = key.partition(" ")
+            if path.startswith("/"):
+                key = route_key(method, path)
+            endpoints[key] = float(limit)
+        default = data.get("default_p95_ms")
+        return cls(
+            default_p95_ms=float(default) if default is not None else None,
+            endpoints=endpoints,
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Budget":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+    def limit_for(self, key: str, name: str) -> float | None:
+        if key in self.endpoints:
+            return self.endpoints[key]
+        if name in self.endpoints:
+            return self.endpoints[name]
+        return self.default_p95_ms
+
+
+@dataclass
+class BudgetResult:
+    key: str
+    name: str
+    limit_p95_ms: float
+    p95_ms: float | None
+    count: int
+    errors: int = 0
+    max_error_rate: float = DEFAULT_MAX_ERROR_RATE
+
+    @property
+    def exceeded(self) -> bool:
+        return self.p95_ms is not None and self.p95_ms > self.limit_p95_ms
+
+    @property
+    def error_rate(self) -> float:
+        total = self.count + self.errors
+        return self.errors / total if total else 0.0
+
+    @property
+    def verdict(self) -> str:
+        """``ok``, ``exceeded``, ``errors`` o ``missing`` (sin muestras exitosas)."""
+        if self.count == 0:
+            return "missing"
+        if self.error_rate > self.max_error_rate:
+            return "errors"
+        return "exceeded" if self.exceeded else "ok"
+
+    @property
+    def failed(self) -> bool:
+        return self.verdict != "ok"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "name": self.name,
+            "limit_p95_ms": self.limit_p95_ms,
+            "p95_ms": self.p95_ms,
+            "count": self.count,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "exceeded": self.exceeded,
+            "verdict": self.verdict,
+            "failed": self.failed,
+        }
+
+
+Measured = dict[str, tuple[str, LatencyHistogram, int]]
+
+
+def check_budget(
+    budget: Budget,
+    measured: Measured,
+    *,
+    max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+) -> list[BudgetResult]:
+    """``measured``: ``{"METHOD /ruta/{id}": (nombre, histograma, errores)}``.
+
+    El histograma sólo contiene respuestas 2xx. Las claves del budget que no
+    aparecen en ``measured`` se reportan con ``count=0`` (``missing``).
+    """
+    results: list[BudgetResult] = []
+    for key in sorted(measured):
+        name, histogram, errors = measured[key]
+        limit = budget.limit_for(key, name)
+        if limit is None:
+            continue
+        p95 = histogram.percentile_ms(95.0) if histogram.count else None
+        results.append(
+            BudgetResult(key, name, limit, p95, histogram.count, errors, max_error_rate)
+        )
+    checked = {result.key for result in results} | {result.name for result in results}
+    for key, limit in sorted(budget.endpoints.items()):
+        if key not in checked:
+            results.append(BudgetResult(key, key, limit, None, 0, 0, max_error_rate))
+    return results
+
+
+def measured_from_samples(sample_set: SampleSet) -> Measured:
+    return {
+        key: (stats.name, stats.histogram(), stats.errors)
+        for key, stats in sample_set.endpoints.items()
+    }
+
+
+def measured_from_load(report) -> Measured:
+    """Agrupar un ``LoadReport`` por plantilla de ruta (ids reemplazados).
+
+    Las llegadas descartadas por el límite de peticiones en vuelo cuentan como
+    errores: el servidor no respondió a tiempo para atenderlas.
+    """
+    measured: Measured = {}
+    for stats in report.endpoints.values():
+        key = route_key(stats.method, stats.endpoint)
+        failed = stats.errors + stats.dropped
+        if key in measured:
+            name, histogram, errors = measured[key]
+            histogram.merge(stats.histogram)
+            measured[key] = (name, histogram, errors + failed)
+        else:
+            histogram = LatencyHistogram(stats.histogram.precision_bits)
+            histogram.merge(stats.histogram)
+            measured[key] = (stats.name, histogram, failed)
+    return measured
+
+
+def format_budget(results: list[BudgetResult]) -> str:
+    header = (
+        f"{'Endpoint':<52} {'p95':>9} {'límite':>9} {'n':>6} {'error':>6}  resultado"
+    )
+    lines = [header, "-" * len(header)]
+    labels = {
+        "ok": "ok",
+        "exceeded": "EXCEDIDO",
+        "errors": "ERRORES",
+        "missing": "SIN DATOS",
+    }
+    for item in results:
+        p95 = f"{item.p95_ms:9.2f}" if item.p95_ms is not None else f"{'-':>9}"
+        lines.append(
+            f"{item.key[:52]:<52} {p95} {item.limit_p95_ms:9.2f} {item.count:>6} "
+            f"{item.error_rate * 100:5.1f}%  {labels[item.verdict]}"
+        )
+    lines.append("(latencias en ms; n = respuestas 2xx)")
+    return "\n".join(lines)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Histograma de latencias log-lineal, mergeable y serializable a JSON.
+
+Cada potencia de dos se divide en ``2**(precision_bits - 1)`` sub-buckets, así
+que el error relativo de cualquier percentil es menor a ``2**-(precision_bits-1)``
+(< 0.8% con el default de 8 bits). Los buckets se guardan dispersos
+({indice: conteo}), por lo que merge() es sumar conteos: sin pérdida entre
+workers, procesos o corridas guardadas en disco.
+
+Los valores se registran en microsegundos enteros.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+DEFAULT_PRECISION_BITS = 8
+PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    def __init__(self, precision_bits: int = DEFAULT_PRECISION_BITS):
+        if precision_bits < 2:
+            raise ValueError("precision_bits debe ser >= 2")
+        self.precision_bits = precision_bits
+        self._half = 1 << (precision_bits - 1)
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: int | None = None
+        self.max_us: int | None = None
+
+    # -- índices -----------------------------------------------------------
+
+    def _index(self, value_us: int) -> int:
+        exponent = max(value_us.bit_length() - self.precision_bits, 0)
+        return exponent * self._half + (value_us >> exponent)
+
+    def _bucket_bounds(self, index: int) -> tuple[int, int]:
+        if index < 2 * self._half:
+            return index, index
+        exponent = index // self._half - 1
+        mantissa = index - exponent * self._half
+        lower = mantissa << exponent
+        return lower, lower + (1 << exponent) - 1
+
+    # -- registro ----------------------------------------------------------
+
+    def record_us(self, value_us: int, count: int = 1) -> None:
+        value_us = max(int(value_us), 0)
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total_us += value_us * count
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = value_us if self.max_us is None else max(self.max_us, value_us)
+
+    def record(self, seconds: float) -> None:
+        self.record_us(round(seconds * 1_000_000))
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if other.precision_bits != self.precision_bits:
+            raise ValueError("No se pueden mezclar histogramas con distinta precisión")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = (
+                other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+            )
+        if other.max_us is not None:
+            self.max_us = (
+                other.max_us if self.max_us is None else max(self.max_us, other.max_us)
+            )
+        return self
+
+    # -- consultas ---------------------------------------------------------
+
+    def percentile_us(self, percentile: float) -> int | None:
+        """Valor (µs) bajo el cual cae ``percentile``% de las muestras."""
+        if self.count == 0:
+            return None
+        rank = max(math.ceil(self.count * percentile / 100.0), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                lower, upper = self._bucket_bounds(index)
+                value = (lower + upper) // 2
+                return min(max(value, self.min_us or 0), self.max_us or value)
+        return self.max_us
+
+    def percentile_ms(self, percentile: float) -> float | None:
+        value = self.percentile_us(percentile)
+        return None if value is None else value / 1000.0
+
+    def mean_ms(self) -> float | None:
+        return None if self.count == 0 else self.total_us / self.count / 1000.0
+
+    def summary(self, percentiles: tuple[float, ...] = PERCENTILES) -> dict[str, Any]:
+        """Resumen en milisegundos: count, min, mean, max y percentiles (p50, p99_9...)."""
+        result: dict[str, Any] = {
+            "count": self.count,
+            "min_ms": None if self.min_us is None else self.min_us / 1000.0,
+            "mean_ms": self.mean_ms(),
+            "max_ms": None if self.max_us is None else self.max_us / 1000.0,
+        }
+        for percentile in percentiles:
+            result[percentile_key(percentile)] = self.percentile_ms(percentile)
+        return result
+
+    # -- serialización -----------------------------------------------------
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "precision_bits": self.precision_bits,
+            "count": self.count,
+            "total_us": self.total_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "counts": {
+                str(index): count for index, count in sorted(self.counts.items())
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(int(data.get("precision_bits", DEFAULT_PRECISION_BITS)))
+        histogram.counts = {
+            int(index): int(count) for index, count in data.get("counts", {}).items()
+        }
+        histogram.count = int(data.get("count", sum(histogram.counts.values())))
+        histogram.total_us = int(data.get("total_us", 0))
+        histogram.min_us = data.get("min_us")
+        histogram.max_us = data.get("max_us")
+        return histogram
+
+    @classmethod
+    def merged(cls, histograms) -> "LatencyHistogram":
+        result: LatencyHistogram | None = None
+        for histogram in histograms:
+            if result is None:
+                result = cls(histogram.precision_bits)
+            result.merge(histogram)
+        return result if result is not None else cls()
+
+
+def percentile_key(percentile: float) -> str:
+    """50 -> 'p50', 99.9 -> 'p99_9'."""
+    text = f"{percentile:g}".replace(".", "_")
+    return f"p{text}"
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Modo de carga para run_api_tests.py.
+
+Reutiliza el catálogo de endpoints del suite (``EndpointCheck``) y el
+``request()`` de los runners async para generar carga durante un tiempo fijo:
+
+- ``rps``: lazo abierto. Las llegadas se programan a intervalos fijos y la
+  latencia se mide desde el instante programado, así que si el servidor se
+  atrasa la cola se refleja en los percentiles (sin "coordinated omission").
+- ``concurrency``: lazo cerrado. N workers envían la siguiente petición en
+  cuanto reciben la respuesta anterior.
+
+Por endpoint se reporta p50/p90/p99/p99.9, throughput y tasa de error, usando
+``LatencyHistogram`` (mergeable) y ``time.perf_counter`` (reloj monotónico).
+Los percentiles son de las respuestas 2xx; las fallidas (timeouts, 5xx) van a
+un histograma aparte para no mezclar sus latencias con las de éxito.
+
+En lazo abierto las peticiones en vuelo se limitan a ``max_in_flight``: las
+llegadas que encuentran el cupo lleno se descartan y se cuentan como
+``dropped`` en lugar de acumular tareas sin límite.
+
+Con ``run_load_workers`` la carga se reparte en N procesos (cada uno con su
+loop, su sesión HTTP y su parte de la tasa) para no topar con el GIL de un solo
+intérprete. Arrancan juntos tras una barrera y sus reportes se fusionan sin
+pérdida (los histogramas se suman bucket a bucket).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import multiprocessing
+import queue as queue_module
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from latency_histogram import LatencyHistogram, percentile_key
+
+RequestFn = Callable[..., Awaitable[tuple[int, Any, float]]]
+# (usuario virtual, check) -> headers extra, p.ej. el token de su identidad.
+HeadersFn = Callable[[int, Any], Awaitable[dict[str, str]]]
+
+REPORT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+DEFAULT_MAX_IN_FLIGHT = 1000
+PROGRESS_INTERVAL = 1.0
+WORKER_START_TIMEOUT = 60.0
+
+
+@dataclass
+class EndpointStats:
+    name: str
+    method: str
+    endpoint: str
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    error_histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    requests: int = 0
+    errors: int = 0
+    dropped: int = 0
+    statuses: dict[int, int] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.method} {self.endpoint}"
+
+    def record(self, status: int, seconds: float) -> None:
+        self.requests += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if 200 <= status < 300:
+            self.histogram.record(seconds)
+        else:
+            self.errors += 1
+            self.error_histogram.record(seconds)
+
+    def merge(self, other: "EndpointStats") -> "EndpointStats":
+        self.histogram.merge(other.histogram)
+        self.error_histogram.merge(other.error_histogram)
+        self.requests += other.requests
+        self.errors += other.errors
+        self.dropped += other.dropped
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        return self
+
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def to_dict(self, elapsed: float) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "method": self.method,
+            "endpoint": self.endpoint,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.error_rate(),
+            "dropped": self.dropped,
+            "throughput_rps": self.requests / elapsed if elapsed > 0 else 0.0,
+            "statuses": {
+                str(status): count for status, count in sorted(self.statuses.items())
+            },
+            "latency_ms": self.histogram.summary(),
+            "histogram": self.histogram.to_dict(),
+            "error_latency_ms": self.error_histogram.summary(),
+            "error_histogram": self.error_histogram.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "EndpointStats":
+        return cls(
+            name=data["name"],
+            method=data["method"],
+            endpoint=data["endpoint"],
+            histogram=LatencyHistogram.from_dict(data["histogram"]),
+            error_histogram=(
+                LatencyHistogram.from_dict(data["error_histogram"])
+                if "error_histogram" in data
+                else LatencyHistogram()
+            ),
+            requests=int(data["requests"]),
+            errors=int(data["errors"]),
+            dropped=int(data.get("dropped", 0)),
+            statuses={
+                int(status): int(count)
+                for status, count in data.get("statuses", {}).items()
+            },
+        )
+
+
+@dataclass
+class LoadReport:
+    mode: str
+    target: float
+    duration: float
+    elapsed: float = 0.0
+    endpoints: dict[str, EndpointStats] = field(default_factory=dict)
+
+    def stats_for(self, name: str, method: str, endpoint: str) -> EndpointStats:
+        key = f"{method} {endpoint}"
+        if key not in self.endpoints:
+            self.endpoints[key] = EndpointStats(name, method, endpoint)
+        return self.endpoints[key]
+
+    def total(self) -> EndpointStats:
+        total = EndpointStats("TOTAL", "*", "*")
+        for stats in self.endpoints.values():
+            total.merge(stats)
+        return total
+
+    def merge(self, other: "LoadReport") -> "LoadReport":
+        self.elapsed = max(self.elapsed, other.elapsed)
+        for key, stats in other.endpoints.items():
+            if key in self.endpoints:
+                self.endpoints[key].merge(stats)
+            else:
+                self.endpoints[key] = EndpointStats.from_dict(
+                    stats.to_dict(other.elapsed)
+                )
+        return self
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "target": self.target,
+            "duration": self.duration,
+            "elapsed": self.elapsed,
+            "total": self.total().to_dict(self.elapsed),
+            "endpoints": {
+                key: stats.to_dict(self.elapsed)
+                for key, stats in self.endpoints.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "LoadReport":
+        report = cls(
+            mode=data["mode"],
+            target=float(data["target"]),
+            duration=float(data["duration"]),
+            elapsed=float(data.get("elapsed", 0.0)),
+        )
+        for key, stats in data.get("endpoints", {}).items():
+            report.endpoints[key] = EndpointStats.from_dict(stats)
+        return report
+
+
+class LoadGenerator:
+    """Genera carga sobre una lista de ``EndpointCheck`` usando ``request``."""
+
+    def __init__(
+        self,
+        request: RequestFn,
+        checks: list,
+        *,
+        duration: float,
+        rps: float | None = None,
+        concurrency: int = 10,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        progress: bool = True,
+        phase: float = 0.0,
+        on_progress: Callable[[dict[str, Any]], None] | None = None,
+        headers_for: HeadersFn | None = None,
+    ):
+        if not checks:
+            raise ValueError("No hay endpoints para generar carga")
+        self.request = request
+        self.checks = list(checks)
+        self.duration = duration
+        self.rps = rps
+        self.concurrency = concurrency
+        self.max_in_flight = max_in_flight
+        self.progress = progress
+        self.phase = phase
+        self.on_progress = on_progress
+        self.headers_for = headers_for
+        mode = "rps" if rps else "concurrency"
+        self.report = LoadReport(
+            mode=mode, target=float(rps or concurrency), duration=duration
+        )
+        self._sequence = itertools.cycle(self.checks)
+        self._in_flight = 0
+
+    async def _send(self, check, started: float, vu: int) -> None:
+        kwargs: dict[str, Any] = {"json": check.json} if check.json is not None else {}
+        self._in_flight += 1
+        try:
+            if self.headers_for:
+                kwargs["headers"] = await self.headers_for(vu, check)
+            status, _, _ = await self.request(check.method, check.endpoint, **kwargs)
+        except Exception:
+            status = 0
+        finally:
+            self._in_flight -= 1
+        elapsed = time.perf_counter() - started
+        self.report.stats_for(check.name, check.method, check.endpoint).record(
+            status, elapsed
+        )
+
+    async def _run_open_loop(self, end: float) -> None:
+        interval = 1.0 / float(self.rps)
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        tasks: set[asyncio.Task] = set()
+        start = time.perf_counter()
+
+        async def _guarded(check, scheduled: float, vu: int) -> None:
+            try:
+                await self._send(check, scheduled, vu)
+            finally:
+                semaphore.release()
+
+        for n in itertools.count():
+            scheduled = start + self.phase + n * interval
+            if scheduled >= end:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            check = next(self._sequence)
+            if semaphore.locked():
+                # Cupo lleno: descartar la llegada en vez de encolar otra tarea.
+                self.report.stats_for(
+                    check.name, check.method, check.endpoint
+                ).dropped += 1
+                continue
+            await semaphore.acquire()
+            task = asyncio.create_task(_guarded(check, scheduled, n))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _run_closed_loop(self, end: float) -> None:
+        async def _worker(vu: int) -> None:
+            while time.perf_counter() < end:
+                await self._send(next(self._sequence), time.perf_counter(), vu)
+
+        await asyncio.gather(*(_worker(vu) for vu in range(self.concurrency)))
+
+    async def _print_progress(self, start: float) -> None:
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            total = self.report.total()
+            elapsed = time.perf_counter() - start
+            if self.on_progress:
+                self.on_progress(
+                    {
+                        "requests": total.requests,
+                        "errors": total.errors,
+                        "dropped": total.dropped,
+                        "in_flight": self._in_flight,
+                        "histogram": total.histogram.to_dict(),
+                    }
+                )
+                continue
+            write_progress(elapsed, total, self._in_flight)
+
+    async def run(self) -> LoadReport:
+        start = time.perf_counter()
+        end = start + self.duration
+        progress_task = (
+            asyncio.create_task(self._print_progress(start))
+            if self.progress or self.on_progress
+            else None
+        )
+        try:
+            if self.rps:
+                await self._run_open_loop(end)
+            else:
+                await self._run_closed_loop(end)
+        finally:
+            if progress_task:
+                progress_task.cancel()
+                if self.progress:
+                    print()
+        self.report.elapsed = time.perf_counter() - start
+        return self.report
+
+
+def write_progress(elapsed: float, total: EndpointStats, in_flight: int) -> None:
+    p99 = total.histogram.percentile_ms(99.0)
+    sys.stdout.write(
+        f"\r  t={elapsed:5.1f}s  reqs={total.requests:<8} "
+        f"rps={total.requests / elapsed if elapsed else 0:8.1f}  "
+        f"err={total.error_rate() * 100:5.1f}%  "
+        f"p99={(p99 or 0):8.1f}ms  in-flight={in_flight:<5}"
+        + (f"  dropped={total.dropped}" if total.dropped else "")
+    )
+    sys.stdout.flush()
+
+
+# -- multiproceso -----------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class WorkerShare:
+    """Parte de la carga de un worker: tasa o clientes, fase y rotación."""
+
+    index: int
+    workers: int
+    rps: float | None
+    concurrency: int
+    phase: float
+
+    def rotate(self, checks: list) -> list:
+        """Cada worker arranca en otro punto del catálogo (sin lockstep)."""
+        offset = self.index % len(checks) if checks else 0
+        return checks[offset:] + checks[:offset]
+
+
+def worker_share(
+    index: int, workers: int, rps: float | None, concurrency: int
+) -> WorkerShare:
+    """Repartir ``rps`` (intercalando llegadas) o ``concurrency`` entre workers."""
+    if rps:
+        return WorkerShare(index, workers, rps / workers, 0, index / rps)
+    share = concurrency // workers + (1 if index < concurrency % workers else 0)
+    return WorkerShare(index, workers, None, share, 0.0)
+
+
+async def run_in_worker(generator: LoadGenerator, index: int, barrier, results) -> None:
+    """Esperar la barrera de arranque, generar carga y publicar el reporte.
+
+    ``generator`` debe haberse creado con ``on_progress`` apuntando a
+    ``results`` (ver ``progress_callback``).
+    """
+    await asyncio.to_thread(barrier.wait, WORKER_START_TIMEOUT)
+    report = await generator.run()
+    results.put(("result", index, report.to_dict()))
+
+
+def progress_callback(index: int, results) -> Callable[[dict[str, Any]], None]:
+    return lambda snapshot: results.put(("progress", index, snapshot))
+
+
+def run_load_workers(
+    target: Callable[..., None],
+    workers: int,
+    payload: Any,
+    *,
+    rps: float | None,
+    concurrency: int,
+    progress: bool = True,
+) -> LoadReport:
+    """Lanzar ``workers`` procesos ``target(index, workers, payload, barrier, results)``.
+
+    ``target`` debe ser una función de módulo (se usa ``spawn``) que cree su
+    propio ``LoadGenerator`` y llame a ``run_in_worker``; si falla antes de la
+    barrera debe llamar ``barrier.abort()`` y publicar ``("error", index, msg)``.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    barrier = context.Barrier(workers + 1)
+    processes = [
+        context.Process(
+            target=target,
+            args=(index, workers, payload, barrier, results),
+            daemon=True,
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        barrier.wait(WORKER_START_TIMEOUT)
+    except threading.BrokenBarrierError:
+        errors = _drain_errors(results)
+        for process in processes:
+            process.terminate()
+        raise RuntimeError(
+            "Los workers no arrancaron: " + ("; ".join(errors) or "timeout")
+        )
+
+    start = time.perf_counter()
+    reports: dict[int, LoadReport] = {}
+    snapshots: dict[int, dict[str, Any]] = {}
+    last_print = start
+    try:
+        while len(reports) < workers:
+            try:
+                kind, index, data = results.get(timeout=PROGRESS_INTERVAL)
+            except queue_module.Empty:
+                dead = [
+                    i
+                    for i, process in enumerate(processes)
+                    if i not in reports and process.exitcode not in (None, 0)
+                ]
+                if dead:
+                    raise RuntimeError(f"Worker(s) {dead} terminaron con error")
+                continue
+            if kind == "result":
+                reports[index] = LoadReport.from_dict(data)
+            elif kind == "progress":
+                snapshots[index] = data
+            elif kind == "error":
+                raise RuntimeError(f"Worker {index}: {data}")
+            now = time.perf_counter()
+            if progress and snapshots and now - last_print >= PROGRESS_INTERVAL:
+                _write_merged_progress(now - start, snapshots)
+                last_print = now
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+    if progress:
+        print()
+
+    merged = reports[0]
+    for index in range(1, workers):
+        merged.merge(reports[index])
+    merged.target = float(rps or concurrency)
+    return merged
+
+
+def _write_merged_progress(elapsed: float, snapshots: dict[int, dict]) -> None:
+    total = EndpointStats("TOTAL", "*", "*")
+    in_flight = 0
+    for snapshot in snapshots.values():
+        total.requests += snapshot["requests"]
+        total.errors += snapshot["errors"]
+        total.dropped += snapshot.get("dropped", 0)
+        total.histogram.merge(LatencyHistogram.from_dict(snapshot["histogram"]))
+        in_flight += snapshot["in_flight"]
+    write_progress(elapsed, total, in_flight)
+
+
+def _drain_errors(results) -> list[str]:
+    errors = []
+    while True:
+        try:
+            kind, index, data = results.get(timeout=0.1)
+        except queue_module.Empty:
+            return errors
+        if kind == "error":
+            errors.append(f"worker {index}: {data}")
+
+
+def select_checks(checks: list, patterns: list[str] | None) -> list:
+    """Filtrar checks por subcadena en nombre o endpoint (sin filtro: todos)."""
+    if not patterns:
+        return list(checks)
+    lowered = [pattern.lower() for pattern in patterns]
+    return [
+        check
+        for check in checks
+        if any(p in check.name.lower() or p in check.endpoint.lower() for p in lowered)
+    ]
+
+
+def format_report(report: LoadReport) -> str:
+    header = f"{'Endpoint':<52} {'reqs':>8} {'rps':>8} {'err%':>6} " + " ".join(
+        f"{percentile_key(p):>9}" for p in REPORT_PERCENTILES
+    )
+    lines = [header, "-" * len(header)]
+
+    def _row(label: str, stats: EndpointStats) -> str:
+        throughput = stats.requests / report.elapsed if report.elapsed > 0 else 0.0
+        values = []
+        for percentile in REPORT_PERCENTILES:
+            value = stats.histogram.percentile_ms(percentile)
+            values.append(f"{value:9.1f}" if value is not None else f"{'-':>9}")
+        return (
+            f"{label[:52]:<52} {stats.requests:>8} {throughput:>8.1f} "
+            f"{stats.error_rate() * 100:>6.1f} " + " ".join(values)
+        )
+
+    for key in sorted(report.endpoints):
+        lines.append(_row(key, report.endpoints[key]))
+    lines.append("-" * len(header))
+    total = report.total()
+    lines.append(_row("TOTAL", total))
+    lines.append("(latencias en ms de respuestas 2xx)")
+    if total.errors:
+        failed_p99 = total.error_histogram.percentile_ms(99.0)
+        lines.append(
+            f"Fallidas: {total.errors}, p99 {(failed_p99 or 0):.1f}ms "
+            "(histograma aparte)"
+        )
+    if total.dropped:
+        lines.append(
+            f"Descartadas por el límite de peticiones en vuelo: {total.dropped}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+Reproducir tráfico real (access logs de nginx/gunicorn) contra un stack local.
+
+Lee logs en formato "combined" (el default de nginx y de gunicorn, opcionalmente
+con ``$request_time`` al final) o JSON por línea, normaliza cada ruta a su
+plantilla (``/api/orders/{id}``), la asocia al catálogo de endpoints de
+``run_api_tests.py`` y reescribe los ids con un archivo de fixtures:
+
+    {
+      "ids": {"<id-produccion>": "<id-local>"},
+      "routes": {"GET /api/employee/orders/{id}": ["<uuid-local-1>", "..."]},
+      "bodies": {"POST /api/client/orders": {"items": [...]}}
+    }
+
+``ids`` reemplaza ids concretos; para los demás, ``routes`` asigna de forma
+determinista uno de los ids locales de la plantilla (el mismo id de origen
+siempre va al mismo id local). ``bodies`` da el cuerpo para métodos con body,
+que no vienen en el log.
+
+El tráfico se reproduce con sus tiempos originales entre llegadas, o N veces
+más rápido con ``--speed``, usando un pool de workers asyncio. Como en el modo
+carga, la latencia se mide desde el instante programado (sin "coordinated
+omission") y se reporta la distribución por plantilla de ruta.
+
+Usage:
+    python replay_access_log.py access.log
+    python replay_access_log.py access.log.1 access.log.2.gz --speed 4 \\
+        --start 2026-10-16T19:00 --end 2026-10-16T23:00 --fixtures fixtures.json
+    python replay_access_log.py access.log --methods GET,POST --unknown-routes keep
+
+Environment Variables:
+    API_BASE_URL      URL base del API local (default: http://localhost:6082)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from latency_baseline import route_template
+from latency_histogram import LatencyHistogram
+from load_mode import LoadReport, format_report
+from run_api_tests import (
+    BASE_URL,
+    HAS_AIOHTTP,
+    AuthenticatedTestRunner,
+    Colors,
+    full_suite_checks,
+    load_checks,
+)
+
+DEFAULT_WORKERS = 50
+DEFAULT_METHODS = "GET,HEAD"
+
+COMBINED_RE = re.compile(
+    r"^(?P<remote>\S+) \S+ (?P<user>\S+) \[(?P<time>[^\]]+)\] "
+    r'"(?P<method>[A-Z]+) (?P<target>\S+)(?: [^"]*)?" (?P<status>\d{3}) \S+'
+    r'(?: "[^"]*" "[^"]*")?(?: (?P<request_time>\d+(?:\.\d+)?))?'
+)
+COMBINED_TIME_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+_UUID_RE = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I
+)
+
+
+@dataclass
+class LogEntry:
+    logged_at: datetime
+    method: str
+    path: str
+    query: str
+    status: int
+    request_time: float | None = None
+    timestamp: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.timestamp = self.timestamp or self.logged_at.timestamp()
+
+    @property
+    def template(self) -> str:
+        return route_template(self.path)
+
+    @property
+    def key(self) -> str:
+        return f"{self.method} {self.template}"
+
+
+@dataclass
+class ReplayStats:
+    lines: int = 0
+    parsed: int = 0
+    skipped: dict[str, int] = field(default_factory=dict)
+    scheduled: int = 0
+    status_mismatch: int = 0
+    lag: LatencyHistogram = field(default_factory=LatencyHistogram)
+    unknown_routes: dict[str, int] = field(default_factory=dict)
+
+    def skip(self, reason: str) -> None:
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "lines": self.lines,
+            "parsed": self.parsed,
+            "scheduled": self.scheduled,
+            "skipped": dict(sorted(self.skipped.items())),
+            "status_mismatch": self.status_mismatch,
+            "schedule_lag_ms": self.lag.summary(),
+            "unknown_routes": dict(
+                sorted(self.unknown_routes.items(), key=lambda item: -item[1])
+            ),
+        }
+
+
+# -- lectura de logs -------------------------------------------------------
+
+
+def _open_log(path: str):
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def _parse_json_line(line: str) -> LogEntry | None:
+    data = json.loads(line)
+    if "msec" in data:
+        logged_at = datetime.fromtimestamp(float(data["msec"])).astimezone()
+    else:
+        raw_time = data.get("time_iso8601") or data.get("time") or data.get("timestamp")
+        logged_at = datetime.fromisoformat(str(raw_time))
+    request = data.get("request")
+    if request:
+        method, target = request.split(" ")[:2]
+    else:
+        method = data.get("request_method") or data.get("method")
+        target = data.get("request_uri") or data.get("uri") or data.get("path")
+    parts = urlsplit(target)
+    request_time = data.get("request_time")
+    return LogEntry(
+        logged_at=logged_at,
+        method=str(method).upper(),
+        path=parts.path,
+        query=parts.query,
+        status=int(data.get("status", 0)),
+        request_time=float(request_time) if request_time not in (None, "") else None,
+    )
+
+
+def parse_line(line: str) -> LogEntry | None:
+    """Interpretar una línea combined o JSON; ``None`` si no es una petición."""
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        return _parse_json_line(line)
+    match = COMBINED_RE.match(line)
+    if not match:
+        return None
+    parts = urlsplit(match["target"])
+    return LogEntry(
+        logged_at=datetime.strptime(match["time"], COMBINED_TIME_FORMAT),
+        method=match["method"],
+        path=parts.path,
+        query=parts.query,
+        status=int(match["status"]),
+        request_time=float(match["request_time"]) if match["request_time"] else None,
+    )
+
+
+def read_entries(paths: Iterable[str], stats: ReplayStats) -> Iterator[LogEntry]:
+    for path in paths:
+        with _open_log(path) as handle:
+            for line in handle:
+                stats.lines += 1
+                try:
+                    entry = parse_line(line)
+                except (ValueError, KeyError, TypeError):
+                    entry = None
+                if entry is None:
+                    stats.skip("unparseable")
+                    continue
+                stats.parsed += 1
+                yield entry
+
+
+def _spread_same_second(entries: list[LogEntry]) -> None:
+    """Los logs combined tienen resolución de 1s: repartir cada segundo uniforme."""
+    index = 0
+    while index < len(entries):
+        end = index
+        second = entries[index].timestamp
+        while end < len(entries) and entries[end].timestamp == second:
+            end += 1
+        group = end - index
+        if group > 1 and float(second).is_integer():
+            for offset in range(group):
+                entries[index + offset].timestamp = second + offset / group
+        index = end
+
+
+def _parse_bound(raw: str | None) -> datetime | None:
+    return datetime.fromisoformat(raw) if raw else None
+
+
+def _within(entry: LogEntry, start: datetime | None, end: datetime | None) -> bool:
+    """Ventana ``[start, end)``; sin zona horaria se compara con la hora del log."""
+    for bound, is_start in ((start, True), (end, False)):
+        if bound is None:
+            continue
+        moment = entry.logged_at
+        if bound.tzinfo is None:
+            moment = moment.replace(tzinfo=None)
+        elif moment.tzinfo is None:
+            moment = moment.astimezone()
+        if (moment < bound) if is_start else (moment >= bound):
+            return False
+    return True
+
+
+# -- mapeo al catálogo -----------------------------------------------------
+
+
+class FixtureMapper:
+    """Reescribe ids de producción a ids locales según el archivo de fixtures."""
+
+    def __init__(self, fixtures: dict[str, Any] | None = None):
+        fixtures = fixtures or {}
+        self.ids: dict[str, str] = {
+            str(key): str(value) for key, value in fixtures.get("ids", {}).items()
+        }
+        self.routes: dict[str, list[str]] = {}
+        for key, values in fixtures.get("routes", {}).items():
+            method, _, path = key.partition(" ")
+            self.routes[f"{method.upper()} {route_template(path)}"] = [
+                str(value) for value in values
+            ]
+        self.bodies: dict[str, Any] = {}
+        for key, body in fixtures.get("bodies", {}).items():
+            method, _, path = key.partition(" ")
+            self.bodies[f"{method.upper()} {route_template(path)}"] = body
+
+    def _local_id(self, key: str, original: str) -> str:
+        if original in self.ids:
+            return self.ids[original]
+        pool = self.routes.get(key)
+        if not pool:
+            return original
+        digest = hashlib.blake2b(original.encode(), digest_size=8).digest()
+        return pool[int.from_bytes(digest, "big") % len(pool)]
+
+    def rewrite(self, entry: LogEntry) -> str:
+        key = entry.key
+        segments = [
+            (
+                self._local_id(key, part)
+                if part.isdigit() or _UUID_RE.match(part)
+                else part
+            )
+            for part in entry.path.split("/")
+        ]
+        path = "/".join(segments)
+        return f"{path}?{entry.query}" if entry.query else path
+
+    def body_for(self, entry: LogEntry) -> Any:
+        return self.bodies.get(entry.key)
+
+
+def catalog_templates(runner: AuthenticatedTestRunner) -> dict[str, str]:
+    """``{"METHOD /ruta/{id}": nombre}`` del catálogo del test suite."""
+    checks = (
+        full_suite_checks()
+        + runner.public_client_checks()
+        + runner.authenticated_client_checks()
+        + runner.employee_checks()
+        + load_checks(runner)
+    )
+    templates: dict[str, str] = {}
+    for check in checks:
+        templates.setdefault(
+            f"{check.method.upper()} {route_template(check.endpoint)}", check.name
+        )
+    return templates
+
+
+# -- reproducción ----------------------------------------------------------
+
+
+@dataclass
+class ReplayItem:
+    offset: float
+    entry: LogEntry
+    name: str
+    endpoint: str
+    body: Any = None
+
+
+class LogReplayer:
+    def __init__(
+        self,
+        request,
+        items: list[ReplayItem],
+        *,
+        speed: float = 1.0,
+        workers: int = DEFAULT_WORKERS,
+        stats: ReplayStats,
+        progress: bool = True,
+    ):
+        self.request = request
+        self.items = items
+        self.speed = speed
+        self.workers = workers
+        self.stats = stats
+        self.progress = progress
+        duration = items[-1].offset / speed if items and speed > 0 else 0.0
+        self.report = LoadReport(mode="replay", target=speed, duration=duration)
+        self._done = 0
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+            replay_item, scheduled = item
+            started = time.perf_counter()
+            self.stats.lag.record(max(started - scheduled, 0.0))
+            kwargs = {"json": replay_item.body} if replay_item.body is not None else {}
+            try:
+                status, _, _ = await self.request(
+                    replay_item.entry.method, replay_item.endpoint, **kwargs
+                )
+            except Exception:
+                status = 0
+            elapsed = time.perf_counter() - scheduled
+            self.report.stats_for(
+                replay_item.name, replay_item.entry.method, replay_item.entry.template
+            ).record(status, elapsed)
+            if status // 100 != replay_item.entry.status // 100:
+                self.stats.status_mismatch += 1
+            self._done += 1
+            queue.task_done()
+
+    async def _print_progress(self, start: float) -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            total = self.report.total()
+            elapsed = time.perf_counter() - start
+            p99 = total.histogram.percentile_ms(99.0)
+            sys.stdout.write(
+                f"\r  t={elapsed:6.1f}s  {self._done}/{len(self.items)}  "
+                f"err={total.error_rate() * 100:5.1f}%  p99={(p99 or 0):8.1f}ms  "
+                f"lag p99={(self.stats.lag.percentile_ms(99.0) or 0):7.1f}ms"
+            )
+            sys.stdout.flush()
+
+    async def run(self) -> LoadReport:
+        queue: asyncio.Queue = asyncio.Queue()
+        workers = [
+            asyncio.create_task(self._worker(queue)) for _ in range(self.workers)
+        ]
+        start = time.perf_counter()
+        progress_task = (
+            asyncio.create_task(self._print_progress(start)) if self.progress else None
+        )
+        try:
+            for item in self.items:
+                scheduled = start + (item.offset / self.speed if self.speed > 0 else 0)
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                queue.put_nowait((item, scheduled))
+            for _ in workers:
+                queue.put_nowait(None)
+            await asyncio.gather(*workers)
+        finally:
+            if progress_task:
+                progress_task.cancel()
+                print()
+            for worker in workers:
+                worker.cancel()
+        self.report.elapsed = time.perf_counter() - start
+        return self.report
+
+
+def build_items(
+    entries: Iterable[LogEntry],
+    catalog: dict[str, str],
+    mapper: FixtureMapper,
+    args,
+    stats: ReplayStats,
+) -> list[ReplayItem]:
+    methods = {method.strip().upper() for method in args.methods.split(",")}
+    start, end = _parse_bound(args.start), _parse_bound(args.end)
+    selected: list[LogEntry] = []
+    for entry in entries:
+        if not _within(entry, start, end):
+            stats.skip("outside_window")
+            continue
+        if entry.method not in methods:
+            stats.skip(f"method_{entry.method}")
+            continue
+        if args.prefix and not entry.path.startswith(args.prefix):
+            stats.skip("prefix")
+            continue
+        selected.append(entry)
+        if args.limit and len(selected) >= args.limit:
+            break
+
+    selected.sort(key=lambda entry: entry.timestamp)
+    _spread_same_second(selected)
+
+    items: list[ReplayItem] = []
+    origin = selected[0].timestamp if selected else 0.0
+    for entry in selected:
+        name = catalog.get(entry.key)
+        if name is None:
+            stats.unknown_routes[entry.key] = stats.unknown_routes.get(entry.key, 0) + 1
+            if args.unknown_routes == "skip":
+                stats.skip("unknown_route")
+                continue
+            name = entry.key
+        body = mapper.body_for(entry)
+        if body is None and entry.method in {"POST", "PUT", "PATCH"}:
+            stats.skip("missing_body")
+            continue
+        items.append(
+            ReplayItem(
+                offset=entry.timestamp - origin,
+                entry=entry,
+                name=name,
+                endpoint=mapper.rewrite(entry),
+                body=body,
+            )
+        )
+    stats.scheduled = len(items)
+    return items
+
+
+async def run_replay(args) -> tuple[LoadReport, ReplayStats]:
+    stats = ReplayStats()
+    mapper = FixtureMapper(
+        json.loads(Path(args.fixtures).read_text()) if args.fixtures else None
+    )
+
+    runner = AuthenticatedTestRunner(quiet=True)
+    await runner.setup(connection_limit=args.workers)
+    try:
+        await runner.authenticate_customer()
+        await runner.create_test_session()
+        await runner.authenticate_employee()
+        catalog = catalog_templates(runner)
+
+        items = build_items(
+            read_entries(args.logs, stats), catalog, mapper, args, stats
+        )
+        if not items:
+            raise SystemExit(
+                f"{Colors.FAIL}No hay peticiones para reproducir "
+                f"(omitidas: {stats.skipped}){Colors.ENDC}"
+            )
+        span = items[-1].offset
+        print(
+            f"\n{Colors.HEADER}=== REPLAY ({len(items)} peticiones, "
+            f"{span:.0f}s originales, x{args.speed:g}) ==={Colors.ENDC}"
+        )
+        replayer = LogReplayer(
+            runner.request,
+            items,
+            speed=args.speed,
+            workers=args.workers,
+            stats=stats,
+            progress=not args.quiet,
+        )
+        report = await replayer.run()
+    finally:
+        await runner.teardown()
+    return report, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reproducir access logs contra el API local",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument(
+        "logs", nargs="+", help="Archivos de access log (.gz soportado, '-' = stdin)"
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Factor de velocidad (1 = tiempos originales, 0 = lo más rápido posible)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Workers asyncio concurrentes (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--fixtures", metavar="FILE", help="JSON de mapeo de ids/bodies"
+    )
+    parser.add_argument(
+        "--methods",
+        default=DEFAULT_METHODS,
+        help=f"Métodos a reproducir (default: {DEFAULT_METHODS})",
+    )
+    parser.add_argument(
+        "--start", help="Inicio de la ventana (ISO, ej. 2026-10-16T19:00)"
+    )
+    parser.add_argument("--end", help="Fin de la ventana (ISO)")
+    parser.add_argument(
+        "--prefix", default="/api/", help="Solo rutas con este prefijo (default: /api/)"
+    )
+    parser.add_argument("--limit", type=int, help="Máximo de peticiones a reproducir")
+    parser.add_argument(
+        "--unknown-routes",
+        choices=["skip", "keep"],
+        default="skip",
+        help="Rutas fuera del catálogo: omitir (default) o reproducir igual",
+    )
+    parser.add_argument(
+        "--output", "-o", metavar="FILE", help="Guardar resultados en JSON"
+    )
+    parser.add_argument("--quiet", "-q", action="store_true", help="Modo silencioso")
+    args = parser.parse_args()
+
+    if not HAS_AIOHTTP:
+        raise SystemExit(
+            f"{Colors.FAIL}replay_access_log.py requiere aiohttp{Colors.ENDC}"
+        )
+    if args.speed < 0 or args.workers < 1:
+        parser.error("--speed debe ser >= 0 y --workers >= 1")
+
+    print(f"API_BASE_URL: {BASE_URL}")
+    report, stats = asyncio.run(run_replay(args))
+
+    print()
+    print(format_report(report))
+    summary = stats.to_dict()
+    print(
+        f"\nLíneas: {summary['lines']}  Parseadas: {summary['parsed']}  "
+        f"Reproducidas: {summary['scheduled']}  "
+        f"Status distinto al original: {summary['status_mismatch']}"
+    )
+    if summary["skipped"]:
+        print(
+            "Omitidas: "
+            + ", ".join(
+                f"{reason}={count}" for reason, count in summary["skipped"].items()
+            )
+        )
+    if stats.unknown_routes:
+        top = list(summary["unknown_routes"].items())[:10]
+        print("Rutas fuera del catálogo (top 10):")
+        for key, count in top:
+            print(f"  {count:>7}  {key}")
+    lag_p99 = stats.lag.percentile_ms(99.0)
+    if lag_p99 is not None:
+        print(f"Retraso de programación p99: {lag_p99:.1f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "timestamp": datetime.now().isoformat(),
+                    "base_url": BASE_URL,
+                    "logs": args.logs,
+                    "speed": args.speed,
+                    "replay": summary,
+                    "load": report.to_dict(),
+                },
+                f,
+                indent=2,
+            )
+        print(f"\n{Colors.OKGREEN}Results saved to {args.output}{Colors.ENDC}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ Usage:
     python run_api_tests.py [OPTIONS]
 
 Options:
-    --simple, -s           Modo simple (sin dependencias async)
+    --simple, -s           Modo simple (sin dependencias async, conexiones keep-alive)
     --full, -f             Modo completo (con Rich y aiohttp) [default]
     --auth-mode            Modo autenticado: login, obtiene token, ejecuta tests de empleado
     --check                Solo verificar que la API esté disponible
@@ -16,6 +16,29 @@ Options:
     --output FILE          Guardar resultados en archivo JSON
     --quiet, -q            Modo silencioso (menos output)
     --verbose, -v          Modo verboso (más detalles)
+    --parallel N           Lecturas independientes en paralelo (default: 8, 1 = secuencial)
+    --load                 Modo carga: p50/p90/p99/p99.9, throughput y errores por endpoint
+    --duration SECONDS     Duración del modo carga (default: 30)
+    --rps N                Modo carga a tasa fija (lazo abierto)
+    --concurrency N        Modo carga con N clientes concurrentes (default: 10)
+    --workers N            Modo carga repartido en N procesos (evita el techo del GIL)
+    --max-in-flight N      Modo carga --rps: tope de peticiones en vuelo (default: 1000)
+    --token-pool N         Modo carga/soak: N clientes con token propio (caché en disco)
+    --employee-accounts F  JSON [{email, password}] de empleados para el pool
+    --token-cache FILE     Caché de JWT del pool (default: ~/.cache/pronto/load_tokens.json)
+    --endpoints A,B        Modo carga/muestreo: filtrar endpoints por nombre o ruta
+    --samples N            Muestras por endpoint para baseline/compare/budget (default: 30)
+    --save-baseline FILE   Guardar distribución de latencias por endpoint
+    --compare BASELINE     Fallar si hay regresiones significativas (Mann-Whitney U)
+    --alpha A              Significancia de --compare (default: 0.01)
+    --min-change PCT       Cambio mínimo de la mediana para regresión (default: 10)
+    --budget FILE          Fallar si algún endpoint excede su p95 (también con --load)
+    --max-error-rate PCT   Tasa de error máxima por endpoint en compare/budget (default: 1)
+    --soak DURATION        Carga sostenida (ej. 2h) con muestreo de RSS, fds y pg_stat_activity
+    --soak-interval S      Segundos entre muestras del modo soak (default: 30)
+    --soak-services A,B    Servicios de compose a muestrear (default: api,client,employees)
+    --compose-file FILE    docker-compose*.yml del stack (repetible)
+    --leak-threshold PCT   Crecimiento sostenido %/h que cuenta como fuga (default: 5)
     --help, -h             Mostrar esta ayuda
 
 Examples:
@@ -26,6 +49,12 @@ Examples:
     python run_api_tests.py --client             # Solo APIs cliente
     python run_api_tests.py --employee           # Solo APIs empleado
     python run_api_tests.py -o results.json      # Guardar resultados
+    python run_api_tests.py --load --concurrency 50 --endpoints "Get Menu,Create Order"
+    python run_api_tests.py --load --rps 4000 --workers 4
+    python run_api_tests.py --load --concurrency 200 --token-pool 200
+    python run_api_tests.py --save-baseline baseline.json --samples 50
+    python run_api_tests.py --compare baseline.json --budget budget.json
+    python run_api_tests.py --soak 2h --rps 20 -o soak.json
 
 Environment Variables:
     API_BASE_URL      URL base del API (default: http://localhost:6082)
@@ -39,10 +68,14 @@ import json
 import os
 import sys
 import time
+from dataclasses import dataclass
 from datetime import datetime
+from http.client import HTTPException
 from typing import Any
+from urllib.parse import urlencode
 from urllib.request import urlopen, Request
-from urllib.error import URLError, HTTPError
+
+from http_pool import ConnectionPool
 
 try:
     import aiohttp
@@ -58,6 +91,7 @@ EMPLOYEES_BASE_URL = os.getenv("EMPLOYEES_BASE_URL", "http://localhost:6081")
 BASE_URL = API_BASE_URL  # Back-compat for existing runners in this script.
 ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin@cafeteria.test")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "ChangeMe!123")
+DEFAULT_PARALLELISM = 8
 
 
 class Colors:
@@ -71,54 +105,623 @@ class Colors:
     BOLD = "\033[1m"
 
 
-class AuthModeTester:
-    """Tester que primero se autentica y luego prueba APIs."""
+@dataclass(frozen=True)
+class EndpointCheck:
+    """Entrada del catálogo de endpoints compartido por los runners y el modo carga."""
 
-    def __init__(self, quiet: bool = False):
-        self.quiet = quiet
-        self.token = None
-        self.results = []
-        self._auth_scope = (os.getenv("EMPLOYEE_AUTH_SCOPE", "system") or "system").strip()
+    name: str
+    method: str
+    endpoint: str
+    json: dict | None = None
+    group: str = "client"
+
+    @property
+    def read_only(self) -> bool:
+        return self.method == "GET"
+
+
+def full_suite_checks() -> list[EndpointCheck]:
+    """Catálogo de endpoints de FullTestRunner, en orden de ejecución."""
+    return [
+        EndpointCheck("Health Check", "GET", "/health", group="health"),
+        EndpointCheck("Client Health", "GET", "/api/client/health", group="health"),
+        EndpointCheck("Employee Health", "GET", "/api/employee/health", group="health"),
+        EndpointCheck(
+            "Client Register",
+            "POST",
+            "/api/client/auth/register",
+            json={"name": "Test", "email": f"test_{int(time.time())}@test.com"},
+            group="client",
+        ),
+        EndpointCheck(
+            "Client Login",
+            "POST",
+            "/api/client/auth/login",
+            json={"email": "test@test.com"},
+            group="client",
+        ),
+        EndpointCheck(
+            "Client Password Recovery",
+            "POST",
+            "/api/client/auth/password/recover",
+            json={"email": "test@test.com"},
+            group="client",
+        ),
+        EndpointCheck(
+            "Client Password Reset",
+            "POST",
+            "/api/client/auth/password/reset",
+            json={"token": "test_token", "password": "password123"},
+            group="client",
+        ),
+        EndpointCheck("Get Avatars", "GET", "/api/client/avatars", group="client"),
+        EndpointCheck("Get Menu", "GET", "/api/client/menu", group="client"),
+        EndpointCheck(
+            "Get Active Promotions",
+            "GET",
+            "/api/client/promotions/active",
+            group="client",
+        ),
+        EndpointCheck(
+            "Get Orders History", "GET", "/api/client/orders/history", group="client"
+        ),
+        EndpointCheck(
+            "Create Order",
+            "POST",
+            "/api/client/orders",
+            json={"items": [{"menu_item_id": 1, "quantity": 1}]},
+            group="client",
+        ),
+        EndpointCheck("Get Tables", "GET", "/api/client/tables", group="client"),
+        EndpointCheck(
+            "Get Active Promotions",
+            "GET",
+            "/api/client/promotions/active",
+            group="client",
+        ),
+        EndpointCheck(
+            "Validate Session", "GET", "/api/client/sessions/validate", group="client"
+        ),
+        EndpointCheck(
+            "Call Waiter",
+            "POST",
+            "/api/client/call-waiter",
+            json={"table_number": "1", "request_type": "general"},
+            group="client",
+        ),
+        EndpointCheck(
+            "Get Notifications", "GET", "/api/client/notifications", group="client"
+        ),
+        EndpointCheck(
+            "Mark Notification Read",
+            "POST",
+            "/api/client/notifications/1/read",
+            group="client",
+        ),
+        EndpointCheck(
+            "Get Business Info", "GET", "/api/client/business-info", group="client"
+        ),
+        EndpointCheck("Get Tables", "GET", "/api/client/tables", group="client"),
+        EndpointCheck("Get Shortcuts", "GET", "/api/client/shortcuts", group="client"),
+        EndpointCheck(
+            "Employee Verify Token",
+            "GET",
+            "/api/employee/auth/verify",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Employee Get Me", "GET", "/api/employee/auth/me", group="employee"
+        ),
+        EndpointCheck(
+            "Employee Get Permissions",
+            "GET",
+            "/api/employee/auth/permissions",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Employee Logout", "POST", "/api/employee/auth/logout", group="employee"
+        ),
+        EndpointCheck(
+            "Get Employees", "GET", "/api/employee/employees", group="employee"
+        ),
+        EndpointCheck(
+            "Get Employee by ID", "GET", "/api/employee/employees/1", group="employee"
+        ),
+        EndpointCheck(
+            "Create Employee",
+            "POST",
+            "/api/employee/employees",
+            json={
+                "name": "New Employee",
+                "email": "new@test.com",
+                "role": "waiter",
+                "password": "password123",
+            },
+            group="employee",
+        ),
+        EndpointCheck(
+            "Update Employee",
+            "PATCH",
+            "/api/employee/employees/1",
+            json={"name": "Updated Name"},
+            group="employee",
+        ),
+        EndpointCheck("Get Menu Items", "GET", "/api/employee/menu", group="employee"),
+        EndpointCheck(
+            "Get Menu Categories",
+            "GET",
+            "/api/employee/menu/categories",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Create Menu Item",
+            "POST",
+            "/api/employee/menu",
+            json={"name": "Test Item", "price": 10.99, "category_id": 1},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Update Menu Item",
+            "PATCH",
+            "/api/employee/menu/1",
+            json={"price": 12.99},
+            group="employee",
+        ),
+        EndpointCheck("Get Orders", "GET", "/api/employee/orders", group="employee"),
+        EndpointCheck(
+            "Get Order by ID", "GET", "/api/employee/orders/1", group="employee"
+        ),
+        EndpointCheck(
+            "Update Order Status",
+            "PATCH",
+            "/api/employee/orders/1/status",
+            json={"status": "preparing"},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Order Items", "GET", "/api/employee/orders/1/items", group="employee"
+        ),
+        EndpointCheck("Get Tables", "GET", "/api/employee/tables", group="employee"),
+        EndpointCheck(
+            "Get Table by ID", "GET", "/api/employee/tables/1", group="employee"
+        ),
+        EndpointCheck(
+            "Create Table",
+            "POST",
+            "/api/employee/tables",
+            json={"table_number": "99", "capacity": 4, "area_id": 1},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Update Table",
+            "PATCH",
+            "/api/employee/tables/1",
+            json={"capacity": 6},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Sessions", "GET", "/api/employee/sessions/closed", group="employee"
+        ),
+        EndpointCheck(
+            "Get Session by ID",
+            "GET",
+            "/api/employee/sessions/closed/1",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Create Session",
+            "POST",
+            "/api/employee/sessions/closed",
+            json={"table_ids": [1, 2], "customer_count": 4},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Close Session",
+            "PATCH",
+            "/api/employee/sessions/closed/1/close",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Customers", "GET", "/api/employee/customers/search", group="employee"
+        ),
+        EndpointCheck(
+            "Get Customer by ID",
+            "GET",
+            "/api/employee/customers/search/1",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Waiter Calls",
+            "GET",
+            "/api/notifications/waiter/pending",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Acknowledge Waiter Call",
+            "PATCH",
+            "/api/notifications/waiter/confirm/1",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Promotions", "GET", "/api/employee/promotions", group="employee"
+        ),
+        EndpointCheck(
+            "Create Promotion",
+            "POST",
+            "/api/employee/promotions",
+            json={
+                "code": "TEST10",
+                "discount_percent": 10,
+                "valid_from": "2024-01-01",
+                "valid_until": "2024-12-31",
+            },
+            group="employee",
+        ),
+        EndpointCheck(
+            "Update Promotion",
+            "PATCH",
+            "/api/employee/promotions/1",
+            json={"discount_percent": 15},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Discount Codes",
+            "GET",
+            "/api/employee/discount-codes",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Validate Discount Code",
+            "POST",
+            "/api/employee/discount-codes/validate",
+            json={"code": "SAVE10", "order_total": 100},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Sales Report", "GET", "/api/employee/reports/sales", group="employee"
+        ),
+        EndpointCheck(
+            "Get Daily Summary",
+            "GET",
+            "/api/employee/reports/top-products",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Popular Items",
+            "GET",
+            "/api/employee/reports/popular-items",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Dashboard Stats",
+            "GET",
+            "/api/employee/analytics/kpis",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Revenue Stats",
+            "GET",
+            "/api/employee/analytics/revenue",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Order Stats", "GET", "/api/employee/analytics/orders", group="employee"
+        ),
+        EndpointCheck(
+            "Get Settings", "GET", "/api/employee/settings", group="employee"
+        ),
+        EndpointCheck(
+            "Update Settings",
+            "PATCH",
+            "/api/employee/settings",
+            json={"timezone": "America/New_York"},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Business Info", "GET", "/api/employee/business-info", group="employee"
+        ),
+        EndpointCheck(
+            "Update Business Info",
+            "PATCH",
+            "/api/employee/business-info",
+            json={"name": "Updated Restaurant", "phone": "555-0123"},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Branding", "GET", "/api/employee/branding/config", group="employee"
+        ),
+        EndpointCheck(
+            "Update Branding",
+            "PATCH",
+            "/api/employee/branding/config",
+            json={"primary_color": "#FF5733"},
+            group="employee",
+        ),
+        EndpointCheck("Get Areas", "GET", "/api/employee/areas", group="employee"),
+        EndpointCheck(
+            "Create Area",
+            "POST",
+            "/api/employee/areas",
+            json={"name": "Patio", "description": "Outdoor seating"},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Roles", "GET", "/api/employee/roles/roles", group="employee"
+        ),
+        EndpointCheck(
+            "Get Role by ID", "GET", "/api/employee/roles/roles/1", group="employee"
+        ),
+        EndpointCheck(
+            "Get Notifications", "GET", "/api/realtime/notifications", group="employee"
+        ),
+        EndpointCheck(
+            "Send Notification",
+            "POST",
+            "/api/realtime/notifications",
+            json={"title": "Test", "message": "Test message", "type": "info"},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Table Assignments",
+            "GET",
+            "/api/employee/table-assignments",
+            group="employee",
+        ),
+        EndpointCheck(
+            "Assign Table",
+            "POST",
+            "/api/employee/table-assignments",
+            json={"table_id": 1, "employee_id": 1},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Day Periods", "GET", "/api/employee/day-periods", group="employee"
+        ),
+        EndpointCheck(
+            "Get Feedback", "GET", "/api/employee/feedback", group="employee"
+        ),
+        EndpointCheck(
+            "Get Feedback by ID", "GET", "/api/employee/feedback/1", group="employee"
+        ),
+        EndpointCheck("Get Images", "GET", "/api/employee/images", group="employee"),
+        EndpointCheck("Upload Image", "POST", "/api/employee/images", group="employee"),
+        EndpointCheck(
+            "Get Modifiers", "GET", "/api/employee/modifiers", group="employee"
+        ),
+        EndpointCheck(
+            "Create Modifier",
+            "POST",
+            "/api/employee/modifiers",
+            json={"name": "Extra Cheese", "price": 1.5},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Realtime Status", "GET", "/api/realtime/orders", group="employee"
+        ),
+        EndpointCheck(
+            "Get Admin Config", "GET", "/api/employee/admin/config", group="employee"
+        ),
+        EndpointCheck(
+            "Update Admin Config",
+            "PATCH",
+            "/api/employee/admin/config",
+            json={"maintenance_mode": False},
+            group="employee",
+        ),
+        EndpointCheck(
+            "Get Debug Info", "GET", "/api/employee/debug/info", group="employee"
+        ),
+    ]
+
+
+def load_checks(runner: "AuthenticatedTestRunner") -> list[EndpointCheck]:
+    """Endpoints del modo carga: lecturas del catálogo + creación de orden.
+
+    Solo incluye lo que el runner puede autenticar; las escrituras del catálogo
+    (salvo crear orden en la sesión de prueba) se excluyen para no mutar datos.
+    """
+    checks: list[EndpointCheck] = []
+    seen: set[tuple[str, str]] = set()
+    for check in full_suite_checks():
+        if not check.read_only or (check.method, check.endpoint) in seen:
+            continue
+        if check.group == "employee" and not runner.employee_token:
+            continue
+        seen.add((check.method, check.endpoint))
+        checks.append(check)
+
+    if runner.session_id:
+        checks.append(
+            EndpointCheck(
+                "Create Order",
+                "POST",
+                "/api/client/orders",
+                json={
+                    "items": [{"menu_item_id": 1, "quantity": 1}],
+                    "session_id": runner.session_id,
+                },
+            )
+        )
+    return checks
+
+
+def check_stage(check: EndpointCheck) -> str:
+    """Etapa de dependencia de un check: auth -> write -> read -> teardown."""
+    if check.read_only:
+        return "read"
+    if check.endpoint.endswith("/auth/logout"):
+        return "teardown"
+    if "/auth/" in check.endpoint:
+        return "auth"
+    return "write"
+
+
+class StagedRunnerMixin:
+    """Ejecución por etapas compartida por los runners async.
+
+    Las etapas de lectura se lanzan con ``asyncio.gather`` limitado por un
+    semáforo de ``parallelism``; los resultados se imprimen y guardan en el
+    orden del catálogo, así que la salida y el JSON de ``--output`` no dependen
+    del orden en que terminan las peticiones.
+    """
+
+    quiet: bool = False
+    parallelism: int = 1
+    results: list
 
     def log(self, msg: str, color: str = ""):
         if not self.quiet:
             print(f"{color}{msg}{Colors.ENDC}")
 
-    def make_request(
+    async def _execute(self, name: str, method: str, endpoint: str, **kwargs) -> dict:
+        status, data, duration = await self.request(method, endpoint, **kwargs)
+        return {
+            "name": name,
+            "endpoint": endpoint,
+            "method": method,
+            "status": status,
+            "success": 200 <= status < 300,
+            "duration": duration,
+        }
+
+    async def _execute_check(self, check: EndpointCheck) -> dict:
+        kwargs = {"json": check.json} if check.json is not None else {}
+        return await self._execute(check.name, check.method, check.endpoint, **kwargs)
+
+    def _record(self, result: dict) -> dict:
+        if not self.quiet:
+            success = result["success"]
+            emoji = "✓" if success else "✗"
+            color = "\033[92m" if success else "\033[91m"
+            print(
+                f"{color}{emoji}\033[0m {result['name']:<45} "
+                f"[{result['status']}] {result['duration'] * 1000:.1f}ms"
+            )
+        self.results.append(result)
+        return result
+
+    async def run_test(self, name: str, method: str, endpoint: str, **kwargs) -> dict:
+        return self._record(await self._execute(name, method, endpoint, **kwargs))
+
+    async def run_check(self, check: EndpointCheck) -> dict:
+        return self._record(await self._execute_check(check))
+
+    async def run_stage(
+        self, title: str, checks: list[EndpointCheck], parallel: bool = False
+    ) -> list[dict]:
+        if not checks:
+            return []
+        if parallel and self.parallelism > 1:
+            self.log(
+                f"\n{Colors.HEADER}{title} ({len(checks)} checks, "
+                f"{self.parallelism} en paralelo){Colors.ENDC}"
+            )
+            semaphore = asyncio.Semaphore(self.parallelism)
+
+            async def _guarded(check: EndpointCheck) -> dict:
+                async with semaphore:
+                    return await self._execute_check(check)
+
+            executed = await asyncio.gather(*(_guarded(check) for check in checks))
+            return [self._record(result) for result in executed]
+
+        self.log(f"\n{Colors.HEADER}{title}{Colors.ENDC}")
+        return [await self.run_check(check) for check in checks]
+
+
+class KeepAliveClientMixin:
+    """Peticiones síncronas sobre un ``ConnectionPool`` keep-alive.
+
+    Cada resultado separa ``connect_ms`` (TCP + TLS, 0 si la conexión se
+    reutilizó) de ``server_ms`` (envío hasta respuesta completa), así la
+    latencia reportada refleja al API y no al handshake.
+    """
+
+    quiet: bool = False
+    pool: ConnectionPool
+
+    def log(self, msg: str, color: str = ""):
+        if not self.quiet:
+            print(f"{color}{msg}{Colors.ENDC}")
+
+    def _pooled_request(
         self,
         method: str,
-        base_url: str,
-        endpoint: str,
+        url: str,
         data: dict | None = None,
         token: str | None = None,
-    ) -> tuple:
-        url = f"{base_url}{endpoint}"
+    ) -> tuple[int, Any, float, dict[str, Any]]:
         headers = {"Content-Type": "application/json"}
         if token:
             headers["Authorization"] = f"Bearer {token}"
+        body = json.dumps(data).encode() if data else None
 
-        json_data = json.dumps(data).encode() if data else None
-        req = Request(url, data=json_data, headers=headers, method=method)
+        try:
+            response = self.pool.request(method, url, body=body, headers=headers)
+        except (OSError, HTTPException, ValueError) as e:
+            return 0, {"error": str(e)}, 0.0, {}
 
-        start_time = time.time()
+        raw = response.body.decode("utf-8", errors="replace")
         try:
-            with urlopen(req, timeout=30) as response:
-                duration = time.time() - start_time
-                try:
-                    response_data = json.loads(response.read().decode())
-                except Exception:
-                    response_data = {"raw": response.read().decode()}
-                return response.status, response_data, duration
-        except HTTPError as e:
-            duration = time.time() - start_time
-            try:
-                error_data = json.loads(e.read().decode())
-            except Exception:
-                error_data = {"error": str(e)}
-            return e.code, error_data, duration
-        except URLError as e:
-            duration = time.time() - start_time
-            return 0, {"error": str(e)}, duration
+            response_data = json.loads(raw)
+        except ValueError:
+            response_data = (
+                {"raw": raw}
+                if 200 <= response.status < 300
+                else {"error": f"HTTP Error {response.status}"}
+            )
+        timing = {
+            "connect_ms": round(response.connect * 1000, 3),
+            "server_ms": round(response.server * 1000, 3),
+            "reused": response.reused,
+        }
+        return response.status, response_data, response.duration, timing
+
+    @staticmethod
+    def _format_timing(duration: float, timing: dict[str, Any]) -> str:
+        text = f"{duration * 1000:.1f}ms"
+        if timing:
+            text += (
+                f" (conexión {timing['connect_ms']:.1f} + "
+                f"servidor {timing['server_ms']:.1f})"
+            )
+        return text
+
+    def log_connection_summary(self):
+        stats = self.pool.stats
+        self.log(
+            f"Conexiones: {stats.connections_opened} abiertas, "
+            f"{stats.connections_reused} reutilizadas "
+            f"({stats.requests} peticiones)"
+        )
+        self.log(
+            f"Tiempo de conexión: {stats.connect_seconds * 1000:.1f}ms  "
+            f"Tiempo de servidor: {stats.server_seconds * 1000:.1f}ms"
+        )
+
+
+class AuthModeTester(KeepAliveClientMixin):
+    """Tester que primero se autentica y luego prueba APIs."""
+
+    def __init__(self, quiet: bool = False):
+        self.quiet = quiet
+        self.token = None
+        self.results = []
+        self.pool = ConnectionPool()
+        self._auth_scope = (os.getenv("EMPLOYEE_AUTH_SCOPE", "system") or "system").strip()
+
+    def make_request(
+        self,
+        method: str,
+        base_url: str,
+        endpoint: str,
+        data: dict | None = None,
+        token: str | None = None,
+    ) -> tuple:
+        status, response_data, duration, _ = self._pooled_request(
+            method, f"{base_url}{endpoint}", data, token
+        )
+        return status, response_data, duration
 
     def run_test(
         self,
@@ -129,13 +732,16 @@ class AuthModeTester:
         json: dict | None = None,
         token: str | None = None,
     ) -> dict:
-        status, data, duration = self.make_request(method, base_url, endpoint, json, token)
+        status, data, duration, timing = self._pooled_request(
+            method, f"{base_url}{endpoint}", json, token
+        )
         success = 200 <= status < 300
         emoji = "✓" if success else "✗"
         color = Colors.OKGREEN if success else Colors.FAIL
 
         self.log(
-            f"{color}{emoji}{Colors.ENDC} {name:<45} [{status}] {duration * 1000:.1f}ms"
+            f"{color}{emoji}{Colors.ENDC} {name:<45} [{status}] "
+            f"{self._format_timing(duration, timing)}"
         )
 
         result = {
@@ -145,6 +751,7 @@ class AuthModeTester:
             "status": status,
             "success": success,
             "duration": duration,
+            **timing,
             "response": data if not success else None,
         }
         self.results.append(result)
@@ -157,60 +764,31 @@ class AuthModeTester:
         POST application/x-www-form-urlencoded and return the redirect response (no follow),
         including headers for cookie extraction.
         """
-        from urllib.parse import urlencode
-        import urllib.request
-
         url = f"{base_url}{endpoint}"
         body = urlencode(form).encode("utf-8")
 
-        class _NoRedirect(urllib.request.HTTPRedirectHandler):
-            def redirect_request(self, req, fp, code, msg, hdrs, newurl):  # type: ignore[override]
-                return None
-
-        opener = urllib.request.build_opener(_NoRedirect)
-        req = urllib.request.Request(
-            url,
-            data=body,
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            method="POST",
-        )
-
-        start_time = time.time()
         try:
-            resp = opener.open(req, timeout=30)
-            duration = time.time() - start_time
-            headers = dict(resp.headers.items())
-            # Preserve multiple Set-Cookie headers (Message.items() collapses to last occurrence).
-            try:
-                all_set_cookie = resp.headers.get_all("Set-Cookie")  # type: ignore[attr-defined]
-            except Exception:
-                all_set_cookie = None
-            if all_set_cookie:
-                headers["Set-Cookie"] = "\n".join(all_set_cookie)
-            raw = resp.read().decode("utf-8", errors="replace")
-            try:
-                data = json.loads(raw)
-            except Exception:
-                data = {"raw": raw}
-            return resp.status, data, duration, headers
-        except HTTPError as e:
-            duration = time.time() - start_time
-            headers = dict(getattr(e, "headers", {}).items()) if getattr(e, "headers", None) else {}
-            try:
-                all_set_cookie = e.headers.get_all("Set-Cookie")  # type: ignore[attr-defined]
-            except Exception:
-                all_set_cookie = None
-            if all_set_cookie:
-                headers["Set-Cookie"] = "\n".join(all_set_cookie)
-            try:
-                raw = e.read().decode("utf-8", errors="replace")
-                data = json.loads(raw)
-            except Exception:
-                data = {"error": str(e)}
-            return e.code, data, duration, headers
-        except URLError as e:
-            duration = time.time() - start_time
-            return 0, {"error": str(e)}, duration, {}
+            resp = self.pool.request(
+                "POST",
+                url,
+                body=body,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                follow_redirects=False,
+            )
+        except (OSError, HTTPException, ValueError) as e:
+            return 0, {"error": str(e)}, 0.0, {}
+
+        headers = dict(resp.headers.items())
+        # Preserve multiple Set-Cookie headers (Message.items() collapses to last occurrence).
+        all_set_cookie = resp.header_values("Set-Cookie")
+        if all_set_cookie:
+            headers["Set-Cookie"] = "\n".join(all_set_cookie)
+        raw = resp.body.decode("utf-8", errors="replace")
+        try:
+            data = json.loads(raw)
+        except Exception:
+            data = {"raw": raw}
+        return resp.status, data, resp.duration, headers
 
     @staticmethod
     def _extract_cookie_value(set_cookie: str, name: str) -> str | None:
@@ -311,10 +889,12 @@ class AuthModeTester:
 
     def run(self):
         """Ejecutar tests en modo autenticado."""
-        if not self.authenticate():
-            return None
-
-        self.test_authenticated_endpoints()
+        try:
+            if not self.authenticate():
+                return None
+            self.test_authenticated_endpoints()
+        finally:
+            self.pool.close()
 
         passed = sum(1 for r in self.results if r["success"])
         failed = sum(1 for r in self.results if not r["success"])
@@ -329,19 +909,17 @@ class AuthModeTester:
         self.log(f"{Colors.OKGREEN}Passed: {passed}{Colors.ENDC}")
         self.log(f"{Colors.FAIL}Failed: {failed}{Colors.ENDC}")
         self.log(f"Pass Rate: {(passed / total * 100):.1f}%" if total > 0 else "N/A")
+        self.log_connection_summary()
 
         return self.results
 
 
-class SimpleTestRunner:
+class SimpleTestRunner(KeepAliveClientMixin):
     def __init__(self, quiet: bool = False):
         self.quiet = quiet
         self.results = []
         self.token = None
-
-    def log(self, msg: str, color: str = ""):
-        if not self.quiet:
-            print(f"{color}{msg}{Colors.ENDC}")
+        self.pool = ConnectionPool()
 
     def make_request(
         self,
@@ -350,33 +928,10 @@ class SimpleTestRunner:
         data: dict | None = None,
         token: str | None = None,
     ) -> tuple:
-        url = f"{BASE_URL}{endpoint}"
-        headers = {"Content-Type": "application/json"}
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
-
-        json_data = json.dumps(data).encode() if data else None
-        req = Request(url, data=json_data, headers=headers, method=method)
-
-        start_time = time.time()
-        try:
-            with urlopen(req, timeout=30) as response:
-                duration = time.time() - start_time
-                try:
-                    response_data = json.loads(response.read().decode())
-                except Exception:
-                    response_data = {"raw": response.read().decode()}
-                return response.status, response_data, duration
-        except HTTPError as e:
-            duration = time.time() - start_time
-            try:
-                error_data = json.loads(e.read().decode())
-            except Exception:
-                error_data = {"error": str(e)}
-            return e.code, error_data, duration
-        except URLError as e:
-            duration = time.time() - start_time
-            return 0, {"error": str(e)}, duration
+        status, response_data, duration, _ = self._pooled_request(
+            method, f"{BASE_URL}{endpoint}", data, token
+        )
+        return status, response_data, duration
 
     def run_test(
         self,
@@ -386,13 +941,16 @@ class SimpleTestRunner:
         json: dict | None = None,
         token: str | None = None,
     ) -> dict:
-        status, data, duration = self.make_request(method, endpoint, json, token)
+        status, data, duration, timing = self._pooled_request(
+            method, f"{BASE_URL}{endpoint}", json, token
+        )
         success = 200 <= status < 300
         emoji = "✓" if success else "✗"
         color = Colors.OKGREEN if success else Colors.FAIL
 
         self.log(
-            f"{color}{emoji}{Colors.ENDC} {name:<40} [{status}] {duration * 1000:.1f}ms"
+            f"{color}{emoji}{Colors.ENDC} {name:<40} [{status}] "
+            f"{self._format_timing(duration, timing)}"
         )
 
         result = {
@@ -402,6 +960,7 @@ class SimpleTestRunner:
             "status": status,
             "success": success,
             "duration": duration,
+            **timing,
         }
         self.results.append(result)
         return result
@@ -561,10 +1120,14 @@ class SimpleTestRunner:
                 f"{Colors.WARNING}Skipping authenticated employee tests (login failed){Colors.ENDC}"
             )
 
+        self.log_connection_summary()
+        self.pool.close()
 
-class FullTestRunner:
-    def __init__(self, quiet: bool = False):
+
+class FullTestRunner(StagedRunnerMixin):
+    def __init__(self, quiet: bool = False, parallelism: int = DEFAULT_PARALLELISM):
         self.quiet = quiet
+        self.parallelism = parallelism
         self.session: aiohttp.ClientSession | None = None
         self.results = []
         self.employee_token: str | None = None
@@ -584,17 +1147,17 @@ class FullTestRunner:
         self, method: str, endpoint: str, **kwargs
     ) -> tuple[int, dict[str, Any], float]:
         url = f"{BASE_URL}{endpoint}"
-        start = datetime.now()
+        start = time.perf_counter()
         try:
             async with self.session.request(method, url, **kwargs) as response:
-                duration = (datetime.now() - start).total_seconds()
+                duration = time.perf_counter() - start
                 try:
                     data = await response.json()
                 except Exception:
                     data = {"raw": await response.text()}
                 return response.status, data, duration
         except aiohttp.ClientError as e:
-            duration = (datetime.now() - start).total_seconds()
+            duration = time.perf_counter() - start
             return 0, {"error": str(e)}, duration
 
     async def authenticate_employee(self) -> bool:
@@ -608,38 +1171,16 @@ class FullTestRunner:
             return True
         return False
 
-    async def run_test(self, name: str, method: str, endpoint: str, **kwargs) -> dict:
-        headers = kwargs.pop("headers", {})
+    async def _execute(self, name: str, method: str, endpoint: str, **kwargs) -> dict:
+        headers = dict(kwargs.pop("headers", {}))
         if self.employee_token and endpoint.startswith("/api/employee"):
             headers["Authorization"] = f"Bearer {self.employee_token}"
         kwargs["headers"] = headers
-
-        status, data, duration = await self.request(method, endpoint, **kwargs)
-        success = 200 <= status < 300
-        emoji = "✓" if success else "✗"
-        color = "\033[92m" if success else "\033[91m"
-
-        if not self.quiet:
-            print(
-                f"{color}{emoji}\033[0m {name:<45} [{status}] {duration * 1000:.1f}ms"
-            )
-
-        result = {
-            "name": name,
-            "endpoint": endpoint,
-            "method": method,
-            "status": status,
-            "success": success,
-            "duration": duration,
-        }
-        self.results.append(result)
-        return result
+        return await super()._execute(name, method, endpoint, **kwargs)
 
     async def test_health(self):
-        print(f"\n\033[1m\033[95mHealth Endpoints\033[0m")
-        await self.run_test("Health Check", "GET", "/health")
-        await self.run_test("Client Health", "GET", "/api/client/health")
-        await self.run_test("Employee Health", "GET", "/api/employee/health")
+        health = [c for c in full_suite_checks() if c.group == "health"]
+        await self.run_stage("Health Endpoints", health, parallel=True)
 
     async def test_all(self):
         await self.setup()
@@ -652,273 +1193,28 @@ class FullTestRunner:
 
         await self.test_health()
 
-        await self.run_test(
-            "Client Register",
-            "POST",
-            "/api/client/auth/register",
-            json={"name": "Test", "email": f"test_{int(time.time())}@test.com"},
-        )
-        await self.run_test(
-            "Client Login",
-            "POST",
-            "/api/client/auth/login",
-            json={"email": "test@test.com"},
-        )
-        await self.run_test(
-            "Client Password Recovery",
-            "POST",
-            "/api/client/auth/password/recover",
-            json={"email": "test@test.com"},
-        )
-        await self.run_test(
-            "Client Password Reset",
-            "POST",
-            "/api/client/auth/password/reset",
-            json={"token": "test_token", "password": "password123"},
+        # Etapas: auth -> creación de datos -> lecturas independientes -> logout.
+        catalog = [c for c in full_suite_checks() if c.group == "client"]
+        await self.run_stage(
+            "Client: autenticación",
+            [c for c in catalog if check_stage(c) == "auth"],
         )
-        await self.run_test("Get Avatars", "GET", "/api/client/avatars")
+        if await self.authenticate_employee():
+            catalog += [c for c in full_suite_checks() if c.group == "employee"]
 
-        await self.run_test("Get Menu", "GET", "/api/client/menu")
-        await self.run_test(
-            "Get Active Promotions", "GET", "/api/client/promotions/active"
+        await self.run_stage(
+            "Creación/modificación de datos",
+            [c for c in catalog if check_stage(c) == "write"],
         )
-        await self.run_test("Get Orders History", "GET", "/api/client/orders/history")
-        await self.run_test(
-            "Create Order",
-            "POST",
-            "/api/client/orders",
-            json={"items": [{"menu_item_id": 1, "quantity": 1}]},
+        await self.run_stage(
+            "Lecturas independientes",
+            [c for c in catalog if check_stage(c) == "read"],
+            parallel=True,
         )
-        await self.run_test("Get Tables", "GET", "/api/client/tables")
-        await self.run_test(
-            "Get Active Promotions", "GET", "/api/client/promotions/active"
+        await self.run_stage(
+            "Cierre de sesión",
+            [c for c in catalog if check_stage(c) == "teardown"],
         )
-        await self.run_test("Validate Session", "GET", "/api/client/sessions/validate")
-        await self.run_test(
-            "Call Waiter",
-            "POST",
-            "/api/client/call-waiter",
-            json={"table_number": "1", "request_type": "general"},
-        )
-        await self.run_test("Get Notifications", "GET", "/api/client/notifications")
-        await self.run_test(
-            "Mark Notification Read", "POST", "/api/client/notifications/1/read"
-        )
-        await self.run_test("Get Business Info", "GET", "/api/client/business-info")
-        await self.run_test("Get Tables", "GET", "/api/client/tables")
-        await self.run_test("Get Shortcuts", "GET", "/api/client/shortcuts")
-
-        if await self.authenticate_employee():
-            await self.run_test(
-                "Employee Verify Token", "GET", "/api/employee/auth/verify"
-            )
-            await self.run_test("Employee Get Me", "GET", "/api/employee/auth/me")
-            await self.run_test(
-                "Employee Get Permissions", "GET", "/api/employee/auth/permissions"
-            )
-            await self.run_test("Employee Logout", "POST", "/api/employee/auth/logout")
-            await self.run_test("Get Employees", "GET", "/api/employee/employees")
-            await self.run_test(
-                "Get Employee by ID", "GET", "/api/employee/employees/1"
-            )
-            await self.run_test(
-                "Create Employee",
-                "POST",
-                "/api/employee/employees",
-                json={
-                    "name": "New Employee",
-                    "email": "new@test.com",
-                    "role": "waiter",
-                    "password": "password123",
-                },
-            )
-            await self.run_test(
-                "Update Employee",
-                "PATCH",
-                "/api/employee/employees/1",
-                json={"name": "Updated Name"},
-            )
-            await self.run_test("Get Menu Items", "GET", "/api/employee/menu")
-            await self.run_test(
-                "Get Menu Categories", "GET", "/api/employee/menu/categories"
-            )
-            await self.run_test(
-                "Create Menu Item",
-                "POST",
-                "/api/employee/menu",
-                json={"name": "Test Item", "price": 10.99, "category_id": 1},
-            )
-            await self.run_test(
-                "Update Menu Item",
-                "PATCH",
-                "/api/employee/menu/1",
-                json={"price": 12.99},
-            )
-            await self.run_test("Get Orders", "GET", "/api/employee/orders")
-            await self.run_test("Get Order by ID", "GET", "/api/employee/orders/1")
-            await self.run_test(
-                "Update Order Status",
-                "PATCH",
-                "/api/employee/orders/1/status",
-                json={"status": "preparing"},
-            )
-            await self.run_test(
-                "Get Order Items", "GET", "/api/employee/orders/1/items"
-            )
-            await self.run_test("Get Tables", "GET", "/api/employee/tables")
-            await self.run_test("Get Table by ID", "GET", "/api/employee/tables/1")
-            await self.run_test(
-                "Create Table",
-                "POST",
-                "/api/employee/tables",
-                json={"table_number": "99", "capacity": 4, "area_id": 1},
-            )
-            await self.run_test(
-                "Update Table", "PATCH", "/api/employee/tables/1", json={"capacity": 6}
-            )
-            await self.run_test("Get Sessions", "GET", "/api/employee/sessions/closed")
-            await self.run_test(
-                "Get Session by ID", "GET", "/api/employee/sessions/closed/1"
-            )
-            await self.run_test(
-                "Create Session",
-                "POST",
-                "/api/employee/sessions/closed",
-                json={"table_ids": [1, 2], "customer_count": 4},
-            )
-            await self.run_test(
-                "Close Session", "PATCH", "/api/employee/sessions/closed/1/close"
-            )
-            await self.run_test(
-                "Get Customers", "GET", "/api/employee/customers/search"
-            )
-            await self.run_test(
-                "Get Customer by ID", "GET", "/api/employee/customers/search/1"
-            )
-            await self.run_test("Get Waiter Calls", "GET", "/api/notifications/waiter/pending")
-            await self.run_test(
-                "Acknowledge Waiter Call",
-                "PATCH",
-                "/api/notifications/waiter/confirm/1",
-            )
-            await self.run_test("Get Promotions", "GET", "/api/employee/promotions")
-            await self.run_test(
-                "Create Promotion",
-                "POST",
-                "/api/employee/promotions",
-                json={
-                    "code": "TEST10",
-                    "discount_percent": 10,
-                    "valid_from": "2024-01-01",
-                    "valid_until": "2024-12-31",
-                },
-            )
-            await self.run_test(
-                "Update Promotion",
-                "PATCH",
-                "/api/employee/promotions/1",
-                json={"discount_percent": 15},
-            )
-            await self.run_test(
-                "Get Discount Codes", "GET", "/api/employee/discount-codes"
-            )
-            await self.run_test(
-                "Validate Discount Code",
-                "POST",
-                "/api/employee/discount-codes/validate",
-                json={"code": "SAVE10", "order_total": 100},
-            )
-            await self.run_test(
-                "Get Sales Report", "GET", "/api/employee/reports/sales"
-            )
-            await self.run_test(
-                "Get Daily Summary", "GET", "/api/employee/reports/top-products"
-            )
-            await self.run_test(
-                "Get Popular Items", "GET", "/api/employee/reports/popular-items"
-            )
-            await self.run_test(
-                "Get Dashboard Stats", "GET", "/api/employee/analytics/kpis"
-            )
-            await self.run_test(
-                "Get Revenue Stats", "GET", "/api/employee/analytics/revenue"
-            )
-            await self.run_test(
-                "Get Order Stats", "GET", "/api/employee/analytics/orders"
-            )
-            await self.run_test("Get Settings", "GET", "/api/employee/settings")
-            await self.run_test(
-                "Update Settings",
-                "PATCH",
-                "/api/employee/settings",
-                json={"timezone": "America/New_York"},
-            )
-            await self.run_test(
-                "Get Business Info", "GET", "/api/employee/business-info"
-            )
-            await self.run_test(
-                "Update Business Info",
-                "PATCH",
-                "/api/employee/business-info",
-                json={"name": "Updated Restaurant", "phone": "555-0123"},
-            )
-            await self.run_test("Get Branding", "GET", "/api/employee/branding/config")
-            await self.run_test(
-                "Update Branding",
-                "PATCH",
-                "/api/employee/branding/config",
-                json={"primary_color": "#FF5733"},
-            )
-            await self.run_test("Get Areas", "GET", "/api/employee/areas")
-            await self.run_test(
-                "Create Area",
-                "POST",
-                "/api/employee/areas",
-                json={"name": "Patio", "description": "Outdoor seating"},
-            )
-            await self.run_test("Get Roles", "GET", "/api/employee/roles/roles")
-            await self.run_test("Get Role by ID", "GET", "/api/employee/roles/roles/1")
-            await self.run_test(
-                "Get Notifications", "GET", "/api/realtime/notifications"
-            )
-            await self.run_test(
-                "Send Notification",
-                "POST",
-                "/api/realtime/notifications",
-                json={"title": "Test", "message": "Test message", "type": "info"},
-            )
-            await self.run_test(
-                "Get Table Assignments", "GET", "/api/employee/table-assignments"
-            )
-            await self.run_test(
-                "Assign Table",
-                "POST",
-                "/api/employee/table-assignments",
-                json={"table_id": 1, "employee_id": 1},
-            )
-            await self.run_test("Get Day Periods", "GET", "/api/employee/day-periods")
-            await self.run_test("Get Feedback", "GET", "/api/employee/feedback")
-            await self.run_test("Get Feedback by ID", "GET", "/api/employee/feedback/1")
-            await self.run_test("Get Images", "GET", "/api/employee/images")
-            await self.run_test("Upload Image", "POST", "/api/employee/images")
-            await self.run_test("Get Modifiers", "GET", "/api/employee/modifiers")
-            await self.run_test(
-                "Create Modifier",
-                "POST",
-                "/api/employee/modifiers",
-                json={"name": "Extra Cheese", "price": 1.50},
-            )
-            await self.run_test(
-                "Get Realtime Status", "GET", "/api/realtime/orders"
-            )
-            await self.run_test("Get Admin Config", "GET", "/api/employee/admin/config")
-            await self.run_test(
-                "Update Admin Config",
-                "PATCH",
-                "/api/employee/admin/config",
-                json={"maintenance_mode": False},
-            )
-            await self.run_test("Get Debug Info", "GET", "/api/employee/debug/info")
 
         await self.teardown()
 
@@ -951,11 +1247,12 @@ def check_api_health() -> bool:
     return False
 
 
-class AuthenticatedTestRunner:
+class AuthenticatedTestRunner(StagedRunnerMixin):
     """Test runner with authentication and test data creation."""
 
-    def __init__(self, quiet: bool = False):
+    def __init__(self, quiet: bool = False, parallelism: int = DEFAULT_PARALLELISM):
         self.quiet = quiet
+        self.parallelism = parallelism
         self.session: aiohttp.ClientSession | None = None
         self.results = []
         self.customer_token: str | None = None
@@ -964,11 +1261,13 @@ class AuthenticatedTestRunner:
         self.session_id: int | None = None
         self.notification_id: int | None = None
         self.test_email = f"test_{int(time.time())}@test.com"
+        self.skipped_stages: list[dict[str, Any]] = []
 
-    async def setup(self):
+    async def setup(self, connection_limit: int = 100):
         self.session = aiohttp.ClientSession(
             timeout=aiohttp.ClientTimeout(total=30),
             headers={"Content-Type": "application/json"},
+            connector=aiohttp.TCPConnector(limit=connection_limit),
         )
 
     async def teardown(self):
@@ -979,53 +1278,28 @@ class AuthenticatedTestRunner:
         self, method: str, endpoint: str, **kwargs
     ) -> tuple[int, dict[str, Any], float]:
         url = f"{BASE_URL}{endpoint}"
-        headers = kwargs.pop("headers", {})
-        if self.customer_token and endpoint.startswith("/api/client"):
+        headers = dict(kwargs.pop("headers", None) or {})
+        if "Authorization" in headers:
+            pass  # Identidad explícita (p.ej. del pool de tokens del modo carga)
+        elif self.customer_token and endpoint.startswith("/api/client"):
             headers["Authorization"] = f"Bearer {self.customer_token}"
         elif self.employee_token and endpoint.startswith("/api/employee"):
             headers["Authorization"] = f"Bearer {self.employee_token}"
-            # Debug log
-            print(f"DEBUG: Sending request to {endpoint}")
-            print(f"DEBUG: Token exists: {bool(self.employee_token)}")
-            if self.employee_token:
-                print(f"DEBUG: Token prefix: {self.employee_token[:30]}...")
         kwargs["headers"] = headers
 
-        start = datetime.now()
+        start = time.perf_counter()
         try:
             async with self.session.request(method, url, **kwargs) as response:
-                duration = (datetime.now() - start).total_seconds()
+                duration = time.perf_counter() - start
                 try:
                     data = await response.json()
                 except Exception:
                     data = {"raw": await response.text()}
                 return response.status, data, duration
         except aiohttp.ClientError as e:
-            duration = (datetime.now() - start).total_seconds()
+            duration = time.perf_counter() - start
             return 0, {"error": str(e)}, duration
 
-    async def run_test(self, name: str, method: str, endpoint: str, **kwargs) -> dict:
-        status, data, duration = await self.request(method, endpoint, **kwargs)
-        success = 200 <= status < 300
-        emoji = "✓" if success else "✗"
-        color = "\033[92m" if success else "\033[91m"
-
-        if not self.quiet:
-            print(
-                f"{color}{emoji}\033[0m {name:<45} [{status}] {duration * 1000:.1f}ms"
-            )
-
-        result = {
-            "name": name,
-            "endpoint": endpoint,
-            "method": method,
-            "status": status,
-            "success": success,
-            "duration": duration,
-        }
-        self.results.append(result)
-        return result
-
     async def authenticate_customer(self) -> bool:
         """Register and login a customer to get token."""
         self.log(f"\n{Colors.HEADER}=== Cliente: Autenticación ==={Colors.ENDC}")
@@ -1121,242 +1395,260 @@ class AuthenticatedTestRunner:
         self.log(f"{Colors.WARNING}⚠ No se pudo crear notificación{Colors.ENDC}")
         return False
 
-    def log(self, msg: str, color: str = ""):
-        if not self.quiet:
-            print(f"{color}{msg}{Colors.ENDC}")
-
-    async def test_authenticated_client_endpoints(self):
-        """Test client endpoints that require authentication."""
-        self.log(
-            f"\n{Colors.HEADER}=== Cliente: Endpoints autenticados ==={Colors.ENDC}"
-        )
-
+    def public_client_checks(self) -> list[EndpointCheck]:
+        return [
+            EndpointCheck("Get Menu", "GET", "/api/client/menu"),
+            EndpointCheck(
+                "Get Active Promotions", "GET", "/api/client/promotions/active"
+            ),
+            EndpointCheck("Get Tables", "GET", "/api/client/tables"),
+            EndpointCheck("Get Business Info", "GET", "/api/client/business-info"),
+            EndpointCheck("Get Shortcuts", "GET", "/api/client/shortcuts"),
+        ]
+
+    def authenticated_client_checks(self) -> list[EndpointCheck]:
+        """Endpoints de cliente que dependen de la sesión/notificación de prueba."""
+        checks: list[EndpointCheck] = []
         if self.session_id:
-            await self.run_test(
-                "Get Orders History",
-                "GET",
-                "/api/client/orders/history",
+            checks += [
+                EndpointCheck(
+                    "Get Orders History", "GET", "/api/client/orders/history"
+                ),
+                EndpointCheck(
+                    "Get Session Orders",
+                    "GET",
+                    f"/api/client/orders/session/{self.session_id}/orders",
+                ),
+                EndpointCheck(
+                    "Validate Session",
+                    "GET",
+                    f"/api/client/orders/session/{self.session_id}/validate",
+                ),
+                EndpointCheck(
+                    "Create Order",
+                    "POST",
+                    "/api/client/orders",
+                    json={
+                        "items": [{"menu_item_id": 1, "quantity": 1}],
+                        "session_id": self.session_id,
+                    },
+                ),
+            ]
+        if self.notification_id:
+            checks.append(
+                EndpointCheck(
+                    "Mark Notification Read",
+                    "POST",
+                    f"/api/client/notifications/{self.notification_id}/read",
+                )
             )
+        return checks
 
-            await self.run_test(
-                "Get Session Orders",
+    def employee_checks(self) -> list[EndpointCheck]:
+        """Endpoints de empleado (token de empleado en /api/employee)."""
+        return [
+            EndpointCheck(
+                "Employee Verify Token",
                 "GET",
-                f"/api/client/orders/session/{self.session_id}/orders",
-            )
-
-            await self.run_test(
-                "Validate Session",
+                "/api/employee/auth/verify",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Employee Get Me", "GET", "/api/employee/auth/me", group="employee"
+            ),
+            EndpointCheck(
+                "Employee Get Permissions",
                 "GET",
-                f"/api/client/orders/session/{self.session_id}/validate",
-            )
-
-            await self.run_test(
-                "Create Order",
-                "POST",
-                "/api/client/orders",
-                json={
-                    "items": [{"menu_item_id": 1, "quantity": 1}],
-                    "session_id": self.session_id,
-                },
-            )
-
-        if self.notification_id:
-            await self.run_test(
-                "Mark Notification Read",
-                "POST",
-                f"/api/client/notifications/{self.notification_id}/read",
-            )
-
-    async def test_authenticated_employee_endpoints(self):
-        """Test employee endpoints that require authentication."""
-        self.log(
-            f"\n{Colors.HEADER}=== Empleado: Endpoints autenticados ==={Colors.ENDC}"
-        )
+                "/api/employee/auth/permissions",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Employees", "GET", "/api/employee/employees", group="employee"
+            ),
+            EndpointCheck(
+                "Get Menu Items", "GET", "/api/employee/menu", group="employee"
+            ),
+            EndpointCheck(
+                "Get Menu Categories",
+                "GET",
+                "/api/employee/menu/categories",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Orders", "GET", "/api/employee/orders", group="employee"
+            ),
+            EndpointCheck(
+                "Get Tables", "GET", "/api/employee/tables", group="employee"
+            ),
+            EndpointCheck(
+                "Get Sessions",
+                "GET",
+                "/api/employee/sessions/closed/closed",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Customers Stats",
+                "GET",
+                "/api/employee/customers/search/stats",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Sales Report",
+                "GET",
+                "/api/employee/reports/sales",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Daily Summary",
+                "GET",
+                "/api/employee/reports/top-products",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Dashboard Stats",
+                "GET",
+                "/api/employee/analytics/kpis",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Settings", "GET", "/api/employee/settings", group="employee"
+            ),
+            EndpointCheck(
+                "Get Business Info",
+                "GET",
+                "/api/employee/business-info",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Branding", "GET", "/api/employee/branding/config", group="employee"
+            ),
+            EndpointCheck("Get Areas", "GET", "/api/employee/areas", group="employee"),
+            EndpointCheck(
+                "Get Roles Employees",
+                "GET",
+                "/api/employee/roles/roles/employees",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Employee Verify Token",
+                "GET",
+                "/api/employee/auth/verify",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Employee Get Me", "GET", "/api/employee/auth/me", group="employee"
+            ),
+            EndpointCheck(
+                "Employee Get Permissions",
+                "GET",
+                "/api/employee/auth/permissions",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Employees", "GET", "/api/employee/employees", group="employee"
+            ),
+            EndpointCheck(
+                "Get Menu Items", "GET", "/api/employee/menu", group="employee"
+            ),
+            EndpointCheck(
+                "Get Orders", "GET", "/api/employee/orders", group="employee"
+            ),
+            EndpointCheck(
+                "Get Tables", "GET", "/api/employee/tables", group="employee"
+            ),
+            EndpointCheck(
+                "Get Sessions",
+                "GET",
+                "/api/employee/sessions/closed/closed",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Customers Search",
+                "GET",
+                "/api/employee/customers/search?q=test",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Sales Report",
+                "GET",
+                "/api/employee/reports/sales",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Top Products",
+                "GET",
+                "/api/employee/reports/top-products",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Dashboard Stats",
+                "GET",
+                "/api/employee/analytics/kpis",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Settings", "GET", "/api/employee/settings", group="employee"
+            ),
+            EndpointCheck(
+                "Get Business Info",
+                "GET",
+                "/api/employee/business-info",
+                group="employee",
+            ),
+            EndpointCheck(
+                "Get Branding", "GET", "/api/employee/branding/config", group="employee"
+            ),
+            EndpointCheck("Get Areas", "GET", "/api/employee/areas", group="employee"),
+            EndpointCheck(
+                "Get Roles", "GET", "/api/employee/roles/roles/roles", group="employee"
+            ),
+            EndpointCheck(
+                "Get Notifications",
+                "GET",
+                "/api/realtime/notifications",
+                group="employee",
+            ),
+        ]
 
-        await self.run_test(
-            "Employee Verify Token",
-            "GET",
-            "/api/employee/auth/verify",
-        )
-        await self.run_test(
-            "Employee Get Me",
-            "GET",
-            "/api/employee/auth/me",
-        )
-        await self.run_test(
-            "Employee Get Permissions",
-            "GET",
-            "/api/employee/auth/permissions",
-        )
-        await self.run_test(
-            "Get Employees",
-            "GET",
-            "/api/employee/employees",
-        )
-        await self.run_test(
-            "Get Menu Items",
-            "GET",
-            "/api/employee/menu",
-        )
-        await self.run_test(
-            "Get Menu Categories",
-            "GET",
-            "/api/employee/menu/categories",
-        )
-        await self.run_test(
-            "Get Orders",
-            "GET",
-            "/api/employee/orders",
-        )
-        await self.run_test(
-            "Get Tables",
-            "GET",
-            "/api/employee/tables",
-        )
-        await self.run_test(
-            "Get Sessions",
-            "GET",
-            "/api/employee/sessions/closed/closed",
-        )
-        await self.run_test(
-            "Get Customers Stats",
-            "GET",
-            "/api/employee/customers/search/stats",
-        )
-        await self.run_test(
-            "Get Sales Report",
-            "GET",
-            "/api/employee/reports/sales",
-        )
-        await self.run_test(
-            "Get Daily Summary",
-            "GET",
-            "/api/employee/reports/top-products",
-        )
-        await self.run_test(
-            "Get Dashboard Stats",
-            "GET",
-            "/api/employee/analytics/kpis",
-        )
-        await self.run_test(
-            "Get Settings",
-            "GET",
-            "/api/employee/settings",
-        )
-        await self.run_test(
-            "Get Business Info",
-            "GET",
-            "/api/employee/business-info",
-        )
-        await self.run_test(
-            "Get Branding",
-            "GET",
-            "/api/employee/branding/config",
-        )
-        await self.run_test(
-            "Get Areas",
-            "GET",
-            "/api/employee/areas",
+    async def test_authenticated_client_endpoints(self):
+        """Test client endpoints that require authentication."""
+        await self.run_stage(
+            "=== Cliente: Endpoints autenticados ===",
+            self.authenticated_client_checks(),
+        )
+
+    def authorized_employee_checks(self) -> list[EndpointCheck]:
+        """``employee_checks`` si hay token; si no, registra la etapa como omitida."""
+        if self.employee_token:
+            return self.employee_checks()
+        checks = self.employee_checks()
+        self.skipped_stages.append(
+            {
+                "stage": "employee",
+                "reason": "login de empleado fallido",
+                "checks": [check.name for check in checks],
+            }
         )
-        await self.run_test(
-            "Get Roles Employees",
-            "GET",
-            "/api/employee/roles/roles/employees",
+        self.log(
+            f"{Colors.WARNING}⚠ Etapa de empleado omitida: {len(checks)} checks "
+            f"sin token{Colors.ENDC}"
         )
+        return []
 
-        await self.run_test(
-            "Employee Verify Token",
-            "GET",
-            "/api/employee/auth/verify",
-        )
-        await self.run_test(
-            "Employee Get Me",
-            "GET",
-            "/api/employee/auth/me",
-        )
-        await self.run_test(
-            "Employee Get Permissions",
-            "GET",
-            "/api/employee/auth/permissions",
-        )
-        await self.run_test(
-            "Get Employees",
-            "GET",
-            "/api/employee/employees",
-        )
-        await self.run_test(
-            "Get Menu Items",
-            "GET",
-            "/api/employee/menu",
-        )
-        await self.run_test(
-            "Get Orders",
-            "GET",
-            "/api/employee/orders",
-        )
-        await self.run_test(
-            "Get Tables",
-            "GET",
-            "/api/employee/tables",
-        )
-        await self.run_test(
-            "Get Sessions",
-            "GET",
-            "/api/employee/sessions/closed/closed",
-        )
-        await self.run_test(
-            "Get Customers Search",
-            "GET",
-            "/api/employee/customers/search?q=test",
-        )
-        await self.run_test(
-            "Get Sales Report",
-            "GET",
-            "/api/employee/reports/sales",
-        )
-        await self.run_test(
-            "Get Top Products",
-            "GET",
-            "/api/employee/reports/top-products",
-        )
-        await self.run_test(
-            "Get Dashboard Stats",
-            "GET",
-            "/api/employee/analytics/kpis",
-        )
-        await self.run_test(
-            "Get Settings",
-            "GET",
-            "/api/employee/settings",
-        )
-        await self.run_test(
-            "Get Business Info",
-            "GET",
-            "/api/employee/business-info",
-        )
-        await self.run_test(
-            "Get Branding",
-            "GET",
-            "/api/employee/branding/config",
-        )
-        await self.run_test(
-            "Get Areas",
-            "GET",
-            "/api/employee/areas",
-        )
-        await self.run_test(
-            "Get Roles",
-            "GET",
-            "/api/employee/roles/roles/roles",
-        )
-        await self.run_test(
-            "Get Notifications",
-            "GET",
-            "/api/realtime/notifications",
+    async def test_authenticated_employee_endpoints(self):
+        """Test employee endpoints that require authentication."""
+        await self.run_stage(
+            "=== Empleado: Endpoints autenticados ===",
+            self.authorized_employee_checks(),
+            parallel=True,
         )
 
     async def run_all(self):
-        """Run all tests with authentication and test data."""
+        """Run all tests with authentication and test data.
+
+        Etapas: health -> autenticación -> creación de datos -> escrituras ->
+        lecturas independientes en paralelo.
+        """
         await self.setup()
 
         print(f"\n{Colors.BOLD}========================================={Colors.ENDC}")
@@ -1366,16 +1658,23 @@ class AuthenticatedTestRunner:
 
         await self.test_health()
 
-        await self.test_public_client_endpoints()
-
         await self.authenticate_customer()
+        await self.authenticate_employee()
+
         await self.create_test_session()
         await self.create_test_notification()
 
-        await self.test_authenticated_client_endpoints()
-
-        await self.authenticate_employee()
-        await self.test_authenticated_employee_endpoints()
+        client_checks = self.authenticated_client_checks()
+        await self.run_stage(
+            "=== Cliente: escrituras ===", [c for c in client_checks if not c.read_only]
+        )
+        await self.run_stage(
+            "=== Lecturas independientes ===",
+            self.public_client_checks()
+            + [c for c in client_checks if c.read_only]
+            + self.authorized_employee_checks(),
+            parallel=True,
+        )
 
         await self.teardown()
 
@@ -1389,26 +1688,374 @@ class AuthenticatedTestRunner:
         print(f"Total Tests: {total}")
         print(f"{Colors.OKGREEN}Passed: {passed}{Colors.ENDC}")
         print(f"{Colors.FAIL}Failed: {failed}{Colors.ENDC}")
+        for stage in self.skipped_stages:
+            print(
+                f"{Colors.WARNING}Skipped: {len(stage['checks'])} "
+                f"({stage['stage']}: {stage['reason']}){Colors.ENDC}"
+            )
         print(f"Pass Rate: {(passed / total * 100):.1f}%" if total > 0 else "N/A")
         print(f"\nEnd Time: {datetime.now().isoformat()}")
 
         return self.results
 
     async def test_health(self):
-        print(f"\n{Colors.HEADER}Health Endpoints{Colors.ENDC}")
-        await self.run_test("Health Check", "GET", "/health")
-        await self.run_test("Client Health", "GET", "/api/client/health")
-        await self.run_test("Employee Health", "GET", "/api/employee/health")
+        health = [c for c in full_suite_checks() if c.group == "health"]
+        await self.run_stage("Health Endpoints", health, parallel=True)
 
     async def test_public_client_endpoints(self):
-        print(f"\n{Colors.HEADER}Client Endpoints (públicos){Colors.ENDC}")
-        await self.run_test("Get Menu", "GET", "/api/client/menu")
-        await self.run_test(
-            "Get Active Promotions", "GET", "/api/client/promotions/active"
+        await self.run_stage(
+            "Client Endpoints (públicos)", self.public_client_checks(), parallel=True
         )
-        await self.run_test("Get Tables", "GET", "/api/client/tables")
-        await self.run_test("Get Business Info", "GET", "/api/client/business-info")
-        await self.run_test("Get Shortcuts", "GET", "/api/client/shortcuts")
+
+
+async def _prepare_catalog(runner: "AuthenticatedTestRunner", args) -> list:
+    """Autenticar una vez y resolver el catálogo filtrado por --endpoints."""
+    from load_mode import select_checks
+
+    await runner.authenticate_customer()
+    await runner.create_test_session()
+    await runner.authenticate_employee()
+
+    patterns = [p.strip() for p in (args.endpoints or "").split(",") if p.strip()]
+    checks = select_checks(load_checks(runner), patterns)
+    if not checks:
+        raise SystemExit(
+            f"{Colors.FAIL}Ningún endpoint coincide con --endpoints{Colors.ENDC}"
+        )
+    return checks
+
+
+async def _prepare_token_pool(runner: "AuthenticatedTestRunner", args):
+    """Aprovisionar --token-pool clientes y las cuentas de empleado (None si 0)."""
+    from token_pool import (
+        DEFAULT_CACHE_PATH,
+        PoolProvisionError,
+        TokenPool,
+        load_employee_accounts,
+    )
+
+    if not args.token_pool:
+        return None
+    try:
+        accounts = load_employee_accounts(
+            args.employee_accounts, (ADMIN_EMAIL, ADMIN_PASSWORD)
+        )
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"{Colors.FAIL}--employee-accounts: {e}{Colors.ENDC}")
+    pool = TokenPool(
+        runner.request,
+        BASE_URL,
+        customers=args.token_pool,
+        employee_accounts=accounts,
+        cache_path=args.token_cache or DEFAULT_CACHE_PATH,
+    )
+    start = time.perf_counter()
+    try:
+        await pool.provision()
+    except PoolProvisionError as e:
+        raise SystemExit(f"{Colors.FAIL}✗ --token-pool: {e}{Colors.ENDC}")
+    print(
+        f"Pool de tokens: {pool.ready('customer')}/{args.token_pool} clientes, "
+        f"{pool.ready('employee')}/{len(accounts)} empleados "
+        f"({pool.cache_hits} de caché, {pool.logins} logins, "
+        f"{pool.failures} fallos, {time.perf_counter() - start:.1f}s)"
+    )
+    return pool
+
+
+def _pooled_headers(pool):
+    """headers_for del LoadGenerator: una identidad distinta por usuario virtual.
+
+    Los checks ligados a la sesión de prueba (``session_id``) siguen usando al
+    cliente que la abrió.
+    """
+
+    async def _headers_for(vu: int, check: EndpointCheck) -> dict[str, str]:
+        if check.json and "session_id" in check.json:
+            return {}
+        return await pool.headers_for(vu, check.endpoint)
+
+    return _headers_for
+
+
+async def run_load_mode(args) -> "LoadReport":
+    """Autenticar una vez, resolver el catálogo de carga y generar carga."""
+    from load_mode import LoadGenerator, format_report, run_load_workers
+
+    runner = AuthenticatedTestRunner(quiet=True)
+    await runner.setup(connection_limit=0 if args.rps else args.concurrency)
+    try:
+        checks = await _prepare_catalog(runner, args)
+        pool = await _prepare_token_pool(runner, args)
+
+        target = f"{args.rps} rps" if args.rps else f"concurrency={args.concurrency}"
+        if args.workers > 1:
+            target += f", {args.workers} procesos"
+        print(
+            f"\n{Colors.HEADER}=== MODO CARGA ({target}, {args.duration:.0f}s) ==={Colors.ENDC}"
+        )
+        print(
+            f"Cliente: {'ok' if runner.customer_token else 'sin token'}  "
+            f"Sesión: {runner.session_id or '-'}  "
+            f"Empleado: {'ok' if runner.employee_token else 'sin token'}"
+        )
+        print(f"Endpoints: {len(checks)}\n")
+
+        if args.workers > 1:
+            payload = {
+                "customer_token": runner.customer_token,
+                "employee_token": runner.employee_token,
+                "checks": checks,
+                "duration": args.duration,
+                "rps": args.rps,
+                "concurrency": args.concurrency,
+                "max_in_flight": args.max_in_flight,
+                "token_pool": pool.to_dict() if pool else None,
+            }
+            try:
+                report = await asyncio.to_thread(
+                    run_load_workers,
+                    _load_worker,
+                    args.workers,
+                    payload,
+                    rps=args.rps,
+                    concurrency=args.concurrency,
+                    progress=not args.quiet,
+                )
+            except RuntimeError as e:
+                raise SystemExit(f"{Colors.FAIL}✗ {e}{Colors.ENDC}")
+        else:
+            generator = LoadGenerator(
+                runner.request,
+                checks,
+                duration=args.duration,
+                rps=args.rps,
+                concurrency=args.concurrency,
+                max_in_flight=args.max_in_flight,
+                progress=not args.quiet,
+                headers_for=_pooled_headers(pool) if pool else None,
+            )
+            report = await generator.run()
+            if pool:
+                pool.save()
+    finally:
+        await runner.teardown()
+
+    print()
+    print(format_report(report))
+    return report
+
+
+def _load_worker(index: int, workers: int, payload: dict, barrier, results) -> None:
+    """Proceso de --load --workers: loop, sesión HTTP y parte de la carga propios."""
+    try:
+        asyncio.run(_load_worker_main(index, workers, payload, barrier, results))
+    except Exception as e:
+        barrier.abort()
+        results.put(("error", index, str(e) or type(e).__name__))
+
+
+async def _load_worker_main(
+    index: int, workers: int, payload: dict, barrier, results
+) -> None:
+    from load_mode import LoadGenerator, progress_callback, run_in_worker, worker_share
+    from token_pool import TokenPool
+
+    share = worker_share(index, workers, payload["rps"], payload["concurrency"])
+    runner = AuthenticatedTestRunner(quiet=True)
+    runner.customer_token = payload["customer_token"]
+    runner.employee_token = payload["employee_token"]
+    await runner.setup(connection_limit=0 if share.rps else share.concurrency)
+    try:
+        headers_for = None
+        if payload["token_pool"]:
+            pooled = _pooled_headers(
+                TokenPool.from_dict(payload["token_pool"], runner.request)
+            )
+
+            async def headers_for(vu: int, check: EndpointCheck) -> dict[str, str]:
+                return await pooled(vu * workers + index, check)
+
+        generator = LoadGenerator(
+            runner.request,
+            share.rotate(payload["checks"]),
+            duration=payload["duration"],
+            rps=share.rps,
+            concurrency=share.concurrency,
+            max_in_flight=-(-payload["max_in_flight"] // workers),
+            progress=False,
+            phase=share.phase,
+            on_progress=progress_callback(index, results),
+            headers_for=headers_for,
+        )
+        await run_in_worker(generator, index, barrier, results)
+    finally:
+        await runner.teardown()
+
+
+async def run_soak_mode(args) -> tuple["LoadReport", "SoakReport"]:
+    """Carga sostenida durante --soak muestreando recursos del stack local."""
+    from load_mode import LoadGenerator, format_report
+    from soak_mode import SoakMonitor, detect_stack, format_trends
+
+    services = [s.strip() for s in args.soak_services.split(",") if s.strip()]
+    stack, services = await detect_stack(args.compose_file, services)
+
+    runner = AuthenticatedTestRunner(quiet=True)
+    await runner.setup(connection_limit=0 if args.rps else args.concurrency)
+    try:
+        checks = await _prepare_catalog(runner, args)
+        pool = await _prepare_token_pool(runner, args)
+
+        async def _reauth() -> None:
+            await runner.authenticate_customer()
+            await runner.authenticate_employee()
+
+        monitor = SoakMonitor(
+            runner.request,
+            stack,
+            services,
+            duration=args.soak,
+            interval=args.soak_interval,
+            threshold_pct=args.leak_threshold,
+            reauth=_reauth,
+            progress=not args.quiet,
+        )
+        target = f"{args.rps} rps" if args.rps else f"concurrency={args.concurrency}"
+        print(
+            f"\n{Colors.HEADER}=== MODO SOAK ({target}, {args.soak:.0f}s, "
+            f"muestra cada {args.soak_interval:.0f}s) ==={Colors.ENDC}"
+        )
+        print(
+            f"Endpoints: {len(checks)}  Servicios: {', '.join(services) or '-'}  "
+            f"Postgres: {'sí' if stack and stack.has_postgres else 'no'}\n"
+        )
+
+        generator = LoadGenerator(
+            monitor.request,
+            checks,
+            duration=args.soak,
+            rps=args.rps,
+            concurrency=args.concurrency,
+            max_in_flight=args.max_in_flight,
+            progress=False,
+            headers_for=_pooled_headers(pool) if pool else None,
+        )
+        soak = await monitor.run(generator.run())
+        report = generator.report
+    finally:
+        await runner.teardown()
+
+    print()
+    print(format_report(report))
+    print(
+        f"\n{Colors.HEADER}=== TENDENCIAS (sin los primeros "
+        f"{soak.warmup:.0f}s) ==={Colors.ENDC}"
+    )
+    print(format_trends(soak.trends))
+    if soak.sampling_errors:
+        print(
+            f"{Colors.WARNING}⚠ {soak.sampling_errors} muestra(s) de recursos "
+            f"fallaron{Colors.ENDC}"
+        )
+    return report, soak
+
+
+async def run_sampling_mode(args) -> "SampleSet":
+    """Medir cada endpoint --samples veces, secuencialmente, para baseline/budget."""
+    from latency_baseline import collect_samples
+
+    runner = AuthenticatedTestRunner(quiet=True)
+    await runner.setup(connection_limit=1)
+    try:
+        checks = await _prepare_catalog(runner, args)
+        print(
+            f"\n{Colors.HEADER}=== MUESTREO ({args.samples} muestras x "
+            f"{len(checks)} endpoints) ==={Colors.ENDC}"
+        )
+        return await collect_samples(
+            runner.request,
+            checks,
+            base_url=BASE_URL,
+            samples=args.samples,
+            progress=not args.quiet,
+        )
+    finally:
+        await runner.teardown()
+
+
+def evaluate_latency_gates(args, sample_set=None, load_report=None) -> dict:
+    """Aplicar --save-baseline, --compare y --budget; ``failed`` si algo regresa."""
+    from latency_baseline import (
+        Budget,
+        SampleSet,
+        check_budget,
+        compare,
+        format_budget,
+        format_comparison,
+        measured_from_load,
+        measured_from_samples,
+    )
+
+    outcome: dict[str, Any] = {"failed": False}
+
+    if sample_set is not None and args.save_baseline:
+        sample_set.save(args.save_baseline)
+        print(
+            f"\n{Colors.OKGREEN}Baseline guardado en {args.save_baseline}{Colors.ENDC}"
+        )
+
+    if sample_set is not None and args.compare:
+        baseline = SampleSet.load(args.compare)
+        comparison = compare(
+            baseline,
+            sample_set,
+            alpha=args.alpha,
+            min_change=args.min_change / 100.0,
+            max_error_rate=args.max_error_rate / 100.0,
+        )
+        print(
+            f"\n{Colors.HEADER}=== COMPARACIÓN vs {args.compare} "
+            f"({baseline.created_at}) ==={Colors.ENDC}"
+        )
+        print(format_comparison(comparison))
+        failures = [item for item in comparison if item.failed]
+        outcome["comparison"] = [item.to_dict() for item in comparison]
+        if failures:
+            outcome["failed"] = True
+            print(
+                f"{Colors.FAIL}✗ {len(failures)} endpoint(s) con regresión "
+                f"significativa, errores o sin muestras exitosas{Colors.ENDC}"
+            )
+        else:
+            print(f"{Colors.OKGREEN}✓ Sin regresiones significativas{Colors.ENDC}")
+
+    if args.budget:
+        budget = Budget.load(args.budget)
+        measured = (
+            measured_from_load(load_report)
+            if load_report is not None
+            else measured_from_samples(sample_set)
+        )
+        results = check_budget(
+            budget, measured, max_error_rate=args.max_error_rate / 100.0
+        )
+        print(f"\n{Colors.HEADER}=== BUDGET p95 ({args.budget}) ==={Colors.ENDC}")
+        print(format_budget(results))
+        failures = [item for item in results if item.failed]
+        outcome["budget"] = [item.to_dict() for item in results]
+        if failures:
+            outcome["failed"] = True
+            print(
+                f"{Colors.FAIL}✗ {len(failures)} endpoint(s) exceden su p95, "
+                f"superan la tasa de error o no tienen muestras{Colors.ENDC}"
+            )
+        else:
+            print(
+                f"{Colors.OKGREEN}✓ Todos los endpoints dentro del budget{Colors.ENDC}"
+            )
+
+    return outcome
 
 
 def main():
@@ -1460,6 +2107,143 @@ def main():
         action="store_true",
         help="Modo completo con autenticación y datos de prueba",
     )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=DEFAULT_PARALLELISM,
+        metavar="N",
+        help=f"Lecturas independientes en paralelo (default: {DEFAULT_PARALLELISM}, 1 = secuencial)",
+    )
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="Modo carga: percentiles, throughput y errores por endpoint",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=30.0,
+        metavar="SECONDS",
+        help="Duración del modo carga (default: 30)",
+    )
+    parser.add_argument(
+        "--rps", type=float, help="Modo carga a tasa fija de peticiones por segundo"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="Modo carga: clientes concurrentes si no se usa --rps (default: 10)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Modo carga: repartir la carga en N procesos (default: 1)",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=1000,
+        metavar="N",
+        help="Modo carga --rps: tope de peticiones en vuelo; el exceso se descarta (default: 1000)",
+    )
+    parser.add_argument(
+        "--token-pool",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Modo carga/soak: N clientes distintos (un token por usuario virtual)",
+    )
+    parser.add_argument(
+        "--employee-accounts",
+        metavar="FILE",
+        help="JSON [{email, password}] de empleados para el pool (default: ADMIN_*)",
+    )
+    parser.add_argument(
+        "--token-cache",
+        metavar="FILE",
+        help="Caché de JWT del pool entre corridas (default: ~/.cache/pronto/load_tokens.json)",
+    )
+    parser.add_argument(
+        "--endpoints",
+        metavar="A,B",
+        help="Modo carga: filtrar endpoints por nombre o ruta (subcadena)",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=30,
+        metavar="N",
+        help="Muestras por endpoint para --compare/--save-baseline/--budget (default: 30)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        metavar="FILE",
+        help="Guardar distribución de latencias por endpoint como baseline",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="Comparar contra un baseline; falla si hay regresiones significativas",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.01,
+        help="Nivel de significancia de --compare (default: 0.01)",
+    )
+    parser.add_argument(
+        "--min-change",
+        type=float,
+        default=10.0,
+        metavar="PCT",
+        help="Cambio mínimo de la mediana para contar como regresión (default: 10)",
+    )
+    parser.add_argument(
+        "--budget",
+        metavar="FILE",
+        help="JSON con límites de p95 por endpoint; falla si alguno se excede",
+    )
+    parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=1.0,
+        metavar="PCT",
+        help="Tasa de error máxima por endpoint en --compare/--budget (default: 1)",
+    )
+    parser.add_argument(
+        "--soak",
+        metavar="DURATION",
+        help="Modo soak: carga sostenida (ej. 2h, 45m) muestreando RSS, fds y pg",
+    )
+    parser.add_argument(
+        "--soak-interval",
+        type=float,
+        default=30.0,
+        metavar="SECONDS",
+        help="Modo soak: segundos entre muestras (default: 30)",
+    )
+    parser.add_argument(
+        "--soak-services",
+        default="api,client,employees",
+        metavar="A,B",
+        help="Modo soak: servicios de compose a muestrear (default: api,client,employees)",
+    )
+    parser.add_argument(
+        "--compose-file",
+        action="append",
+        metavar="FILE",
+        help="Modo soak: docker-compose*.yml del stack (repetible; default: pronto-root/docker-compose.yml)",
+    )
+    parser.add_argument(
+        "--leak-threshold",
+        type=float,
+        default=5.0,
+        metavar="PCT",
+        help="Modo soak: crecimiento sostenido por hora que cuenta como fuga (default: 5)",
+    )
     args = parser.parse_args()
 
     print(f"{Colors.BOLD}========================================={Colors.ENDC}")
@@ -1475,11 +2259,121 @@ def main():
         check_api_health()
         return
 
+    if args.soak:
+        from soak_mode import parse_duration
+
+        if not HAS_AIOHTTP:
+            raise SystemExit(f"{Colors.FAIL}--soak requiere aiohttp{Colors.ENDC}")
+        try:
+            args.soak = parse_duration(args.soak)
+        except ValueError as e:
+            parser.error(str(e))
+        if (
+            args.soak_interval <= 0
+            or args.concurrency < 1
+            or (args.rps is not None and args.rps <= 0)
+        ):
+            parser.error("--soak-interval, --rps y --concurrency deben ser positivos")
+        if args.load or args.compare or args.save_baseline or args.workers > 1:
+            parser.error(
+                "--soak no se combina con --load/--workers/--compare/--save-baseline"
+            )
+        report, soak = asyncio.run(run_soak_mode(args))
+        gates = evaluate_latency_gates(args, load_report=report)
+        leaks = soak.leaks()
+        if leaks:
+            print(
+                f"{Colors.FAIL}✗ Posible fuga en: "
+                f"{', '.join(trend.series for trend in leaks)}{Colors.ENDC}"
+            )
+        else:
+            print(
+                f"{Colors.OKGREEN}✓ Sin crecimiento sostenido de recursos{Colors.ENDC}"
+            )
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(
+                    {
+                        "timestamp": datetime.now().isoformat(),
+                        "base_url": BASE_URL,
+                        "load": report.to_dict(),
+                        "soak": soak.to_dict(),
+                        "budget": gates.get("budget"),
+                    },
+                    f,
+                    indent=2,
+                )
+            print(f"\n{Colors.OKGREEN}Results saved to {args.output}{Colors.ENDC}")
+        if gates["failed"] or leaks:
+            raise SystemExit(1)
+        return
+
+    if args.load:
+        if not HAS_AIOHTTP:
+            raise SystemExit(f"{Colors.FAIL}--load requiere aiohttp{Colors.ENDC}")
+        if (
+            args.duration <= 0
+            or args.concurrency < 1
+            or (args.rps is not None and args.rps <= 0)
+        ):
+            parser.error("--duration, --rps y --concurrency deben ser positivos")
+        if args.workers < 1 or (not args.rps and args.concurrency < args.workers):
+            parser.error("--workers debe ser >= 1 y <= --concurrency")
+        if args.max_in_flight < 1:
+            parser.error("--max-in-flight debe ser positivo")
+        if args.compare or args.save_baseline:
+            parser.error("--compare/--save-baseline no aplican con --load")
+        report = asyncio.run(run_load_mode(args))
+        gates = evaluate_latency_gates(args, load_report=report)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(
+                    {
+                        "timestamp": datetime.now().isoformat(),
+                        "base_url": BASE_URL,
+                        "load": report.to_dict(),
+                        "budget": gates.get("budget"),
+                    },
+                    f,
+                    indent=2,
+                )
+            print(f"\n{Colors.OKGREEN}Results saved to {args.output}{Colors.ENDC}")
+        if gates["failed"]:
+            raise SystemExit(1)
+        return
+
+    if args.compare or args.save_baseline or args.budget:
+        if not HAS_AIOHTTP:
+            raise SystemExit(
+                f"{Colors.FAIL}--compare/--save-baseline/--budget requieren aiohttp{Colors.ENDC}"
+            )
+        if args.samples < 2:
+            parser.error("--samples debe ser al menos 2")
+        sample_set = asyncio.run(run_sampling_mode(args))
+        gates = evaluate_latency_gates(args, sample_set=sample_set)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(
+                    {
+                        "timestamp": datetime.now().isoformat(),
+                        "base_url": BASE_URL,
+                        "samples": sample_set.to_dict(),
+                        "comparison": gates.get("comparison"),
+                        "budget": gates.get("budget"),
+                    },
+                    f,
+                    indent=2,
+                )
+            print(f"\n{Colors.OKGREEN}Results saved to {args.output}{Colors.ENDC}")
+        if gates["failed"]:
+            raise SystemExit(1)
+        return
+
     if args.auth_mode:
         print(f"\n{Colors.HEADER}=== MODO AUTENTICADO ==={Colors.ENDC}")
         print("Este modo primero hace login y luego prueba APIs de empleado\n")
-        tester = AuthModeTester(quiet=args.quiet)
-        results = tester.run()
+        runner = AuthModeTester(quiet=args.quiet)
+        results = runner.run()
         if not results or any(not r.get("success") for r in results):
             raise SystemExit(1)
     elif args.auth or args.full:
@@ -1489,10 +2383,12 @@ def main():
                     f"\n{Colors.HEADER}=== MODO AUTENTICADO COMPLETO ==={Colors.ENDC}"
                 )
                 print("Con autenticación y creación de datos de prueba\n")
-                runner = AuthenticatedTestRunner(quiet=args.quiet)
+                runner = AuthenticatedTestRunner(
+                    quiet=args.quiet, parallelism=args.parallel
+                )
                 results = asyncio.run(runner.run_all())
             else:
-                runner = FullTestRunner(quiet=args.quiet)
+                runner = FullTestRunner(quiet=args.quiet, parallelism=args.parallel)
                 results = asyncio.run(runner.test_all())
         else:
             print(
@@ -1513,6 +2409,7 @@ def main():
                     "timestamp": datetime.now().isoformat(),
                     "base_url": BASE_URL,
                     "results": results,
+                    "skipped": getattr(runner, "skipped_stages", []),
                 },
                 f,
                 indent=2,
@@ -0,0 +1,654 @@
+#!/usr/bin/env python3
+"""
+Simulador de un turno completo del restaurante contra el API real.
+
+Modela N mesas durante ``--service-minutes`` minutos simulados, comprimidos por
+``--time-scale`` (60 = un minuto simulado por segundo real). Cada mesa recibe
+grupos de clientes uno tras otro:
+
+    cliente: registro/login -> abre sesión -> consulta menú -> ordena
+             (1..--max-rounds rondas) -> come -> pide la cuenta
+    mesero:  acepta órdenes y las entrega cuando cocina las marca listas
+    cocina:  inicia preparación, espera el tiempo de cocina, marca lista
+    cajero:  cobra la sesión (con propina aleatoria)
+
+Meseros, cocineros y cajeros son workers con capacidad limitada, así que las
+colas (y la latencia de punta a punta) crecen si el personal o el API no dan
+abasto. Los tiempos de espera ("think times") son exponenciales alrededor de
+su media, en minutos simulados.
+
+Reporta:
+    - latencia de punta a punta por orden (creada -> entregada) y espera por
+      transición, en minutos simulados
+    - throughput de transiciones de estado (por segundo real y hora simulada)
+    - latencia, throughput y errores por endpoint (ms reales, p50..p99.9)
+    - peticiones concurrentes máximas, para dimensionar workers de gunicorn
+
+Usage:
+    python simulate_service.py --tables 20 --service-minutes 120 --time-scale 60
+    python simulate_service.py --tables 40 --waiters 6 --chefs 4 -o turno.json
+
+Environment Variables:
+    API_BASE_URL      URL base del API (default: http://localhost:6082)
+    ADMIN_EMAIL       Email del empleado que ejecuta las transiciones
+    ADMIN_PASSWORD    Password del empleado
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - se valida en main()
+    aiohttp = None
+
+from latency_baseline import route_template
+from latency_histogram import LatencyHistogram
+from load_mode import LoadReport, format_report
+
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:6082")
+ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin@cafeteria.test")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "ChangeMe!123")
+
+# Endpoints del flujo; {order_id}/{session_id} se sustituyen por orden/sesión.
+ENDPOINTS = {
+    "register": ("POST", "/api/client/auth/register"),
+    "login": ("POST", "/api/client/auth/login"),
+    "open_session": ("POST", "/api/client/sessions/open"),
+    "menu": ("GET", "/api/client/menu"),
+    "create_order": ("POST", "/api/client/orders"),
+    "employee_login": ("POST", "/api/employee/auth/login"),
+    "accept": ("POST", "/api/employee/orders/{order_id}/accept"),
+    "kitchen_start": ("POST", "/api/employee/orders/{order_id}/kitchen/start"),
+    "kitchen_ready": ("POST", "/api/employee/orders/{order_id}/kitchen/ready"),
+    "deliver": ("POST", "/api/employee/orders/{order_id}/deliver"),
+    "pay": ("POST", "/api/employee/sessions/{session_id}/pay"),
+}
+
+TRANSITIONS = ("accept", "kitchen_start", "kitchen_ready", "deliver", "pay")
+TIP_PERCENTAGES = (0, 10, 10, 15, 20)
+
+
+class Colors:
+    HEADER = "\033[95m"
+    OKGREEN = "\033[92m"
+    WARNING = "\033[93m"
+    FAIL = "\033[91m"
+    BOLD = "\033[1m"
+    ENDC = "\033[0m"
+
+
+@dataclass
+class SimulationConfig:
+    tables: int = 10
+    service_minutes: float = 120.0
+    time_scale: float = 60.0
+    waiters: int = 3
+    chefs: int = 3
+    cashiers: int = 1
+    max_party_size: int = 4
+    max_rounds: int = 2
+    browse_minutes: float = 4.0
+    eat_minutes: float = 25.0
+    prep_minutes: float = 12.0
+    waiter_minutes: float = 1.0
+    cashier_minutes: float = 2.0
+    turnover_minutes: float = 5.0
+    payment_method: str = "cash"
+    seed: int | None = None
+
+
+@dataclass
+class OrderTrace:
+    order_id: str
+    session_id: str
+    created: float
+    transitions: dict[str, float] = field(default_factory=dict)
+    delivered: asyncio.Event = field(default_factory=asyncio.Event)
+    failed: bool = False
+
+
+@dataclass
+class SessionBill:
+    session_id: str
+    paid: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+def _find_menu_item_ids(data: Any) -> list[int | str]:
+    """Recolectar ids de productos de la respuesta del menú (forma tolerante)."""
+    found: list[int | str] = []
+
+    def _walk(node: Any) -> None:
+        if isinstance(node, dict):
+            if "id" in node and "price" in node and node.get("is_available", True):
+                found.append(node["id"])
+            for value in node.values():
+                _walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                _walk(value)
+
+    _walk(data)
+    return list(dict.fromkeys(found))
+
+
+def _extract_id(data: Any, *paths: tuple[str, ...]) -> str | None:
+    for path in paths:
+        node = data
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+        if node not in (None, ""):
+            return str(node)
+    return None
+
+
+class ServiceSimulator:
+    def __init__(self, config: SimulationConfig, quiet: bool = False):
+        self.config = config
+        self.quiet = quiet
+        self.random = random.Random(config.seed)
+        self.report = LoadReport(
+            mode="simulation", target=float(config.tables), duration=0.0
+        )
+        self.session: aiohttp.ClientSession | None = None
+        self.employee_token: str | None = None
+        self.menu_item_ids: list[int | str] = [1]
+
+        self.waiter_queue: asyncio.Queue = asyncio.Queue()
+        self.kitchen_queue: asyncio.Queue = asyncio.Queue()
+        self.cashier_queue: asyncio.Queue = asyncio.Queue()
+
+        self.orders: list[OrderTrace] = []
+        self.transition_counts: dict[str, int] = {name: 0 for name in TRANSITIONS}
+        self.transition_waits: dict[str, LatencyHistogram] = {
+            name: LatencyHistogram() for name in TRANSITIONS
+        }
+        self.end_to_end = LatencyHistogram()
+        self.parties = 0
+        self.covers = 0
+        self.failed_flows: dict[str, int] = {}
+        self.sessions_paid = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._started = 0.0
+
+    # -- reloj simulado ----------------------------------------------------
+
+    def sim_minutes(self) -> float:
+        return (time.perf_counter() - self._started) * self.config.time_scale / 60.0
+
+    def to_sim_minutes(self, real_seconds: float) -> float:
+        return real_seconds * self.config.time_scale / 60.0
+
+    async def think(self, mean_minutes: float) -> None:
+        """Esperar un tiempo exponencial de media ``mean_minutes`` simulados."""
+        if mean_minutes <= 0:
+            return
+        minutes = self.random.expovariate(1.0 / mean_minutes)
+        await asyncio.sleep(minutes * 60.0 / self.config.time_scale)
+
+    def log(self, msg: str) -> None:
+        if not self.quiet:
+            print(f"  [{self.sim_minutes():6.1f} min] {msg}")
+
+    # -- HTTP --------------------------------------------------------------
+
+    async def call(
+        self,
+        step: str,
+        token: str | None = None,
+        json_body: dict | None = None,
+        **path_params: str,
+    ) -> tuple[int, Any]:
+        method, template = ENDPOINTS[step]
+        endpoint = template.format(**path_params)
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            async with self.session.request(
+                method, f"{API_BASE_URL}{endpoint}", json=json_body, headers=headers
+            ) as response:
+                try:
+                    data = await response.json(content_type=None)
+                except ValueError:
+                    data = {"raw": await response.text()}
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status, data = 0, {"error": str(e)}
+        finally:
+            self.in_flight -= 1
+        self.report.stats_for(step, method, route_template(template)).record(
+            status, time.perf_counter() - start
+        )
+        return status, data
+
+    def _fail(self, step: str) -> None:
+        self.failed_flows[step] = self.failed_flows.get(step, 0) + 1
+
+    async def _transition(self, step: str, trace: OrderTrace, **payload) -> bool:
+        status, _ = await self.call(
+            step, self.employee_token, payload or {}, order_id=trace.order_id
+        )
+        if not 200 <= status < 300:
+            trace.failed = True
+            self._fail(step)
+            return False
+        now = time.perf_counter()
+        previous = max(trace.transitions.values(), default=trace.created)
+        self.transition_waits[step].record(self.to_sim_minutes(now - previous) * 60.0)
+        trace.transitions[step] = now
+        self.transition_counts[step] += 1
+        return True
+
+    # -- preparación -------------------------------------------------------
+
+    async def prepare(self) -> bool:
+        status, data = await self.call(
+            "employee_login",
+            json_body={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD},
+        )
+        self.employee_token = _extract_id(
+            data, ("data", "access_token"), ("access_token",)
+        )
+        if not self.employee_token:
+            print(
+                f"{Colors.FAIL}✗ Login de empleado fallido [{status}]: {data}{Colors.ENDC}"
+            )
+            return False
+
+        status, data = await self.call("menu")
+        menu_ids = _find_menu_item_ids(data) if 200 <= status < 300 else []
+        if menu_ids:
+            self.menu_item_ids = menu_ids
+        else:
+            print(
+                f"{Colors.WARNING}⚠ Menú sin productos reconocibles; "
+                f"usando menu_item_id=1{Colors.ENDC}"
+            )
+        return True
+
+    # -- clientes ----------------------------------------------------------
+
+    async def _customer_token(self, party_number: int) -> str | None:
+        email = f"sim_{int(time.time())}_{party_number}@test.com"
+        await self.call(
+            "register", json_body={"name": f"Sim {party_number}", "email": email}
+        )
+        status, data = await self.call("login", json_body={"email": email})
+        token = _extract_id(data, ("access_token",), ("data", "access_token"))
+        if not token:
+            self._fail("login")
+        return token
+
+    def _order_items(self, party_size: int) -> list[dict[str, Any]]:
+        count = self.random.randint(1, min(3, len(self.menu_item_ids)))
+        return [
+            {"menu_item_id": item_id, "quantity": self.random.randint(1, party_size)}
+            for item_id in self.random.sample(self.menu_item_ids, count)
+        ]
+
+    async def _party(self, table_number: int) -> None:
+        self.parties += 1
+        party_number = self.parties
+        party_size = self.random.randint(1, self.config.max_party_size)
+        self.covers += party_size
+
+        token = await self._customer_token(party_number)
+        if not token:
+            return
+        status, data = await self.call(
+            "open_session", token, {"table_number": str(table_number)}
+        )
+        session_id = _extract_id(data, ("session", "id"), ("data", "session", "id"))
+        if not session_id:
+            self._fail("open_session")
+            return
+        self.log(f"mesa {table_number}: grupo de {party_size} (sesión {session_id})")
+
+        await self.call("menu", token)
+        await self.think(self.config.browse_minutes)
+
+        rounds = self.random.randint(1, self.config.max_rounds)
+        for _ in range(rounds):
+            created = time.perf_counter()
+            status, data = await self.call(
+                "create_order",
+                token,
+                {
+                    "items": self._order_items(party_size),
+                    "session_id": session_id,
+                    "table_number": str(table_number),
+                },
+            )
+            order_id = _extract_id(
+                data, ("data", "order_id"), ("data", "id"), ("order", "id"), ("id",)
+            )
+            if not order_id:
+                self._fail("create_order")
+                break
+            trace = OrderTrace(order_id, session_id, created)
+            self.orders.append(trace)
+            await self.waiter_queue.put(("accept", trace))
+            await trace.delivered.wait()
+            if trace.failed:
+                break
+            await self.think(self.config.eat_minutes / rounds)
+
+        bill = SessionBill(session_id)
+        await self.cashier_queue.put(bill)
+        await bill.paid.wait()
+
+    async def _table(self, table_number: int) -> None:
+        # Escalonar la llegada del primer grupo.
+        await self.think(self.config.turnover_minutes * 2)
+        while self.sim_minutes() < self.config.service_minutes:
+            await self._party(table_number)
+            await self.think(self.config.turnover_minutes)
+
+    # -- personal ----------------------------------------------------------
+
+    async def _waiter(self) -> None:
+        while True:
+            action, trace = await self.waiter_queue.get()
+            await self.think(self.config.waiter_minutes)
+            if action == "accept":
+                if await self._transition("accept", trace):
+                    await self.kitchen_queue.put(trace)
+                else:
+                    trace.delivered.set()
+            else:
+                if await self._transition("deliver", trace):
+                    self.end_to_end.record(
+                        self.to_sim_minutes(time.perf_counter() - trace.created) * 60.0
+                    )
+                trace.delivered.set()
+            self.waiter_queue.task_done()
+
+    async def _chef(self) -> None:
+        while True:
+            trace = await self.kitchen_queue.get()
+            if await self._transition("kitchen_start", trace):
+                await self.think(self.config.prep_minutes)
+                if await self._transition("kitchen_ready", trace):
+                    await self.waiter_queue.put(("deliver", trace))
+                else:
+                    trace.delivered.set()
+            else:
+                trace.delivered.set()
+            self.kitchen_queue.task_done()
+
+    async def _cashier(self) -> None:
+        while True:
+            bill = await self.cashier_queue.get()
+            await self.think(self.config.cashier_minutes)
+            status, _ = await self.call(
+                "pay",
+                self.employee_token,
+                {
+                    "payment_method": self.config.payment_method,
+                    "tip_percentage": self.random.choice(TIP_PERCENTAGES),
+                },
+                session_id=bill.session_id,
+            )
+            if 200 <= status < 300:
+                self.transition_counts["pay"] += 1
+                self.sessions_paid += 1
+            else:
+                self._fail("pay")
+            bill.paid.set()
+            self.cashier_queue.task_done()
+
+    # -- ejecución ---------------------------------------------------------
+
+    async def run(self) -> dict[str, Any]:
+        connector = aiohttp.TCPConnector(limit=0)
+        self.session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30), connector=connector
+        )
+        self._started = time.perf_counter()
+        try:
+            if not await self.prepare():
+                raise SystemExit(1)
+            staff = (
+                [self._waiter() for _ in range(self.config.waiters)]
+                + [self._chef() for _ in range(self.config.chefs)]
+                + [self._cashier() for _ in range(self.config.cashiers)]
+            )
+            staff_tasks = [asyncio.create_task(worker) for worker in staff]
+            try:
+                await asyncio.gather(
+                    *(
+                        self._table(number)
+                        for number in range(1, self.config.tables + 1)
+                    )
+                )
+            finally:
+                for task in staff_tasks:
+                    task.cancel()
+                await asyncio.gather(*staff_tasks, return_exceptions=True)
+        finally:
+            await self.session.close()
+        self.report.elapsed = time.perf_counter() - self._started
+        self.report.duration = self.report.elapsed
+        return self.summary()
+
+    def summary(self) -> dict[str, Any]:
+        elapsed = self.report.elapsed
+        simulated_hours = self.to_sim_minutes(elapsed) / 60.0
+        transitions = sum(self.transition_counts.values())
+        delivered = sum(1 for trace in self.orders if "deliver" in trace.transitions)
+
+        def _minutes(histogram: LatencyHistogram) -> dict[str, Any]:
+            # Los histogramas guardan segundos simulados (summary() los da x1000).
+            return {
+                key.removesuffix("_ms"): (
+                    value / 60_000.0 if key != "count" and value is not None else value
+                )
+                for key, value in histogram.summary().items()
+            }
+
+        return {
+            "config": asdict(self.config),
+            "elapsed_seconds": elapsed,
+            "simulated_minutes": self.to_sim_minutes(elapsed),
+            "parties": self.parties,
+            "covers": self.covers,
+            "orders_created": len(self.orders),
+            "orders_delivered": delivered,
+            "sessions_paid": self.sessions_paid,
+            "failed_flows": dict(self.failed_flows),
+            "order_latency_sim_min": _minutes(self.end_to_end),
+            "transition_wait_sim_min": {
+                name: _minutes(histogram)
+                for name, histogram in self.transition_waits.items()
+            },
+            "transitions": dict(self.transition_counts),
+            "transitions_per_second": transitions / elapsed if elapsed else 0.0,
+            "transitions_per_sim_hour": (
+                transitions / simulated_hours if simulated_hours else 0.0
+            ),
+            "peak_in_flight_requests": self.peak_in_flight,
+            "api": self.report.to_dict(),
+        }
+
+
+def format_summary(result: dict[str, Any], report: LoadReport) -> str:
+    def _row(label: str, stats: dict[str, Any]) -> str:
+        def _fmt(key: str) -> str:
+            value = stats.get(key)
+            return f"{value:7.1f}" if value is not None else f"{'-':>7}"
+
+        return (
+            f"  {label:<22} n={stats['count']:<6} p50={_fmt('p50')} "
+            f"p90={_fmt('p90')} p99={_fmt('p99')} max={_fmt('max')}"
+        )
+
+    lines = [
+        f"Duración: {result['elapsed_seconds']:.1f}s reales = "
+        f"{result['simulated_minutes']:.0f} min simulados",
+        f"Grupos: {result['parties']}  Comensales: {result['covers']}  "
+        f"Órdenes: {result['orders_created']} creadas / "
+        f"{result['orders_delivered']} entregadas  "
+        f"Sesiones cobradas: {result['sessions_paid']}",
+        "",
+        "Latencia por orden (minutos simulados):",
+        _row("creada -> entregada", result["order_latency_sim_min"]),
+    ]
+    for name, stats in result["transition_wait_sim_min"].items():
+        if name != "pay":
+            lines.append(_row(f"espera {name}", stats))
+    lines += [
+        "",
+        f"Transiciones: {sum(result['transitions'].values())} "
+        f"({result['transitions_per_second']:.2f}/s reales, "
+        f"{result['transitions_per_sim_hour']:.0f}/hora simulada)",
+        f"Peticiones concurrentes máximas: {result['peak_in_flight_requests']}",
+    ]
+    if result["failed_flows"]:
+        failed = ", ".join(
+            f"{step}={count}" for step, count in sorted(result["failed_flows"].items())
+        )
+        lines.append(f"Flujos fallidos: {failed}")
+    lines += ["", "API por endpoint (ms reales):", format_report(report)]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simulador de turno completo contra el API de Pronto",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    defaults = SimulationConfig()
+    parser.add_argument("--tables", type=int, default=defaults.tables)
+    parser.add_argument(
+        "--service-minutes",
+        type=float,
+        default=defaults.service_minutes,
+        help="Duración del turno en minutos simulados (default: 120)",
+    )
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=defaults.time_scale,
+        help="Minutos simulados por minuto real (default: 60)",
+    )
+    parser.add_argument("--waiters", type=int, default=defaults.waiters)
+    parser.add_argument("--chefs", type=int, default=defaults.chefs)
+    parser.add_argument("--cashiers", type=int, default=defaults.cashiers)
+    parser.add_argument("--max-party-size", type=int, default=defaults.max_party_size)
+    parser.add_argument(
+        "--max-rounds",
+        type=int,
+        default=defaults.max_rounds,
+        help="Rondas de órdenes por grupo (default: 2)",
+    )
+    parser.add_argument(
+        "--prep-minutes",
+        type=float,
+        default=defaults.prep_minutes,
+        help="Tiempo medio de cocina (default: 12)",
+    )
+    parser.add_argument(
+        "--eat-minutes",
+        type=float,
+        default=defaults.eat_minutes,
+        help="Tiempo medio en mesa tras recibir la comida (default: 25)",
+    )
+    parser.add_argument(
+        "--payment-method",
+        default=defaults.payment_method,
+        choices=["cash", "card", "stripe", "clip"],
+    )
+    parser.add_argument("--seed", type=int, help="Semilla para reproducir la corrida")
+    parser.add_argument(
+        "--output", "-o", metavar="FILE", help="Guardar resultados en JSON"
+    )
+    parser.add_argument("--quiet", "-q", action="store_true", help="Modo silencioso")
+    args = parser.parse_args()
+
+    if aiohttp is None:
+        raise SystemExit(
+            f"{Colors.FAIL}simulate_service.py requiere aiohttp{Colors.ENDC}"
+        )
+    for name in (
+        "tables",
+        "waiters",
+        "chefs",
+        "cashiers",
+        "max_party_size",
+        "max_rounds",
+    ):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} debe ser al menos 1")
+    if args.time_scale <= 0 or args.service_minutes <= 0:
+        parser.error("--time-scale y --service-minutes deben ser positivos")
+
+    config = SimulationConfig(
+        tables=args.tables,
+        service_minutes=args.service_minutes,
+        time_scale=args.time_scale,
+        waiters=args.waiters,
+        chefs=args.chefs,
+        cashiers=args.cashiers,
+        max_party_size=args.max_party_size,
+        max_rounds=args.max_rounds,
+        prep_minutes=args.prep_minutes,
+        eat_minutes=args.eat_minutes,
+        payment_method=args.payment_method,
+        seed=args.seed,
+    )
+
+    print(f"{Colors.BOLD}========================================={Colors.ENDC}")
+    print(f"{Colors.BOLD}  Pronto - Simulación de turno{Colors.ENDC}")
+    print(f"{Colors.BOLD}========================================={Colors.ENDC}")
+    print(f"API_BASE_URL: {API_BASE_URL}")
+    print(
+        f"Mesas: {config.tables}  Turno: {config.service_minutes:.0f} min  "
+        f"Escala: x{config.time_scale:g} "
+        f"(~{config.service_minutes * 60 / config.time_scale:.0f}s reales)"
+    )
+    print(
+        f"Personal: {config.waiters} meseros, {config.chefs} cocina, "
+        f"{config.cashiers} caja\n"
+    )
+
+    simulator = ServiceSimulator(config, quiet=args.quiet)
+    result = asyncio.run(simulator.run())
+
+    print(f"\n{Colors.HEADER}=== RESULTADOS ==={Colors.ENDC}")
+    print(format_summary(result, simulator.report))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "timestamp": datetime.now().isoformat(),
+                    "base_url": API_BASE_URL,
+                    "simulation": result,
+                },
+                f,
+                indent=2,
+                default=str,
+            )
+        print(f"\n{Colors.OKGREEN}Results saved to {args.output}{Colors.ENDC}")
+
+    total = simulator.report.total()
+    if result["failed_flows"] or total.errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
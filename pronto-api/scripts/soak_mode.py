@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Modo soak para run_api_tests.py: carga sostenida + muestreo de recursos.
+
+Mientras ``LoadGenerator`` mantiene una carga mixta constante durante horas,
+``SoakMonitor`` toma una muestra cada ``interval`` segundos de:
+
+- RSS total, archivos abiertos y procesos de cada contenedor de la app
+  (``docker compose exec`` + ``/proc``; suma de todos los workers).
+- Conexiones de Postgres por estado (``pg_stat_activity`` de la base del app).
+- rps, tasa de error y p99 de la ventana (métricas del propio harness).
+
+Al final se ajusta una recta por mínimos cuadrados a cada serie, descartando
+el calentamiento (caches, pools que se llenan). Una serie de recursos se
+marca como fuga si crece de forma sostenida (R² alto) a más de
+``threshold_pct`` %/h de su valor inicial.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from latency_histogram import LatencyHistogram
+
+RequestFn = Callable[..., Awaitable[tuple[int, Any, float]]]
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_COMPOSE_FILE = REPO_ROOT / "pronto-root" / "docker-compose.yml"
+DEFAULT_SERVICES = ("api", "client", "employees")
+DEFAULT_INTERVAL = 30.0
+DEFAULT_LEAK_THRESHOLD_PCT = 5.0
+REAUTH_INTERVAL = 600.0
+MIN_TREND_SAMPLES = 5
+MIN_LEAK_R2 = 0.5
+
+# Crecimiento mínimo absoluto por hora para considerar fuga (evita marcar
+# series pequeñas donde +1 ya es un porcentaje alto).
+MIN_LEAK_SLOPE = {"rss_mb": 1.0, "fds": 1.0, "connections": 1.0}
+
+# Suma RSS (kB) y fds de todos los procesos visibles del contenedor, excepto el
+# propio shell de muestreo. Compatible con busybox (alpine) y debian-slim.
+PROC_SAMPLE_SCRIPT = r"""
+for d in /proc/[0-9]*; do
+  pid=${d#/proc/}
+  [ "$pid" = "$$" ] && continue
+  rss=$(sed -n 's/^VmRSS:[[:space:]]*\([0-9]*\).*/\1/p' "$d/status" 2>/dev/null)
+  [ -n "$rss" ] || continue
+  fds=$(ls "$d/fd" 2>/dev/null | wc -l)
+  echo "$pid $rss $fds"
+done
+"""
+
+PG_ACTIVITY_SQL = (
+    "SELECT coalesce(state, 'background'), count(*) FROM pg_stat_activity "
+    "WHERE datname = current_database() AND pid <> pg_backend_pid() GROUP BY 1"
+)
+
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$", re.IGNORECASE)
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(raw: str) -> float:
+    """``"90"``, ``"45m"``, ``"2h"``, ``"1.5h"`` -> segundos."""
+    match = _DURATION_RE.match(raw)
+    if not match:
+        raise ValueError(f"Duración inválida: {raw!r} (ej. 3600, 45m, 2h)")
+    seconds = float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()]
+    if seconds <= 0:
+        raise ValueError("La duración debe ser positiva")
+    return seconds
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds >= 3600:
+        return f"{seconds / 3600:g}h"
+    if seconds >= 60:
+        return f"{seconds / 60:g}m"
+    return f"{seconds:g}s"
+
+
+# -- docker compose ---------------------------------------------------------
+
+
+class ComposeStack:
+    """Acceso de solo lectura a los contenedores del stack de docker compose."""
+
+    def __init__(
+        self,
+        compose_files: list[str] | None = None,
+        project: str | None = None,
+        postgres_service: str = "postgres",
+    ):
+        self.compose_files = compose_files or [str(DEFAULT_COMPOSE_FILE)]
+        # Sin proyecto explícito manda el ``name:`` de los compose files.
+        self.project = project or os.getenv("COMPOSE_PROJECT_NAME") or None
+        self.postgres_service = postgres_service
+        self.postgres_user = os.getenv("POSTGRES_USER", "pronto")
+        self.postgres_db = os.getenv("POSTGRES_DB", "pronto")
+        self.has_postgres = True
+
+    def command(self, *args: str) -> list[str]:
+        cmd = ["docker", "compose"]
+        for compose_file in self.compose_files:
+            cmd += ["-f", compose_file]
+        if self.project:
+            cmd += ["-p", self.project]
+        return cmd + list(args)
+
+    async def _run(self, cmd: list[str], timeout: float = 20.0) -> str:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise RuntimeError(f"Timeout ejecutando: {' '.join(cmd[-3:])}")
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode(errors="replace").strip() or "error")
+        return stdout.decode(errors="replace")
+
+    async def running_services(self, services: list[str]) -> list[str]:
+        output = await self._run(
+            self.command("ps", "--status", "running", "--services")
+        )
+        running = set(output.split())
+        return [service for service in services if service in running]
+
+    async def sample_service(self, service: str) -> dict[str, float]:
+        output = await self._run(
+            self.command("exec", "-T", service, "sh", "-c", PROC_SAMPLE_SCRIPT)
+        )
+        rss_kb = fds = processes = 0
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) != 3:
+                continue
+            processes += 1
+            rss_kb += int(parts[1])
+            fds += int(parts[2])
+        return {"rss_mb": rss_kb / 1024.0, "fds": fds, "processes": processes}
+
+    async def sample_postgres(self) -> dict[str, int]:
+        output = await self._run(
+            self.command(
+                "exec",
+                "-T",
+                self.postgres_service,
+                "psql",
+                "-U",
+                self.postgres_user,
+                "-d",
+                self.postgres_db,
+                "-AtF",
+                "|",
+                "-c",
+                PG_ACTIVITY_SQL,
+            )
+        )
+        states: dict[str, int] = {}
+        for line in output.splitlines():
+            state, sep, count = line.rpartition("|")
+            if sep:
+                states[state] = int(count)
+        return states
+
+
+# -- tendencias -------------------------------------------------------------
+
+
+def linear_trend(points: list[tuple[float, float]]) -> tuple[float, float]:
+    """Pendiente (por unidad de x) y R² de mínimos cuadrados."""
+    n = len(points)
+    if n < 2:
+        return 0.0, 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    syy = sum((y - mean_y) ** 2 for _, y in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    if sxx == 0:
+        return 0.0, 0.0
+    slope = sxy / sxx
+    r2 = (sxy * sxy) / (sxx * syy) if syy > 0 else 0.0
+    return slope, r2
+
+
+@dataclass
+class Trend:
+    series: str
+    samples: int
+    first: float
+    last: float
+    minimum: float
+    maximum: float
+    slope_per_hour: float
+    r2: float
+    growth_pct_per_hour: float | None
+    leak: bool
+    tracked: bool
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "series": self.series,
+            "samples": self.samples,
+            "first": self.first,
+            "last": self.last,
+            "min": self.minimum,
+            "max": self.maximum,
+            "slope_per_hour": self.slope_per_hour,
+            "r2": self.r2,
+            "growth_pct_per_hour": self.growth_pct_per_hour,
+            "leak": self.leak,
+        }
+
+
+def _leak_metric(series: str) -> str | None:
+    """``"api.rss_mb"`` -> ``"rss_mb"``; None si la serie no es de recursos."""
+    metric = series.rsplit(".", 1)[-1]
+    return metric if metric in MIN_LEAK_SLOPE else None
+
+
+def analyze(
+    series: dict[str, list[tuple[float, float]]],
+    warmup: float,
+    threshold_pct: float = DEFAULT_LEAK_THRESHOLD_PCT,
+) -> list[Trend]:
+    trends: list[Trend] = []
+    for name in sorted(series):
+        points = [(t, value) for t, value in series[name] if t >= warmup]
+        if not points:
+            continue
+        slope, r2 = linear_trend([(t / 3600.0, value) for t, value in points])
+        values = [value for _, value in points]
+        first = values[0]
+        growth = slope / first * 100.0 if first else None
+        metric = _leak_metric(name)
+        leak = bool(
+            metric
+            and len(points) >= MIN_TREND_SAMPLES
+            and r2 >= MIN_LEAK_R2
+            and slope > MIN_LEAK_SLOPE[metric]
+            and (growth is None or growth > threshold_pct)
+        )
+        trends.append(
+            Trend(
+                series=name,
+                samples=len(points),
+                first=first,
+                last=values[-1],
+                minimum=min(values),
+                maximum=max(values),
+                slope_per_hour=slope,
+                r2=r2,
+                growth_pct_per_hour=growth,
+                leak=leak,
+                tracked=metric is not None,
+            )
+        )
+    return trends
+
+
+def format_trends(trends: list[Trend]) -> str:
+    header = (
+        f"{'Serie':<36} {'n':>4} {'inicio':>10} {'final':>10} {'máx':>10} "
+        f"{'pend/h':>10} {'%/h':>7} {'R²':>5}  "
+    )
+    lines = [header, "-" * len(header)]
+    for trend in trends:
+        growth = (
+            f"{trend.growth_pct_per_hour:+7.1f}"
+            if trend.growth_pct_per_hour is not None
+            else f"{'-':>7}"
+        )
+        verdict = "FUGA" if trend.leak else ("ok" if trend.tracked else "")
+        lines.append(
+            f"{trend.series[:36]:<36} {trend.samples:>4} {trend.first:>10.1f} "
+            f"{trend.last:>10.1f} {trend.maximum:>10.1f} "
+            f"{trend.slope_per_hour:>+10.2f} {growth} {trend.r2:>5.2f}  {verdict}"
+        )
+    return "\n".join(lines)
+
+
+# -- monitor ----------------------------------------------------------------
+
+
+@dataclass
+class SoakReport:
+    duration: float
+    interval: float
+    warmup: float
+    services: list[str]
+    started_at: str = ""
+    series: dict[str, list[tuple[float, float]]] = field(default_factory=dict)
+    sampling_errors: int = 0
+    reauths: int = 0
+    trends: list[Trend] = field(default_factory=list)
+
+    def add(self, name: str, t: float, value: float) -> None:
+        self.series.setdefault(name, []).append((round(t, 3), value))
+
+    def leaks(self) -> list[Trend]:
+        return [trend for trend in self.trends if trend.leak]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "interval": self.interval,
+            "warmup": self.warmup,
+            "services": self.services,
+            "sampling_errors": self.sampling_errors,
+            "reauths": self.reauths,
+            "series": {
+                name: [list(point) for point in points]
+                for name, points in self.series.items()
+            },
+            "trends": [trend.to_dict() for trend in self.trends],
+        }
+
+
+class SoakMonitor:
+    """Muestrea recursos y métricas de ventana mientras corre la carga.
+
+    ``request`` envuelve al del runner para medir la ventana actual; pásalo a
+    ``LoadGenerator`` en lugar del original.
+    """
+
+    def __init__(
+        self,
+        inner_request: RequestFn,
+        stack: ComposeStack | None,
+        services: list[str],
+        *,
+        duration: float,
+        interval: float = DEFAULT_INTERVAL,
+        warmup: float | None = None,
+        threshold_pct: float = DEFAULT_LEAK_THRESHOLD_PCT,
+        reauth: Callable[[], Awaitable[Any]] | None = None,
+        progress: bool = True,
+    ):
+        self.inner_request = inner_request
+        self.stack = stack
+        self.threshold_pct = threshold_pct
+        self.reauth = reauth
+        self.progress = progress
+        self.report = SoakReport(
+            duration=duration,
+            interval=interval,
+            warmup=warmup if warmup is not None else min(300.0, duration * 0.1),
+            services=list(services),
+        )
+        self._window = LatencyHistogram()
+        self._window_requests = 0
+        self._window_errors = 0
+
+    async def request(self, method: str, endpoint: str, **kwargs):
+        status, data, duration = await self.inner_request(method, endpoint, **kwargs)
+        self._window.record(duration)
+        self._window_requests += 1
+        if not 200 <= status < 300:
+            self._window_errors += 1
+        return status, data, duration
+
+    def _take_window(self, seconds: float) -> dict[str, float]:
+        window, requests, errors = (
+            self._window,
+            self._window_requests,
+            self._window_errors,
+        )
+        self._window = LatencyHistogram()
+        self._window_requests = self._window_errors = 0
+        return {
+            "rps": requests / seconds if seconds > 0 else 0.0,
+            "error_pct": errors / requests * 100.0 if requests else 0.0,
+            "p99_ms": window.percentile_ms(99.0) or 0.0,
+        }
+
+    async def _sample_resources(self, t: float) -> list[str]:
+        if self.stack is None:
+            return []
+        report = self.report
+        jobs = [self.stack.sample_service(s) for s in report.services]
+        if self.stack.has_postgres:
+            jobs.append(self.stack.sample_postgres())
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+
+        notes = []
+        for service, result in zip(report.services, results):
+            if isinstance(result, Exception):
+                report.sampling_errors += 1
+                continue
+            for metric, value in result.items():
+                report.add(f"{service}.{metric}", t, value)
+            notes.append(f"{service}={result['rss_mb']:.0f}MB/{result['fds']}fd")
+
+        if not self.stack.has_postgres:
+            return notes
+        pg = results[-1]
+        if isinstance(pg, Exception):
+            report.sampling_errors += 1
+        else:
+            report.add("postgres.connections", t, sum(pg.values()))
+            for state in ("active", "idle", "idle in transaction"):
+                key = state.replace(" ", "_")
+                report.add(f"postgres.{key}", t, pg.get(state, 0))
+            notes.append(f"pg={sum(pg.values())}")
+        return notes
+
+    async def _sample(self, start: float, last: float) -> float:
+        now = time.perf_counter()
+        t = now - start
+        window = self._take_window(now - last)
+        for metric, value in window.items():
+            self.report.add(f"load.{metric}", t, value)
+        notes = await self._sample_resources(t)
+        if self.progress:
+            print(
+                f"  t={_format_duration(round(t))}  rps={window['rps']:.1f}  "
+                f"err={window['error_pct']:.1f}%  p99={window['p99_ms']:.1f}ms  "
+                + "  ".join(notes),
+                flush=True,
+            )
+        return now
+
+    async def run(self, load: Awaitable[Any]) -> SoakReport:
+        """Correr ``load`` (p.ej. ``LoadGenerator.run()``) mientras se muestrea."""
+        self.report.started_at = datetime.now().isoformat()
+        start = last = time.perf_counter()
+        last_reauth = start
+        load_task = asyncio.ensure_future(load)
+        await self._sample_resources(0.0)
+        try:
+            while not load_task.done():
+                await asyncio.wait({load_task}, timeout=self.report.interval)
+                if load_task.done():
+                    break
+                last = await self._sample(start, last)
+                if self.reauth and last - last_reauth >= REAUTH_INTERVAL:
+                    await self.reauth()
+                    self.report.reauths += 1
+                    last_reauth = last
+            load_task.result()
+            if time.perf_counter() - last >= self.report.interval / 2:
+                await self._sample(start, last)
+        finally:
+            if not load_task.done():
+                load_task.cancel()
+        self.report.trends = analyze(
+            self.report.series, self.report.warmup, self.threshold_pct
+        )
+        return self.report
+
+
+async def detect_stack(
+    compose_files: list[str] | None, services: list[str]
+) -> tuple[ComposeStack | None, list[str]]:
+    """Stack y servicios a muestrear; ``(None, [])`` si docker no está disponible."""
+    stack = ComposeStack(compose_files)
+    try:
+        running = await stack.running_services(services + [stack.postgres_service])
+    except (OSError, RuntimeError) as e:
+        print(f"⚠ docker compose no disponible ({e}); solo métricas de carga")
+        return None, []
+    if stack.postgres_service not in running:
+        stack.has_postgres = False
+        print(f"⚠ Servicio {stack.postgres_service!r} no está corriendo")
+    missing = [s for s in services if s not in running]
+    if missing:
+        print(f"⚠ Servicios sin contenedor corriendo: {', '.join(missing)}")
+    app_services = [s for s in running if s != stack.postgres_service]
+    if not app_services and not stack.has_postgres:
+        return None, []
+    return stack, app_services
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Servidor stub del API de Pronto para medir el propio harness.
+
+Sirve los endpoints que usan ``run_api_tests.py``, ``simulate_service.py`` y
+``replay_access_log.py`` (health, menú, auth, sesiones, órdenes y sus
+transiciones) con respuestas de la misma forma que el API real, sin Docker ni
+base de datos. Cualquier otra ruta bajo ``/api/`` responde 200 ``{"success":
+true}`` salvo con ``--strict``.
+
+Latencias (ms) configurables por distribución, global o por ruta:
+
+    fixed:5            siempre 5 ms
+    uniform:2,10       uniforme entre 2 y 10 ms
+    normal:5,1         normal (media, desviación), truncada en 0
+    lognormal:5,0.5    log-normal (mediana, sigma)
+    exp:5              exponencial de media 5 ms
+
+Inyección de errores con ``--error-rate`` (global) o por ruta en
+``--route``. Las rutas aceptan plantillas (``/api/employee/orders/{id}``).
+
+Usage:
+    python stub_api_server.py --port 18082
+    python stub_api_server.py --latency lognormal:8,0.4 --error-rate 0.01
+    python stub_api_server.py --route "POST /api/client/orders=exp:30" \\
+        --route "GET /api/client/menu=fixed:2,error=0.05,status=503"
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import random
+import sys
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from aiohttp import web
+
+from latency_baseline import route_template
+
+DEFAULT_PORT = 18082
+
+
+@dataclass(frozen=True)
+class LatencySpec:
+    kind: str
+    params: tuple[float, ...]
+
+    @classmethod
+    def parse(cls, raw: str) -> "LatencySpec":
+        kind, _, rest = raw.strip().partition(":")
+        kind = kind.lower()
+        if kind in {"0", "none", ""}:
+            return cls("fixed", (0.0,))
+        params = tuple(float(value) for value in rest.split(",") if value.strip())
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Distribución de latencia inválida: {raw!r}")
+        return cls(kind, params)
+
+    def sample_ms(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(rng.gauss(*self.params), 0.0)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return median * rng.lognormvariate(0.0, sigma)
+        return rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class RouteBehavior:
+    latency: LatencySpec | None = None
+    error_rate: float | None = None
+    error_status: int | None = None
+
+
+def parse_route_option(raw: str) -> tuple[str, RouteBehavior]:
+    """``"POST /api/x/{id}=exp:30,error=0.1,status=503"``."""
+    key, _, spec = raw.partition("=")
+    method, _, path = key.strip().partition(" ")
+    if not path.startswith("/"):
+        raise ValueError(f"Ruta inválida (se espera 'METHOD /ruta'): {raw!r}")
+    latency_parts: list[str] = []
+    error_rate = None
+    error_status = None
+    for part in spec.split(","):
+        name, sep, value = part.partition("=")
+        if sep and name.strip() == "error":
+            error_rate = float(value)
+        elif sep and name.strip() == "status":
+            error_status = int(value)
+        elif part.strip():
+            latency_parts.append(part.strip())
+    latency = LatencySpec.parse(",".join(latency_parts)) if latency_parts else None
+    route_key = f"{method.upper()} {route_template(path)}"
+    return route_key, RouteBehavior(latency, error_rate, error_status)
+
+
+class StubApi:
+    def __init__(
+        self,
+        latency: LatencySpec,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        routes: dict[str, RouteBehavior] | None = None,
+        strict: bool = False,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.routes = routes or {}
+        self.strict = strict
+        self.rng = random.Random(seed)
+        self._ids = itertools.count(1)
+        self.requests = 0
+        self.errors = 0
+        self.handlers: dict[str, Callable[[web.Request], Any]] = {
+            "GET /health": self._health,
+            "GET /api/client/health": self._health,
+            "GET /api/employee/health": self._health,
+            "GET /api/client/menu": self._menu,
+            "GET /api/employee/menu": self._menu,
+            "POST /api/client/auth/register": self._register,
+            "POST /api/client/auth/login": self._client_login,
+            "POST /api/employee/auth/login": self._employee_login,
+            "POST /api/client/sessions/open": self._open_session,
+            "POST /api/client/orders": self._create_order,
+            "GET /api/employee/orders": self._list_orders,
+            "POST /api/realtime/notifications": self._create_notification,
+            "POST /api/employee/orders/{id}/accept": self._status("confirmed"),
+            "POST /api/employee/orders/{id}/kitchen/start": self._status("in_kitchen"),
+            "POST /api/employee/orders/{id}/kitchen/ready": self._status("ready"),
+            "POST /api/employee/orders/{id}/deliver": self._status("delivered"),
+            "POST /api/employee/sessions/{id}/pay": self._pay,
+        }
+
+    # -- respuestas --------------------------------------------------------
+
+    def _next_id(self) -> int:
+        return next(self._ids)
+
+    async def _health(self, request: web.Request) -> dict:
+        return {"status": "ok"}
+
+    async def _menu(self, request: web.Request) -> dict:
+        items = [
+            {"id": item_id, "name": f"Producto {item_id}", "price": 50.0 + item_id}
+            for item_id in range(1, 13)
+        ]
+        return {
+            "success": True,
+            "data": {
+                "categories": [
+                    {"id": 1, "name": "Comida", "items": items[:8]},
+                    {"id": 2, "name": "Bebidas", "items": items[8:]},
+                ]
+            },
+        }
+
+    async def _register(self, request: web.Request) -> dict:
+        return {"success": True, "user": {"id": self._next_id()}}
+
+    async def _client_login(self, request: web.Request) -> dict:
+        return {
+            "access_token": f"stub-customer-{uuid.uuid4().hex}",
+            "user": {"id": self._next_id()},
+        }
+
+    async def _employee_login(self, request: web.Request) -> dict:
+        return {
+            "success": True,
+            "data": {"access_token": f"stub-employee-{uuid.uuid4().hex}"},
+        }
+
+    async def _open_session(self, request: web.Request) -> dict:
+        return {"success": True, "session": {"id": str(uuid.uuid4())}}
+
+    async def _create_order(self, request: web.Request) -> dict:
+        return {
+            "success": True,
+            "data": {"order_id": str(uuid.uuid4()), "workflow_status": "new"},
+        }
+
+    async def _list_orders(self, request: web.Request) -> dict:
+        return {"success": True, "orders": []}
+
+    async def _create_notification(self, request: web.Request) -> dict:
+        return {"success": True, "id": self._next_id()}
+
+    def _status(self, workflow_status: str):
+        async def _handler(request: web.Request) -> dict:
+            return {"success": True, "workflow_status": workflow_status}
+
+        return _handler
+
+    async def _pay(self, request: web.Request) -> dict:
+        return {"success": True, "totals": {"subtotal": 100.0, "total_amount": 110.0}}
+
+    async def _generic(self, request: web.Request) -> dict:
+        return {"success": True}
+
+    # -- despacho ----------------------------------------------------------
+
+    async def dispatch(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        key = f"{request.method} {route_template(request.path)}"
+        behavior = self.routes.get(key, RouteBehavior())
+
+        latency = behavior.latency or self.latency
+        delay_ms = latency.sample_ms(self.rng)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+        error_rate = (
+            behavior.error_rate if behavior.error_rate is not None else self.error_rate
+        )
+        if error_rate and self.rng.random() < error_rate:
+            self.errors += 1
+            return web.json_response(
+                {"success": False, "error": "Error inyectado por el stub"},
+                status=behavior.error_status or self.error_status,
+            )
+
+        handler = self.handlers.get(key)
+        if handler is None:
+            if self.strict or not request.path.startswith("/api/"):
+                return web.json_response(
+                    {"success": False, "error": "Not found"}, status=404
+                )
+            handler = self._generic
+        return web.json_response(await handler(request))
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.dispatch)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Servidor stub del API de Pronto (benchmark del harness)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--latency",
+        default="fixed:0",
+        help="Distribución de latencia global (default: fixed:0)",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fracción de respuestas con error (default: 0)",
+    )
+    parser.add_argument(
+        "--error-status", type=int, default=500, help="Status de los errores"
+    )
+    parser.add_argument(
+        "--route",
+        action="append",
+        default=[],
+        metavar="'METHOD /ruta=DIST[,error=F][,status=N]'",
+        help="Latencia/errores por ruta (repetible)",
+    )
+    parser.add_argument(
+        "--strict", action="store_true", help="404 para rutas sin handler propio"
+    )
+    parser.add_argument("--seed", type=int, help="Semilla de latencias y errores")
+    args = parser.parse_args()
+
+    try:
+        latency = LatencySpec.parse(args.latency)
+        routes = dict(parse_route_option(raw) for raw in args.route)
+    except ValueError as e:
+        parser.error(str(e))
+    if not 0.0 <= args.error_rate <= 1.0:
+        parser.error("--error-rate debe estar entre 0 y 1")
+
+    stub = StubApi(
+        latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        routes=routes,
+        strict=args.strict,
+        seed=args.seed,
+    )
+    print(
+        f"Stub API en http://{args.host}:{args.port} "
+        f"(latencia {args.latency}, errores {args.error_rate:g})",
+        file=sys.stderr,
+        flush=True,
+    )
+    web.run_app(stub.app(), host=args.host, port=args.port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
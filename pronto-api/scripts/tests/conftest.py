@@ -0,0 +1,6 @@
+"""Los scripts se importan entre sí por nombre (``from latency_histogram import ...``)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
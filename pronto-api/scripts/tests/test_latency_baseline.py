@@ -0,0 +1,137 @@
+from latency_baseline import (
+    Budget,
+    BudgetResult,
+    EndpointSamples,
+    SampleSet,
+    check_budget,
+    compare,
+    measured_from_load,
+    route_key,
+)
+from latency_histogram import LatencyHistogram
+from load_mode import LoadReport
+
+
+def _sample_set(**endpoints) -> SampleSet:
+    sample_set = SampleSet(base_url="http://localhost", samples=30)
+    for key, (samples_ms, errors) in endpoints.items():
+        method, route = key.split("_", 1)
+        stats = EndpointSamples(key, method, "/" + route, list(samples_ms), errors)
+        sample_set.endpoints[stats.key] = stats
+    return sample_set
+
+
+def _verdicts(results) -> dict[str, str]:
+    return {result.name: result.verdict for result in results}
+
+
+def test_route_key_replaces_ids():
+    assert route_key("get", "/api/orders/42/items?x=1") == "GET /api/orders/{id}/items"
+    uuid = "0b7c6a52-8f1e-4a57-9a8e-3c1c2f6c0d11"
+    assert route_key("GET", f"/api/sessions/{uuid}") == "GET /api/sessions/{id}"
+
+
+def test_compare_verdicts():
+    fast = [10.0 + 0.1 * k for k in range(30)]
+    slow = [20.0 + 0.1 * k for k in range(30)]
+    baseline = _sample_set(
+        GET_slower=(fast, 0),
+        GET_faster=(slow, 0),
+        GET_steady=(fast, 0),
+        GET_failing=(fast, 0),
+        GET_gone=(fast, 0),
+    )
+    current = _sample_set(
+        GET_slower=(slow, 0),
+        GET_faster=(fast, 0),
+        GET_steady=(list(reversed(fast)), 0),
+        GET_failing=(fast, 5),
+        GET_added=(fast, 0),
+    )
+    results = compare(baseline, current)
+    assert _verdicts(results) == {
+        "GET_slower": "regression",
+        "GET_faster": "improvement",
+        "GET_steady": "same",
+        "GET_failing": "errors",
+        "GET_gone": "missing",
+        "GET_added": "new",
+    }
+    failed = {result.name for result in results if result.failed}
+    assert failed == {"GET_slower", "GET_failing", "GET_gone"}
+
+
+def test_compare_ignores_small_significant_change():
+    base = [10.0 + 0.01 * k for k in range(30)]
+    current = [value * 1.05 for value in base]
+    results = compare(
+        _sample_set(GET_menu=(base, 0)),
+        _sample_set(GET_menu=(current, 0)),
+        min_change=0.10,
+    )
+    assert _verdicts(results) == {"GET_menu": "same"}
+
+
+def test_compare_only_successes_is_missing():
+    results = compare(
+        _sample_set(GET_menu=([10.0] * 30, 0)),
+        _sample_set(GET_menu=([], 30)),
+    )
+    assert _verdicts(results) == {"GET_menu": "missing"}
+
+
+def test_budget_result_verdicts():
+    assert BudgetResult("k", "n", 100.0, 80.0, 100).verdict == "ok"
+    assert BudgetResult("k", "n", 100.0, 120.0, 100).verdict == "exceeded"
+    assert BudgetResult("k", "n", 100.0, 80.0, 90, errors=10).verdict == "errors"
+    assert BudgetResult("k", "n", 100.0, None, 0, errors=5).verdict == "missing"
+    assert not BudgetResult("k", "n", 100.0, 80.0, 100).failed
+
+
+def _histogram(values_ms) -> LatencyHistogram:
+    histogram = LatencyHistogram()
+    for value in values_ms:
+        histogram.record(value / 1000.0)
+    return histogram
+
+
+def test_check_budget_limits_by_key_name_and_default():
+    budget = Budget.from_dict(
+        {
+            "default_p95_ms": 50,
+            "endpoints": {
+                "GET /api/orders/7": 200,
+                "Get Menu": {"p95_ms": 10},
+            },
+        }
+    )
+    measured = {
+        "GET /api/orders/{id}": ("Get Order", _histogram([100.0] * 20), 0),
+        "GET /api/menu": ("Get Menu", _histogram([20.0] * 20), 0),
+        "GET /health": ("Health", _histogram([60.0] * 20), 0),
+    }
+    results = {result.key: result for result in check_budget(budget, measured)}
+    assert results["GET /api/orders/{id}"].verdict == "ok"
+    assert results["GET /api/menu"].verdict == "exceeded"
+    assert results["GET /health"].verdict == "exceeded"
+
+
+def test_check_budget_reports_unmeasured_keys_as_missing():
+    budget = Budget.from_dict({"endpoints": {"GET /api/menu": 10}})
+    (result,) = check_budget(budget, {})
+    assert result.verdict == "missing"
+    assert result.failed
+
+
+def test_measured_from_load_groups_routes_and_counts_dropped():
+    report = LoadReport("rps", 10.0, 1.0, elapsed=1.0)
+    report.stats_for("Get Order", "GET", "/api/orders/1").record(200, 0.01)
+    second = report.stats_for("Get Order", "GET", "/api/orders/2")
+    second.record(200, 0.02)
+    second.record(500, 3.0)
+    second.dropped = 4
+    measured = measured_from_load(report)
+    name, histogram, errors = measured["GET /api/orders/{id}"]
+    assert name == "Get Order"
+    assert histogram.count == 2
+    assert errors == 5
@@ -0,0 +1,67 @@
+import pytest
+
+from latency_histogram import LatencyHistogram, percentile_key
+
+
+def _filled(values_ms) -> LatencyHistogram:
+    histogram = LatencyHistogram()
+    for value in values_ms:
+        histogram.record(value / 1000.0)
+    return histogram
+
+
+def test_percentiles_within_relative_error():
+    histogram = _filled(range(1, 1001))
+    assert histogram.count == 1000
+    for percentile, expected in ((50.0, 500), (90.0, 900), (99.0, 990), (99.9, 999)):
+        value = histogram.percentile_ms(percentile)
+        assert value == pytest.approx(expected, rel=2**-7)
+
+
+def test_percentiles_clamped_to_min_and_max():
+    histogram = _filled([5.0, 5.0, 5.0])
+    assert histogram.percentile_ms(0.1) == 5.0
+    assert histogram.percentile_ms(100.0) == 5.0
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile_ms(99.0) is None
+    assert histogram.mean_ms() is None
+    assert histogram.summary()["count"] == 0
+
+
+def test_merge_equals_single_histogram():
+    merged = _filled(range(1, 501)).merge(_filled(range(501, 1001)))
+    single = _filled(range(1, 1001))
+    assert merged.counts == single.counts
+    assert merged.count == single.count
+    assert merged.total_us == single.total_us
+    assert (merged.min_us, merged.max_us) == (single.min_us, single.max_us)
+    assert merged.percentile_ms(99.0) == single.percentile_ms(99.0)
+
+
+def test_merge_into_empty_keeps_min_and_max():
+    merged = LatencyHistogram().merge(_filled([3.0, 7.0]))
+    assert (merged.min_us, merged.max_us) == (3000, 7000)
+
+
+def test_merged_of_nothing_is_empty():
+    assert LatencyHistogram.merged([]).count == 0
+
+
+def test_merge_rejects_other_precision():
+    with pytest.raises(ValueError):
+        LatencyHistogram(8).merge(LatencyHistogram(6))
+
+
+def test_dict_round_trip():
+    histogram = _filled([0.5, 1.0, 12.3, 250.0])
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.counts == histogram.counts
+    assert restored.summary() == histogram.summary()
+
+
+def test_percentile_key():
+    assert percentile_key(50.0) == "p50"
+    assert percentile_key(99.9) == "p99_9"
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+from load_mode import EndpointStats, LoadGenerator, LoadReport, worker_share
+
+
+def _check(name="Get Menu", method="GET", endpoint="/api/menu"):
+    return SimpleNamespace(name=name, method=method, endpoint=endpoint, json=None)
+
+
+def test_record_keeps_failed_latencies_apart():
+    stats = EndpointStats("Get Menu", "GET", "/api/menu")
+    stats.record(200, 0.010)
+    stats.record(201, 0.020)
+    stats.record(500, 5.0)
+    stats.record(0, 30.0)
+    assert stats.requests == 4
+    assert stats.errors == 2
+    assert stats.histogram.count == 2
+    assert stats.error_histogram.count == 2
+    assert stats.histogram.percentile_ms(100.0) < 25.0
+    assert stats.statuses == {200: 1, 201: 1, 500: 1, 0: 1}
+
+
+def test_merge_and_round_trip():
+    a = EndpointStats("Get Menu", "GET", "/api/menu")
+    a.record(200, 0.010)
+    a.dropped = 3
+    b = EndpointStats("Get Menu", "GET", "/api/menu")
+    b.record(503, 0.5)
+    b.dropped = 2
+    a.merge(b)
+    assert (a.requests, a.errors, a.dropped) == (2, 1, 5)
+
+    restored = EndpointStats.from_dict(a.to_dict(elapsed=1.0))
+    assert restored.dropped == 5
+    assert restored.histogram.counts == a.histogram.counts
+    assert restored.error_histogram.counts == a.error_histogram.counts
+
+
+def test_from_dict_without_error_histogram():
+    data = EndpointStats("Get Menu", "GET", "/api/menu").to_dict(elapsed=1.0)
+    del data["error_histogram"], data["dropped"]
+    stats = EndpointStats.from_dict(data)
+    assert stats.error_histogram.count == 0
+    assert stats.dropped == 0
+
+
+def test_report_merge_sums_endpoints():
+    first = LoadReport("rps", 10.0, 1.0, elapsed=1.0)
+    first.stats_for("Get Menu", "GET", "/api/menu").record(200, 0.01)
+    second = LoadReport("rps", 10.0, 1.0, elapsed=1.2)
+    second.stats_for("Get Menu", "GET", "/api/menu").record(500, 0.01)
+    second.stats_for("Health", "GET", "/health").record(200, 0.01)
+    first.merge(second)
+    assert first.elapsed == 1.2
+    assert first.total().requests == 3
+    assert first.total().errors == 1
+
+
+def test_open_loop_drops_arrivals_over_the_cap():
+    async def slow_request(method, endpoint, **kwargs):
+        await asyncio.sleep(0.5)
+        return 200, None, 0.5
+
+    generator = LoadGenerator(
+        slow_request,
+        [_check()],
+        duration=0.2,
+        rps=200,
+        max_in_flight=2,
+        progress=False,
+    )
+    report = asyncio.run(generator.run())
+    total = report.total()
+    assert total.requests == 2
+    assert total.dropped > 0
+    assert total.requests + total.dropped <= 41
+
+
+def test_worker_share_splits_rate_and_clients():
+    shares = [worker_share(i, 4, 100.0, 0) for i in range(4)]
+    assert all(share.rps == 25.0 for share in shares)
+    assert [share.phase for share in shares] == [0.0, 0.01, 0.02, 0.03]
+
+    clients = [worker_share(i, 3, None, 10).concurrency for i in range(3)]
+    assert clients == [4, 3, 3]
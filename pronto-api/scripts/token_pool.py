@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Pool de identidades autenticadas para el modo carga de run_api_tests.py.
+
+En lugar de que todos los usuarios virtuales compartan un solo token, se
+aprovisionan de antemano ``customers`` clientes (registro + login) y las
+cuentas de empleado disponibles, en paralelo pero con concurrencia acotada
+(el login usa bcrypt y no queremos medir eso). Los JWT se guardan en disco
+con su expiración (claim ``exp``) y se reutilizan entre corridas; un token
+que está por vencer se renueva de forma perezosa la primera vez que se pide.
+
+Cada usuario virtual ``vu`` recibe siempre la misma identidad
+(``vu % len(pool)``), así que la carga se reparte entre usuarios distintos y
+aparece la contención por usuario (caches, locks de sesión) que un token
+compartido oculta. Si ningún login de un tipo funciona, ``provision`` falla
+con ``PoolProvisionError`` en vez de repartir identidades sin token.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+RequestFn = Callable[..., Awaitable[tuple[int, Any, float]]]
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "pronto" / "load_tokens.json"
+DEFAULT_AUTH_CONCURRENCY = 4
+DEFAULT_TOKEN_TTL = 900.0
+REFRESH_MARGIN = 60.0
+CUSTOMER_EMAIL_TEMPLATE = "loadtest_{index:04d}@test.com"
+
+
+class PoolProvisionError(RuntimeError):
+    """Ninguna identidad de algún tipo pudo autenticarse."""
+
+
+def token_expiry(token: str, default_ttl: float = DEFAULT_TOKEN_TTL) -> float:
+    """Epoch de expiración del claim ``exp`` de un JWT (sin verificar firma)."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + default_ttl
+
+
+@dataclass
+class Identity:
+    kind: str  # "customer" | "employee"
+    email: str
+    token: str | None = None
+    expires_at: float = 0.0
+    user_id: int | None = None
+    issued_at: float = 0.0
+
+    def valid(self, margin: float = REFRESH_MARGIN) -> bool:
+        # Tokens de vida corta: renovar en el último cuarto, no a 60s fijos.
+        margin = min(margin, max(self.expires_at - self.issued_at, 0.0) / 4)
+        return bool(self.token) and self.expires_at - margin > time.time()
+
+
+def load_employee_accounts(path: str | None, default: tuple[str, str]) -> list[dict]:
+    """Cuentas ``[{"email": ..., "password": ...}]`` o solo la de ADMIN_*."""
+    if not path:
+        return [{"email": default[0], "password": default[1]}]
+    accounts = json.loads(Path(path).read_text())
+    if not isinstance(accounts, list) or not all(
+        isinstance(item, dict) and item.get("email") and item.get("password")
+        for item in accounts
+    ):
+        raise ValueError(f"{path}: se espera una lista de {{email, password}}")
+    return accounts
+
+
+class TokenPool:
+    def __init__(
+        self,
+        request: RequestFn,
+        base_url: str,
+        *,
+        customers: int,
+        employee_accounts: list[dict],
+        cache_path: Path | str | None = DEFAULT_CACHE_PATH,
+        auth_concurrency: int = DEFAULT_AUTH_CONCURRENCY,
+    ):
+        self.request = request
+        self.base_url = base_url
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.passwords = {a["email"]: a["password"] for a in employee_accounts}
+        self.customers = [
+            Identity("customer", CUSTOMER_EMAIL_TEMPLATE.format(index=index))
+            for index in range(customers)
+        ]
+        self.employees = [
+            Identity("employee", account["email"]) for account in employee_accounts
+        ]
+        self._semaphore = asyncio.Semaphore(auth_concurrency)
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        self.logins = 0
+        self.cache_hits = 0
+        self.failures = 0
+
+    # -- caché en disco ----------------------------------------------------
+
+    def _load_cache(self) -> None:
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            data = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            return
+        cached = data.get(self.base_url, {})
+        for identity in self.customers + self.employees:
+            entry = cached.get(f"{identity.kind}:{identity.email}")
+            if entry:
+                identity.token = entry.get("token")
+                identity.expires_at = float(entry.get("expires_at", 0))
+                identity.user_id = entry.get("user_id")
+                identity.issued_at = float(entry.get("issued_at", 0))
+
+    def save(self) -> None:
+        if not self.cache_path:
+            return
+        data: dict[str, Any] = {}
+        if self.cache_path.exists():
+            try:
+                data = json.loads(self.cache_path.read_text())
+            except (OSError, ValueError):
+                data = {}
+        entries = data.setdefault(self.base_url, {})
+        now = time.time()
+        for key in [k for k, v in entries.items() if v.get("expires_at", 0) < now]:
+            del entries[key]
+        for identity in self.customers + self.employees:
+            if identity.valid(margin=0):
+                entries[f"{identity.kind}:{identity.email}"] = asdict(identity)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.cache_path)
+
+    # -- login -------------------------------------------------------------
+
+    async def _login_customer(self, identity: Identity) -> bool:
+        status, data, _ = await self.request(
+            "POST", "/api/client/auth/login", json={"email": identity.email}
+        )
+        if status != 200 or not data.get("access_token"):
+            await self.request(
+                "POST",
+                "/api/client/auth/register",
+                json={"name": "Load Test", "email": identity.email},
+            )
+            status, data, _ = await self.request(
+                "POST", "/api/client/auth/login", json={"email": identity.email}
+            )
+        if status == 200 and data.get("access_token"):
+            identity.token = data["access_token"]
+            identity.user_id = data.get("user", {}).get("id")
+            return True
+        return False
+
+    async def _login_employee(self, identity: Identity) -> bool:
+        status, data, _ = await self.request(
+            "POST",
+            "/api/employee/auth/login",
+            json={"email": identity.email, "password": self.passwords[identity.email]},
+        )
+        token = data.get("data", {}).get("access_token") if status == 200 else None
+        if token:
+            identity.token = token
+            return True
+        return False
+
+    async def _ensure(self, identity: Identity) -> bool:
+        key = (identity.kind, identity.email)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if identity.valid():
+                return True
+            async with self._semaphore:
+                login = (
+                    self._login_customer
+                    if identity.kind == "customer"
+                    else self._login_employee
+                )
+                try:
+                    ok = await login(identity)
+                except Exception:
+                    ok = False
+            if not ok:
+                self.failures += 1
+                identity.token = None
+                return False
+            self.logins += 1
+            identity.issued_at = time.time()
+            identity.expires_at = token_expiry(identity.token)
+            return True
+
+    async def provision(self) -> "TokenPool":
+        """Cargar la caché y hacer login (en paralelo) de lo que falte o venza.
+
+        Las identidades sin token se descartan; si no queda ninguna de un tipo
+        que se pidió, lanza ``PoolProvisionError``.
+        """
+        self._load_cache()
+        pending = [i for i in self.customers + self.employees if not i.valid()]
+        self.cache_hits = len(self.customers) + len(self.employees) - len(pending)
+        await asyncio.gather(*(self._ensure(identity) for identity in pending))
+        failed = [
+            f"{label} ({len(identities)} logins fallidos)"
+            for label, identities in (
+                ("clientes", self.customers),
+                ("empleados", self.employees),
+            )
+            if identities and not any(i.token for i in identities)
+        ]
+        self.customers = [i for i in self.customers if i.token]
+        self.employees = [i for i in self.employees if i.token]
+        self.save()
+        if failed:
+            raise PoolProvisionError(
+                f"sin tokens para {', '.join(failed)} en {self.base_url}"
+            )
+        return self
+
+    # -- uso ---------------------------------------------------------------
+
+    async def token_for(self, kind: str, vu: int) -> str | None:
+        identities = self.customers if kind == "customer" else self.employees
+        if not identities:
+            return None
+        identity = identities[vu % len(identities)]
+        if not identity.valid() and not await self._ensure(identity):
+            return None
+        return identity.token
+
+    async def headers_for(self, vu: int, endpoint: str) -> dict[str, str]:
+        if endpoint.startswith("/api/client"):
+            token = await self.token_for("customer", vu)
+        elif endpoint.startswith("/api/employee"):
+            token = await self.token_for("employee", vu)
+        else:
+            token = None
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    def ready(self, kind: str) -> int:
+        identities = self.customers if kind == "customer" else self.employees
+        return sum(1 for identity in identities if identity.token)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Estado serializable (para pasarlo a procesos worker)."""
+        return {
+            "base_url": self.base_url,
+            "customers": [asdict(i) for i in self.customers],
+            "employees": [asdict(i) for i in self.employees],
+            "passwords": self.passwords,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], request: RequestFn) -> "TokenPool":
+        """Pool de un worker: mismas identidades, sin escribir la caché."""
+        pool = cls(
+            request,
+            data["base_url"],
+            customers=0,
+            employee_accounts=[
+                {"email": email, "password": password}
+                for email, password in data["passwords"].items()
+            ],
+            cache_path=None,
+        )
+        pool.customers = [Identity(**item) for item in data["customers"]]
+        pool.employees = [Identity(**item) for item in data["employees"]]
+        return pool
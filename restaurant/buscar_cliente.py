@@ -1,15 +1,21 @@
 #!/usr/bin/env python3
 """Buscar cliente en PRONTO por nombre, email o teléfono.
 
+La búsqueda usa las columnas normalizadas (``name_search``, ``email_normalized``,
+``phone_e164``) y los mismos helpers de ``pronto_shared.normalize`` que las
+pueblan, de modo que funciona aunque el PII esté cifrado y usa índices
+(trigram GIN para nombre, btree para email/teléfono).
+
 Uso:
     python buscar_cliente.py --query "Juan"
     python buscar_cliente.py --email "juan@email.com"
-    python buscar_cliente.py --phone "1234567890"
+    python buscar_cliente.py --phone "1234567890" --limit 5
 
 Args:
-    --query: Buscar por nombre (contiene)
-    --email: Buscar por email exacto
-    --phone: Buscar por teléfono exacto
+    --query: Buscar por nombre (contiene), ordenado por relevancia
+    --email: Buscar por email exacto (normalizado)
+    --phone: Buscar por teléfono exacto (E.164)
+    --limit: Máximo de resultados (default: 50)
     --json: Salida en JSON
 """
 
@@ -18,45 +24,92 @@ import json
 import sys
 from pathlib import Path
 
+from sqlalchemy import case, func
+
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from dotenv import load_dotenv
 from pronto_shared.db import get_session
 from pronto_shared.models import Customer
+from pronto_shared.normalize import normalize_email, normalize_name, normalize_phone_e164
 
 ENV_PATH = Path(__file__).parent / ".env"
 if ENV_PATH.exists():
     load_dotenv(ENV_PATH)
 
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def _print_error(as_json: bool, message: str) -> None:
+    if as_json:
+        print(json.dumps({"status": "error", "message": message}))
+    else:
+        print(f"Error: {message}")
+
+
+def _build_query(session, args):
+    """Construir la consulta indexada según el criterio recibido.
+
+    Retorna ``None`` si el valor no se puede normalizar (no habría coincidencias).
+    """
+    query = session.query(Customer)
+
+    if args.email:
+        email = normalize_email(args.email)
+        if not email:
+            return None
+        return query.filter(Customer.email_normalized == email).order_by(Customer.id)
+
+    if args.phone:
+        phone = normalize_phone_e164(args.phone)
+        if not phone:
+            return None
+        return query.filter(Customer.phone_e164 == phone).order_by(Customer.id)
+
+    term = normalize_name(args.query)
+    if not term:
+        return None
+
+    # LIKE '%term%' sobre name_search usa el índice GIN gin_trgm_ops;
+    # el orden prioriza coincidencia exacta, luego prefijo, luego similitud.
+    exact_first = case(
+        (Customer.name_search == term, 0),
+        (Customer.name_search.startswith(term, autoescape=True), 1),
+        else_=2,
+    )
+    return query.filter(Customer.name_search.contains(term, autoescape=True)).order_by(
+        exact_first,
+        func.similarity(Customer.name_search, term).desc(),
+        Customer.id,
+    )
+
 
 def main():
     parser = argparse.ArgumentParser(description="Buscar cliente en PRONTO")
     parser.add_argument("--query", help="Buscar por nombre (contiene)")
     parser.add_argument("--email", help="Buscar por email exacto")
     parser.add_argument("--phone", help="Buscar por teléfono exacto")
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_LIMIT,
+        help=f"Máximo de resultados (default: {DEFAULT_LIMIT}, max: {MAX_LIMIT})",
+    )
     parser.add_argument("--json", action="store_true", help="Salida en JSON")
     args = parser.parse_args()
 
     if not any([args.query, args.email, args.phone]):
-        if args.json:
-            print(
-                '{"status": "error", "message": "Debe especificar --query, --email o --phone"}'
-            )
-        else:
-            print("Error: Debe especificar --query, --email o --phone")
+        _print_error(args.json, "Debe especificar --query, --email o --phone")
         sys.exit(1)
 
-    with get_session() as session:
-        query = session.query(Customer)
-
-        if args.email:
-            query = query.filter(Customer.email.ilike(f"%{args.email}%"))
-        elif args.phone:
-            query = query.filter(Customer.phone.ilike(f"%{args.phone}%"))
-        elif args.query:
-            query = query.filter(Customer.name.ilike(f"%{args.query}%"))
+    if args.limit < 1 or args.limit > MAX_LIMIT:
+        _print_error(args.json, f"--limit debe estar entre 1 y {MAX_LIMIT}")
+        sys.exit(1)
 
-        customers = query.limit(50).all()
+    with get_session() as session:
+        query = _build_query(session, args)
+        customers = query.limit(args.limit).all() if query is not None else []
 
         if args.json:
             print(
@@ -66,7 +119,7 @@ def main():
                         "count": len(customers),
                         "customers": [
                             {
-                                "id": c.id,
+                                "id": str(c.id),
                                 "name": c.name,
                                 "email": c.email,
                                 "phone": c.phone,
@@ -77,11 +130,11 @@ def main():
                 )
             )
         else:
-            print(f"{'ID':<5} {'NOMBRE':<40} {'EMAIL':<30} {'TELÉFONO'}")
-            print("-" * 100)
+            print(f"{'ID':<36} {'NOMBRE':<40} {'EMAIL':<30} {'TELÉFONO'}")
+            print("-" * 130)
             for c in customers:
                 print(
-                    f"{c.id:<5} {c.name[:40]:<40} {c.email or '-':<30} {c.phone or '-'}"
+                    f"{str(c.id):<36} {(c.name or '')[:40]:<40} {c.email or '-':<30} {c.phone or '-'}"
                 )
 
 
@@ -18,8 +18,6 @@ import uuid
 from http import HTTPStatus
 from pathlib import Path
 
-from sqlalchemy import select
-
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from dotenv import load_dotenv
@@ -27,6 +25,7 @@ from pronto_shared.constants import OrderStatus
 from pronto_shared.db import get_session
 from pronto_shared.models import Order
 from pronto_shared.services.order_transitions import transition_order
+from resolver_ordenes import resolve_order
 
 ENV_PATH = Path(__file__).parent / ".env"
 if ENV_PATH.exists():
@@ -47,33 +46,6 @@ def _parse_uuid(raw_value: object, field_name: str, required: bool = True) -> uu
         raise ValueError(f"{field_name} inválido: {value}") from exc
 
 
-def _resolve_order(db_session, raw_identifier: str) -> Order | None:
-    normalized = str(raw_identifier or "").strip()
-    if not normalized:
-        return None
-
-    try:
-        parsed_uuid: uuid.UUID | None = uuid.UUID(normalized)
-    except ValueError:
-        parsed_uuid = None
-
-    if parsed_uuid is not None:
-        order = db_session.get(Order, parsed_uuid)
-        if order is not None:
-            return order
-
-    if normalized.isdigit():
-        return (
-            db_session.execute(
-                select(Order).where(Order.order_number == int(normalized))
-            )
-            .scalars()
-            .first()
-        )
-
-    return None
-
-
 def _print_error(as_json: bool, message: str) -> None:
     if as_json:
         print(json.dumps({"status": "error", "message": message}))
@@ -120,7 +92,7 @@ def main() -> None:
         sys.exit(1)
 
     with get_session() as db_session:
-        order = _resolve_order(db_session, args.id)
+        order = resolve_order(db_session, args.id)
         if order is None:
             _print_error(args.json, f"Orden no encontrada: {args.id}")
             sys.exit(1)
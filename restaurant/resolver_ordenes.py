@@ -0,0 +1,100 @@
+"""Resolución de órdenes por UUID u ``order_number``.
+
+Compartido por ``pasar_estado.py``, ``forzar_estado.py``, ``pagar_orden.py`` y
+``transicion_masiva.py``. Los scripts de ``restaurant/`` se ejecutan desde su
+propio directorio, por lo que basta con ``from resolver_ordenes import ...``.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable
+
+from sqlalchemy import or_, select
+
+from pronto_shared.models import Order
+
+
+def split_identifier(raw_identifier: object) -> tuple[uuid.UUID | None, int | None]:
+    """Interpretar un identificador como UUID y/o order_number."""
+    normalized = str(raw_identifier or "").strip()
+    if not normalized:
+        return None, None
+
+    try:
+        parsed_uuid: uuid.UUID | None = uuid.UUID(normalized)
+    except ValueError:
+        parsed_uuid = None
+
+    order_number = int(normalized) if normalized.isdigit() else None
+    return parsed_uuid, order_number
+
+
+def resolve_order(db_session, raw_identifier: str) -> Order | None:
+    parsed_uuid, order_number = split_identifier(raw_identifier)
+
+    if parsed_uuid is not None:
+        order = db_session.get(Order, parsed_uuid)
+        if order is not None:
+            return order
+
+    if order_number is not None:
+        return (
+            db_session.execute(select(Order).where(Order.order_number == order_number))
+            .scalars()
+            .first()
+        )
+
+    return None
+
+
+def resolve_order_ids(
+    db_session, raw_identifiers: Iterable[str]
+) -> tuple[dict[str, uuid.UUID], list[str]]:
+    """Resolver muchos identificadores (UUIDs y order_numbers mezclados) en una consulta.
+
+    Retorna ``(resueltos, no_encontrados)`` donde ``resueltos`` mapea el
+    identificador original al UUID de la orden.
+    """
+    identifiers = [str(raw or "").strip() for raw in raw_identifiers]
+    identifiers = [raw for raw in dict.fromkeys(identifiers) if raw]
+
+    uuids: set[uuid.UUID] = set()
+    numbers: set[int] = set()
+    for raw in identifiers:
+        parsed_uuid, order_number = split_identifier(raw)
+        if parsed_uuid is not None:
+            uuids.add(parsed_uuid)
+        if order_number is not None:
+            numbers.add(order_number)
+
+    conditions = []
+    if uuids:
+        conditions.append(Order.id.in_(uuids))
+    if numbers:
+        conditions.append(Order.order_number.in_(numbers))
+
+    by_id: dict[str, uuid.UUID] = {}
+    by_number: dict[int, uuid.UUID] = {}
+    if conditions:
+        rows = db_session.execute(
+            select(Order.id, Order.order_number).where(or_(*conditions))
+        ).all()
+        for order_id, order_number in rows:
+            by_id[str(order_id)] = order_id
+            if order_number is not None:
+                by_number[int(order_number)] = order_id
+
+    resolved: dict[str, uuid.UUID] = {}
+    missing: list[str] = []
+    for raw in identifiers:
+        parsed_uuid, order_number = split_identifier(raw)
+        order_id = by_id.get(str(parsed_uuid)) if parsed_uuid is not None else None
+        if order_id is None and order_number is not None:
+            order_id = by_number.get(order_number)
+        if order_id is None:
+            missing.append(raw)
+        else:
+            resolved[raw] = order_id
+
+    return resolved, missing
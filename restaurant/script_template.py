@@ -10,7 +10,7 @@ Uso:
 Categorías:
     - Productos: crear_producto.py, eliminar_producto.py, modificar_producto.py
     - Órdenes: crear_orden.py, eliminar_orden.py, modificar_orden.py
-    - Estados: pasar_a_preparacion.py, forzar_estado.py
+    - Estados: pasar_a_preparacion.py, forzar_estado.py, transicion_masiva.py
     - Pagos: pagar_efectivo.py, pagar_tarjeta.py
     - Mesas: crear_mesa.py, asignar_mesa.py
 """
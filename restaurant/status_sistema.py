@@ -4,17 +4,29 @@
 Uso:
     python status_sistema.py
     python status_sistema.py --json
+    python status_sistema.py --exact --timeout 30
 
 Verifica:
     - Conexión a PostgreSQL
-    - Conexión a Redis
+    - Conexión a Redis (memoria y ops/seg desde INFO)
     - Estado de servicios
     - Contadores de registros
+
+Por defecto los contadores son estimaciones de ``pg_class.reltuples`` /
+``pg_stat_user_tables.n_live_tup`` (no leen las tablas). ``--exact`` usa
+``COUNT(*)``. Las verificaciones corren en paralelo (hilos daemon), cada una
+con su timeout y su latencia medida; un probe colgado no retiene el proceso.
+La conexión a PostgreSQL usa ``connect_timeout`` para que un host caído no
+espere el timeout TCP del sistema.
 """
 
 import argparse
 import json
+import math
+import os
 import sys
+import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -26,71 +38,244 @@ ENV_PATH = Path(__file__).parent / ".env"
 if ENV_PATH.exists():
     load_dotenv(ENV_PATH)
 
+DEFAULT_TIMEOUT_SECONDS = 5.0
+
+ESTIMATED_COUNTS_SQL = """
+    SELECT c.relname,
+           c.reltuples::bigint AS reltuples,
+           s.n_live_tup
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE c.relname = ANY(:names)
+      AND c.relkind IN ('r', 'p')
+      AND n.nspname = current_schema()
+"""
+
+
+def _count_models():
+    from pronto_shared.models import Customer, Employee, MenuItem, Order, Table
+
+    return {
+        "orders": Order,
+        "customers": Customer,
+        "products": MenuItem,
+        "tables": Table,
+        "employees": Employee,
+    }
+
+
+def configure_connect_timeout(timeout):
+    """Agregar ``connect_timeout`` (segundos enteros de libpq) al engine compartido."""
+    from pronto_shared.db import get_session
+    from sqlalchemy import event
+
+    with get_session() as session:
+        engine = session.get_bind()
+
+    seconds = max(1, math.ceil(timeout))
 
-def check_postgres():
+    @event.listens_for(engine, "do_connect")
+    def _connect_timeout(dialect, conn_rec, cargs, cparams):
+        cparams.setdefault("connect_timeout", seconds)
+
+
+def _set_statement_timeout(session, timeout):
+    from sqlalchemy import text
+
+    session.execute(text(f"SET LOCAL statement_timeout = {int(timeout * 1000)}"))
+
+
+def check_postgres(timeout=DEFAULT_TIMEOUT_SECONDS):
     try:
         from pronto_shared.db import get_session
+        from sqlalchemy import text
 
         with get_session() as session:
-            result = session.execute("SELECT 1")
+            _set_statement_timeout(session, timeout)
+            session.execute(text("SELECT 1"))
             return {"status": "connected", "message": "PostgreSQL OK"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
-def check_redis():
+def check_redis(timeout=DEFAULT_TIMEOUT_SECONDS):
     try:
         import redis
 
-        r = redis.Redis(host="localhost", port=6379, decode_responses=True)
+        r = redis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            decode_responses=True,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+        )
         r.ping()
-        return {"status": "connected", "message": "Redis OK"}
+        memory = r.info("memory")
+        stats = r.info("stats")
+        return {
+            "status": "connected",
+            "message": "Redis OK",
+            "used_memory": memory.get("used_memory_human"),
+            "used_memory_peak": memory.get("used_memory_peak_human"),
+            "ops_per_sec": stats.get("instantaneous_ops_per_sec"),
+        }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
-def get_counts():
+def get_estimated_counts(timeout=DEFAULT_TIMEOUT_SECONDS):
+    """Contadores aproximados desde el catálogo; no escanea las tablas."""
     try:
         from pronto_shared.db import get_session
-        from pronto_shared.models import Order, Customer, MenuItem, Table, Employee
+        from sqlalchemy import text
+
+        models = _count_models()
+        table_names = {key: model.__tablename__ for key, model in models.items()}
 
         with get_session() as session:
-            counts = {
-                "orders": session.query(Order).count(),
-                "customers": session.query(Customer).count(),
-                "products": session.query(MenuItem).count(),
-                "tables": session.query(Table).count(),
-                "employees": session.query(Employee).count(),
-            }
+            _set_statement_timeout(session, timeout)
+            rows = session.execute(
+                text(ESTIMATED_COUNTS_SQL), {"names": list(table_names.values())}
+            ).all()
+
+        by_table = {}
+        for relname, reltuples, n_live_tup in rows:
+            # reltuples = -1 en tablas nunca analizadas (PG14+); usar n_live_tup.
+            if reltuples is not None and reltuples >= 0:
+                by_table[relname] = int(reltuples)
+            else:
+                by_table[relname] = int(n_live_tup or 0)
+
+        return {key: by_table.get(name) for key, name in table_names.items()}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def get_counts(timeout=DEFAULT_TIMEOUT_SECONDS):
+    try:
+        from pronto_shared.db import get_session
+
+        models = _count_models()
+        with get_session() as session:
+            _set_statement_timeout(session, timeout)
+            counts = {key: session.query(model).count() for key, model in models.items()}
             return counts
     except Exception as e:
         return {"error": str(e)}
 
 
+def _timed(probe, timeout, name, finished):
+    started = time.perf_counter()
+    result = probe(timeout)
+    finished[name] = (result, (time.perf_counter() - started) * 1000.0)
+
+
+def run_probes(probes, timeout):
+    """Ejecutar probes en paralelo; cada uno con timeout y latencia en ms.
+
+    Cada probe corre en un hilo daemon y se espera como máximo hasta el
+    deadline común: un probe colgado (p.ej. en el connect) se reporta como
+    ``timeout`` y no impide que el proceso termine.
+    """
+    finished = {}
+    threads = {
+        name: threading.Thread(
+            target=_timed,
+            args=(probe, timeout, name, finished),
+            name=f"probe-{name}",
+            daemon=True,
+        )
+        for name, probe in probes.items()
+    }
+    for thread in threads.values():
+        thread.start()
+
+    deadline = time.monotonic() + timeout
+    results = {}
+    latencies = {}
+    for name, thread in threads.items():
+        thread.join(max(deadline - time.monotonic(), 0.0))
+        if name in finished:
+            results[name], latencies[name] = finished[name]
+        else:
+            results[name] = {"status": "timeout", "message": f"Sin respuesta en {timeout:.1f}s"}
+            latencies[name] = None
+    return results, latencies
+
+
 def main():
     parser = argparse.ArgumentParser(description="Verificar estado del sistema PRONTO")
     parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Contadores exactos con COUNT(*) (lento en tablas grandes)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT_SECONDS,
+        help=f"Timeout por verificación en segundos (default: {DEFAULT_TIMEOUT_SECONDS})",
+    )
     args = parser.parse_args()
 
+    probes = {
+        "postgres": check_postgres,
+        "redis": check_redis,
+        "counts": get_counts if args.exact else get_estimated_counts,
+    }
+    try:
+        configure_connect_timeout(args.timeout)
+    except Exception:
+        # Sin engine el probe de postgres reporta el error con su mensaje.
+        pass
+    results, latencies = run_probes(probes, args.timeout)
+
     status = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
-        "postgres": check_postgres(),
-        "redis": check_redis(),
-        "counts": get_counts(),
+        "postgres": results["postgres"],
+        "redis": results["redis"],
+        "counts": results["counts"],
+        "counts_mode": "exact" if args.exact else "estimated",
+        "latency_ms": {
+            name: round(value, 2) if value is not None else None
+            for name, value in latencies.items()
+        },
     }
 
     if args.json:
         print(json.dumps(status, indent=2))
     else:
+        latency = status["latency_ms"]
+
+        def _ms(name):
+            return f"{latency[name]:.1f} ms" if latency[name] is not None else "timeout"
+
         print("=== ESTADO DEL SISTEMA PRONTO ===")
         print(f"Timestamp: {status['timestamp']}")
         print(
             f"PostgreSQL: {status['postgres']['status']} - {status['postgres']['message']}"
+            f" ({_ms('postgres')})"
+        )
+        print(
+            f"Redis: {status['redis']['status']} - {status['redis']['message']}"
+            f" ({_ms('redis')})"
         )
-        print(f"Redis: {status['redis']['status']} - {status['redis']['message']}")
-        print("\n=== CONTADORES ===")
-        for key, value in status["counts"].items():
-            print(f"  {key}: {value}")
+        if status["redis"].get("status") == "connected":
+            print(
+                f"  memoria: {status['redis'].get('used_memory')}"
+                f" (pico {status['redis'].get('used_memory_peak')}),"
+                f" ops/seg: {status['redis'].get('ops_per_sec')}"
+            )
+        print(f"\n=== CONTADORES ({status['counts_mode']}, {_ms('counts')}) ===")
+        counts = status["counts"]
+        if "status" in counts and "message" in counts:
+            print(f"  {counts['status']}: {counts['message']}")
+        else:
+            prefix = "" if args.exact else "~"
+            for key, value in counts.items():
+                print(f"  {key}: {prefix}{value}" if key != "error" else f"  error: {value}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""Transición masiva de órdenes usando la máquina de estados canónica.
+
+Pensado para cierre de turno (ej. delivered -> paid, órdenes viejas -> cancelled).
+Las órdenes se resuelven en una sola consulta (UUIDs y order_numbers mezclados),
+se bloquean por lotes con ``FOR UPDATE SKIP LOCKED`` y cada una pasa por
+``order_state_machine.apply_transition``. El historial de estados se inserta en
+bloque por lote. Órdenes bloqueadas por otra transacción se reportan como
+``locked`` y no se tocan; cuentan como fallo parcial (exit 1) para que el
+cierre de turno se reintente.
+
+Uso:
+    python transicion_masiva.py --ids 101,102,<uuid> --status paid --payment-method cash
+    python transicion_masiva.py --from-status delivered --status paid --dry-run
+    python transicion_masiva.py --from-status new,queued --older-than-minutes 240 \\
+        --status cancelled --reason "Cierre de turno"
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import insert, select
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from dotenv import load_dotenv
+from pronto_shared.constants import ORDER_TRANSITIONS, OrderStatus
+from pronto_shared.db import get_session
+from pronto_shared.models import Order, OrderStatusHistory
+from pronto_shared.services.order_state_machine import (
+    OrderEvent,
+    OrderStateError,
+    TransitionContext,
+    order_state_machine,
+)
+from resolver_ordenes import resolve_order_ids
+
+ENV_PATH = Path(__file__).parent / ".env"
+if ENV_PATH.exists():
+    load_dotenv(ENV_PATH)
+
+CANON_STATUSES = [status.value for status in OrderStatus]
+EMPLOYEE_SCOPES = {"waiter", "chef", "cashier", "admin"}
+DEFAULT_BATCH_SIZE = 100
+# ``locked``: otra transacción tenía la orden; el lote quedó incompleto.
+FAILED_OUTCOMES = frozenset({"error", "invalid_transition", "not_found", "locked"})
+
+
+def _parse_uuid(raw_value: object, field_name: str, required: bool = True) -> uuid.UUID | None:
+    value = str(raw_value or "").strip()
+    if not value:
+        if required:
+            raise ValueError(f"{field_name} es requerido")
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError as exc:
+        raise ValueError(f"{field_name} inválido: {value}") from exc
+
+
+def _print_error(as_json: bool, message: str) -> None:
+    if as_json:
+        print(json.dumps({"status": "error", "message": message}))
+    else:
+        print(f"Error: {message}")
+
+
+def _split_csv(raw: str | None) -> list[str]:
+    return [part.strip() for part in str(raw or "").split(",") if part.strip()]
+
+
+def _read_identifiers(args) -> list[str]:
+    identifiers = _split_csv(args.ids)
+    if args.ids_file:
+        with open(args.ids_file, encoding="utf-8") as handle:
+            for line in handle:
+                identifiers.extend(_split_csv(line.split("#", 1)[0]))
+    return identifiers
+
+
+def _event_for(from_status: str, to_status: OrderStatus) -> OrderEvent | None:
+    """Evento canónico para ``from_status -> to_status`` según ORDER_TRANSITIONS."""
+    try:
+        policy = ORDER_TRANSITIONS.get((OrderStatus(from_status), to_status))
+    except ValueError:
+        return None
+    if not policy:
+        return None
+    try:
+        return OrderEvent(policy["action"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _select_by_filter(db_session, args) -> list[uuid.UUID]:
+    stmt = select(Order.id).where(Order.workflow_status.in_(_split_csv(args.from_status)))
+    if args.older_than_minutes:
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=args.older_than_minutes)
+        stmt = stmt.where(Order.created_at < cutoff)
+    if args.session_id:
+        stmt = stmt.where(Order.session_id == args.session_id)
+    return list(db_session.execute(stmt.order_by(Order.created_at)).scalars())
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _transition_batch(
+    order_ids: list[uuid.UUID],
+    *,
+    target: OrderStatus,
+    actor_scope: str,
+    actor_id: uuid.UUID | None,
+    payload: dict[str, object],
+    reason: str | None,
+    dry_run: bool,
+) -> list[dict[str, object]]:
+    """Bloquear, transicionar y registrar historial de un lote en una transacción."""
+    outcomes: list[dict[str, object]] = []
+    history_rows: list[dict[str, object]] = []
+    changed_by = actor_id if actor_scope in EMPLOYEE_SCOPES else None
+
+    with get_session() as db_session:
+        orders = (
+            db_session.execute(
+                select(Order)
+                .where(Order.id.in_(order_ids))
+                .order_by(Order.id)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+        locked_ids = set(order_ids) - {order.id for order in orders}
+
+        for order in orders:
+            old_status = order.workflow_status
+            outcome: dict[str, object] = {
+                "order_id": str(order.id),
+                "order_number": order.order_number,
+                "old_status": old_status,
+                "new_status": old_status,
+            }
+            outcomes.append(outcome)
+
+            if old_status == target.value:
+                outcome["outcome"] = "unchanged"
+                continue
+
+            event = _event_for(old_status, target)
+            if event is None:
+                outcome["outcome"] = "invalid_transition"
+                outcome["message"] = f"Transición no permitida: {old_status} -> {target.value}"
+                continue
+
+            if dry_run:
+                outcome["outcome"] = "would_apply"
+                outcome["new_status"] = target.value
+                continue
+
+            try:
+                with db_session.begin_nested():
+                    order_state_machine.apply_transition(
+                        TransitionContext(
+                            order=order,
+                            event=event,
+                            actor_scope=actor_scope,
+                            actor_id=actor_id,
+                            payload=payload or None,
+                        )
+                    )
+            except (OrderStateError, ValueError) as exc:
+                outcome["outcome"] = "error"
+                outcome["message"] = str(exc)
+                continue
+
+            outcome["outcome"] = "applied"
+            outcome["new_status"] = order.workflow_status
+            history_rows.append(
+                {
+                    "order_id": order.id,
+                    "status": order.workflow_status,
+                    "changed_at": datetime.now(timezone.utc),
+                    "changed_by": changed_by,
+                    "notes": reason,
+                }
+            )
+
+        if history_rows:
+            db_session.execute(insert(OrderStatusHistory), history_rows)
+
+        if dry_run:
+            db_session.rollback()
+        else:
+            db_session.commit()
+
+    for order_id in sorted(locked_ids, key=str):
+        outcomes.append(
+            {
+                "order_id": str(order_id),
+                "outcome": "locked",
+                "message": "Bloqueada por otra transacción (SKIP LOCKED)",
+            }
+        )
+    return outcomes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Transición masiva de órdenes (canónica)")
+    parser.add_argument("--ids", help="UUIDs u order_numbers separados por coma")
+    parser.add_argument("--ids-file", help="Archivo con UUIDs u order_numbers (uno por línea)")
+    parser.add_argument("--from-status", help="Filtrar por estado(s) actuales, ej: 'delivered'")
+    parser.add_argument(
+        "--older-than-minutes",
+        type=int,
+        help="Con --from-status: solo órdenes creadas hace más de N minutos",
+    )
+    parser.add_argument("--session-id", help="Con --from-status: solo órdenes de una sesión")
+    parser.add_argument("--status", required=True, choices=CANON_STATUSES, help="Estado destino")
+    parser.add_argument(
+        "--actor-scope",
+        default="system",
+        choices=["waiter", "chef", "cashier", "admin", "system"],
+        help="Scope ejecutando la transición",
+    )
+    parser.add_argument("--actor-id", help="UUID del actor (opcional)")
+    parser.add_argument("--reason", help="Justificación (se guarda en el historial)")
+    parser.add_argument(
+        "--payment-method",
+        default="cash",
+        choices=["cash", "card", "stripe", "clip"],
+        help="Método de pago (si --status paid)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Órdenes por lote/transacción (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Validar sin aplicar cambios")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    if not (args.ids or args.ids_file or args.from_status):
+        _print_error(args.json, "Debe especificar --ids, --ids-file o --from-status")
+        sys.exit(1)
+    if (args.ids or args.ids_file) and args.from_status:
+        _print_error(args.json, "--ids/--ids-file y --from-status son excluyentes")
+        sys.exit(1)
+    if not args.from_status and (args.older_than_minutes is not None or args.session_id):
+        _print_error(args.json, "--older-than-minutes y --session-id requieren --from-status")
+        sys.exit(1)
+    if args.batch_size < 1:
+        _print_error(args.json, "--batch-size debe ser mayor a 0")
+        sys.exit(1)
+    unknown = [status for status in _split_csv(args.from_status) if status not in CANON_STATUSES]
+    if unknown:
+        _print_error(
+            args.json,
+            f"--from-status inválido: {', '.join(unknown)} (válidos: {', '.join(CANON_STATUSES)})",
+        )
+        sys.exit(1)
+
+    try:
+        target_status = OrderStatus(args.status)
+        actor_id = _parse_uuid(args.actor_id, "actor_id", required=False)
+        args.session_id = _parse_uuid(args.session_id, "session_id", required=False)
+        identifiers = _read_identifiers(args)
+    except (OSError, ValueError) as exc:
+        _print_error(args.json, str(exc))
+        sys.exit(1)
+
+    payload: dict[str, object] = {}
+    if args.reason:
+        payload["justification"] = args.reason
+    if target_status == OrderStatus.PAID:
+        payload["payment_method"] = args.payment_method
+
+    outcomes: list[dict[str, object]] = []
+    with get_session() as db_session:
+        if args.from_status:
+            order_ids = _select_by_filter(db_session, args)
+        else:
+            resolved, missing = resolve_order_ids(db_session, identifiers)
+            order_ids = list(dict.fromkeys(resolved.values()))
+            outcomes.extend(
+                {"order_id": raw, "outcome": "not_found", "message": "Orden no encontrada"}
+                for raw in missing
+            )
+
+    for chunk in _chunks(order_ids, args.batch_size):
+        outcomes.extend(
+            _transition_batch(
+                chunk,
+                target=target_status,
+                actor_scope=args.actor_scope,
+                actor_id=actor_id,
+                payload=payload,
+                reason=args.reason,
+                dry_run=args.dry_run,
+            )
+        )
+
+    summary: dict[str, int] = {}
+    for outcome in outcomes:
+        summary[str(outcome["outcome"])] = summary.get(str(outcome["outcome"]), 0) + 1
+    failed = any(o["outcome"] in FAILED_OUTCOMES for o in outcomes)
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "status": "partial" if failed else "success",
+                    "target_status": target_status.value,
+                    "dry_run": args.dry_run,
+                    "summary": summary,
+                    "orders": outcomes,
+                }
+            )
+        )
+    else:
+        for outcome in outcomes:
+            label = outcome.get("order_number") or outcome["order_id"]
+            line = f"{outcome['outcome']:<18} {label}"
+            if "old_status" in outcome:
+                line += f"  {outcome['old_status']} -> {outcome['new_status']}"
+            if outcome.get("message"):
+                line += f"  ({outcome['message']})"
+            print(line)
+        print("-" * 60)
+        print(
+            "Resumen: "
+            + ", ".join(f"{name}={count}" for name, count in sorted(summary.items()))
+            + (" [dry-run]" if args.dry_run else "")
+        )
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()